@@ -0,0 +1,29 @@
+-- docker/init-scripts/02-rag-source-registry.sql
+-- Reingestao incremental do RAG: hash de conteudo por chunk e registro de fontes
+
+ALTER TABLE agenteia.documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- Remover duplicatas antigas (mesma fonte e mesmo conteudo), mantendo a mais antiga
+DELETE FROM agenteia.documents d
+USING agenteia.documents o
+WHERE d.source = o.source
+  AND d.content = o.content
+  AND d.id > o.id
+  AND d.content_hash IS NULL;
+
+-- Um chunk por conteudo dentro de cada fonte; linhas antigas sem hash ficam fora do indice
+-- e sao apagadas no primeiro commit da fonte no registro (SourceRegistry.commit)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_source_content_hash
+    ON agenteia.documents (source, content_hash)
+    WHERE content_hash IS NOT NULL;
+
+-- Fonte -> hashes dos chunks atualmente gravados (base do diff na reingestao)
+CREATE TABLE IF NOT EXISTS agenteia.rag_sources (
+    source VARCHAR(255) PRIMARY KEY,
+    chunk_hashes TEXT[] NOT NULL DEFAULT '{}',
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    ingested_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    metadata JSONB DEFAULT '{}'
+);
+
+GRANT ALL PRIVILEGES ON agenteia.rag_sources TO agenteia_app;
@@ -0,0 +1,13 @@
+-- docker/init-scripts/03-bot-shared-state.sql
+-- Estado compartilhado pelos processos do bot Discord (um processo por shard)
+
+-- Agente preferido de cada usuario, visivel para qualquer shard
+CREATE TABLE IF NOT EXISTS agenteia.bot_user_preferences (
+    user_id VARCHAR(255) PRIMARY KEY,
+    agent_type VARCHAR(50) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- A lideranca do monitoramento de logs usa pg_try_advisory_lock e nao precisa de tabela
+
+GRANT ALL PRIVILEGES ON agenteia.bot_user_preferences TO agenteia_app;
@@ -163,53 +163,39 @@ async def migrate_existing_data():
 
     try:
         from memory.postgres_memory_service import PostgresMemoryService
-        from memory.memory_manager import MemoryManager # Importar MemoryManager para fallback
-        import json
+        from memory.conversation_migration import ConversationMigrator
 
-        # Inicializar serviços
-        postgres_service = PostgresMemoryService()
-        await postgres_service.initialize()
-
-        # Verificar se existe diretório de memória antiga
-        old_memory_dir = Path("memory_storage")
-        if not old_memory_dir.exists():
+        # Armazenamento em arquivos usado na raiz e dentro do projeto
+        roots = [d for d in (current_dir / "memory_storage", current_dir / "projeto_agentes_ia" / "memory_storage")
+                 if d.exists()]
+        if not roots:
             print("ℹ️ Nenhum dado antigo encontrado para migrar")
-            await postgres_service.close()
             return True
 
-        print(f"📁 Encontrado diretório de memória: {old_memory_dir}")
+        for root in roots:
+            print(f"📁 Encontrado diretório de memória: {root}")
 
-        migrated_count = 0
-        error_count = 0
-
-        # Migrar arquivos de conversa
-        for json_file in old_memory_dir.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    conversations = json.load(f)
-
-                print(f"📄 Migrando arquivo: {json_file.name} ({len(conversations)} conversas)")
-
-                for conv_data in conversations:
-                    try:
-                        from memory.memory_manager import ConversationEntry
-                        entry = ConversationEntry.from_dict(conv_data)
-                        await postgres_service.save_conversation(entry)
-                        migrated_count += 1
-                    except Exception as conv_error:
-                        print(f"⚠️ Erro ao migrar conversa: {conv_error}")
-                        error_count += 1
+        postgres_service = PostgresMemoryService()
+        await postgres_service.initialize()
 
-            except Exception as file_error:
-                print(f"❌ Erro ao processar arquivo {json_file}: {file_error}")
-                error_count += 1
+        try:
+            migrator = ConversationMigrator(
+                postgres_service.pool,
+                checkpoint_path=current_dir / "migration_checkpoint.json",
+                batch_size=int(os.getenv("MIGRATION_BATCH_SIZE", "5000")),
+                workers=int(os.getenv("MIGRATION_WORKERS", "4"))
+            )
+            report = await migrator.run(roots)
+        finally:
+            await postgres_service.close()
 
         print(f"✅ Migração concluída:")
-        print(f"   📊 Conversas migradas: {migrated_count}")
-        print(f"   ❌ Erros: {error_count}")
+        print(f"   📄 Arquivos: {report.files_done} migrados, {report.files_skipped} já migrados anteriormente")
+        print(f"   📊 Conversas migradas: {report.rows_inserted} ({report.duplicates} já existentes)")
+        print(f"   ⚡ Performance: {report.rows_per_second:.0f} linhas/segundo")
+        print(f"   ❌ Erros: {report.invalid_entries} entradas inválidas, {len(report.failed_files)} arquivos")
 
-        await postgres_service.close()
-        return True
+        return not report.failed_files
 
     except Exception as e:
         print(f"❌ Erro na migração de dados: {e}")
@@ -381,50 +367,14 @@ async def performance_benchmark():
     print("\n⚡ === BENCHMARK DE PERFORMANCE ===")
 
     try:
-        from memory.postgres_memory_service import PostgresMemoryService
-        from memory.memory_manager import ConversationEntry
-        import time
-
-        postgres_service = PostgresMemoryService()
-        await postgres_service.initialize()
-
-        # Teste de inserção em lote
-        print("📊 Testando performance de inserção...")
-
-        start_time = time.time()
-        batch_size = 100
-
-        for i in range(batch_size):
-            entry = ConversationEntry(
-                timestamp=datetime.now().isoformat(),
-                user_id=f"benchmark_user_{i % 10}",
-                session_id=f"benchmark_session_{i % 5}",
-                user_message=f"Mensagem de benchmark número {i}",
-                agent_response=f"Resposta de benchmark para mensagem {i}",
-                agent_type="benchmark",
-                metadata={"benchmark": True, "batch": i}
-            )
-            await postgres_service.save_conversation(entry)
-
-        insert_time = time.time() - start_time
-        print(f"✅ Inserção de {batch_size} registros: {insert_time:.2f}s")
-        print(f"   Performance: {batch_size/insert_time:.1f} inserções/segundo")
+        from benchmarks import memory_backends
+        from benchmarks.common import write_report
 
-        # Teste de busca
-        print("🔍 Testando performance de busca...")
-
-        start_time = time.time()
-        for i in range(10):
-            history = await postgres_service.get_conversation_history(
-                f"benchmark_user_{i}", f"benchmark_session_{i % 5}", limit=10
-            )
-
-        search_time = time.time() - start_time
-        print(f"✅ 10 buscas de histórico: {search_time:.2f}s")
-        print(f"   Performance: {10/search_time:.1f} buscas/segundo")
-
-        await postgres_service.close()
-        return True
+        # Suíte completa (RAG, logs, documentos): python -m benchmarks em projeto_agentes_ia
+        args = memory_backends.build_parser().parse_args(["--users", "10", "--messages", "5", "--queries", "50"])
+        report = await memory_backends.run_async(args)
+        write_report(report, "benchmark_memory.json")
+        return "postgres" in report.results
 
     except Exception as e:
         print(f"❌ Erro no benchmark: {e}")
@@ -495,6 +445,11 @@ async def main():
 
     success = True
 
+    # Só a migração dos dados (retomável), com o PostgreSQL já no ar
+    if "--only-data" in sys.argv:
+        await migrate_existing_data()
+        return
+
     # Etapa 1: Configurar PostgreSQL
     if not await setup_postgres_environment():
         print("❌ Falha na configuração do PostgreSQL")
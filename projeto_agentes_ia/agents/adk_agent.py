@@ -5,7 +5,7 @@ from google.adk.runners import Runner
 from google.adk.tools import google_search
 from google.genai import types
 from .base_agent import BaseAgent
-import asyncio
+from integrations.http_pool import run_sync
 import os
 from dotenv import load_dotenv
 
@@ -45,7 +45,7 @@ class SimpleADKAgent(BaseAgent):
         """
         Executa o agente de forma síncrona (wrapper para o método assíncrono).
         """
-        return asyncio.run(self._run_async(query))
+        return run_sync(self._run_async(query))
 
     async def _run_async(self, query: str) -> str:
         """
@@ -5,16 +5,14 @@ from google.adk.tools import google_search
 from google.genai import types
 from .base_agent import BaseAgent
 import os
-import sys
-from pathlib import Path
+import logging
 from dotenv import load_dotenv
 
-# Adicionar o diretório de memória ao path
-memory_path = Path(__file__).parent.parent / "memory"
-sys.path.append(str(memory_path))
+from memory.memory_manager import MemoryManager
+from memory.rag_system import RAGManager
+from observability import span, mark_error
 
-from memory_manager import MemoryManager
-from rag_system import RAGManager
+logger = logging.getLogger(__name__)
 
 class ADKAgentWithMemory(BaseAgent):
     """
@@ -87,9 +85,11 @@ FORMATO DE RESPOSTA:
             self.rag_manager = None
 
     def set_user_context(self, user_id: str, session_id: str = None):
-        """Define o contexto do usuário para a sessão."""
+        """
+        Define o usuário padrão de run(). A sessão não fica na instância:
+        é passada a cada _run_async (ou derivada do usuário).
+        """
         self.user_id = user_id
-        self.session_id = session_id or f"session_{user_id}_{hash(user_id) % 10000}"
 
     def add_knowledge(self, content: str, source: str = "user", metadata: dict = None):
         """Adiciona conhecimento ao sistema RAG."""
@@ -140,101 +140,117 @@ Seja consistente com informações fornecidas anteriormente."""
 
         return contextualized_query
 
-    async def _run_async(self, query: str) -> str:
-        """Método assíncrono que executa o agente com contexto de memória."""
+    async def _run_async(self, query: str, user_id: str = None, session_id: str = None) -> str:
+        """
+        Método assíncrono que executa o agente com contexto de memória.
+        user_id/session_id por chamada permitem requisições simultâneas de
+        usuários diferentes na mesma instância; sem session_id, cada usuário
+        usa a própria sessão padrão.
+        """
         if not self.agent:
             return "Agente ADK não está disponível. Verifique a configuração."
 
-        try:
-            print(f"[{self.name}] Processando consulta: '{query[:50]}...'")
-
-            # Gerar ID de sessão único
-            session_id = getattr(self, 'session_id', None) or f"session_{abs(hash(query)) % 10000}"
-
-            # Criar sessão
-            session = await self.session_service.create_session(
-                app_name=self.app_name,
-                user_id=self.user_id,
-                session_id=session_id
-            )
-
-            # Obter contexto de memória se disponível
-            contextualized_query = query
-            if self.memory_manager:
-                try:
-                    memory_context = self.memory_manager.get_context_for_agent(
-                        self.user_id, session_id, limit=3
-                    )
-
-                    rag_context = ""
-                    if self.rag_manager:
-                        rag_context = self.rag_manager.get_relevant_context(query, limit=2)
-
-                    related_context = self.memory_manager.search_relevant_context(
-                        self.user_id, query, limit=2
-                    )
-
-                    contextualized_query = self._build_contextualized_query(
-                        query, memory_context, rag_context, related_context
-                    )
-
-                    print(f"[{self.name}] Contexto de memória aplicado com sucesso")
-
-                except Exception as memory_error:
-                    print(f"[{self.name}] Erro ao aplicar contexto de memória: {memory_error}")
-                    # Continuar sem contexto se houver erro
-
-            # Preparar o conteúdo da mensagem
-            content = types.Content(
-                role='user',
-                parts=[types.Part(text=contextualized_query)]
-            )
-
-            # Executar o agente
-            events_async = self.runner.run_async(
-                user_id=self.user_id,
-                session_id=session_id,
-                new_message=content
-            )
-
-            # Processar eventos assíncronos
-            final_response = ""
-            async for event in events_async:
-                if event.is_final_response():
-                    if hasattr(event, 'content') and event.content:
-                        if hasattr(event.content, 'parts'):
-                            if hasattr(event.content.parts, 'text'):
-                                final_response = event.content.parts.text
-                            elif isinstance(event.content.parts, list):
-                                for part in event.content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        final_response += part.text
-                            elif hasattr(event.content, 'text'):
-                                final_response = event.content.text
-                        break
-
-            if not final_response:
-                final_response = "Não foi possível obter uma resposta do agente."
-
-            # Salvar interação na memória se disponível
-            if self.memory_manager:
-                try:
-                    self.memory_manager.save_interaction(
-                        user_id=self.user_id,
+        user_id = user_id or self.user_id
+        with span("agent.run", agent=self.name, user_id=user_id) as run_span:
+            try:
+                logger.debug("[%s] Processando consulta: '%s...'", self.name, query[:50])
+
+                # Sessão da chamada; nunca a de outra requisição
+                session_id = session_id or f"session_{user_id}"
+                run_span.set_attribute("session_id", session_id)
+
+                # Criar sessão
+                session = await self.session_service.create_session(
+                    app_name=self.app_name,
+                    user_id=user_id,
+                    session_id=session_id
+                )
+
+                # Obter contexto de memória se disponível
+                contextualized_query = query
+                if self.memory_manager:
+                    try:
+                        with span("context.memory"):
+                            memory_context = self.memory_manager.get_context_for_agent(
+                                user_id, session_id, limit=3
+                            )
+
+                        rag_context = ""
+                        if self.rag_manager:
+                            with span("context.rag", limit=2):
+                                rag_context = self.rag_manager.get_relevant_context(query, limit=2)
+
+                        with span("context.related", limit=2):
+                            related_context = self.memory_manager.search_relevant_context(
+                                user_id, query, limit=2
+                            )
+
+                        contextualized_query = self._build_contextualized_query(
+                            query, memory_context, rag_context, related_context
+                        )
+
+                        logger.debug("[%s] Contexto de memória aplicado com sucesso", self.name)
+
+                    except Exception as memory_error:
+                        logger.warning("[%s] Erro ao aplicar contexto de memória: %s", self.name, memory_error)
+                        # Continuar sem contexto se houver erro
+
+                # Preparar o conteúdo da mensagem
+                content = types.Content(
+                    role='user',
+                    parts=[types.Part(text=contextualized_query)]
+                )
+
+                # Executar o agente (o ADK abre spans call_llm/execute_tool dentro deste)
+                final_response = ""
+                with span("llm.call", model=str(getattr(self.agent.model, "model", self.agent.model)),
+                          prompt_chars=len(contextualized_query)) as llm_span:
+                    events_async = self.runner.run_async(
+                        user_id=user_id,
                         session_id=session_id,
-                        user_message=query,
-                        agent_response=final_response,
-                        agent_type="ADK",
-                        metadata={"has_rag_context": bool(self.rag_manager)}
+                        new_message=content
                     )
-                    print(f"[{self.name}] Interação salva na memória")
-                except Exception as save_error:
-                    print(f"[{self.name}] Erro ao salvar na memória: {save_error}")
-
-            print(f"[{self.name}] Resposta gerada com sucesso")
-            return final_response
 
-        except Exception as e:
-            error_msg = f"Erro ao executar agente: {str(e)}"
-            print(f"[{self.name}] {error_msg}")
-            return f"Desculpe, ocorreu um erro: {error_msg}"
\ No newline at end of file
+                    # Processar eventos assíncronos
+                    async for event in events_async:
+                        if event.is_final_response():
+                            if hasattr(event, 'content') and event.content:
+                                if hasattr(event.content, 'parts'):
+                                    if hasattr(event.content.parts, 'text'):
+                                        final_response = event.content.parts.text
+                                    elif isinstance(event.content.parts, list):
+                                        for part in event.content.parts:
+                                            if hasattr(part, 'text') and part.text:
+                                                final_response += part.text
+                                    elif hasattr(event.content, 'text'):
+                                        final_response = event.content.text
+                                break
+                    llm_span.set_attribute("response_chars", len(final_response))
+
+                if not final_response:
+                    final_response = "Não foi possível obter uma resposta do agente."
+
+                # Salvar interação na memória se disponível
+                if self.memory_manager:
+                    try:
+                        with span("memory.save"):
+                            self.memory_manager.save_interaction(
+                                user_id=user_id,
+                                session_id=session_id,
+                                user_message=query,
+                                agent_response=final_response,
+                                agent_type="ADK",
+                                metadata={"has_rag_context": bool(self.rag_manager)}
+                            )
+                        logger.debug("[%s] Interação salva na memória", self.name)
+                    except Exception as save_error:
+                        logger.warning("[%s] Erro ao salvar na memória: %s", self.name, save_error)
+
+                logger.debug("[%s] Resposta gerada com sucesso", self.name)
+                return final_response
+
+            except Exception as e:
+                error_msg = f"Erro ao executar agente: {str(e)}"
+                logger.error("[%s] %s", self.name, error_msg)
+                mark_error(run_span, error_msg)
+                return f"Desculpe, ocorreu um erro: {error_msg}"
@@ -1,57 +1,124 @@
-from typing import Dict, Optional
-from .adk_agent_with_memory import ADKAgentWithMemory
-from .langchain_agent_with_memory import LangChainGeminiAgent  # Nova importação
+from typing import Dict, List, Optional
 from .base_agent import BaseAgent
+import asyncio
+import importlib
 import os
+import threading
+import time
+import logging
+
+from observability import startup_report
+
+logger = logging.getLogger(__name__)
+
+# Agentes conhecidos: módulo e classe importados só na primeira utilização
+# (google.adk e langchain levam segundos para carregar)
+AGENT_TYPES = {
+    "adk": ("agents.adk_agent_with_memory", "ADKAgentWithMemory", "Agente ADK (Google Gemini)"),
+    "langchain": ("agents.langchain_agent_with_memory", "LangChainGeminiAgent", "Agente LangChain (Google Gemini)")
+}
+
+DEFAULT_INSTRUCTION = """
+        Você é um assistente de IA inteligente e prestativo.
+        Responda às perguntas dos usuários de forma clara, precisa e informativa.
+        Se você não souber algo, seja honesto sobre isso.
+        Mantenha suas respostas organizadas e fáceis de entender.
+        Use sua memória para fornecer respostas mais personalizadas e contextuais.
+        """
 
 class AgentManager:
     """
     Gerenciador para múltiplos agentes de IA.
     Permite alternar entre diferentes tipos de agentes.
+
+    Os agentes são criados no primeiro uso (get_agent/aget_agent) ou no
+    aquecimento (warm_up), não no construtor: iniciar o gerenciador só
+    verifica quais agentes estão configurados.
     """
     
-    def __init__(self):
-        self.agents: Dict[str, BaseAgent] = {}
+    def __init__(self, warm_up: bool = False):
+        self.agents: Dict[str, BaseAgent] = {}  # agentes já criados
+        self.available: List[str] = []          # agentes configurados
         self.current_agent: Optional[str] = None
+        self.init_times: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
         self._initialize_agents()
+        if warm_up:
+            self.warm_up()
     
     def _initialize_agents(self):
-        """Inicializa todos os agentes disponíveis com Google Gemini unificado."""
-        instruction = """
-        Você é um assistente de IA inteligente e prestativo.
-        Responda às perguntas dos usuários de forma clara, precisa e informativa.
-        Se você não souber algo, seja honesto sobre isso.
-        Mantenha suas respostas organizadas e fáceis de entender.
-        Use sua memória para fornecer respostas mais personalizadas e contextuais.
-        """
-        
-        # Inicializar agente ADK com memória (Google Gemini)
-        try:
+        """Registra os agentes disponíveis com Google Gemini unificado (sem criá-los)."""
+        for agent_type, (_, _, label) in AGENT_TYPES.items():
             if os.getenv("GOOGLE_API_KEY"):
-                self.agents["adk"] = ADKAgentWithMemory(instruction=instruction)
-                print("✅ Agente ADK (Google Gemini) inicializado com sucesso")
+                self.available.append(agent_type)
+                self._locks[agent_type] = threading.Lock()
             else:
-                print("⚠️  Agente ADK não inicializado - GOOGLE_API_KEY não encontrada")
-        except Exception as e:
-            print(f"❌ Erro ao inicializar agente ADK: {e}")
-        
-        # Inicializar agente LangChain com Gemini (mesmo modelo do ADK)
-        try:
-            if os.getenv("GOOGLE_API_KEY"):
-                self.agents["langchain"] = LangChainGeminiAgent(instruction=instruction)
-                print("✅ Agente LangChain (Google Gemini) inicializado com sucesso")
-            else:
-                print("⚠️  Agente LangChain não inicializado - GOOGLE_API_KEY não encontrada")
-        except Exception as e:
-            print(f"❌ Erro ao inicializar agente LangChain-Gemini: {e}")
+                print(f"⚠️  {label} não disponível - GOOGLE_API_KEY não encontrada")
         
         # Definir agente padrão
-        if "adk" in self.agents:
+        if "adk" in self.available:
             self.current_agent = "adk"
-        elif "langchain" in self.agents:
+        elif "langchain" in self.available:
             self.current_agent = "langchain"
         else:
-            print("❌ Nenhum agente foi inicializado com sucesso")
+            print("❌ Nenhum agente disponível")
+
+    def register_agent(self, agent_type: str, agent: BaseAgent):
+        """Registra um agente já criado (testes, modelos falsos)."""
+        self.agents[agent_type] = agent
+        if agent_type not in self.available:
+            self.available.append(agent_type)
+            self._locks[agent_type] = threading.Lock()
+
+    def get_agent(self, agent_type: str) -> Optional[BaseAgent]:
+        """
+        Agente do tipo pedido, criado na primeira chamada. Bloqueia durante a
+        criação; em código assíncrono use aget_agent.
+        """
+        agent = self.agents.get(agent_type)
+        if agent is not None or agent_type not in self.available:
+            return agent
+
+        with self._locks[agent_type]:
+            if agent_type in self.agents:
+                return self.agents[agent_type]
+            module_name, class_name, label = AGENT_TYPES[agent_type]
+            started = time.perf_counter()
+            try:
+                agent_class = getattr(importlib.import_module(module_name), class_name)
+                agent = agent_class(instruction=DEFAULT_INSTRUCTION)
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                startup_report.record(f"agent.{agent_type}", elapsed, deferred=True, error=True)
+                print(f"❌ Erro ao inicializar {label}: {e}")
+                self.available.remove(agent_type)
+                if self.current_agent == agent_type:
+                    self.current_agent = self.available[0] if self.available else None
+                return None
+            elapsed = time.perf_counter() - started
+            self.init_times[agent_type] = elapsed
+            startup_report.record(f"agent.{agent_type}", elapsed, deferred=True)
+            self.agents[agent_type] = agent
+            print(f"✅ {label} inicializado em {elapsed:.1f}s")
+            return agent
+
+    async def aget_agent(self, agent_type: str) -> Optional[BaseAgent]:
+        """Como get_agent, criando o agente fora do loop de eventos."""
+        agent = self.agents.get(agent_type)
+        if agent is not None or agent_type not in self.available:
+            return agent
+        return await asyncio.to_thread(self.get_agent, agent_type)
+
+    def warm_up(self, agent_types: List[str] = None):
+        """Cria agora os agentes ainda não criados (pré-carregamento)."""
+        for agent_type in list(agent_types or self.available):
+            self.get_agent(agent_type)
+
+    def start_warm_up(self, agent_types: List[str] = None) -> threading.Thread:
+        """Aquecimento em segundo plano: o primeiro usuário não espera a criação do agente."""
+        thread = threading.Thread(target=self.warm_up, args=(agent_types,), name="agent-warm-up", daemon=True)
+        thread.start()
+        return thread
     
     def set_agent(self, agent_type: str) -> bool:
         """
@@ -63,33 +130,39 @@ class AgentManager:
         Returns:
             True se o agente foi definido com sucesso, False caso contrário
         """
-        if agent_type in self.agents:
+        if agent_type in self.available:
             self.current_agent = agent_type
-            print(f"✅ Agente alterado para: {agent_type}")
+            logger.info("Agente alterado para: %s", agent_type)
             return True
             
         else:
-            print(f"❌ Agente '{agent_type}' não disponível")
+            logger.warning("Agente '%s' não disponível", agent_type)
             return False
         
     def get_current_agent(self) -> Optional[BaseAgent]:
-            """Retorna o agente atualmente selecionado."""
-            if self.current_agent and self.current_agent in self.agents:
-                return self.agents[self.current_agent]
+            """Retorna o agente atualmente selecionado (criando-o se preciso)."""
+            if self.current_agent:
+                return self.get_agent(self.current_agent)
             return None
         
-    def get_agent_info(self) -> Dict:
-        """Retorna informações sobre os agentes disponíveis."""
+    def get_agent_info(self, selected: str = None) -> Dict:
+        """
+        Retorna informações sobre os agentes disponíveis.
+        selected indica o agente escolhido pelo cliente (padrão: o agente atual).
+        """
         info = {
-            "available_agents": list(self.agents.keys()),
-            "current_agent": self.current_agent,
+            "available_agents": list(self.available),
+            "current_agent": selected or self.current_agent,
             "agents_status": {}
         }
         
-        for agent_type, agent in self.agents.items():
+        for agent_type in self.available:
+            agent = self.agents.get(agent_type)
             info["agents_status"][agent_type] = {
-                "name": agent.name,
+                "name": agent.name if agent else AGENT_TYPES.get(agent_type, (None, agent_type))[1],
                 "available": True,
+                "initialized": agent is not None,
+                "init_seconds": round(self.init_times[agent_type], 3) if agent_type in self.init_times else None,
                 "description": self._get_agent_description(agent_type)
             }
         
@@ -116,19 +189,43 @@ class AgentManager:
             if hasattr(agent, 'set_user_context'):
                 agent.set_user_context(user_id, session_id)
         
-    async def run_current_agent_with_context(self, query: str, user_id: str, session_id: str = None) -> str:
-        """Executa o agente atual com contexto de usuário."""
-        current = self.get_current_agent()
-        if not current:
+    def resolve_agent_type(self, agent_type: str = None) -> Optional[str]:
+        """Tipo pedido na requisição ou, sem escolha, o padrão; None se indisponível."""
+        key = agent_type or self.current_agent
+        return key if key in self.available else None
+
+    def resolve_agent(self, agent_type: str = None) -> Optional[BaseAgent]:
+        """Agente pedido na requisição ou, sem escolha, o agente padrão (criado se preciso)."""
+        key = self.resolve_agent_type(agent_type)
+        return self.get_agent(key) if key else None
+
+    async def run_agent(self, query: str, user_id: str, session_id: str = None, agent_type: str = None) -> str:
+        """
+        Executa um agente com o contexto do usuário passado por chamada, sem
+        alterar o estado compartilhado (agente atual, usuário/sessão da
+        instância). Seguro para requisições simultâneas e vários workers.
+        """
+        key = self.resolve_agent_type(agent_type)
+        agent = await self.aget_agent(key) if key else None
+        if not agent:
             return "Nenhum agente disponível no momento."
-        
+
         try:
-            # Definir contexto se o agente suportar
-            if hasattr(current, 'set_user_context'):
-                current.set_user_context(user_id, session_id)
-            
-            # Executar o método assíncrono
-            return await current._run_async(query)
-            
+            if hasattr(agent, 'set_user_context'):
+                return await agent._run_async(query, user_id=user_id, session_id=session_id)
+            return await agent._run_async(query)
         except Exception as e:
-            return f"Erro ao executar agente: {str(e)}"
\ No newline at end of file
+            return f"Erro ao executar agente: {str(e)}"
+
+    async def run_current_agent_with_context(self, query: str, user_id: str, session_id: str = None) -> str:
+        """Executa o agente atual com contexto de usuário."""
+        return await self.run_agent(query, user_id, session_id, agent_type=self.current_agent)
+
+    def flush_memory(self, timeout: float = 10.0) -> bool:
+        """Conclui as gravações de memória pendentes de todos os agentes (encerramento)."""
+        flushed = True
+        for agent in self.agents.values():
+            memory_manager = getattr(agent, 'memory_manager', None)
+            if memory_manager is not None and hasattr(memory_manager, 'flush'):
+                flushed = memory_manager.flush(timeout) and flushed
+        return flushed
@@ -26,5 +26,5 @@ class BaseAgent(ABC):
         Método síncrono opcional que pode ser implementado pelos agentes.
         Por padrão, não é obrigatório implementar.
         """
-        import asyncio
-        return asyncio.run(self._run_async(query))
\ No newline at end of file
+        from integrations.http_pool import run_sync
+        return run_sync(self._run_async(query))
\ No newline at end of file
@@ -4,20 +4,13 @@ from google.adk.runners import Runner
 from google.adk.tools import google_search
 from google.genai import types
 from .base_agent import BaseAgent
-import asyncio
 import os
-import sys
 import json
 import re
-from pathlib import Path
 from typing import Dict, Optional
 
-# Adicionar o diretório raiz ao sys.path para importação do cliente
-current_dir = Path(__file__).parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
-
 from integrations.bticket_client import BTicketClient
+from integrations.http_pool import run_sync
 from memory.memory_manager import MemoryManager
 
 class BTicketAgent(BaseAgent):
@@ -264,4 +257,4 @@ class BTicketAgent(BaseAgent):
 
     def run(self, query: str):
         """Método síncrono para conveniência (executa o assíncrono)."""
-        return asyncio.run(self._run_async(query))
\ No newline at end of file
+        return run_sync(self._run_async(query))
\ No newline at end of file
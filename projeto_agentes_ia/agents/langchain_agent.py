@@ -6,7 +6,7 @@ from langchain_tavily.tavily_search import TavilySearch  # Nova importação
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain import hub
 from .base_agent import BaseAgent
-import asyncio
+from integrations.http_pool import run_sync
 import os
 from dotenv import load_dotenv
 
@@ -101,7 +101,7 @@ class LangChainAgent(BaseAgent):
         """
         Executa o agente LangChain de forma síncrona.
         """
-        return asyncio.run(self._run_async(query))
+        return run_sync(self._run_async(query))
     
     async def _run_async(self, query: str) -> str:
         """
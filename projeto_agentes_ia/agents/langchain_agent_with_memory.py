@@ -3,18 +3,40 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_community.tools import DuckDuckGoSearchResults
+from langchain_core.callbacks import BaseCallbackHandler
 from .base_agent import BaseAgent
 import os
-import sys
-from pathlib import Path
+import time
+import logging
+from collections import OrderedDict
 from dotenv import load_dotenv
 
-# Adicionar o diretório de memória ao path
-memory_path = Path(__file__).parent.parent / "memory"
-sys.path.append(str(memory_path))
+from memory.memory_manager import MemoryManager
+from memory.rag_system import RAGManager
+from observability import span, record_span, mark_error
 
-from memory_manager import MemoryManager
-from rag_system import RAGManager
+logger = logging.getLogger(__name__)
+
+
+class ToolSpanHandler(BaseCallbackHandler):
+    """Registra cada chamada de ferramenta do AgentExecutor como span tool.call."""
+
+    def __init__(self):
+        self._started = {}
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._started[run_id] = ((serialized or {}).get("name", "tool"), time.time_ns())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id, error=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=True)
+
+    def _finish(self, run_id, error: bool):
+        name, started = self._started.pop(run_id, ("tool", None))
+        if started is not None:
+            record_span("tool.call", started, error=error, tool=name)
 
 class LangChainGeminiAgent(BaseAgent):
     """
@@ -56,9 +78,10 @@ class LangChainGeminiAgent(BaseAgent):
             except Exception as e:
                 print(f"⚠️ Erro ao configurar busca: {e}")
             
-            # Usar memória personalizada para histórico da sessão
-            self.conversation_history = []
+            # Histórico recente por sessão (as sessões menos usadas são descartadas)
+            self.session_histories = OrderedDict()
             self.max_history = 5
+            self.max_sessions = 1000
             
             # Template de prompt otimizado para Gemini
             self.prompt_template = ChatPromptTemplate.from_messages([
@@ -116,7 +139,7 @@ CONTEXTO ADICIONAL (se disponível):
                 self.agent_executor = AgentExecutor(
                     agent=self.agent,
                     tools=self.tools,
-                    verbose=True,
+                    verbose=False,  # rastreamento via spans; verbose imprime cada passo no stdout
                     handle_parsing_errors=True,
                     max_iterations=3,
                     return_intermediate_steps=False
@@ -130,7 +153,6 @@ CONTEXTO ADICIONAL (se disponível):
             
             self.instruction = instruction or "Seja útil, preciso e forneça respostas bem estruturadas, sempre considerando o contexto e a memória. Use busca na internet quando necessário para informações atualizadas."
             self.user_id = "default_user"
-            self.session_id = None
             
             super().__init__(name="LangChainGeminiAgent")
             print(f"✅ {self.name} inicializado com Google Gemini 2.0 Flash")
@@ -142,34 +164,38 @@ CONTEXTO ADICIONAL (se disponível):
             self.llm = None
             self.memory_manager = None
             self.rag_manager = None
-            self.conversation_history = []
+            self.session_histories = OrderedDict()
             self.agent_executor = None
     
-    def _format_chat_history(self) -> list:
-        """Formata o histórico para o formato de mensagens do LangChain."""
-        if not self.conversation_history:
+    def _format_chat_history(self, session_id: str) -> list:
+        """Formata o histórico da sessão para o formato de mensagens do LangChain."""
+        history = self.session_histories.get(session_id)
+        if not history:
             return []
         
         from langchain_core.messages import HumanMessage, AIMessage
         
         messages = []
-        for entry in self.conversation_history[-self.max_history:]:
+        for entry in history[-self.max_history:]:
             messages.append(HumanMessage(content=entry['user']))
             messages.append(AIMessage(content=entry['assistant']))
         
         return messages
     
-    def _add_to_history(self, user_message: str, assistant_response: str):
-        """Adiciona uma interação ao histórico local."""
-        self.conversation_history.append({
+    def _add_to_history(self, session_id: str, user_message: str, assistant_response: str) -> int:
+        """Adiciona uma interação ao histórico local da sessão e retorna o tamanho dele."""
+        history = self.session_histories.pop(session_id, [])
+        history.append({
             "user": user_message,
             "assistant": assistant_response
         })
+        self.session_histories[session_id] = history[-self.max_history:]
         
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
+        while len(self.session_histories) > self.max_sessions:
+            self.session_histories.popitem(last=False)
         
-        print(f"[{self.name}] Adicionado ao histórico local: {len(self.conversation_history)} interações")
+        logger.debug("[%s] Adicionado ao histórico local: %d interações", self.name, len(self.session_histories[session_id]))
+        return len(self.session_histories[session_id])
     
     def _build_context(self, memory_context: str, rag_context: str, related_context: str) -> str:
         """Constrói o contexto completo para o agente."""
@@ -193,11 +219,12 @@ CONTEXTO ADICIONAL (se disponível):
         return "\n".join(context_parts) if context_parts else ""
     
     def set_user_context(self, user_id: str, session_id: str = None):
-        """Define o contexto do usuário para a sessão."""
-        print(f"[{self.name}] Definindo contexto: user_id={user_id}, session_id={session_id}")
+        """
+        Define o usuário padrão de run(). A sessão não fica na instância:
+        é passada a cada _run_async (ou derivada do usuário).
+        """
+        logger.debug("[%s] Definindo contexto: user_id=%s", self.name, user_id)
         self.user_id = user_id
-        self.session_id = session_id or f"session_{user_id}_{hash(user_id) % 10000}"
-        self.conversation_history = []
     
     def add_knowledge(self, content: str, source: str = "user", metadata: dict = None):
         """Adiciona conhecimento ao sistema RAG."""
@@ -205,117 +232,132 @@ CONTEXTO ADICIONAL (se disponível):
             return self.rag_manager.add_knowledge(content, source, metadata)
         return None
     
-    async def _run_async(self, query: str) -> str:
-        """Método assíncrono para executar o agente com memória e Gemini."""
+    async def _run_async(self, query: str, user_id: str = None, session_id: str = None) -> str:
+        """
+        Método assíncrono para executar o agente com memória e Gemini.
+        user_id/session_id por chamada permitem requisições simultâneas na
+        mesma instância; sem session_id, cada usuário usa a própria sessão
+        padrão.
+        """
         if not self.llm:
             return "Agente LangChain-Gemini não está disponível. Verifique a configuração da API key."
         
-        try:
-            print(f"[{self.name}] Processando consulta com Gemini: '{query[:50]}...'")
-            
-            # Obter contexto de memória persistente
-            full_context = ""
-            if self.memory_manager:
-                try:
-                    print(f"[{self.name}] Buscando contexto de memória para user_id={self.user_id}")
-                    
-                    memory_context = self.memory_manager.get_context_for_agent(
-                        self.user_id, self.session_id, limit=3
-                    )
-                    
-                    rag_context = ""
-                    if self.rag_manager:
-                        rag_context = self.rag_manager.get_relevant_context(query, limit=2)
-                    
-                    related_context = self.memory_manager.search_relevant_context(
-                        self.user_id, query, limit=2
+        user_id = user_id or self.user_id
+        session_id = session_id or f"session_{user_id}"
+        with span("agent.run", agent=self.name, user_id=user_id, session_id=session_id) as run_span:
+            try:
+                logger.debug("[%s] Processando consulta com Gemini: '%s...'", self.name, query[:50])
+
+                # Obter contexto de memória persistente
+                full_context = ""
+                if self.memory_manager:
+                    try:
+                        with span("context.memory"):
+                            memory_context = self.memory_manager.get_context_for_agent(
+                                user_id, session_id, limit=3
+                            )
+
+                        rag_context = ""
+                        if self.rag_manager:
+                            with span("context.rag", limit=2):
+                                rag_context = self.rag_manager.get_relevant_context(query, limit=2)
+
+                        with span("context.related", limit=2):
+                            related_context = self.memory_manager.search_relevant_context(
+                                user_id, query, limit=2
+                            )
+
+                        full_context = self._build_context(memory_context, rag_context, related_context)
+
+                        if full_context:
+                            logger.debug("[%s] Contexto de memória aplicado com sucesso (%d caracteres)",
+                                         self.name, len(full_context))
+
+                    except Exception as memory_error:
+                        logger.warning("[%s] Erro ao aplicar contexto de memória: %s", self.name, memory_error)
+
+                # Usar agente com ferramentas se disponível
+                if self.agent_executor:
+                    logger.debug("[%s] Executando agente Gemini com ferramentas", self.name)
+
+                    # Formatar histórico para o agente
+                    chat_history = self._format_chat_history(session_id)
+
+                    # Executar consulta com o agente executor (ferramentas viram spans tool.call)
+                    with span("llm.call", model="gemini-2.0-flash-exp", tools=len(self.tools)):
+                        response = await self.agent_executor.ainvoke({
+                            "input": query,
+                            "context": full_context,
+                            "instruction": self.instruction,
+                            "chat_history": chat_history
+                        }, config={"callbacks": [ToolSpanHandler()]})
+
+                    final_response = response.get("output", "Não foi possível gerar uma resposta.")
+
+                else:
+                    # Fallback para LLM direto sem ferramentas
+                    logger.debug("[%s] Executando Gemini direto (sem ferramentas)", self.name)
+
+                    # Formatar histórico
+                    history = self._format_chat_history(session_id)
+
+                    # Criar mensagens para o Gemini
+                    messages = []
+
+                    # Adicionar system message
+                    system_content = self.prompt_template.messages[0].format(
+                        instruction=self.instruction,
+                        context=full_context
                     )
-                    
-                    full_context = self._build_context(memory_context, rag_context, related_context)
-                    
-                    if full_context:
-                        print(f"[{self.name}] Contexto de memória aplicado com sucesso ({len(full_context)} caracteres)")
-                    
-                except Exception as memory_error:
-                    print(f"[{self.name}] Erro ao aplicar contexto de memória: {memory_error}")
-            
-            # Usar agente com ferramentas se disponível
-            if self.agent_executor:
-                print(f"[{self.name}] Executando agente Gemini com ferramentas")
-                
-                # Formatar histórico para o agente
-                chat_history = self._format_chat_history()
-                
-                # Executar consulta com o agente executor
-                response = await self.agent_executor.ainvoke({
-                    "input": query,
-                    "context": full_context,
-                    "instruction": self.instruction,
-                    "chat_history": chat_history
-                })
-                
-                final_response = response.get("output", "Não foi possível gerar uma resposta.")
-                
-            else:
-                # Fallback para LLM direto sem ferramentas
-                print(f"[{self.name}] Executando Gemini direto (sem ferramentas)")
-                
-                # Formatar histórico
-                history = self._format_chat_history()
-                
-                # Criar mensagens para o Gemini
-                messages = []
-                
-                # Adicionar system message
-                system_content = self.prompt_template.messages[0].format(
-                    instruction=self.instruction,
-                    context=full_context
-                )
-                messages.append(("system", system_content))
-                
-                # Adicionar histórico
-                messages.extend([(msg.type, msg.content) for msg in history])
-                
-                # Adicionar pergunta atual
-                messages.append(("human", query))
-                
-                response = await self.llm.ainvoke(messages)
-                final_response = response.content if hasattr(response, 'content') else str(response)
-            
-            # Adicionar ao histórico local
-            self._add_to_history(query, final_response)
-            
-            # Salvar na memória persistente
-            if self.memory_manager:
+                    messages.append(("system", system_content))
+
+                    # Adicionar histórico
+                    messages.extend([(msg.type, msg.content) for msg in history])
+
+                    # Adicionar pergunta atual
+                    messages.append(("human", query))
+
+                    with span("llm.call", model="gemini-2.0-flash-exp", tools=0):
+                        response = await self.llm.ainvoke(messages)
+                    final_response = response.content if hasattr(response, 'content') else str(response)
+
+                # Adicionar ao histórico local
+                history_length = self._add_to_history(session_id, query, final_response)
+
+                # Salvar na memória persistente
+                if self.memory_manager:
+                    try:
+                        with span("memory.save"):
+                            self.memory_manager.save_interaction(
+                                user_id=user_id,
+                                session_id=session_id,
+                                user_message=query,
+                                agent_response=final_response,
+                                agent_type="LangChain-Gemini",
+                                metadata={
+                                    "has_rag_context": bool(self.rag_manager and full_context),
+                                    "has_search_tools": bool(self.tools),
+                                    "model": "gemini-2.0-flash-exp",
+                                    "session_history_length": history_length
+                                }
+                            )
+                        logger.debug("[%s] Interação salva na memória persistente", self.name)
+                    except Exception as save_error:
+                        logger.warning("[%s] Erro ao salvar na memória: %s", self.name, save_error)
+
+                logger.debug("[%s] Resposta gerada com Gemini com sucesso", self.name)
+                return final_response
+
+            except Exception as e:
+                error_msg = f"Erro ao executar agente LangChain-Gemini: {str(e)}"
+                logger.error("[%s] %s", self.name, error_msg)
+                mark_error(run_span, error_msg)
+
+                # Fallback simples
                 try:
-                    self.memory_manager.save_interaction(
-                        user_id=self.user_id,
-                        session_id=self.session_id or "default_session",
-                        user_message=query,
-                        agent_response=final_response,
-                        agent_type="LangChain-Gemini",
-                        metadata={
-                            "has_rag_context": bool(self.rag_manager and full_context),
-                            "has_search_tools": bool(self.tools),
-                            "model": "gemini-2.0-flash-exp",
-                            "session_history_length": len(self.conversation_history)
-                        }
-                    )
-                    print(f"[{self.name}] Interação salva na memória persistente")
-                except Exception as save_error:
-                    print(f"[{self.name}] Erro ao salvar na memória: {save_error}")
-            
-            print(f"[{self.name}] Resposta gerada com Gemini com sucesso")
-            return final_response
-            
-        except Exception as e:
-            error_msg = f"Erro ao executar agente LangChain-Gemini: {str(e)}"
-            print(f"[{self.name}] {error_msg}")
-            
-            # Fallback simples
-            try:
-                print(f"[{self.name}] Tentando fallback simples com Gemini")
-                response = await self.llm.ainvoke([("human", f"Responda à seguinte pergunta: {query}")])
-                return response.content if hasattr(response, 'content') else str(response)
-            except Exception:
-                return f"Erro no agente LangChain-Gemini: {error_msg}"
\ No newline at end of file
+                    logger.info("[%s] Tentando fallback simples com Gemini", self.name)
+                    with span("llm.call", model="gemini-2.0-flash-exp", fallback=True):
+                        response = await self.llm.ainvoke([("human", f"Responda à seguinte pergunta: {query}")])
+                    return response.content if hasattr(response, 'content') else str(response)
+                except Exception:
+                    return f"Erro no agente LangChain-Gemini: {error_msg}"
@@ -6,23 +6,27 @@ from google.adk.tools import google_search
 from google.genai import types
 from .base_agent import BaseAgent
 import asyncio
-import aiohttp
 import os
-import sys
 import re
 import json
-from pathlib import Path
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
 import hashlib
-
-# Adicionar o diretório de memória ao path
-memory_path = Path(__file__).parent.parent / "memory"
-sys.path.append(str(memory_path))
-
-from memory_manager import MemoryManager
-from rag_system import RAGManager
+import time
+
+from memory.memory_manager import MemoryManager
+from memory.rag_system import RAGManager
+from monitoring.error_matcher import ErrorMatcher, DEFAULT_ERROR_PATTERNS
+from monitoring.dedup_store import ErrorDedupStore
+from monitoring.clustering import DrainTemplateMiner, ClusterAnalysisCache, LogCluster
+from monitoring.sources import LogSource, LogChunk, HttpDateLogSource, load_sources_from_env
+from monitoring.multi_source import MultiSourceMonitor
+from monitoring.event_store import ErrorEventStore, ErrorEvent, parse_log_timestamp
+from monitoring.log_index import LogIndexManager, LogIndex, SearchHit
+from monitoring.log_cache import LogCache
+from monitoring.alert_dispatcher import AlertDispatcher, Alert
+from integrations.http_pool import get_session
 
 class LogMonitorAgent(BaseAgent):
     """
@@ -30,7 +34,8 @@ class LogMonitorAgent(BaseAgent):
     Monitora logs em tempo real e envia alertas quando detecta erros.
     """
 
-    def __init__(self, discord_webhook_url: str = None, check_interval: int = 300):
+    def __init__(self, discord_webhook_url: str = None, check_interval: int = 300,
+                 sources: List[LogSource] = None):
         load_dotenv()
 
         try:
@@ -45,24 +50,52 @@ class LogMonitorAgent(BaseAgent):
 
             # Controle de estado
             self.last_check_time = {}  # Por data
-            self.known_errors = set()  # Cache de erros já reportados
+            # Deduplicação persistente por fingerprint (limitada em memória)
+            dedup_db = os.getenv("LOG_MONITOR_DEDUP_DB", "log_storage/dedup.sqlite3")
+            self.dedup_store = ErrorDedupStore(db_path=dedup_db)
+
+            # Agrupamento por template e cache das análises por grupo
+            self.template_miner = DrainTemplateMiner(fingerprinter=self.dedup_store.fingerprinter)
+            self.analysis_cache = ClusterAnalysisCache(db_path=dedup_db)
+
+            # Cópia local e índice de busca dos logs de cada dia
+            self.log_indexes = LogIndexManager(os.getenv("LOG_MONITOR_LOG_DIR", "log_storage/logs"))
+            # Downloads compartilhados por comandos e monitoramento (revalidação após o TTL)
+            self.log_cache = LogCache(self.log_indexes, ttl_seconds=float(os.getenv("LOG_CACHE_TTL", "60")))
+
+            # Envio de alertas agrupados por fonte e janela de tempo
+            self.alert_dispatcher = AlertDispatcher(
+                self.discord_webhook_url,
+                window_seconds=float(os.getenv("ALERT_DIGEST_WINDOW", "30")),
+                session_factory=lambda: get_session("discord_webhook")
+            )
+
+            # Série temporal de todas as ocorrências de erro (tendências e picos)
+            self.event_store = ErrorEventStore(
+                db_path=os.getenv("LOG_MONITOR_EVENTS_DB", "log_storage/events.sqlite3")
+            )
+            self.max_clusters_per_prompt = 40
+            self.analysis_stats = {'llm_calls': 0, 'cache_hits': 0}
             self.is_monitoring = False
 
-            # Padrões de erro para detectar
-            self.error_patterns = [
-                r'ERROR',
-                r'CRITICAL',
-                r'FATAL',
-                r'Exception',
-                r'Traceback',
-                r'500\s+Internal\s+Server\s+Error',
-                r'404\s+Not\s+Found',
-                r'Connection\s+refused',
-                r'Timeout',
-                r'Failed\s+to\s+connect',
-                r'Database\s+error',
-                r'SQL\s+Error'
+            # Fontes monitoradas em paralelo, cada uma com sua agenda
+            self.sources = sources or load_sources_from_env() or [
+                HttpDateLogSource("backend", self.base_url, interval=check_interval)
             ]
+            for source in self.sources:
+                if isinstance(source, HttpDateLogSource) and source.cache is None:
+                    source.cache = self.log_cache
+                    if source.base_url != self.base_url:
+                        source.cache_prefix = f"{source.name}_"
+            self.scheduler = MultiSourceMonitor(
+                self.sources, self._process_chunk, session_factory=lambda: get_session("logs")
+            )
+            # Limita análises de IA simultâneas entre fontes
+            self.analysis_semaphore = asyncio.Semaphore(int(os.getenv("LOG_MONITOR_MAX_ANALYSES", "2")))
+
+            # Padrões de erro compilados em uma única alternância
+            self.error_matcher = ErrorMatcher(DEFAULT_ERROR_PATTERNS)
+            self.error_patterns = self.error_matcher.patterns
 
             # Instrução especializada para análise de logs
             instruction = """
@@ -117,20 +150,20 @@ class LogMonitorAgent(BaseAgent):
             print(f"❌ Erro ao inicializar {self.name}: {e}")
             raise
 
-    async def fetch_logs(self, date: str) -> Optional[str]:
-        """Busca os logs de uma data específica."""
+    async def fetch_logs_raw(self, date: str, max_age: float = None) -> Optional[bytes]:
+        """
+        Busca os logs de uma data específica sem decodificar o corpo.
+
+        O conteúdo vem do LogCache: dentro do TTL é lido da cópia local; depois
+        dele é revalidado e apenas o trecho novo é baixado.
+        """
         url = f"{self.base_url}/{date}"
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=30) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        print(f"📥 Logs obtidos para {date}: {len(content)} caracteres")
-                        return content
-                    else:
-                        print(f"⚠️ Erro HTTP {response.status} ao acessar logs de {date}")
-                        return None
+            content = await self.log_cache.get(get_session("logs"), url, date, max_age=max_age)
+            if content is not None:
+                print(f"📥 Logs obtidos para {date}: {len(content)} bytes")
+            return content
 
         except asyncio.TimeoutError:
             print(f"⏰ Timeout ao acessar logs de {date}")
@@ -139,244 +172,425 @@ class LogMonitorAgent(BaseAgent):
             print(f"❌ Erro ao buscar logs de {date}: {e}")
             return None
 
-    def extract_errors(self, log_content: str) -> List[Dict]:
-        """Extrai erros do conteúdo dos logs usando padrões regex."""
+    async def search_logs(self, date: str, term: str = None, regex: str = None, since: float = None,
+                          until: float = None, limit: int = 5) -> Optional[Tuple[LogIndex, List[SearchHit]]]:
+        """Busca nos logs do dia pelo índice local (texto, regex e/ou intervalo de tempo)."""
+        content = await self.fetch_logs_raw(date)
+        if not content:
+            return None
+
+        index = self.log_indexes.get(date)
+
+        def run_search():
+            index.update()  # Sem custo se o índice já cobre a cópia local
+            return index.search(term, regex, since, until, limit)
+
+        hits = await asyncio.to_thread(run_search)
+        return index, hits
+
+    async def fetch_logs(self, date: str) -> Optional[str]:
+        """Busca os logs de uma data específica."""
+        content = await self.fetch_logs_raw(date)
+        if content is None:
+            return None
+        return content.decode('utf-8', errors='replace')
+
+    def extract_errors(self, log_content: Union[str, bytes, memoryview], only_new: bool = True,
+                       source: str = None, base_offset: int = 0, first_line: int = 1,
+                       event_source: str = None) -> List[Dict]:
+        """
+        Extrai erros do conteúdo dos logs.
+
+        A varredura é feita em passagem única pelo ErrorMatcher; o conteúdo
+        pode ser o texto decodificado ou os bytes brutos da resposta.
+
+        Com only_new=True cada ocorrência é registrada no ErrorDedupStore e só
+        são retornados erros cujo fingerprint ainda não foi alertado. Com
+        source informado, a varredura continua do último checkpoint da fonte
+        e processa apenas linhas completas. Para trechos já incrementais (fontes
+        que acompanham arquivos), base_offset e first_line indicam a posição
+        do trecho no arquivo.
+
+        Todas as ocorrências (não só as alertadas) são gravadas no
+        ErrorEventStore com a fonte event_source (padrão: source).
+
+        Bloqueante (varredura e SQLite): no loop de eventos, chamar via
+        asyncio.to_thread.
+        """
+        if not only_new:
+            return [
+                self._error_dict(match, self.dedup_store.fingerprinter.fingerprint(match.line)[0])
+                for match in self.error_matcher.scan(log_content)
+            ]
+
+        data = log_content.encode('utf-8') if isinstance(log_content, str) else log_content
+        if isinstance(data, memoryview):
+            data = data.obj if data.nbytes == len(data.obj) else data.tobytes()
+        start, end = 0, None
+
+        if source:
+            # Apenas linhas completas: a última pode ainda estar sendo escrita
+            end = data.rfind(b'\n') + 1
+            # Log truncado, rotacionado ou substituído: o checkpoint volta ao início
+            start, line_count = self.dedup_store.get_checkpoint(source, data)
+            if start > end:
+                start, line_count = 0, 0
+            first_line = line_count + 1
+
         errors = []
-        lines = log_content.split('\n')
-
-        for i, line in enumerate(lines):
-            for pattern in self.error_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Capturar contexto (linha anterior e posterior)
-                    context_start = max(0, i - 1)
-                    context_end = min(len(lines), i + 2)
-                    context = '\n'.join(lines[context_start:context_end])
-
-                    # Extrair timestamp se possível
-                    timestamp_match = re.search(r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}', line)
-                    timestamp = timestamp_match.group() if timestamp_match else "Timestamp não encontrado"
-
-                    # Criar hash único para evitar duplicatas
-                    error_hash = hashlib.md5(line.encode()).hexdigest()
-
-                    if error_hash not in self.known_errors:
-                        errors.append({
-                            'line': line.strip(),
-                            'context': context,
-                            'timestamp': timestamp,
-                            'pattern': pattern,
-                            'hash': error_hash,
-                            'line_number': i + 1
-                        })
-                        self.known_errors.add(error_hash)
+        occurrences = {}
+        events = []
+        event_source = event_source or source or "manual"
+        now = time.time()
+
+        for match in self.error_matcher.scan(data, start=start, end=end, first_line=first_line):
+            stats, should_alert = self.dedup_store.observe(match.line, match.pattern)
+            events.append(ErrorEvent(
+                ts=parse_log_timestamp(match.timestamp, now),
+                fingerprint=stats.fingerprint,
+                template=stats.template,
+                pattern=match.pattern,
+                source=event_source,
+                line_offset=match.offset + base_offset
+            ))
+            if should_alert:
+                error = self._error_dict(match, stats.fingerprint)
+                error['offset'] += base_offset
+                errors.append(error)
+                occurrences[stats.fingerprint] = stats
+
+        for error in errors:
+            error['occurrences'] = occurrences[error['fingerprint']].count
+
+        if source:
+            line_count = first_line - 1 + data.count(b'\n', start, end)
+            self.dedup_store.set_checkpoint(source, end, line_count, data)
+        self.dedup_store.flush()
+        self.event_store.add_many(events)
 
         return errors
 
+    @staticmethod
+    def _error_dict(match, fingerprint: str) -> Dict:
+        return {
+            'line': match.line,
+            'context': match.context,
+            'timestamp': match.timestamp,
+            'pattern': match.pattern,
+            'hash': fingerprint,
+            'fingerprint': fingerprint,
+            'line_number': match.line_number,
+            'offset': match.offset,
+            'occurrences': 1
+        }
+
+    def cluster_errors(self, errors: List[Dict]) -> List[Tuple[LogCluster, List[Dict]]]:
+        """Agrupa os erros por template (Drain), do grupo mais frequente ao menos."""
+        groups: Dict[int, Tuple[LogCluster, List[Dict]]] = {}
+        for error in errors:
+            cluster, _ = self.template_miner.add(error['line'])
+            groups.setdefault(cluster.cluster_id, (cluster, []))[1].append(error)
+
+        return sorted(
+            groups.values(),
+            key=lambda group: sum(e.get('occurrences', 1) for e in group[1]),
+            reverse=True
+        )
+
     async def analyze_errors_with_ai(self, errors: List[Dict], date: str) -> str:
-        """Usa o agente ADK para analisar os erros encontrados."""
+        """
+        Usa o agente ADK para analisar os erros encontrados.
+
+        Os erros são agrupados por template e apenas grupos novos ou cujo
+        template mudou são enviados ao modelo, em prompts de até
+        max_clusters_per_prompt grupos. As análises por grupo ficam em cache e
+        são reaproveitadas nas próximas verificações.
+        """
         if not errors:
             return "Nenhum erro detectado nos logs."
 
         try:
-            # Preparar contexto para análise
-            error_summary = f"ANÁLISE DE LOGS - {date}\n\n"
-            error_summary += f"Total de erros detectados: {len(errors)}\n\n"
-
-            for i, error in enumerate(errors[:5], 1):  # Limitar a 5 erros por análise
-                error_summary += f"ERRO {i}:\n"
-                error_summary += f"Timestamp: {error['timestamp']}\n"
-                error_summary += f"Linha {error['line_number']}: {error['line']}\n"
-                error_summary += f"Contexto:\n{error['context']}\n"
-                error_summary += "-" * 50 + "\n"
-
-            if len(errors) > 5:
-                error_summary += f"\n... e mais {len(errors) - 5} erros detectados.\n"
-
-            # Criar sessão para análise
-            session_id = f"log_analysis_{date}_{datetime.now().strftime('%H%M%S')}"
-            session = await self.session_service.create_session(
-                app_name=self.app_name,
-                user_id=self.user_id,
-                session_id=session_id
-            )
-
-            # Prompt para análise
-            analysis_prompt = f"""
-            Analise os seguintes erros encontrados nos logs da aplicação:
-
-            {error_summary}
+            groups = self.cluster_errors(errors)
+
+            analyses: Dict[str, str] = {}
+            pending = []
+            for cluster, cluster_errors in groups:
+                cached = self.analysis_cache.get(cluster.template_hash)
+                if cached:
+                    analyses[cluster.template_hash] = cached
+                    self.analysis_stats['cache_hits'] += 1
+                else:
+                    pending.append((cluster, cluster_errors))
+
+            # Grupos além do limite vão em prompts seguintes, não ficam pendentes para sempre
+            summaries = []
+            for start in range(0, len(pending), self.max_clusters_per_prompt):
+                batch = pending[start:start + self.max_clusters_per_prompt]
+                response = await self._run_analysis_prompt(
+                    self._build_batch_prompt(batch, date, len(errors)), date
+                )
+                batch_summary, fresh = self._parse_batch_response(response, batch)
+                self.analysis_cache.put_many([
+                    (cluster.template_hash, cluster.template, fresh[cluster.template_hash])
+                    for cluster, _ in batch if cluster.template_hash in fresh
+                ])
+                analyses.update(fresh)
+                if batch_summary:
+                    summaries.append(batch_summary)
+            summary = "\n\n".join(summaries)
+
+            return self._format_cluster_report(groups, analyses, summary, len(pending))
 
-            Por favor, forneça:
-            1. 🚨 Classificação de severidade (CRÍTICO/ALTO/MÉDIO/BAIXO)
-            2. 🔍 Análise dos erros mais importantes
-            3. 💡 Possíveis causas e soluções
-            4. ⚡ Ações recomendadas para a equipe
+        except Exception as e:
+            print(f"❌ Erro na análise de IA: {e}")
+            return f"Erro na análise: {str(e)}"
 
-            Seja conciso mas informativo. Use emojis para facilitar a leitura.
-            """
+    def _build_batch_prompt(self, pending: List[Tuple[LogCluster, List[Dict]]], date: str, total: int) -> str:
+        """Monta um único prompt com todos os grupos de erro ainda não analisados."""
+        parts = [f"ANÁLISE DE LOGS - {date}", f"Total de erros novos: {total} em {len(pending)} grupos a analisar", ""]
 
-            # Executar análise
-            content = types.Content(
-                role='user',
-                parts=[types.Part(text=analysis_prompt)]
-            )
+        for number, (cluster, cluster_errors) in enumerate(pending, 1):
+            first, last = cluster_errors[0], cluster_errors[-1]
+            occurrences = sum(e.get('occurrences', 1) for e in cluster_errors)
+            parts.append(f"[C{number}] Template: {cluster.template}")
+            parts.append(f"Ocorrências: {occurrences} | Primeira: {first['timestamp']} | Última: {last['timestamp']}")
+            parts.append(f"Exemplo (linha {first['line_number']}): {first['line'][:300]}")
+            parts.append(f"Contexto:\n{first['context'][:600]}")
+            parts.append("-" * 50)
 
-            events_async = self.runner.run_async(
-                user_id=self.user_id,
-                session_id=session_id,
-                new_message=content
-            )
+        error_summary = "\n".join(parts)
+        sections = "\n".join(f"### C{n}\n<severidade, causa provável e solução em até 3 linhas>"
+                             for n in range(1, len(pending) + 1))
 
-            analysis_result = ""
-            async for event in events_async:
-                if event.is_final_response():
-                    if hasattr(event, 'content') and event.content:
-                        if hasattr(event.content, 'parts'):
-                            if hasattr(event.content.parts, 'text'):
-                                analysis_result = event.content.parts.text
-                            elif isinstance(event.content.parts, list):
-                                for part in event.content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        analysis_result += part.text
-                    break
-
-            return analysis_result or "Não foi possível analisar os erros."
+        return f"""
+            Analise os grupos de erros abaixo. Cada grupo reúne linhas com o mesmo
+            template (partes variáveis aparecem como <NUM>, <TS>, <*> etc.).
 
-        except Exception as e:
-            print(f"❌ Erro na análise de IA: {e}")
-            return f"Erro na análise: {str(e)}"
+            {error_summary}
 
-    async def send_discord_alert(self, message: str, date: str, errors_count: int):
-        """Envia alerta para o Discord via webhook."""
-        if not self.discord_webhook_url:
-            print("⚠️ Discord webhook não configurado")
-            return False
+            Responda EXATAMENTE neste formato, uma seção por grupo:
+            ### RESUMO
+            <🚨 severidade geral (CRÍTICO/ALTO/MÉDIO/BAIXO) e ⚡ ações prioritárias para a equipe>
+            {sections}
 
-        try:
-            # Preparar payload do Discord
-            embed = {
-                "title": "🚨 Alerta de Monitoramento de Logs",
-                "description": f"Erros detectados nos logs de {date}",
-                "color": 0xff0000,  # Vermelho
-                "fields": [
-                    {
-                        "name": "📅 Data",
-                        "value": date,
-                        "inline": True
-                    },
-                    {
-                        "name": "🔢 Erros Detectados",
-                        "value": str(errors_count),
-                        "inline": True
-                    },
-                    {
-                        "name": "🔗 URL dos Logs",
-                        "value": f"{self.base_url}/{date}",
-                        "inline": False
-                    },
-                    {
-                        "name": "🤖 Análise IA",
-                        "value": message[:1000] + "..." if len(message) > 1000 else message,
-                        "inline": False
-                    }
-                ],
-                "timestamp": datetime.now().isoformat(),
-                "footer": {
-                    "text": "Sistema de Monitoramento de Logs"
-                }
-            }
-
-            payload = {
-                "embeds": [embed],
-                "username": "Log Monitor Bot"
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.discord_webhook_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 204:
-                        print(f"✅ Alerta enviado para Discord com sucesso")
-                        return True
-                    else:
-                        print(f"❌ Erro ao enviar para Discord: {response.status}")
-                        return False
+            Seja conciso mas informativo. Use emojis para facilitar a leitura.
+            """
 
-        except Exception as e:
-            print(f"❌ Erro ao enviar alerta Discord: {e}")
-            return False
+    @staticmethod
+    def _parse_batch_response(response: str, pending: List[Tuple[LogCluster, List[Dict]]]) -> Tuple[str, Dict[str, str]]:
+        """Separa o resumo e a análise de cada grupo na resposta do modelo."""
+        sections = re.split(r'^\s*###\s*(RESUMO|C\d+)\s*$', response, flags=re.MULTILINE | re.IGNORECASE)
+
+        summary = sections[0].strip() if len(sections) == 1 else ""
+        analyses = {}
+        for label, body in zip(sections[1::2], sections[2::2]):
+            label = label.upper()
+            if label == "RESUMO":
+                summary = body.strip()
+                continue
+            index = int(label[1:]) - 1
+            if 0 <= index < len(pending) and body.strip():
+                analyses[pending[index][0].template_hash] = body.strip()
+
+        return summary, analyses
+
+    @staticmethod
+    def _format_cluster_report(groups: List[Tuple[LogCluster, List[Dict]]], analyses: Dict[str, str],
+                               summary: str, analyzed_now: int) -> str:
+        total = sum(e.get('occurrences', 1) for _, cluster_errors in groups for e in cluster_errors)
+        lines = []
+        if summary:
+            lines.append(summary)
+            lines.append("")
+
+        reused = sum(1 for cluster, _ in groups if cluster.template_hash in analyses) - analyzed_now
+        lines.append(f"📊 {total} ocorrências em {len(groups)} grupos "
+                     f"({analyzed_now} analisados agora, {max(reused, 0)} do cache)")
+
+        for cluster, cluster_errors in groups:
+            occurrences = sum(e.get('occurrences', 1) for e in cluster_errors)
+            analysis = analyses.get(cluster.template_hash, "⏳ Análise pendente")
+            lines.append(f"🔹 [{occurrences}x] {cluster.template[:120]}")
+            lines.append(f"   {analysis}")
+
+        return "\n".join(lines)
+
+    async def _run_analysis_prompt(self, analysis_prompt: str, date: str) -> str:
+        """Executa um prompt de análise em uma sessão ADK dedicada."""
+        session_id = f"log_analysis_{date}_{datetime.now().strftime('%H%M%S%f')}"
+        await self.session_service.create_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=session_id
+        )
+
+        content = types.Content(
+            role='user',
+            parts=[types.Part(text=analysis_prompt)]
+        )
+
+        events_async = self.runner.run_async(
+            user_id=self.user_id,
+            session_id=session_id,
+            new_message=content
+        )
+        self.analysis_stats['llm_calls'] += 1
+
+        analysis_result = ""
+        async for event in events_async:
+            if event.is_final_response():
+                if hasattr(event, 'content') and event.content:
+                    if hasattr(event.content, 'parts'):
+                        if hasattr(event.content.parts, 'text'):
+                            analysis_result = event.content.parts.text
+                        elif isinstance(event.content.parts, list):
+                            for part in event.content.parts:
+                                if hasattr(part, 'text') and part.text:
+                                    analysis_result += part.text
+                break
+
+        return analysis_result or "Não foi possível analisar os erros."
+
+    async def send_discord_alert(self, message: str, date: str, errors_count: int, source_name: str = None,
+                                 location: str = None):
+        """
+        Enfileira um alerta para o Discord.
+
+        O AlertDispatcher agrupa os alertas da mesma fonte dentro da janela
+        em um resumo e cuida do envio (rate limit e novas tentativas).
+        """
+        return self.alert_dispatcher.submit(Alert(
+            source_name=source_name or "backend",
+            label=date,
+            location=location or f"{self.base_url}/{date}",
+            errors_count=errors_count,
+            message=message
+        ))
 
     async def monitor_date(self, date: str) -> bool:
         """Monitora os logs de uma data específica."""
         print(f"🔍 Monitorando logs de {date}...")
 
-        # Buscar logs
-        log_content = await self.fetch_logs(date)
+        # Buscar logs (bytes brutos, varridos sem cópia)
+        log_content = await self.fetch_logs_raw(date)
         if not log_content:
             return False
 
-        # Extrair erros
-        errors = self.extract_errors(log_content)
+        url = f"{self.base_url}/{date}"
+        chunk = LogChunk(source_name="backend", key=url, label=date, location=url, data=log_content)
+        return await self.process_chunk(chunk)
+
+    async def _process_chunk(self, source: LogSource, chunk: LogChunk):
+        """Handler do agendador: processa o conteúdo obtido de uma fonte."""
+        await self.process_chunk(chunk)
+
+    async def process_chunk(self, chunk: LogChunk) -> bool:
+        """Detecta, analisa e alerta os erros novos de um conteúdo de log."""
+        # Extrair apenas erros novos desde a última verificação desta fonte. A
+        # varredura do corpo e as gravações em SQLite rodam fora do loop de eventos
+        if chunk.incremental:
+            errors = await asyncio.to_thread(
+                self.extract_errors, memoryview(chunk.data), base_offset=chunk.offset,
+                first_line=chunk.first_line, event_source=chunk.key)
+        else:
+            errors = await asyncio.to_thread(self.extract_errors, memoryview(chunk.data), source=chunk.key)
 
         if errors:
-            print(f"⚠️ {len(errors)} erros detectados em {date}")
+            print(f"⚠️ {len(errors)} erros detectados em {chunk.source_name}/{chunk.label}")
 
             # Analisar com IA
-            analysis = await self.analyze_errors_with_ai(errors, date)
+            async with self.analysis_semaphore:
+                analysis = await self.analyze_errors_with_ai(errors, chunk.label)
 
             # Enviar alerta
-            await self.send_discord_alert(analysis, date, len(errors))
+            await self.send_discord_alert(analysis, chunk.label, len(errors), source_name=chunk.source_name,
+                                          location=chunk.location)
 
             # Salvar na memória
             self.memory_manager.save_interaction(
                 user_id=self.user_id,
-                session_id=f"monitor_{date}",
-                user_message=f"Monitoramento de logs {date}",
+                session_id=f"monitor_{chunk.label}",
+                user_message=f"Monitoramento de logs {chunk.label}",
                 agent_response=analysis,
                 agent_type="LogMonitor",
                 metadata={
-                    "date": date,
+                    "date": chunk.label,
+                    "source": chunk.source_name,
                     "errors_count": len(errors),
-                    "url": f"{self.base_url}/{date}"
+                    "url": chunk.location
                 }
             )
 
             return True
         else:
-            print(f"✅ Nenhum erro encontrado em {date}")
+            print(f"✅ Nenhum erro encontrado em {chunk.source_name}/{chunk.label}")
             return False
 
     async def start_monitoring(self):
-        """Inicia o monitoramento contínuo."""
+        """Inicia o monitoramento contínuo de todas as fontes."""
         self.is_monitoring = True
         print(f"🚀 Iniciando monitoramento de logs...")
-        print(f"⏱️ Verificação a cada {self.check_interval} segundos")
-
-        while self.is_monitoring:
-            try:
-                # Monitorar hoje e ontem
-                today = datetime.now().strftime("%Y-%m-%d")
-                yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        for source in self.sources:
+            print(f"📡 Fonte: {source.describe()}")
 
-                for date in [today, yesterday]:
-                    await self.monitor_date(date)
-                    await asyncio.sleep(2)  # Pausa entre datas
-
-                # Aguardar próxima verificação
-                print(f"⏳ Próxima verificação em {self.check_interval} segundos...")
-                await asyncio.sleep(self.check_interval)
-
-            except Exception as e:
-                print(f"❌ Erro no monitoramento: {e}")
-                await asyncio.sleep(60)  # Aguardar 1 minuto em caso de erro
+        try:
+            await self.scheduler.run()
+        except Exception as e:
+            print(f"❌ Erro no monitoramento: {e}")
+        finally:
+            self.is_monitoring = False
 
     def stop_monitoring(self):
         """Para o monitoramento."""
         self.is_monitoring = False
+        self.scheduler.stop()
         print("🛑 Monitoramento interrompido")
 
+    async def close(self):
+        """Para o monitoramento, envia os alertas pendentes e fecha os armazenamentos locais."""
+        self.stop_monitoring()
+        await self.alert_dispatcher.close()
+        self.log_indexes.close()
+        self.event_store.close()
+        self.analysis_cache.close()
+        self.dedup_store.close()
+
+    def get_trends(self, hours: int = 24, bucket_seconds: int = 3600, limit: int = 5) -> Dict:
+        """Resumo das tendências de erro a partir da série temporal persistida."""
+        since = time.time() - hours * 3600
+        return {
+            'hours': hours,
+            'total': self.event_store.count(since=since),
+            'buckets': self.event_store.counts_by_bucket(bucket_seconds, since=since),
+            'top': self.event_store.top_fingerprints(limit, since=since),
+            'spikes': self.event_store.detect_spikes(bucket_seconds)[:limit]
+        }
+
+    def format_trends(self, trends: Dict) -> str:
+        """Formata o resumo de tendências em texto."""
+        lines = [f"📈 **Tendências das últimas {trends['hours']}h:** {trends['total']} ocorrências"]
+
+        if trends['buckets']:
+            peak = max(count for _, count in trends['buckets'])
+            lines.append("\n⏱️ **Por hora:**")
+            for bucket, count in trends['buckets'][-12:]:
+                bar = "█" * max(1, round(10 * count / peak))
+                lines.append(f"`{datetime.fromtimestamp(bucket).strftime('%d/%m %H:%M')}` {bar} {count}")
+
+        if trends['top']:
+            lines.append("\n🔝 **Erros mais frequentes:**")
+            for item in trends['top']:
+                lines.append(f"- {item['count']}x `{item['template'][:120]}`")
+
+        if trends['spikes']:
+            lines.append("\n🚨 **Picos na última hora:**")
+            for spike in trends['spikes']:
+                lines.append(
+                    f"- {spike['current']}x (média {spike['baseline']}, z={spike['zscore']}) `{spike['template'][:120]}`"
+                )
+
+        return "\n".join(lines)
+
     async def _run_async(self, query: str) -> str:
         """Método assíncrono para comandos manuais."""
         try:
@@ -409,9 +623,31 @@ class LogMonitorAgent(BaseAgent):
                 else:
                     return "❌ Formato de data inválido. Use YYYY-MM-DD"
 
+            elif "tendencia" in query.lower() or "tendência" in query.lower():
+                hours_match = re.search(r'(\d+)\s*h', query)
+                hours = int(hours_match.group(1)) if hours_match else 24
+                return self.format_trends(await asyncio.to_thread(self.get_trends, hours))
+
             elif "status" in query.lower():
                 status = "🟢 Ativo" if self.is_monitoring else "🔴 Inativo"
-                return f"📊 Status do monitoramento: {status}\n🔗 URL: {self.base_url}\n⏱️ Intervalo: {self.check_interval}s"
+                source_lines = []
+                for source, state in zip(self.sources, self.scheduler.status()):
+                    health = "✅" if not state['consecutive_failures'] else f"❌ {state['last_error']}"
+                    source_lines.append(f"  • {source.describe()} {health}")
+                return (
+                    f"📊 Status do monitoramento: {status}\n🔗 URL: {self.base_url}\n⏱️ Intervalo: {self.check_interval}s\n"
+                    f"🧠 Fingerprints em memória: {len(self.dedup_store)}/{self.dedup_store.max_entries}\n"
+                    f"🤖 Chamadas à IA: {self.analysis_stats['llm_calls']} | "
+                    f"Análises do cache: {self.analysis_stats['cache_hits']}\n"
+                    f"💾 Cache de logs: {self.log_cache.stats['hits']} acertos, "
+                    f"{self.log_cache.stats['coalesced']} agrupados, {self.log_cache.stats['not_modified']} não modificados, "
+                    f"{self.log_cache.stats['partial']} parciais, {self.log_cache.stats['full']} completos\n"
+                    f"📨 Alertas: {self.alert_dispatcher.stats['sent_alerts']} enviados em "
+                    f"{self.alert_dispatcher.stats['sent_messages']} mensagens, "
+                    f"{self.alert_dispatcher.stats['dropped']} descartados, "
+                    f"latência p95 {self.alert_dispatcher.latency_summary()['p95']:.1f}s\n"
+                    f"📡 Fontes:\n" + "\n".join(source_lines)
+                )
 
             else:
                 return """
@@ -421,10 +657,11 @@ class LogMonitorAgent(BaseAgent):
 -  `parar monitoramento` - Para o monitoramento
 -  `verificar hoje` - Verifica logs de hoje
 -  `verificar data YYYY-MM-DD` - Verifica logs de data específica
+-  `tendencia [Nh]` - Tendências, erros mais frequentes e picos (padrão: 24h)
 -  `status` - Mostra status do sistema
 
 📋 **Informações:**
-- Monitora automaticamente logs de hoje e ontem
+- Monitora em paralelo as fontes configuradas (padrão: logs de hoje e ontem do backend)
 - Detecta erros usando padrões avançados
 - Envia alertas para Discord quando encontra problemas
 - Usa IA para análise inteligente dos erros
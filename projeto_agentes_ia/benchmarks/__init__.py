@@ -0,0 +1,6 @@
+"""
+Benchmarks de desempenho dos pipelines do projeto.
+Cada módulo pode ser executado com `python -m benchmarks.<modulo>`, e a
+suíte completa com `python -m benchmarks` (JSON com p50/p95/p99 e
+comparação com uma execução anterior via --baseline).
+"""
@@ -0,0 +1,67 @@
+# benchmarks/__main__.py
+"""
+Executa a suíte de benchmarks e grava um único JSON com os resultados de
+cada módulo, para comparação com execuções anteriores (--baseline).
+
+Uso:
+    python -m benchmarks --quick --output bench/atual.json
+    python -m benchmarks --baseline bench/main.json --output bench/atual.json
+    python -m benchmarks --only documents,log_matcher --skip-postgres
+"""
+import argparse
+import sys
+
+from benchmarks import documents, log_matcher, memory_backends, rag_search
+from benchmarks.common import BenchmarkReport, add_common_arguments, finish
+
+MODULES = {
+    "memory_backends": memory_backends,
+    "rag_search": rag_search,
+    "log_matcher": log_matcher,
+    "documents": documents,
+}
+
+# Parâmetros reduzidos para rodar em poucos minutos (CI, verificação local)
+QUICK = {
+    "memory_backends": ["--users", "10", "--messages", "10", "--queries", "100"],
+    "rag_search": ["--sizes", "1000,10000", "--queries", "20"],
+    "log_matcher": ["--size-mb", "50", "--legacy-mb", "5", "--extract-gb", "0.25", "--window-mb", "32"],
+    "documents": ["--documents", "50", "--pdf-pages", "40", "--repeats", "2"],
+}
+
+# Tamanhos completos (bases de 1M chunks e logs de vários GB)
+FULL = {
+    "log_matcher": ["--extract-gb", "4"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do projeto")
+    parser.add_argument("--only", help=f"Módulos separados por vírgula ({', '.join(MODULES)})")
+    parser.add_argument("--quick", action="store_true", help="Tamanhos reduzidos")
+    parser.add_argument("--skip-postgres", action="store_true", help="Não usar o PostgreSQL local")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(",")] if args.only else list(MODULES)
+    unknown = [name for name in selected if name not in MODULES]
+    if unknown:
+        parser.error(f"Módulos desconhecidos: {', '.join(unknown)}")
+
+    suite = BenchmarkReport(name="suite", seed=args.seed, parameters={"modules": selected, "quick": args.quick})
+    for name in selected:
+        module = MODULES[name]
+        argv = list((QUICK if args.quick else FULL).get(name, [])) + ["--seed", str(args.seed)]
+        if args.skip_postgres and name in ("memory_backends", "rag_search"):
+            argv.append("--skip-postgres")
+
+        print(f"\n🏁 === {name} ===")
+        report = module.run(module.build_parser().parse_args(argv))
+        suite.parameters[name] = report.parameters
+        suite.results[name] = report.results
+
+    sys.exit(finish(suite, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# benchmarks/common.py
+"""
+Utilitários compartilhados pelos benchmarks: medição de latência com
+percentis, geradores de dados determinísticos (seed), saída em JSON e
+comparação com um resultado anterior para detectar regressões.
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+WORDS = [
+    "pedido", "cliente", "produto", "entrega", "pagamento", "estoque", "sorvete", "loja",
+    "relatório", "sistema", "agente", "memória", "consulta", "banco", "dados", "erro",
+    "servidor", "usuário", "sessão", "mensagem", "resposta", "documento", "busca", "índice",
+    "python", "postgres", "discord", "integração", "monitoramento", "desempenho", "latência",
+    "configuração", "ambiente", "processo", "fila", "cache", "arquivo", "log", "alerta", "modelo"
+]
+
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Percentil q (0–100) com interpolação linear entre as amostras ordenadas."""
+    if not sorted_samples:
+        return 0.0
+    position = (len(sorted_samples) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+@dataclass
+class LatencyStats:
+    """Resumo de latências em milissegundos."""
+    count: int = 0
+    total_seconds: float = 0.0
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    ops_per_second: float = 0.0
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float], wall_seconds: float = None) -> "LatencyStats":
+        """Cria o resumo a partir de durações em segundos (wall_seconds: tempo total real, se houve concorrência)."""
+        ordered = sorted(samples)
+        total = sum(ordered)
+        wall = wall_seconds if wall_seconds is not None else total
+        return cls(
+            count=len(ordered),
+            total_seconds=round(wall, 6),
+            mean_ms=round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+            p50_ms=round(percentile(ordered, 50) * 1000, 4),
+            p95_ms=round(percentile(ordered, 95) * 1000, 4),
+            p99_ms=round(percentile(ordered, 99) * 1000, 4),
+            max_ms=round(ordered[-1] * 1000, 4) if ordered else 0.0,
+            ops_per_second=round(len(ordered) / wall, 2) if wall > 0 else 0.0
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return (f"{self.count} ops, {self.ops_per_second:.1f} ops/s | p50 {self.p50_ms:.2f}ms "
+                f"p95 {self.p95_ms:.2f}ms p99 {self.p99_ms:.2f}ms max {self.max_ms:.2f}ms")
+
+
+Operation = Callable[[int], Union[None, Awaitable[None]]]
+
+
+async def measure(operation: Operation, iterations: int, warmup: int = 0) -> LatencyStats:
+    """Executa operation(i) em sequência e mede cada chamada (síncrona ou assíncrona)."""
+    for i in range(warmup):
+        result = operation(i)
+        if inspect.isawaitable(result):
+            await result
+
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        begin = time.perf_counter()
+        result = operation(warmup + i)
+        if inspect.isawaitable(result):
+            await result
+        samples.append(time.perf_counter() - begin)
+    return LatencyStats.from_samples(samples, time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Descarta os prints dos serviços durante a medição (como em produção, sem terminal)."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def throughput(amount: float, seconds: float) -> float:
+    return round(amount / seconds, 2) if seconds > 0 else 0.0
+
+
+# Dados sintéticos
+
+def synthetic_sentence(rng: random.Random, min_words: int = 6, max_words: int = 18) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def synthetic_paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(synthetic_sentence(rng) for _ in range(sentences))
+
+
+def synthetic_document(rng: random.Random, sections: int = 10, paragraphs: int = 6) -> str:
+    """Documento com títulos e parágrafos, no formato que o Chunker reconhece."""
+    parts = []
+    for section in range(1, sections + 1):
+        parts.append(f"{section}. {rng.choice(WORDS).capitalize()} e {rng.choice(WORDS)}")
+        parts.extend(synthetic_paragraph(rng, rng.randint(3, 8)) for _ in range(paragraphs))
+    return "\n\n".join(parts) + "\n"
+
+
+def unit_vector(rng: random.Random, dim: int) -> List[float]:
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+# Resultados
+
+@dataclass
+class BenchmarkReport:
+    """Resultados de uma execução, com o contexto necessário para comparar execuções."""
+    name: str
+    seed: int
+    parameters: Dict = field(default_factory=dict)
+    results: Dict = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    environment: Dict = field(default_factory=lambda: environment_info())
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def environment_info() -> Dict:
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        info["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        info["git_commit"] = None
+    return info
+
+
+def write_report(report: BenchmarkReport, output: Optional[str]):
+    if not output:
+        return
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+    print(f"📄 Resultados salvos em: {path}")
+
+
+def flatten_metrics(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """Achata o dicionário de resultados em caminho.com.pontos → valor numérico."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+# Métricas em que valores maiores são melhores; as de latência (_ms, seconds) são o contrário
+HIGHER_IS_BETTER = ("ops_per_second", "per_second", "per_s", "speedup")
+LOWER_IS_BETTER = ("_ms", "seconds")
+
+
+def compare_reports(baseline: Dict, current: Dict, tolerance: float = 0.10) -> List[Dict]:
+    """
+    Compara os resultados com uma execução anterior (dicionários de
+    BenchmarkReport) e retorna as métricas que pioraram mais que tolerance.
+    """
+    before = flatten_metrics(baseline.get("results", {}))
+    after = flatten_metrics(current.get("results", {}))
+    regressions = []
+    for path, old in before.items():
+        new = after.get(path)
+        if new is None or old <= 0:
+            continue
+        metric = path.rsplit(".", 1)[-1]
+        if metric.endswith(HIGHER_IS_BETTER):
+            change = (old - new) / old
+        elif metric.endswith(LOWER_IS_BETTER):
+            change = (new - old) / old
+        else:
+            continue
+        if change > tolerance:
+            regressions.append({"metric": path, "baseline": old, "current": new, "worse_by": round(change, 4)})
+    return regressions
+
+
+def print_regressions(regressions: List[Dict], tolerance: float):
+    if not regressions:
+        print(f"✅ Nenhuma regressão acima de {tolerance:.0%}")
+        return
+    print(f"⚠️ {len(regressions)} métricas pioraram mais de {tolerance:.0%}:")
+    for item in regressions:
+        print(f"   {item['metric']}: {item['baseline']:.4g} → {item['current']:.4g} "
+              f"({item['worse_by']:.0%} pior)")
+
+
+def add_common_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos dados sintéticos")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Piora relativa tolerada na comparação (padrão: 0.10)")
+
+
+def finish(report: BenchmarkReport, args: argparse.Namespace) -> int:
+    """Grava o JSON e compara com o baseline; retorna o código de saída (1 se houve regressão)."""
+    write_report(report, args.output)
+    if not args.baseline:
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_reports(baseline, report.to_dict(), args.tolerance)
+    print_regressions(regressions, args.tolerance)
+    return 1 if regressions else 0
+
@@ -0,0 +1,155 @@
+# benchmarks/documents.py
+"""
+Benchmark do processamento de documentos: chunking (Chunker do
+DocumentProcessor) e extração de texto de PDFs (PdfExtractor, com e sem
+pool de processos).
+
+Os documentos e PDFs são gerados de forma determinística a partir da seed.
+
+Uso:
+    python -m benchmarks.documents --documents 200 --pdf-pages 200 --output bench/documents.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    BenchmarkReport, LatencyStats, add_common_arguments, finish, measure, quiet,
+    synthetic_document, synthetic_sentence, throughput
+)
+from memory.document_processor import DocumentProcessor
+from memory.pdf_extractor import PdfExtractor
+
+MB = 1024 * 1024
+
+
+def _pdf_escape(text: str) -> str:
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return ascii_text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages: List[List[str]]) -> bytes:
+    """PDF mínimo (Helvetica, sem compressão) com as linhas de texto de cada página."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        body = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {body} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def synthetic_pdf(seed: int, pages: int, lines_per_page: int = 50) -> bytes:
+    rng = random.Random(seed)
+    return build_pdf([[synthetic_sentence(rng, 8, 14) for _ in range(lines_per_page)] for _ in range(pages)])
+
+
+def bench_chunking(seed: int, documents: int, sections: int) -> dict:
+    rng = random.Random(seed)
+    texts = [synthetic_document(rng, sections=sections) for _ in range(documents)]
+    processor = DocumentProcessor()
+    counts = []
+
+    def split(i):
+        counts.append(len(processor.chunker.split(texts[i])))
+
+    stats = asyncio.run(measure(split, len(texts)))
+    size_mb = sum(len(text.encode("utf-8")) for text in texts) / MB
+    return {
+        "documents": documents,
+        "size_mb": round(size_mb, 2),
+        "chunks": sum(counts),
+        "chunks_per_second": throughput(sum(counts), stats.total_seconds),
+        "mb_per_s": throughput(size_mb, stats.total_seconds),
+        "per_document": stats.to_dict()
+    }
+
+
+async def bench_pdf(pdf: bytes, workers: int, pages_per_task: int, repeats: int) -> dict:
+    extractor = PdfExtractor(max_workers=workers, pages_per_task=pages_per_task)
+    try:
+        # Primeira execução sobe os processos do pool; fica fora da medição
+        with quiet():
+            await extractor.extract_text(pdf)
+        runs = []
+        pages = 0
+        for _ in range(repeats):
+            started = time.perf_counter()
+            with quiet():
+                async for _ in extractor.iter_pages(pdf):
+                    pages += 1
+            runs.append(time.perf_counter() - started)
+    finally:
+        extractor.close()
+    return {
+        "workers": workers,
+        "pages_per_task": pages_per_task,
+        "pages_per_second": throughput(pages, sum(runs)),
+        "document": LatencyStats.from_samples(runs).to_dict()
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark de chunking e extração de PDFs")
+    parser.add_argument("--documents", type=int, default=200, help="Documentos sintéticos para o chunking")
+    parser.add_argument("--sections", type=int, default=10, help="Seções por documento")
+    parser.add_argument("--pdf-pages", type=int, default=200, help="Páginas do PDF sintético (0 desativa)")
+    parser.add_argument("--pdf-workers", default="0,4", help="Processos do extrator a comparar (0 = thread)")
+    parser.add_argument("--pages-per-task", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3, help="Extrações medidas por configuração")
+    add_common_arguments(parser)
+    return parser
+
+
+def run(args) -> BenchmarkReport:
+    report = BenchmarkReport(name="documents", seed=args.seed, parameters={
+        "documents": args.documents, "sections": args.sections, "pdf_pages": args.pdf_pages,
+        "pdf_workers": args.pdf_workers, "pages_per_task": args.pages_per_task, "repeats": args.repeats
+    })
+
+    print(f"✂️ Chunking de {args.documents} documentos...")
+    chunking = bench_chunking(args.seed, args.documents, args.sections)
+    report.results["chunking"] = chunking
+    print(f"   {chunking['chunks']} chunks, {chunking['chunks_per_second']:.0f} chunks/s, "
+          f"{chunking['mb_per_s']:.2f} MB/s | {LatencyStats(**chunking['per_document'])}")
+
+    if args.pdf_pages:
+        pdf = synthetic_pdf(args.seed, args.pdf_pages)
+        for workers in [int(w) for w in args.pdf_workers.split(",") if w.strip()]:
+            print(f"📄 PDF de {args.pdf_pages} páginas com {workers or 'thread, sem'} processos...")
+            result = asyncio.run(bench_pdf(pdf, workers, args.pages_per_task, args.repeats))
+            report.results.setdefault("pdf", {})[f"workers_{workers}"] = result
+            print(f"   {result['pages_per_second']:.1f} páginas/s | {LatencyStats(**result['document'])}")
+    return report
+
+
+def main():
+    args = build_parser().parse_args()
+    report = run(args)
+    sys.exit(finish(report, args))
+
+
+if __name__ == "__main__":
+    main()
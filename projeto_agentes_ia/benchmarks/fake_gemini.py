@@ -0,0 +1,172 @@
+# benchmarks/fake_gemini.py
+"""
+Modelo Gemini falso e determinístico para testes de carga sem gastar cota.
+
+FakeGemini implementa a interface de modelo do Google ADK (BaseLlm) e
+substitui apenas a chamada à API no agente ADK real: Runner, sessões,
+memória e RAG continuam os mesmos da aplicação. A latência simula o
+tempo até o primeiro token mais a geração a tokens_per_second, e um limite
+opcional de chamadas simultâneas reproduz o rate limit do provedor.
+
+Ativação na aplicação web (sem alterar código): FAKE_GEMINI=1 e, opcionalmente,
+FAKE_GEMINI_FIRST_TOKEN_MS, FAKE_GEMINI_TOKENS_PER_SECOND, FAKE_GEMINI_TOKENS,
+FAKE_GEMINI_CONCURRENCY e FAKE_GEMINI_SEED.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from pydantic import Field, PrivateAttr
+
+from benchmarks.common import LatencyStats, WORDS
+
+
+@dataclass
+class FakeGeminiConfig:
+    """Perfil de latência do modelo falso."""
+    first_token_ms: float = 400.0
+    tokens_per_second: float = 80.0
+    min_tokens: int = 60
+    max_tokens: int = 240
+    jitter: float = 0.1
+    max_concurrency: int = 0  # 0 = sem limite
+    seed: int = 42
+
+    @classmethod
+    def from_env(cls) -> "FakeGeminiConfig":
+        tokens = os.getenv("FAKE_GEMINI_TOKENS")
+        min_tokens, max_tokens = (int(t) for t in tokens.split("-", 1)) if tokens and "-" in tokens else (
+            (int(tokens), int(tokens)) if tokens else (cls.min_tokens, cls.max_tokens)
+        )
+        return cls(
+            first_token_ms=float(os.getenv("FAKE_GEMINI_FIRST_TOKEN_MS", str(cls.first_token_ms))),
+            tokens_per_second=float(os.getenv("FAKE_GEMINI_TOKENS_PER_SECOND", str(cls.tokens_per_second))),
+            min_tokens=min_tokens,
+            max_tokens=max_tokens,
+            max_concurrency=int(os.getenv("FAKE_GEMINI_CONCURRENCY", "0")),
+            seed=int(os.getenv("FAKE_GEMINI_SEED", str(cls.seed)))
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class FakeGemini(BaseLlm):
+    """Modelo compatível com o ADK que responde após a latência configurada."""
+
+    # Mesmo nome do modelo real: ferramentas como google_search aceitam a requisição
+    model: str = "gemini-2.0-flash-exp"
+    config: FakeGeminiConfig = Field(default_factory=FakeGeminiConfig)
+
+    _slots: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+    _queue_waits: List[float] = PrivateAttr(default_factory=list)
+    _generation_times: List[float] = PrivateAttr(default_factory=list)
+    _in_flight: int = PrivateAttr(default=0)
+    _peak_in_flight: int = PrivateAttr(default=0)
+    _tokens: int = PrivateAttr(default=0)
+
+    def _response_for(self, prompt: str):
+        """Resposta e latência derivadas só do prompt e da seed (mesma pergunta, mesma resposta)."""
+        digest = hashlib.sha256(f"{self.config.seed}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        tokens = rng.randint(self.config.min_tokens, self.config.max_tokens)
+        text = " ".join(rng.choice(WORDS) for _ in range(tokens))
+        seconds = self.config.first_token_ms / 1000 + tokens / max(self.config.tokens_per_second, 1e-6)
+        seconds *= 1 + rng.uniform(-self.config.jitter, self.config.jitter)
+        return text.capitalize() + ".", tokens, max(seconds, 0.0)
+
+    @staticmethod
+    def _prompt_text(llm_request: LlmRequest) -> str:
+        parts = []
+        for content in llm_request.contents or []:
+            for part in content.parts or []:
+                if part.text:
+                    parts.append(part.text)
+        return "\n".join(parts)
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        prompt = self._prompt_text(llm_request)
+        text, tokens, seconds = self._response_for(prompt)
+
+        if self.config.max_concurrency and self._slots is None:
+            self._slots = asyncio.Semaphore(self.config.max_concurrency)
+
+        queued = time.perf_counter()
+        if self._slots is not None:
+            await self._slots.acquire()
+        started = time.perf_counter()
+        self._queue_waits.append(started - queued)
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            usage = types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=len(prompt.split()), candidates_token_count=tokens,
+                total_token_count=len(prompt.split()) + tokens
+            )
+            if stream:
+                words = text.split(" ")
+                step = max(1, len(words) // 8)
+                await asyncio.sleep(self.config.first_token_ms / 1000)
+                per_word = max(seconds - self.config.first_token_ms / 1000, 0.0) / max(len(words), 1)
+                for index in range(0, len(words), step):
+                    await asyncio.sleep(per_word * step)
+                    yield LlmResponse(
+                        content=types.Content(role="model", parts=[types.Part(text=" ".join(words[index:index + step]) + " ")]),
+                        partial=True
+                    )
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]),
+                                  usage_metadata=usage)
+            else:
+                await asyncio.sleep(seconds)
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]),
+                                  usage_metadata=usage)
+            self._tokens += tokens
+        finally:
+            self._in_flight -= 1
+            self._generation_times.append(time.perf_counter() - started)
+            if self._slots is not None:
+                self._slots.release()
+
+    def stats(self) -> Dict:
+        return {
+            "calls": len(self._generation_times),
+            "tokens": self._tokens,
+            "peak_in_flight": self._peak_in_flight,
+            "queue_wait": LatencyStats.from_samples(self._queue_waits).to_dict(),
+            "generation": LatencyStats.from_samples(self._generation_times).to_dict()
+        }
+
+    def reset_stats(self):
+        self._queue_waits = []
+        self._generation_times = []
+        self._peak_in_flight = self._in_flight
+        self._tokens = 0
+
+
+def install_fake_gemini(agent_manager, config: FakeGeminiConfig = None) -> FakeGemini:
+    """
+    Troca o modelo do agente ADK do AgentManager pelo FakeGemini, criando o
+    agente se ele não foi inicializado (ex.: sem GOOGLE_API_KEY).
+    """
+    from agents.adk_agent_with_memory import ADKAgentWithMemory
+
+    agent = agent_manager.get_agent("adk") if "adk" in agent_manager.available else None
+    if agent is None:
+        agent = ADKAgentWithMemory()
+        agent_manager.register_agent("adk", agent)
+    if getattr(agent, "agent", None) is None:
+        raise RuntimeError("Agente ADK não pôde ser criado; verifique a instalação do google-adk")
+
+    fake = FakeGemini(config=config or FakeGeminiConfig())
+    agent.agent.model = fake
+    agent_manager.current_agent = "adk"
+    print(f"🧪 FakeGemini ativo: {fake.config.first_token_ms:.0f}ms + {fake.config.tokens_per_second:.0f} tokens/s")
+    return fake
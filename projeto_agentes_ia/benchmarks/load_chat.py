@@ -0,0 +1,334 @@
+# benchmarks/load_chat.py
+"""
+Teste de carga do /chat (web/app.py) e do comando /agenteia (discord_bot/bot.py)
+com o FakeGemini no lugar da API.
+
+N usuários virtuais enviam perguntas em laço fechado (uma por vez, com
+tempo de pensar opcional) durante --duration segundos, em níveis crescentes
+de concorrência. Para cada nível são medidos vazão, latência (p50/p95/p99),
+tempo de fila no modelo, o tempo gasto fora do modelo (memória, RAG,
+framework) e o atraso do loop de eventos — atrasos altos indicam código
+síncrono bloqueando o loop. O nível de saturação é o primeiro em que a vazão
+para de crescer enquanto a latência sobe.
+
+No Discord, o comando é chamado com uma Interaction simulada e também é
+medido o tempo até o defer(), que o Discord exige em até 3 segundos.
+
+Uso:
+    python -m benchmarks.load_chat --target web --users 1,5,10,25,50 --duration 20
+    python -m benchmarks.load_chat --target discord --users 10 --first-token-ms 800 --llm-concurrency 8
+    python -m benchmarks.load_chat --target web --url http://127.0.0.1:8000 --users 10  # servidor com FAKE_GEMINI=1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    BenchmarkReport, LatencyStats, add_common_arguments, finish, quiet, synthetic_sentence, throughput
+)
+from benchmarks.fake_gemini import FakeGemini, FakeGeminiConfig, install_fake_gemini
+
+
+class LoopLagMonitor:
+    """Mede o atraso do loop de eventos: quanto um sleep(interval) passa do previsto."""
+
+    def __init__(self, interval: float = 0.01, stall_threshold: float = 0.05):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> Dict:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        stats = LatencyStats.from_samples(self.samples).to_dict()
+        stats["stalls"] = sum(1 for lag in self.samples if lag >= self.stall_threshold)
+        return stats
+
+
+@dataclass
+class LevelResult:
+    """Amostras de um nível de concorrência."""
+    latencies: List[float] = field(default_factory=list)
+    acks: List[float] = field(default_factory=list)
+    errors: int = 0
+    error_samples: List[str] = field(default_factory=list)
+
+    def fail(self, message: str):
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(message[:200])
+
+
+# Alvos
+
+class WebTarget:
+    """POST /chat no app FastAPI (em processo, via ASGI) ou em um servidor já em execução."""
+
+    def __init__(self, url: str = None):
+        import httpx
+
+        if url:
+            self.client = httpx.AsyncClient(base_url=url, timeout=300)
+        else:
+            from web import app as web_app
+            self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=web_app.app),
+                                            base_url="http://loadtest", timeout=300)
+
+    async def send(self, user: int, query: str, result: LevelResult):
+        response = await self.client.post("/chat", data={"query": query, "user_id": f"load_user_{user}"})
+        body = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+        if response.status_code != 200 or not body.get("success"):
+            raise RuntimeError(f"HTTP {response.status_code}: {body.get('error') or body.get('detail') or ''}")
+        if str(body.get("response", "")).startswith("Erro ao executar agente"):
+            raise RuntimeError(body["response"])
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class _FakeResponse:
+    def __init__(self, interaction: "_FakeInteraction"):
+        self.interaction = interaction
+
+    async def defer(self, *args, **kwargs):
+        self.interaction.deferred_at = time.perf_counter()
+
+
+class _FakeFollowup:
+    def __init__(self, interaction: "_FakeInteraction"):
+        self.interaction = interaction
+
+    async def send(self, *args, embed=None, **kwargs):
+        self.interaction.sent.append(embed)
+
+
+class _FakeInteraction:
+    """O suficiente de discord.Interaction para os handlers de slash commands."""
+
+    def __init__(self, user: int):
+        self.user = SimpleNamespace(id=10 ** 17 + user, name=f"load_user_{user}", display_name=f"load_user_{user}")
+        self.guild_id = 10 ** 17
+        self.channel_id = 10 ** 17 + 1
+        self.deferred_at: Optional[float] = None
+        self.sent = []
+        self.response = _FakeResponse(self)
+        self.followup = _FakeFollowup(self)
+
+
+class DiscordTarget:
+    """Chama o handler do /agenteia diretamente, sem conexão com o Discord."""
+
+    def __init__(self, agent_manager):
+        import discord
+        from discord_bot import bot as bot_module
+
+        self.command = bot_module.agenteia_command
+        self.modelo = discord.app_commands.Choice(name="ADK (FakeGemini)", value="adk")
+        bot_module.bot.agent_manager = agent_manager
+
+    async def send(self, user: int, query: str, result: LevelResult):
+        interaction = _FakeInteraction(user)
+        started = time.perf_counter()
+        await self.command.callback(interaction, self.modelo, query)
+        if interaction.deferred_at is not None:
+            result.acks.append(interaction.deferred_at - started)
+        embed = interaction.sent[-1] if interaction.sent else None
+        if embed is None or str(embed.title).startswith("❌") or str(embed.description).startswith("Erro ao executar"):
+            raise RuntimeError(str(embed.description if embed else "sem resposta"))
+
+    async def close(self):
+        pass
+
+
+# Execução
+
+async def virtual_user(user: int, target, rng: random.Random, deadline: float, think_ms: float,
+                       result: LevelResult):
+    while time.perf_counter() < deadline:
+        query = synthetic_sentence(rng)
+        started = time.perf_counter()
+        try:
+            await target.send(user, query, result)
+            result.latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            result.fail(f"{type(e).__name__}: {e}")
+        if think_ms:
+            await asyncio.sleep(rng.expovariate(1000 / think_ms))
+
+
+async def run_level(target, users: int, duration: float, think_ms: float, seed: int,
+                    fake: Optional[FakeGemini]) -> Dict:
+    if fake is not None:
+        fake.reset_stats()
+    result = LevelResult()
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    deadline = started + duration
+    with quiet():
+        await asyncio.gather(*(
+            virtual_user(user, target, random.Random(seed * 1000 + user), deadline, think_ms, result)
+            for user in range(users)
+        ))
+    elapsed = time.perf_counter() - started
+    loop_lag = await monitor.stop()
+
+    latency = LatencyStats.from_samples(result.latencies, elapsed)
+    level = {
+        "users": users,
+        "completed": len(result.latencies),
+        "errors": result.errors,
+        "requests_per_second": throughput(len(result.latencies), elapsed),
+        "latency": latency.to_dict(),
+        "loop_lag": loop_lag,
+    }
+    if result.error_samples:
+        level["error_samples"] = result.error_samples
+    if result.acks:
+        level["ack"] = LatencyStats.from_samples(result.acks).to_dict()
+    if fake is not None:
+        llm = fake.stats()
+        level["llm"] = llm
+        # Tempo fora do modelo: memória, RAG, framework e espera pelo loop
+        level["overhead_mean_ms"] = round(latency.mean_ms - llm["generation"]["mean_ms"], 3)
+    return level
+
+
+def find_saturation(levels: List[Dict], min_gain: float = 0.10) -> Optional[int]:
+    """Primeiro nível em que a vazão cresce menos que min_gain enquanto o p95 aumenta."""
+    for previous, current in zip(levels, levels[1:]):
+        if previous["requests_per_second"] <= 0:
+            continue
+        gain = current["requests_per_second"] / previous["requests_per_second"] - 1
+        if gain < min_gain and current["latency"]["p95_ms"] > previous["latency"]["p95_ms"]:
+            return current["users"]
+    return None
+
+
+def print_level(level: Dict):
+    line = (f"   {level['users']:>4} usuários | {level['requests_per_second']:>7.2f} req/s | "
+            f"p50 {level['latency']['p50_ms']:>8.1f}ms p95 {level['latency']['p95_ms']:>8.1f}ms "
+            f"p99 {level['latency']['p99_ms']:>8.1f}ms | loop máx {level['loop_lag']['max_ms']:>6.1f}ms "
+            f"({level['loop_lag']['stalls']} travadas) | erros {level['errors']}")
+    if "ack" in level:
+        line += f" | defer p99 {level['ack']['p99_ms']:.1f}ms"
+    if "llm" in level:
+        line += (f" | fila LLM p95 {level['llm']['queue_wait']['p95_ms']:.1f}ms"
+                 f" | fora do LLM {level['overhead_mean_ms']:.1f}ms")
+    print(line)
+    for sample in level.get("error_samples", [])[:2]:
+        print(f"      ⚠️ {sample}")
+
+
+def build_agent_manager(config: FakeGeminiConfig):
+    from agents.agent_manager import AgentManager
+
+    with quiet():
+        manager = AgentManager()
+        fake = install_fake_gemini(manager, config)
+    return manager, fake
+
+
+async def run_async(args) -> BenchmarkReport:
+    levels = [int(users) for users in args.users.split(",") if users.strip()]
+    config = FakeGeminiConfig(
+        first_token_ms=args.first_token_ms, tokens_per_second=args.tokens_per_second,
+        min_tokens=args.min_tokens, max_tokens=args.max_tokens,
+        max_concurrency=args.llm_concurrency, seed=args.seed
+    )
+    report = BenchmarkReport(name=f"load_{args.target}", seed=args.seed, parameters={
+        "target": args.target, "url": args.url, "users": levels, "duration": args.duration,
+        "think_ms": args.think_ms, "fake_gemini": config.to_dict()
+    })
+
+    fake = None
+    if args.url:
+        target = WebTarget(args.url)
+    else:
+        manager, fake = build_agent_manager(config)
+        if args.target == "web":
+            from web import app as web_app
+            web_app.agent_manager = manager
+            target = WebTarget()
+        else:
+            target = DiscordTarget(manager)
+
+    print(f"🚦 Carga em {args.target}{' (' + args.url + ')' if args.url else ''}: "
+          f"{config.first_token_ms:.0f}ms + {config.tokens_per_second:.0f} tokens/s por resposta")
+    try:
+        results = []
+        for users in levels:
+            level = await run_level(target, users, args.duration, args.think_ms, args.seed, fake)
+            results.append(level)
+            print_level(level)
+    finally:
+        await target.close()
+
+    report.results["levels"] = {str(level["users"]): level for level in results}
+    saturation = find_saturation(results)
+    report.parameters["saturation_users"] = saturation
+    if saturation:
+        print(f"📉 Saturação a partir de {saturation} usuários simultâneos")
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Teste de carga do /chat e do /agenteia com FakeGemini")
+    parser.add_argument("--target", choices=["web", "discord"], default="web")
+    parser.add_argument("--url", help="Servidor web já em execução (com FAKE_GEMINI=1) em vez do app em processo")
+    parser.add_argument("--users", default="1,5,10,25", help="Níveis de usuários simultâneos")
+    parser.add_argument("--duration", type=float, default=15, help="Segundos por nível")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pausa média entre perguntas de um usuário")
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--min-tokens", type=int, default=60)
+    parser.add_argument("--max-tokens", type=int, default=240)
+    parser.add_argument("--llm-concurrency", type=int, default=0,
+                        help="Limite de chamadas simultâneas ao modelo (0 = sem limite)")
+    parser.add_argument("--workdir", help="Diretório de trabalho (memória e RAG em arquivos); padrão: temporário")
+    add_common_arguments(parser)
+    return parser
+
+
+def run(args) -> BenchmarkReport:
+    # Memória e RAG em arquivos são criados no diretório atual: isolar do armazenamento real
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        os.chdir(workdir)
+        try:
+            return asyncio.run(run_async(args))
+        finally:
+            os.chdir(previous)
+
+
+def main():
+    args = build_parser().parse_args()
+    report = run(args)
+    sys.exit(finish(report, args))
+
+
+if __name__ == "__main__":
+    main()
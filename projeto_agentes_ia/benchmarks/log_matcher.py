@@ -0,0 +1,241 @@
+# benchmarks/log_matcher.py
+"""
+Benchmark do detector de erros de logs.
+
+Gera um log sintético (determinístico via seed) e compara o laço original
+(re.search por padrão e por linha) com o ErrorMatcher compilado.
+
+Com --extract-gb, grava um log de vários GB em disco e mede o laço de
+LogMonitorAgent.extract_errors (varredura + fingerprint + deduplicação)
+sobre o arquivo mapeado em memória, em janelas de --window-mb.
+
+Uso:
+    python -m benchmarks.log_matcher --size-mb 300 --legacy-mb 20
+    python -m benchmarks.log_matcher --size-mb 0 --legacy-mb 0 --extract-gb 4 --output bench/logs.json
+"""
+import argparse
+import mmap
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import BenchmarkReport, LatencyStats, add_common_arguments, finish, throughput
+from monitoring.error_matcher import ErrorMatcher, DEFAULT_ERROR_PATTERNS
+from monitoring.dedup_store import ErrorDedupStore
+
+MB = 1024 * 1024
+
+INFO_MESSAGES = [
+    "GET /api/produtos 200 {ms}ms",
+    "POST /api/pedidos 201 {ms}ms",
+    "Usuário {id} autenticado com sucesso",
+    "Cache hit para chave produto:{id}",
+    "Job de sincronização {id} concluído em {ms}ms",
+    "Conexão com Redis estabelecida",
+]
+
+ERROR_MESSAGES = [
+    "ERROR Falha ao processar pedido {id}",
+    "Traceback (most recent call last):",
+    "psycopg2.OperationalError: Database error ao consultar tabela pedidos",
+    "500 Internal Server Error em /api/checkout",
+    "Connection refused ao conectar em 10.0.0.{ip}:5432",
+    "Timeout após {ms}ms aguardando resposta do gateway",
+    "CRITICAL Fila de mensagens cheia ({id} itens)",
+]
+
+
+def generate_block(block_bytes: int, error_ratio: float = 0.01, seed: int = 42) -> bytes:
+    """Bloco de log sintético com aproximadamente block_bytes bytes (linhas completas)."""
+    rng = random.Random(seed)
+    block = []
+    block_size = 0
+
+    while block_size < block_bytes:
+        second = len(block) % 86400
+        timestamp = f"2025-06-21 {second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+        if rng.random() < error_ratio:
+            message = rng.choice(ERROR_MESSAGES)
+            level = "ERROR"
+        else:
+            message = rng.choice(INFO_MESSAGES)
+            level = "INFO"
+        message = message.format(ms=rng.randint(1, 5000), id=rng.randint(1, 10 ** 6), ip=rng.randint(1, 254))
+        line = f"[{timestamp}] app.{level.lower()}: {message}\n".encode()
+        block.append(line)
+        block_size += len(line)
+    return b"".join(block)
+
+
+def generate_log(size_bytes: int, error_ratio: float = 0.01, seed: int = 42) -> bytes:
+    """Gera um log sintético com aproximadamente size_bytes bytes."""
+    # Gerar um bloco de ~1MB e repeti-lo mantém a geração rápida para centenas de MB
+    chunk = generate_block(min(size_bytes, MB), error_ratio, seed)
+    repeats, remainder = divmod(size_bytes, len(chunk))
+    tail = chunk[:chunk.rfind(b"\n", 0, remainder) + 1] if remainder else b""
+    return chunk * repeats + tail
+
+
+def legacy_extract(log_content: str, patterns) -> int:
+    """Reproduz o laço original de extract_errors (sem deduplicação)."""
+    hits = 0
+    lines = log_content.split('\n')
+    for i, line in enumerate(lines):
+        for pattern in patterns:
+            if re.search(pattern, line, re.IGNORECASE):
+                re.search(r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}', line)
+                hits += 1
+                break
+    return hits
+
+
+def write_log_file(path: Path, size_bytes: int, error_ratio: float = 0.01, seed: int = 42):
+    """Grava um log sintético de size_bytes bytes sem mantê-lo inteiro na memória."""
+    # Blocos com seeds diferentes: timestamps e ids variam ao longo do arquivo
+    blocks = [generate_block(MB, error_ratio, seed + i) for i in range(8)]
+    written = 0
+    with open(path, 'wb') as f:
+        while written < size_bytes:
+            block = blocks[(written // MB) % len(blocks)]
+            f.write(block)
+            written += len(block)
+
+
+def bench_extract(path: Path, window_mb: int, dedup_db: Path) -> dict:
+    """
+    Mede o laço de extract_errors(only_new=True): varredura, fingerprint e
+    deduplicação de cada ocorrência, janela a janela sobre o arquivo mapeado.
+    """
+    matcher = ErrorMatcher(DEFAULT_ERROR_PATTERNS)
+    dedup = ErrorDedupStore(db_path=str(dedup_db))
+    windows = []
+    hits = alerts = 0
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        started = time.perf_counter()
+        start = 0
+        while start < size:
+            end = min(start + window_mb * MB, size)
+            if end < size:
+                end = data.rfind(b"\n", start, end) + 1 or end
+            begin = time.perf_counter()
+            for match in matcher.scan(data, start=start, end=end):
+                _, should_alert = dedup.observe(match.line, match.pattern)
+                hits += 1
+                alerts += should_alert
+            windows.append(time.perf_counter() - begin)
+            start = end
+        dedup.flush()
+        seconds = time.perf_counter() - started
+    dedup.close()
+
+    return {
+        "size_mb": round(size / MB, 1),
+        "seconds": round(seconds, 3),
+        "mb_per_s": throughput(size / MB, seconds),
+        "hits": hits,
+        "hits_per_second": throughput(hits, seconds),
+        "alerts": alerts,
+        "window_mb": window_mb,
+        "windows": LatencyStats.from_samples(windows, seconds).to_dict()
+    }
+
+
+def run_matcher(size_mb: int, legacy_mb: int, error_ratio: float, seed: int) -> dict:
+    matcher = ErrorMatcher(DEFAULT_ERROR_PATTERNS)
+    if not size_mb:
+        return {}
+
+    print(f"🧪 Gerando log sintético de {size_mb} MB (seed={seed})...")
+    data = generate_log(size_mb * 1024 * 1024, error_ratio, seed)
+
+    start = time.perf_counter()
+    hits = sum(1 for _ in matcher.scan(memoryview(data)))
+    compiled_time = time.perf_counter() - start
+    compiled_rate = len(data) / compiled_time / (1024 * 1024)
+    print(f"⚡ ErrorMatcher: {hits} erros em {compiled_time:.2f}s ({compiled_rate:.1f} MB/s)")
+
+    results = {
+        "size_mb": size_mb,
+        "compiled_seconds": compiled_time,
+        "compiled_mb_per_s": compiled_rate,
+        "hits": hits
+    }
+
+    if legacy_mb:
+        sample = data[:data.rfind(b"\n", 0, legacy_mb * 1024 * 1024) + 1]
+        text = sample.decode()
+
+        start = time.perf_counter()
+        legacy_hits = legacy_extract(text, DEFAULT_ERROR_PATTERNS)
+        legacy_time = time.perf_counter() - start
+        legacy_rate = len(sample) / legacy_time / (1024 * 1024)
+
+        start = time.perf_counter()
+        sample_hits = sum(1 for _ in matcher.scan(memoryview(sample)))
+        sample_time = time.perf_counter() - start
+
+        if sample_hits != legacy_hits:
+            print(f"⚠️ Divergência: legado={legacy_hits} compilado={sample_hits}")
+
+        print(f"🐢 Laço original ({legacy_mb} MB): {legacy_hits} erros em {legacy_time:.2f}s ({legacy_rate:.1f} MB/s)")
+        print(f"📈 Speedup: {legacy_time / sample_time:.1f}x")
+
+        results.update({
+            "legacy_mb": legacy_mb,
+            "legacy_seconds": legacy_time,
+            "legacy_mb_per_s": legacy_rate,
+            "speedup": legacy_time / sample_time
+        })
+
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark do detector de erros de logs")
+    parser.add_argument("--size-mb", type=int, default=300, help="Tamanho do log sintético em MB (0 desativa)")
+    parser.add_argument("--legacy-mb", type=int, default=20,
+                        help="MB usados na comparação com o laço original (0 desativa)")
+    parser.add_argument("--error-ratio", type=float, default=0.01, help="Fração de linhas com erro")
+    parser.add_argument("--extract-gb", type=float, default=0,
+                        help="GB do log em disco para o laço de extract_errors (0 desativa)")
+    parser.add_argument("--window-mb", type=int, default=64, help="Janela de varredura do log em disco")
+    parser.add_argument("--workdir", help="Diretório para o log em disco (padrão: temporário)")
+    add_common_arguments(parser)
+    return parser
+
+
+def run(args) -> BenchmarkReport:
+    report = BenchmarkReport(name="log_matcher", seed=args.seed, parameters={
+        "size_mb": args.size_mb, "legacy_mb": args.legacy_mb, "error_ratio": args.error_ratio,
+        "extract_gb": args.extract_gb, "window_mb": args.window_mb
+    })
+    report.results["matcher"] = run_matcher(args.size_mb, args.legacy_mb, args.error_ratio, args.seed)
+
+    if args.extract_gb:
+        with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+            path = Path(workdir) / "synthetic.log"
+            print(f"🧪 Gravando log de {args.extract_gb:g} GB em {path}...")
+            write_log_file(path, int(args.extract_gb * 1024 * MB), args.error_ratio, args.seed)
+            result = bench_extract(path, args.window_mb, Path(workdir) / "dedup.sqlite3")
+        report.results["extract"] = result
+        print(f"⚡ extract_errors: {result['hits']} erros em {result['seconds']:.2f}s "
+              f"({result['mb_per_s']:.1f} MB/s, {result['alerts']} alertas)")
+        print(f"   janelas de {args.window_mb} MB: {LatencyStats(**result['windows'])}")
+    return report
+
+
+def main():
+    args = build_parser().parse_args()
+    report = run(args)
+    sys.exit(finish(report, args))
+
+
+if __name__ == "__main__":
+    main()
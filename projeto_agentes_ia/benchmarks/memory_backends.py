@@ -0,0 +1,132 @@
+# benchmarks/memory_backends.py
+"""
+Benchmark da memória conversacional: arquivos (IsolatedFileMemoryService)
+vs PostgreSQL (PostgresMemoryService) em save, histórico e busca.
+
+O PostgreSQL usa as mesmas variáveis POSTGRES_* da aplicação; suba o
+container local com `docker-compose up -d` em docker/. Os registros
+criados usam user_id com prefixo bench_ e são apagados ao final.
+
+Uso:
+    python -m benchmarks.memory_backends --users 20 --messages 50 --output bench/memory.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    BenchmarkReport, LatencyStats, add_common_arguments, finish, measure, quiet, synthetic_sentence, WORDS
+)
+from memory.memory_manager import ConversationEntry, IsolatedFileMemoryService
+
+
+def generate_entries(seed: int, users: int, sessions: int, messages: int) -> List[ConversationEntry]:
+    """Conversas sintéticas determinísticas, intercaladas entre usuários e sessões."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1) + timedelta(seconds=rng.randint(0, 86400))
+    entries = []
+    for i in range(users * sessions * messages):
+        user = i % users
+        session = (i // users) % sessions
+        entries.append(ConversationEntry(
+            timestamp=(start + timedelta(seconds=i)).isoformat(),
+            user_id=f"bench_{seed}_{user}",
+            session_id=f"sessao_{session}",
+            user_message=synthetic_sentence(rng),
+            agent_response=" ".join(synthetic_sentence(rng) for _ in range(rng.randint(2, 6))),
+            agent_type=rng.choice(["ADK", "LangChain"]),
+            metadata={"benchmark": True, "i": i}
+        ))
+    return entries
+
+
+async def bench_backend(service, entries: List[ConversationEntry], queries: int, seed: int) -> Dict:
+    rng = random.Random(seed + 1)
+    keys = sorted({(entry.user_id, entry.session_id) for entry in entries})
+
+    async def call(method, *args):
+        result = method(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    with quiet():
+        save = await measure(lambda i: call(service.save_conversation, entries[i]), len(entries))
+        history = await measure(lambda i: call(service.get_conversation_history, *rng.choice(keys), 10), queries)
+        search = await measure(
+            lambda i: call(service.search_conversations, rng.choice(keys)[0], rng.choice(WORDS), 5), queries
+        )
+    return {"save": save.to_dict(), "history": history.to_dict(), "search": search.to_dict()}
+
+
+async def run_async(args) -> BenchmarkReport:
+    entries = generate_entries(args.seed, args.users, args.sessions, args.messages)
+    report = BenchmarkReport(name="memory_backends", seed=args.seed, parameters={
+        "users": args.users, "sessions": args.sessions, "messages": args.messages,
+        "entries": len(entries), "queries": args.queries
+    })
+
+    with tempfile.TemporaryDirectory() as storage:
+        print(f"🗂️ Arquivos: {len(entries)} conversas...")
+        report.results["file"] = await bench_backend(IsolatedFileMemoryService(storage), entries,
+                                                     args.queries, args.seed)
+        for operation, stats in report.results["file"].items():
+            print(f"   {operation}: {LatencyStats(**stats)}")
+
+    if not args.skip_postgres:
+        from memory.postgres_memory_service import PostgresMemoryService
+
+        service = PostgresMemoryService()
+        try:
+            await service.initialize()
+        except Exception as e:
+            print(f"⚠️ PostgreSQL indisponível, pulando: {e}")
+            return report
+        try:
+            await clear_postgres(service, args.seed)
+            print(f"🐘 PostgreSQL: {len(entries)} conversas...")
+            report.results["postgres"] = await bench_backend(service, entries, args.queries, args.seed)
+            for operation, stats in report.results["postgres"].items():
+                print(f"   {operation}: {LatencyStats(**stats)}")
+        finally:
+            await clear_postgres(service, args.seed)
+            await service.close()
+
+    return report
+
+
+async def clear_postgres(service, seed: int):
+    async with service.pool.acquire() as conn:
+        await conn.execute("DELETE FROM agenteia.conversations WHERE user_id LIKE $1", f"bench_{seed}_%")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark da memória: arquivos vs PostgreSQL")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=2, help="Sessões por usuário")
+    parser.add_argument("--messages", type=int, default=25, help="Mensagens por sessão")
+    parser.add_argument("--queries", type=int, default=200, help="Leituras de histórico e buscas")
+    parser.add_argument("--skip-postgres", action="store_true")
+    add_common_arguments(parser)
+    return parser
+
+
+def run(args) -> BenchmarkReport:
+    return asyncio.run(run_async(args))
+
+
+def main():
+    args = build_parser().parse_args()
+    report = run(args)
+    sys.exit(finish(report, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# benchmarks/rag_search.py
+"""
+Benchmark da busca do RAG: SimpleRAGSystem (palavras-chave em memória) vs
+pgvector, em bases de 1k, 100k e 1M chunks.
+
+Os vetores do pgvector são gerados no próprio servidor (setseed + random),
+em uma tabela temporária do benchmark (agenteia.bench_documents), com a
+mesma consulta de PostgresRAGSystem.search_documents (operador <#>). A busca
+é medida sem índice (varredura exata) e com índice ivfflat, com o recall do
+índice em relação à varredura exata.
+
+Uso:
+    python -m benchmarks.rag_search --sizes 1000,100000,1000000 --output bench/rag.json
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.common import (
+    BenchmarkReport, LatencyStats, add_common_arguments, finish, measure, quiet,
+    synthetic_paragraph, unit_vector, WORDS
+)
+from memory.rag_system import SimpleRAGSystem
+
+BENCH_TABLE = "agenteia.bench_documents"
+
+
+def generate_documents(seed: int, count: int) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {"id": str(i), "content": synthetic_paragraph(rng, rng.randint(2, 5)), "metadata": {}, "timestamp": ""}
+        for i in range(count)
+    ]
+
+
+def bench_simple(seed: int, size: int, queries: int) -> Dict:
+    rng = random.Random(seed + size)
+    with tempfile.TemporaryDirectory() as storage:
+        rag = SimpleRAGSystem(storage)
+        # Carregado direto na lista: add_document regrava o JSON inteiro a cada documento
+        rag.documents = generate_documents(seed, size)
+        terms = [" ".join(rng.sample(WORDS, 2)) for _ in range(queries)]
+        stats = asyncio.run(measure(lambda i: rag.search(terms[i], 3), queries))
+    return stats.to_dict()
+
+
+async def load_vectors(conn, size: int, dim: int, seed: int):
+    await conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    await conn.execute(f"CREATE TABLE {BENCH_TABLE} (id SERIAL PRIMARY KEY, content TEXT, embedding vector({dim}))")
+    # Mesma sessão: setseed torna os vetores reproduzíveis
+    await conn.execute("SELECT setseed($1)", (seed % 1000) / 1000)
+    batch = 100_000
+    for offset in range(0, size, batch):
+        await conn.execute(
+            f"""
+            INSERT INTO {BENCH_TABLE} (content, embedding)
+            SELECT 'chunk ' || g,
+                   (SELECT array_agg(random() - 0.5) FROM generate_series(1, $3) d WHERE g > 0)::vector
+            FROM generate_series($1 + 1, $1 + $2) g
+            """,
+            offset, min(batch, size - offset), dim
+        )
+    await conn.execute(f"ANALYZE {BENCH_TABLE}")
+
+
+async def bench_pgvector(pool, seed: int, size: int, queries: int, dim: int, probes: int) -> Dict:
+    rng = random.Random(seed + size)
+    vectors = ["[" + ",".join(f"{x:.6f}" for x in unit_vector(rng, dim)) + "]" for _ in range(queries)]
+    query = f"SELECT id FROM {BENCH_TABLE} ORDER BY embedding <#> $1::vector LIMIT 5"
+    results: Dict = {}
+
+    async with pool.acquire() as conn:
+        started = time.perf_counter()
+        await load_vectors(conn, size, dim, seed)
+        results["load_seconds"] = round(time.perf_counter() - started, 3)
+
+        exact_ids = []
+
+        async def exact(i):
+            exact_ids.append([row['id'] for row in await conn.fetch(query, vectors[i])])
+
+        results["exact"] = (await measure(exact, queries)).to_dict()
+
+        lists = max(1, int(math.sqrt(size)))
+        started = time.perf_counter()
+        await conn.execute(
+            f"CREATE INDEX ON {BENCH_TABLE} USING ivfflat (embedding vector_ip_ops) WITH (lists = {lists})"
+        )
+        results["index_build_seconds"] = round(time.perf_counter() - started, 3)
+        await conn.execute(f"SET ivfflat.probes = {probes}")
+
+        index_ids = []
+
+        async def indexed(i):
+            index_ids.append([row['id'] for row in await conn.fetch(query, vectors[i])])
+
+        results["ivfflat"] = (await measure(indexed, queries)).to_dict()
+        results["ivfflat"]["lists"] = lists
+        results["ivfflat"]["probes"] = probes
+        hits = sum(len(set(a) & set(b)) for a, b in zip(exact_ids, index_ids))
+        results["ivfflat"]["recall_at_5"] = round(hits / max(1, sum(len(ids) for ids in exact_ids)), 4)
+
+        await conn.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    return results
+
+
+async def run_pgvector(args, sizes: List[int], report: BenchmarkReport):
+    from memory.postgres_memory_service import PostgresMemoryService
+
+    service = PostgresMemoryService()
+    try:
+        await service.initialize()
+    except Exception as e:
+        print(f"⚠️ PostgreSQL indisponível, pulando pgvector: {e}")
+        return
+    try:
+        for size in sizes:
+            print(f"🐘 pgvector com {size} chunks (dim={args.dim})...")
+            with quiet():
+                result = await bench_pgvector(service.pool, args.seed, size, args.queries, args.dim, args.probes)
+            report.results.setdefault("pgvector", {})[str(size)] = result
+            print(f"   exata: {LatencyStats(**result['exact'])}")
+            ivfflat = {k: v for k, v in result['ivfflat'].items() if k in LatencyStats.__dataclass_fields__}
+            print(f"   ivfflat: {LatencyStats(**ivfflat)} | recall@5 {result['ivfflat']['recall_at_5']:.2f}")
+    finally:
+        await service.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark da busca do RAG: SimpleRAG vs pgvector")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Tamanhos da base, separados por vírgula")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=384, help="Dimensão dos vetores (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--probes", type=int, default=10, help="ivfflat.probes")
+    parser.add_argument("--simple-max", type=int, default=100000,
+                        help="Maior base testada no SimpleRAG (busca linear em Python)")
+    parser.add_argument("--skip-postgres", action="store_true")
+    add_common_arguments(parser)
+    return parser
+
+
+def run(args) -> BenchmarkReport:
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = BenchmarkReport(name="rag_search", seed=args.seed, parameters={
+        "sizes": sizes, "queries": args.queries, "dim": args.dim, "probes": args.probes,
+        "simple_max": args.simple_max
+    })
+
+    for size in sizes:
+        if size > args.simple_max:
+            print(f"⏭️ SimpleRAG com {size} chunks pulado (--simple-max {args.simple_max})")
+            continue
+        print(f"🔎 SimpleRAG com {size} chunks...")
+        result = bench_simple(args.seed, size, args.queries)
+        report.results.setdefault("simple", {})[str(size)] = result
+        print(f"   {LatencyStats(**result)}")
+
+    if not args.skip_postgres:
+        asyncio.run(run_pgvector(args, sizes, report))
+    return report
+
+
+def main():
+    args = build_parser().parse_args()
+    report = run(args)
+    sys.exit(finish(report, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,23 +3,40 @@ import discord
 from discord.ext import commands
 import asyncio
 import os
-import sys
-from pathlib import Path
 from dotenv import load_dotenv
 import hashlib
+import importlib
+import re
+import time
 from datetime import datetime
 
-# Adicionar o diretório pai ao path
-current_dir = Path(__file__).parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
-
 from agents.agent_manager import AgentManager
+from discord_bot.dispatcher import DispatcherSaturated, RequestDispatcher
+from discord_bot.shared_state import create_state_store
+from integrations.http_pool import close_http_sessions
+from memory.pdf_extractor import close_pdf_extractor
+from observability import REQUEST_LATENCY, LoopWatchdog, setup_tracing, span, startup_report
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-class AgentEIABot(commands.Bot):
+def shard_config_from_env() -> dict:
+    """
+    Shards atendidos por este processo:
+    - sem variáveis: o discord.py escolhe o número de shards e roda todos aqui;
+    - DISCORD_SHARD_COUNT=N e DISCORD_SHARD_IDS=0,1: só esses shards de N
+      (um processo por shard ou por grupo, ver discord_bot/shard_launcher.py).
+    """
+    shard_count = os.getenv("DISCORD_SHARD_COUNT")
+    shard_ids = os.getenv("DISCORD_SHARD_IDS")
+    config = {}
+    if shard_count:
+        config["shard_count"] = int(shard_count)
+        if shard_ids:
+            config["shard_ids"] = [int(shard_id) for shard_id in shard_ids.split(",")]
+    return config
+
+class AgentEIABot(commands.AutoShardedBot):
     """Bot Discord com sistema de conversas isoladas e monitoramento de logs."""
 
     def __init__(self):
@@ -30,68 +47,188 @@ class AgentEIABot(commands.Bot):
         super().__init__(
             command_prefix='!',
             intents=intents,
-            description="Bot de IA com agentes ADK, LangChain e Monitoramento de Logs"
+            description="Bot de IA com agentes ADK, LangChain e Monitoramento de Logs",
+            **shard_config_from_env()
         )
 
         self.agent_manager = None
-        self.user_agent_preferences = {}
+        # Execuções de agentes: uma por sessão, sessões em paralelo até o limite.
+        # Uma sessão é de um canal, e um canal é de um único shard: a fila local basta
+        self.dispatcher = RequestDispatcher.from_env()
+        # Preferências e trava de líder compartilhadas entre os processos (setup_hook)
+        self.state_store = None
         self.synced = False
 
-        # Instância global do agente de monitoramento
+        # Instância global do agente de monitoramento (só no processo líder)
         self.log_monitor = None
+        self.log_leader_lock = None
+        self.leader_retry_seconds = int(os.getenv("LOG_MONITOR_LEADER_RETRY", "30"))
+        self._log_monitor_failed = False
+        self._warm_up_task = None
+        self._leader_task = None
+
+        # Detector de bloqueios do loop de eventos
+        self.loop_watchdog = LoopWatchdog.from_env("discord")
 
     async def setup_hook(self):
-        """Configuração inicial com agente de monitoramento."""
+        """
+        Configuração inicial: só o necessário para responder comandos. Agentes,
+        modelos e o monitoramento de logs são criados no primeiro uso ou em
+        segundo plano (_warm_up), depois que o bot já está conectado.
+        """
         try:
             print("🤖 Inicializando AgentEIA Bot...")
-
-            # Inicializar gerenciador de agentes
-            self.agent_manager = AgentManager()
+            with startup_report.phase("tracing"):
+                setup_tracing()
+            if not os.getenv("LOOP_WATCHDOG_DISABLED"):
+                self.loop_watchdog.start()
+
+            # Inicializar gerenciador de agentes (agentes criados no primeiro uso)
+            with startup_report.phase("agent_manager"):
+                self.agent_manager = AgentManager()
             print("✅ Gerenciador de agentes inicializado")
 
+            with startup_report.phase("state_store"):
+                self.state_store = create_state_store()
+
             # Carregar comandos RAG
             try:
-                from .rag_commands import setup as setup_rag
-                await setup_rag(self)
+                with startup_report.phase("cogs.rag"):
+                    from .rag_commands import setup as setup_rag
+                    await setup_rag(self)
                 print("✅ Comandos RAG carregados")
             except Exception as rag_error:
                 print(f"⚠️ Erro ao carregar comandos RAG: {rag_error}")
 
             # Carregar comandos B-Ticket
             try:
-                await self.load_extension("discord_bot.bticket_commands")
+                with startup_report.phase("cogs.bticket"):
+                    await self.load_extension("discord_bot.bticket_commands")
                 print("✅ Comandos B-Ticket carregados")
             except Exception as bticket_error:
                 print(f"⚠️ Erro ao carregar comandos B-Ticket: {bticket_error}")
 
-            # Inicializar agente de monitoramento de logs
-            try:
-                from agents.log_monitor_agent import LogMonitorAgent
+            # Sincronizar comandos (globais: basta o processo do shard 0)
+            if self.shard_ids is None or 0 in self.shard_ids:
+                with startup_report.phase("commands.sync"):
+                    synced = await self.tree.sync()
+                print(f"✅ {len(synced)} comandos sincronizados")
+            self.synced = True
 
-                # Obter webhook do Discord para alertas
-                discord_webhook = os.getenv("DISCORD_WEBHOOK_URL")
+            # Monitoramento de logs e aquecimento dos agentes em segundo plano
+            self._warm_up_task = asyncio.create_task(self._warm_up())
 
-                self.log_monitor = LogMonitorAgent(
-                    discord_webhook_url=discord_webhook,
-                    check_interval=300  # 5 minutos
-                )
-                print("✅ Agente de monitoramento de logs inicializado")
+        except Exception as e:
+            print(f"❌ Erro na configuração: {e}")
+        finally:
+            startup_report.mark_ready()
+            startup_report.log()
 
-                # Iniciar monitoramento automático
-                asyncio.create_task(self.log_monitor.start_monitoring())
-                print("🚀 Monitoramento automático de logs iniciado")
+    def _create_log_monitor(self):
+        """Importa e cria o agente de monitoramento (google.adk, bancos SQLite)."""
+        from agents.log_monitor_agent import LogMonitorAgent
 
-            except Exception as log_error:
-                print(f"⚠️ Erro ao inicializar monitoramento de logs: {log_error}")
+        # Obter webhook do Discord para alertas
+        discord_webhook = os.getenv("DISCORD_WEBHOOK_URL")
 
-            # Sincronizar comandos
-            await asyncio.sleep(2)
-            synced = await self.tree.sync()
-            print(f"✅ {len(synced)} comandos sincronizados")
-            self.synced = True
+        return LogMonitorAgent(
+            discord_webhook_url=discord_webhook,
+            check_interval=300  # 5 minutos
+        )
 
-        except Exception as e:
-            print(f"❌ Erro na configuração: {e}")
+    async def _start_log_monitor(self) -> bool:
+        """Cria o monitor de logs e inicia o monitoramento automático."""
+        try:
+            with startup_report.phase("log_monitor", deferred=True):
+                # A importação pesada vai para uma thread; a criação fica no loop
+                # (as conexões SQLite do monitor pertencem à thread que as abre)
+                await asyncio.to_thread(importlib.import_module, "agents.log_monitor_agent")
+                self.log_monitor = self._create_log_monitor()
+            print("✅ Agente de monitoramento de logs inicializado")
+
+            # Iniciar monitoramento automático
+            asyncio.create_task(self.log_monitor.start_monitoring())
+            print("🚀 Monitoramento automático de logs iniciado")
+            return True
+
+        except Exception as log_error:
+            print(f"⚠️ Erro ao inicializar monitoramento de logs: {log_error}")
+            self._log_monitor_failed = True
+            return False
+
+    async def _stop_log_monitor(self):
+        if self.log_monitor:
+            monitor, self.log_monitor = self.log_monitor, None
+            try:
+                await monitor.close()
+            except Exception as e:
+                print(f"⚠️ Erro ao encerrar monitoramento de logs: {e}")
+
+    async def _lead_log_monitor(self):
+        """
+        Disputa a liderança do monitoramento de logs: só o processo que detém
+        a trava cria e roda o monitor, então os alertas saem uma única vez
+        mesmo com vários processos de shards. Os demais tentam de novo a cada
+        leader_retry_seconds e assumem quando o líder cai.
+        """
+        self.log_leader_lock = self.state_store.leader_lock("log_monitor")
+        try:
+            while True:
+                try:
+                    acquired = await self.log_leader_lock.acquire()
+                except Exception as e:
+                    print(f"⚠️ Erro ao disputar a liderança do monitoramento: {e}")
+                    acquired = False
+
+                if acquired:
+                    print(f"👑 Processo {os.getpid()} é o líder do monitoramento de logs")
+                    if not await self._start_log_monitor():
+                        return
+                    while await self.log_leader_lock.check():
+                        await asyncio.sleep(self.leader_retry_seconds)
+                    print("⚠️ Liderança do monitoramento de logs perdida; monitor encerrado")
+                    await self._stop_log_monitor()
+
+                await asyncio.sleep(self.leader_retry_seconds)
+        finally:
+            await self.log_leader_lock.release()
+
+    async def _warm_up(self):
+        """Inicialização adiada: monitoramento de logs e, com AGENT_WARMUP=1, agentes e RAG."""
+        # Monitoramento de logs no processo que vencer a trava de líder
+        self._leader_task = asyncio.create_task(self._lead_log_monitor())
+
+        if os.getenv("AGENT_WARMUP") == "1":
+            await asyncio.to_thread(self.agent_manager.warm_up)
+            rag_cog = self.get_cog("RAGCommands")
+            if rag_cog:
+                await rag_cog.ensure_rag_system()
+            print(startup_report.format())
+
+    def log_monitor_unavailable_reason(self) -> str:
+        """Mensagem para comandos de log usados onde o monitor não existe."""
+        if self._log_monitor_failed or self.state_store is None:
+            return "Sistema de monitoramento de logs não está configurado."
+        if self.log_leader_lock and not self.log_leader_lock.held and self._leader_task and not self._leader_task.done():
+            return ("O monitoramento de logs roda em outro processo do bot (shard líder). "
+                    "Use os comandos de log em um servidor atendido por ele.")
+        return "O monitoramento de logs ainda está inicializando. Tente novamente em instantes."
+
+    async def close(self):
+        """Encerra o monitoramento, o pool de conexões HTTP e o de extração de PDF antes de desconectar."""
+        for task in (self._warm_up_task, self._leader_task):
+            if task and not task.done():
+                task.cancel()
+        await self._stop_log_monitor()
+        # Libera a liderança para outro processo assumir o monitoramento
+        if self._leader_task:
+            await asyncio.gather(self._leader_task, return_exceptions=True)
+        if self.state_store:
+            await self.state_store.close()
+        await self.loop_watchdog.stop()
+        await close_http_sessions()
+        close_pdf_extractor()
+        await super().close()
 
     async def on_ready(self):
         """Evento quando o bot está pronto."""
@@ -174,7 +311,7 @@ async def log_monitor_command(
     if not bot.log_monitor:
         embed = discord.Embed(
             title="❌ Monitoramento Indisponível",
-            description="Sistema de monitoramento de logs não está configurado.",
+            description=bot.log_monitor_unavailable_reason(),
             color=0xff0000
         )
         await interaction.followup.send(embed=embed)
@@ -269,7 +406,7 @@ async def log_lista_command(
     if not bot.log_monitor:
         embed = discord.Embed(
             title="❌ Monitoramento Indisponível",
-            description="Sistema de monitoramento de logs não está configurado.",
+            description=bot.log_monitor_unavailable_reason(),
             color=0xff0000
         )
         await interaction.followup.send(embed=embed)
@@ -321,8 +458,8 @@ async def log_lista_command(
         # Pegar as últimas N linhas
         recent_lines = log_lines[-linhas:] if total_lines > linhas else log_lines
 
-        # Extrair erros
-        errors = bot.log_monitor.extract_errors(log_content)
+        # Extrair erros (todos os do dia, sem marcar como já alertados)
+        errors = await asyncio.to_thread(bot.log_monitor.extract_errors, log_content, only_new=False)
 
         # Criar embed principal
         embed = discord.Embed(
@@ -397,15 +534,21 @@ async def log_lista_command(
     description="🔍 Busca por texto específico nos logs"
 )
 @discord.app_commands.describe(
-    termo="Termo para buscar nos logs",
+    termo="Termo para buscar nos logs (ou expressão regular, com regex=True)",
     data="Data dos logs (YYYY-MM-DD). Padrão: hoje",
-    limite="Número máximo de resultados (máx: 10). Padrão: 5"
+    limite="Número máximo de resultados (máx: 10). Padrão: 5",
+    regex="Interpretar o termo como expressão regular. Padrão: não",
+    inicio="Horário inicial (HH:MM)",
+    fim="Horário final (HH:MM)"
 )
 async def log_search_command(
     interaction: discord.Interaction,
     termo: str,
     data: str = None,
-    limite: int = 5
+    limite: int = 5,
+    regex: bool = False,
+    inicio: str = None,
+    fim: str = None
 ):
     """Comando para buscar texto específico nos logs."""
     await interaction.response.defer()
@@ -413,7 +556,7 @@ async def log_search_command(
     if not bot.log_monitor:
         embed = discord.Embed(
             title="❌ Monitoramento Indisponível",
-            description="Sistema de monitoramento de logs não está configurado.",
+            description=bot.log_monitor_unavailable_reason(),
             color=0xff0000
         )
         await interaction.followup.send(embed=embed)
@@ -439,12 +582,44 @@ async def log_search_command(
         # Limitar resultados
         limite = max(1, min(limite, 10))
 
+        # Intervalo de horário opcional
+        try:
+            since = datetime.strptime(f"{data} {inicio}", "%Y-%m-%d %H:%M").timestamp() if inicio else None
+            until = datetime.strptime(f"{data} {fim}", "%Y-%m-%d %H:%M").timestamp() + 60 if fim else None
+        except ValueError:
+            embed = discord.Embed(
+                title="❌ Horário Inválido",
+                description="Use o formato HH:MM (ex: 14:30)",
+                color=0xff0000
+            )
+            await interaction.followup.send(embed=embed)
+            return
+
+        if regex:
+            try:
+                re.compile(termo)
+            except re.error as regex_error:
+                embed = discord.Embed(
+                    title="❌ Expressão Regular Inválida",
+                    description=f"```{regex_error}```",
+                    color=0xff0000
+                )
+                await interaction.followup.send(embed=embed)
+                return
+
         print(f"🔍 Buscando '{termo}' nos logs de {data}...")
 
-        # Buscar logs
-        log_content = await bot.log_monitor.fetch_logs(data)
+        # Buscar pelo índice local do dia (atualizado com o trecho novo do log)
+        result = await bot.log_monitor.search_logs(
+            data,
+            term=None if regex else termo,
+            regex=termo if regex else None,
+            since=since,
+            until=until,
+            limit=limite
+        )
 
-        if not log_content:
+        if not result:
             embed = discord.Embed(
                 title="📋 Logs Não Encontrados",
                 description=f"Não foi possível acessar os logs de **{data}**.",
@@ -453,20 +628,11 @@ async def log_search_command(
             await interaction.followup.send(embed=embed)
             return
 
-        # Buscar termo nos logs
-        log_lines = log_content.split('\n')
-        matches = []
-
-        for i, line in enumerate(log_lines, 1):
-            if termo.lower() in line.lower():
-                matches.append({
-                    'line_number': i,
-                    'content': line.strip(),
-                    'context': '\n'.join(log_lines[max(0, i-2):min(len(log_lines), i+1)])
-                })
-
-                if len(matches) >= limite:
-                    break
+        index, hits = result
+        matches = [
+            {'line_number': hit.line_number, 'content': hit.line, 'context': hit.context}
+            for hit in hits
+        ]
 
         # Criar resposta
         if not matches:
@@ -477,7 +643,7 @@ async def log_search_command(
             )
             embed.add_field(
                 name="📊 Informações",
-                value=f"🔢 **Linhas analisadas:** {len(log_lines)}\n📅 **Data:** {data}",
+                value=f"🔢 **Linhas indexadas:** {index.line_count}\n📅 **Data:** {data}",
                 inline=False
             )
         else:
@@ -504,76 +670,189 @@ async def log_search_command(
         )
         await interaction.followup.send(embed=error_embed)
 
-@bot.tree.command(name="agenteia", description="🤖 Interaja com os agentes de IA")
+@bot.tree.command(
+    name="log_tendencia",
+    description="📈 Tendências, erros mais frequentes e picos nos logs"
+)
 @discord.app_commands.describe(
-    modelo="Escolha o modelo de IA",
-    pergunta="Sua pergunta para o agente"
+    horas="Período analisado em horas (máx: 168). Padrão: 24",
+    limite="Número de erros no ranking (máx: 10). Padrão: 5"
 )
-@discord.app_commands.choices(modelo=[
-    discord.app_commands.Choice(name="🔧 ADK (Google Gemini Nativo)", value="adk"),
-    discord.app_commands.Choice(name="🧠 LangChain (Google Gemini + Ferramentas)", value="langchain")
-])
-async def agenteia_command(
+async def log_tendencia_command(
     interaction: discord.Interaction,
-    modelo: discord.app_commands.Choice[str],
-    pergunta: str
+    horas: int = 24,
+    limite: int = 5
 ):
-    """Comando principal com ambos agentes usando Google Gemini."""
+    """Comando para consultar a série temporal de erros sem reprocessar os logs."""
     await interaction.response.defer()
 
-    user_id = str(interaction.user.id)
-    session_id = bot.generate_session_id(
-        user_id=interaction.user.id,
-        guild_id=interaction.guild_id,
-        channel_id=interaction.channel_id
-    )
-
-    # Definir o agente escolhido pelo usuário
-    if not bot.agent_manager.set_agent(modelo.value):
+    if not bot.log_monitor:
         embed = discord.Embed(
-            title="❌ Agente Indisponível",
-            description=f"O agente '{modelo.name}' não está disponível no momento.",
+            title="❌ Monitoramento Indisponível",
+            description=bot.log_monitor_unavailable_reason(),
             color=0xff0000
         )
         await interaction.followup.send(embed=embed)
         return
 
-    # Definir contexto do usuário para o agente
-    bot.agent_manager.set_user_context(user_id, session_id)
-
-    # Executar a consulta
     try:
-        response = await bot.agent_manager.run_current_agent_with_context(
-            pergunta, user_id, session_id
-        )
+        horas = max(1, min(horas, 168))
+        limite = max(1, min(limite, 10))
+
+        # Consultas agregadas no SQLite fora do loop de eventos
+        trends = await asyncio.to_thread(bot.log_monitor.get_trends, hours=horas, limit=limite)
 
-        # Criar embed de resposta
         embed = discord.Embed(
-            title="🤖 Resposta do Agente de IA",
-            description=response,
-            color=0x00ff00
+            title=f"📈 Tendências de Erros ({horas}h)",
+            description=f"🔢 **Ocorrências no período:** {trends['total']}",
+            color=0xff9900 if trends['spikes'] else 0x0099ff
         )
 
-        # Adicionar informações sobre o agente e modelo
-        embed.add_field(
-            name="🤖 Modelo Unificado",
-            value=f"**Google Gemini 2.0 Flash**\nFramework: {modelo.name}",
-            inline=True
-        )
+        if trends['buckets']:
+            peak = max(count for _, count in trends['buckets'])
+            histogram = "\n".join(
+                f"{datetime.fromtimestamp(bucket).strftime('%d/%m %H:%M')} {'█' * max(1, round(10 * count / peak))} {count}"
+                for bucket, count in trends['buckets'][-12:]
+            )
+            embed.add_field(name="⏱️ Por Hora", value=f"```\n{histogram[:1000]}\n```", inline=False)
 
-        # Adicionar timestamp
-        embed.set_footer(text=f"Sessão: {session_id} | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if trends['top']:
+            ranking = "\n".join(f"**{item['count']}x** `{item['template'][:80]}`" for item in trends['top'])
+            embed.add_field(name="🔝 Mais Frequentes", value=ranking[:1024], inline=False)
+
+        if trends['spikes']:
+            spikes = "\n".join(
+                f"**{spike['current']}x** (média {spike['baseline']}) `{spike['template'][:80]}`"
+                for spike in trends['spikes']
+            )
+            embed.add_field(name="🚨 Picos na Última Hora", value=spikes[:1024], inline=False)
 
         await interaction.followup.send(embed=embed)
 
     except Exception as e:
         error_embed = discord.Embed(
-            title="❌ Erro ao Processar Pergunta",
-            description=f"Ocorreu um erro ao processar sua pergunta:\n```{str(e)}```",
+            title="❌ Erro ao Consultar Tendências",
+            description=f"Ocorreu um erro ao consultar a série de erros:\n```{str(e)}```",
             color=0xff0000
         )
         await interaction.followup.send(embed=error_embed)
 
+@bot.tree.command(name="agenteia", description="🤖 Interaja com os agentes de IA")
+@discord.app_commands.describe(
+    modelo="Escolha o modelo de IA (opcional: usa o último escolhido)",
+    pergunta="Sua pergunta para o agente"
+)
+@discord.app_commands.choices(modelo=[
+    discord.app_commands.Choice(name="🔧 ADK (Google Gemini Nativo)", value="adk"),
+    discord.app_commands.Choice(name="🧠 LangChain (Google Gemini + Ferramentas)", value="langchain")
+])
+async def agenteia_command(
+    interaction: discord.Interaction,
+    pergunta: str,
+    modelo: discord.app_commands.Choice[str] = None
+):
+    """Comando principal com ambos agentes usando Google Gemini."""
+    started, outcome = time.perf_counter(), "error"
+    with span("discord.command", command="agenteia", user_id=str(interaction.user.id)) as command_span:
+        try:
+            await interaction.response.defer()
+
+            user_id = str(interaction.user.id)
+            session_id = bot.generate_session_id(
+                user_id=interaction.user.id,
+                guild_id=interaction.guild_id,
+                channel_id=interaction.channel_id
+            )
+
+            # Sem modelo, vale a preferência gravada no estado compartilhado
+            # (o próximo comando do usuário pode chegar a outro shard). Falha no
+            # estado não impede a resposta: sem preferência, o agente é o ADK
+            agent_type = modelo.value if modelo is not None else None
+            try:
+                if modelo is not None:
+                    await bot.state_store.set_preference(user_id, agent_type)
+                else:
+                    agent_type = await bot.state_store.get_preference(user_id)
+            except Exception as e:
+                print(f"⚠️ Erro no estado compartilhado do bot: {e}")
+            agent_type = agent_type or "adk"
+            agent_label = modelo.name if modelo is not None else agent_type.upper()
+            command_span.set_attribute("agent", agent_type)
+
+            # Agente escolhido pelo usuário vale só para esta execução
+            if bot.agent_manager.resolve_agent_type(agent_type) is None:
+                embed = discord.Embed(
+                    title="❌ Agente Indisponível",
+                    description=f"O agente '{agent_label}' não está disponível no momento.",
+                    color=0xff0000
+                )
+                await interaction.followup.send(embed=embed)
+                return
+
+            queued = False
+
+            async def notify_queued(position: int):
+                nonlocal queued
+                queued = True
+                await interaction.edit_original_response(
+                    content=f"⏳ Muitas perguntas em andamento: você está na posição **{position}** da fila."
+                )
+
+            async def send(embed: discord.Embed):
+                # A mensagem de fila vira a resposta; sem fila, a resposta é o followup
+                if queued:
+                    await interaction.edit_original_response(content=None, embed=embed)
+                else:
+                    await interaction.followup.send(embed=embed)
+
+            # Executar a consulta (contexto do usuário passado por chamada; uma por sessão)
+            try:
+                response = await bot.dispatcher.run(
+                    session_id,
+                    lambda: bot.agent_manager.run_agent(pergunta, user_id, session_id, agent_type=agent_type),
+                    on_queued=notify_queued
+                )
+
+                # Criar embed de resposta
+                embed = discord.Embed(
+                    title="🤖 Resposta do Agente de IA",
+                    description=response,
+                    color=0x00ff00
+                )
+
+                # Adicionar informações sobre o agente e modelo
+                embed.add_field(
+                    name="🤖 Modelo Unificado",
+                    value=f"**Google Gemini 2.0 Flash**\nFramework: {agent_label}",
+                    inline=True
+                )
+
+                # Adicionar timestamp
+                embed.set_footer(text=f"Sessão: {session_id} | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+                with span("discord.response"):
+                    await send(embed)
+                outcome = "ok"
+
+            except DispatcherSaturated:
+                outcome = "rejected"
+                embed = discord.Embed(
+                    title="🚦 Bot Ocupado",
+                    description="A fila de perguntas está cheia no momento. Tente novamente em alguns instantes.",
+                    color=0xffaa00
+                )
+                await interaction.followup.send(embed=embed)
+
+            except Exception as e:
+                error_embed = discord.Embed(
+                    title="❌ Erro ao Processar Pergunta",
+                    description=f"Ocorreu um erro ao processar sua pergunta:\n```{str(e)}```",
+                    color=0xff0000
+                )
+                await send(error_embed)
+        finally:
+            REQUEST_LATENCY.observe(time.perf_counter() - started, route="/agenteia", method="discord", status=outcome)
+
 @bot.tree.command(name="status", description="📊 Verifica o status dos agentes de IA")
 async def status_command(interaction: discord.Interaction):
     """Comando para verificar o status dos agentes."""
@@ -608,6 +887,22 @@ async def status_command(interaction: discord.Interaction):
         inline=False
     )
 
+    dispatcher = bot.dispatcher.stats()
+    embed.add_field(
+        name="🚦 Fila de Perguntas",
+        value=(f"{dispatcher['running']}/{dispatcher['max_concurrency']} em execução · "
+               f"{dispatcher['waiting']} na fila"),
+        inline=False
+    )
+
+    shards = ", ".join(str(shard_id) for shard_id in sorted(bot.shards)) or "—"
+    embed.add_field(
+        name="🧩 Shards",
+        value=(f"Processo {os.getpid()}: shards {shards} de {bot.shard_count or 1} · "
+               f"monitor de logs {'👑 líder' if bot.log_monitor else 'em outro processo'}"),
+        inline=False
+    )
+
     status_text = ""
     for agent_type, status in agent_info['agents_status'].items():
         status_text += f"**{status['name']}**: {'🟢 Ativo' if status['available'] else '🔴 Inativo'}\n"
@@ -622,6 +917,48 @@ async def status_command(interaction: discord.Interaction):
 
     await interaction.followup.send(embed=embed)
 
+@bot.tree.command(name="loop_status", description="🩺 Lag do loop de eventos e bloqueios recentes (admin)")
+@discord.app_commands.default_permissions(administrator=True)
+@discord.app_commands.describe(detalhes="Incluir a pilha capturada do bloqueio mais recente")
+async def loop_status_command(interaction: discord.Interaction, detalhes: bool = False):
+    """Mostra as medições do watchdog do loop de eventos do bot."""
+    permissions = getattr(interaction.user, "guild_permissions", None)
+    if not permissions or not permissions.administrator:
+        await interaction.response.send_message("❌ Comando restrito a administradores.", ephemeral=True)
+        return
+
+    stats = bot.loop_watchdog.stats()
+    blocked = stats['blocks'] > 0
+    embed = discord.Embed(
+        title="🩺 Loop de Eventos",
+        description="🟢 Watchdog ativo" if stats['running'] else "🔴 Watchdog parado",
+        color=0xffa500 if blocked else 0x00ff00
+    )
+    embed.add_field(
+        name="⏱️ Lag (último minuto)",
+        value=f"p50: {stats['lag_p50_ms']:.1f}ms\np99: {stats['lag_p99_ms']:.1f}ms\nmáx: {stats['lag_max_ms']:.1f}ms",
+        inline=True
+    )
+    embed.add_field(
+        name="🚧 Bloqueios",
+        value=f"{stats['blocks']} acima de {stats['threshold_ms']:.0f}ms",
+        inline=True
+    )
+
+    events = bot.loop_watchdog.recent_events(limit=5)
+    if events:
+        embed.add_field(
+            name="📋 Recentes",
+            value="\n".join(f"`{event['started_at'][11:19]}` {event['duration_ms']:.0f}ms — `{event['culprit'][:80]}`"
+                            for event in events),
+            inline=False
+        )
+        if detalhes and events[0]['stack']:
+            stack = "\n".join(events[0]['stack'][-8:])
+            embed.add_field(name="🔎 Pilha do último bloqueio", value=f"```{stack[-1000:]}```", inline=False)
+
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 def run_bot():
     """Executa o bot Discord."""
     token = os.getenv("DISCORD_BOT_TOKEN")
@@ -630,6 +967,13 @@ def run_bot():
         print("❌ DISCORD_BOT_TOKEN não encontrado no .env")
         return
 
+    # DISCORD_SHARD_PROCESSES>1: este processo só supervisiona um processo por grupo de shards
+    processes = int(os.getenv("DISCORD_SHARD_PROCESSES", "1"))
+    if processes > 1 and not os.getenv("DISCORD_SHARD_IDS"):
+        from discord_bot.shard_launcher import run_shard_processes
+        run_shard_processes(processes)
+        return
+
     try:
         print("🚀 Iniciando bot com monitoramento de logs integrado...")
         bot.run(token)
@@ -2,15 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
-import sys
-from pathlib import Path
 
-# Adicionar o diretório raiz ao sys.path
-current_dir = Path(__file__).parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
-
-from agents.bticket_agent import BTicketAgent
+from observability import startup_report
 
 class BTicketCommands(commands.Cog):
     """Comandos Discord para integração com B-Ticket."""
@@ -18,11 +11,22 @@ class BTicketCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bticket_agent = None
-        self.setup_agent()
+        # Agente (e google.adk) criado no primeiro comando
+        self._setup_lock = asyncio.Lock()
+    
+    async def ensure_agent(self) -> bool:
+        """Cria o agente B-Ticket na primeira utilização, fora do loop de eventos."""
+        if self.bticket_agent is None:
+            async with self._setup_lock:
+                if self.bticket_agent is None:
+                    with startup_report.phase("bticket_agent", deferred=True):
+                        await asyncio.to_thread(self.setup_agent)
+        return self.bticket_agent is not None
     
     def setup_agent(self):
         """Configura o agente B-Ticket."""
         try:
+            from agents.bticket_agent import BTicketAgent
             self.bticket_agent = BTicketAgent()
             print("✅ Agente B-Ticket configurado para Discord")
         except Exception as e:
@@ -52,7 +56,7 @@ class BTicketCommands(commands.Cog):
         """Comando genérico para B-Ticket."""
         await interaction.response.defer()
         
-        if not self.bticket_agent:
+        if not await self.ensure_agent():
             embed = discord.Embed(
                 title="❌ B-Ticket Indisponível",
                 description="O agente B-Ticket não está configurado.",
@@ -102,7 +106,7 @@ class BTicketCommands(commands.Cog):
         """Mostra detalhes de um ticket."""
         await interaction.response.defer()
         
-        if not self.bticket_agent:
+        if not await self.ensure_agent():
             embed = discord.Embed(
                 title="❌ B-Ticket Indisponível",
                 description="O agente B-Ticket não está configurado.",
@@ -152,7 +156,7 @@ class BTicketCommands(commands.Cog):
         """Cria um novo ticket."""
         await interaction.response.defer()
 
-        if not self.bticket_agent:
+        if not await self.ensure_agent():
             embed = discord.Embed(
                 title="❌ B-Ticket Indisponível",
                 description="O agente B-Ticket não está configurado.",
@@ -195,7 +199,7 @@ class BTicketCommands(commands.Cog):
         """Deleta um ticket."""
         await interaction.response.defer()
 
-        if not self.bticket_agent:
+        if not await self.ensure_agent():
             embed = discord.Embed(
                 title="❌ B-Ticket Indisponível",
                 description="O agente B-Ticket não está configurado.",
@@ -3,14 +3,8 @@ import discord
 from discord.ext import commands
 import asyncio
 import os
-import sys
-from pathlib import Path
 from dotenv import load_dotenv
 
-# Adicionar o diretório pai ao path para importar os agentes
-project_root = Path(__file__).parent.parent
-sys.path.append(str(project_root))
-
 from agents.agent_manager import AgentManager
 
 # Carregar variáveis de ambiente
@@ -146,7 +140,7 @@ async def agenteia_command(
             return
 
         # Verificar se o agente está disponível
-        if not bot.agent_manager or modelo not in bot.agent_manager.agents:
+        if not bot.agent_manager or modelo not in bot.agent_manager.available:
             embed = discord.Embed(
                 title="❌ Agente Indisponível",
                 description=f"O agente **{modelo}** não está disponível no momento.",
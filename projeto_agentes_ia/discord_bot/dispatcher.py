@@ -0,0 +1,133 @@
+# discord_bot/dispatcher.py
+"""
+Despacho das execuções de agentes pedidas pelos comandos do bot.
+
+- Serialização por sessão: pedidos da mesma sessão (usuário + canal) rodam
+  um de cada vez, na ordem de chegada — o segundo vê a memória do primeiro.
+- Paralelismo entre sessões: sessões diferentes rodam ao mesmo tempo.
+- Concorrência limitada: no máximo max_concurrency execuções simultâneas;
+  os demais pedidos esperam em uma fila FIFO limitada a max_queue, e quem
+  entra na fila recebe a própria posição (on_queued).
+
+Tudo roda no loop de eventos do bot: o estado só é alterado entre awaits,
+sem travas.
+"""
+import asyncio
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+
+class DispatcherSaturated(Exception):
+    """Fila de espera cheia: o pedido é recusado em vez de enfileirado."""
+
+
+@dataclass
+class _Ticket:
+    session_key: str
+    future: asyncio.Future = field(repr=False)
+
+
+class RequestDispatcher:
+    """Fila por sessão com limite global de execuções simultâneas."""
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 100):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self._running = 0
+        self._busy_sessions: Set[str] = set()
+        self._waiting: Deque[_Ticket] = deque()
+        self.completed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "RequestDispatcher":
+        """DISCORD_MAX_CONCURRENT_REQUESTS (padrão 4) e DISCORD_MAX_QUEUE (padrão 100)."""
+        return cls(
+            max_concurrency=int(os.getenv("DISCORD_MAX_CONCURRENT_REQUESTS", "4")),
+            max_queue=int(os.getenv("DISCORD_MAX_QUEUE", "100"))
+        )
+
+    def _can_start(self, session_key: str) -> bool:
+        return self._running < self.max_concurrency and session_key not in self._busy_sessions
+
+    def _start(self, session_key: str):
+        self._running += 1
+        self._busy_sessions.add(session_key)
+
+    def _release(self, session_key: str):
+        self._running -= 1
+        self._busy_sessions.discard(session_key)
+        self.completed += 1
+        self._wake()
+
+    def _wake(self):
+        """Libera, em ordem de chegada, os pedidos cuja sessão está livre."""
+        for ticket in list(self._waiting):
+            if ticket.future.done():
+                # Cancelado no mesmo ciclo do loop: o pedido ainda não saiu da fila
+                self._waiting.remove(ticket)
+                continue
+            if self._running >= self.max_concurrency:
+                break
+            if ticket.session_key in self._busy_sessions:
+                continue
+            self._waiting.remove(ticket)
+            self._start(ticket.session_key)
+            ticket.future.set_result(None)
+
+    def position(self, ticket: _Ticket) -> int:
+        """Posição (1 = próximo) do pedido na fila de espera."""
+        for index, waiting in enumerate(self._waiting, 1):
+            if waiting is ticket:
+                return index
+        return 0
+
+    async def _acquire(self, session_key: str, on_queued: Optional[Callable[[int], Awaitable[Any]]]):
+        # Após cada _wake nenhum pedido em espera pode começar: um pedido novo
+        # que pode começar não passa à frente de ninguém
+        if self._can_start(session_key):
+            self._start(session_key)
+            return
+
+        if len(self._waiting) >= self.max_queue:
+            self.rejected += 1
+            raise DispatcherSaturated(f"{len(self._waiting)} pedidos na fila")
+
+        ticket = _Ticket(session_key, asyncio.get_running_loop().create_future())
+        self._waiting.append(ticket)
+        try:
+            if on_queued is not None:
+                await on_queued(self.position(ticket))
+            await ticket.future
+        except BaseException:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+            elif ticket.future.done() and not ticket.future.cancelled():
+                # Liberado enquanto era cancelado: devolve a vaga
+                self._release(session_key)
+            raise
+
+    async def run(self, session_key: str, func: Callable[[], Awaitable[Any]],
+                  on_queued: Optional[Callable[[int], Awaitable[Any]]] = None) -> Any:
+        """
+        Executa func() quando a sessão estiver livre e houver vaga.
+        on_queued(posição) é chamado se o pedido precisar esperar.
+        """
+        await self._acquire(session_key, on_queued)
+        try:
+            return await func()
+        finally:
+            self._release(session_key)
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._running,
+            "waiting": len(self._waiting),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "busy_sessions": len(self._busy_sessions),
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
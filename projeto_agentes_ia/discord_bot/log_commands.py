@@ -3,13 +3,6 @@ import discord
 from discord.ext import commands
 import asyncio
 import os
-import sys
-from pathlib import Path
-
-# Adicionar o diretório pai ao path
-current_dir = Path(__file__).parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
 
 from agents.log_monitor_agent import LogMonitorAgent
 
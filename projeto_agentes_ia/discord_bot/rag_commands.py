@@ -3,19 +3,15 @@ import discord
 from discord.ext import commands
 import asyncio
 import os
-import sys
 import tempfile
 import re
 from pathlib import Path
 from urllib.parse import urlparse
 
-# Adicionar o diretório pai ao path
-current_dir = Path(__file__).parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
-
 from memory.document_processor import DocumentProcessor
 from memory.postgres_rag_system import PostgresRAGSystem
+from memory.ingestion_pipeline import IngestionPipeline, IngestionProgress
+from observability import startup_report
 
 class RAGCommands(commands.Cog):
     """Comandos Discord para alimentação do sistema RAG."""
@@ -24,16 +20,54 @@ class RAGCommands(commands.Cog):
         self.bot = bot
         self.document_processor = DocumentProcessor()
         self.rag_system = None
-        self.setup_rag_system()
+        self.pipeline = None
+        # Modelo de embeddings carregado no primeiro comando (ou no aquecimento do bot)
+        self._setup_lock = asyncio.Lock()
+    
+    async def ensure_rag_system(self) -> bool:
+        """Cria o sistema RAG na primeira utilização, fora do loop de eventos."""
+        if self.rag_system is None:
+            async with self._setup_lock:
+                if self.rag_system is None:
+                    with startup_report.phase("rag_system", deferred=True):
+                        await asyncio.to_thread(self.setup_rag_system)
+        return self.rag_system is not None
     
     def setup_rag_system(self):
         """Configura o sistema RAG."""
         try:
             self.rag_system = PostgresRAGSystem(embedding_model="local")
+            self.pipeline = IngestionPipeline(self.rag_system, self.document_processor)
             print("✅ Sistema RAG configurado para comandos Discord")
         except Exception as e:
             print(f"❌ Erro ao configurar sistema RAG: {e}")
     
+    @staticmethod
+    def _progress_reporter(message: discord.WebhookMessage, embed: discord.Embed, interval: float = 3.0):
+        """Atualiza a mensagem de processamento com o andamento, no máximo a cada `interval` segundos."""
+        description = embed.description
+        state = {'last': 0.0}
+        
+        async def report(progress: IngestionProgress):
+            now = asyncio.get_running_loop().time()
+            if progress.done or now - state['last'] < interval:
+                return
+            state['last'] = now
+            embed.description = (
+                f"{description}\n\n📄 {progress.chunks} chunks · 🧠 {progress.embedded} embeddings · "
+                f"💾 {progress.stored} gravados"
+            )
+            await message.edit(embed=embed)
+        
+        return report
+    
+    @staticmethod
+    def _reuse_note(result: IngestionProgress) -> str:
+        """Resumo da reingestão: trechos inalterados e removidos."""
+        if not result.reused and not result.removed:
+            return ""
+        return f" novos ({result.reused} inalterados, {result.removed} removidos)"
+    
     @discord.app_commands.command(
         name="rag_add_url",
         description="📚 Adiciona conteúdo de uma URL ao conhecimento dos agentes"
@@ -58,7 +92,7 @@ class RAGCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            if not self.rag_system:
+            if not await self.ensure_rag_system():
                 embed = discord.Embed(
                     title="❌ Sistema RAG Indisponível",
                     description="O sistema RAG não está configurado.",
@@ -76,29 +110,20 @@ class RAGCommands(commands.Cog):
                 description=f"Baixando e processando conteúdo de: {url}",
                 color=0x0099ff
             )
-            await interaction.followup.send(embed=embed)
-            
-            # Processar URL
-            result = await self.document_processor.process_url(url, nome)
-            
-            # Adicionar chunks ao RAG
-            added_count = 0
-            for chunk in result['chunks']:
-                doc_id = await self.rag_system.add_document(
-                    content=chunk,
-                    source=f"url:{result['source']}",
-                    metadata={
-                        "type": result['type'],
-                        "url": url,
-                        "added_by": str(interaction.user.id),
-                        "added_via": "discord_url",
-                        "chunk_index": added_count,
-                        "total_chunks": result['total_chunks'],
-                        **result['metadata']
-                    }
-                )
-                if doc_id:
-                    added_count += 1
+            status_message = await interaction.followup.send(embed=embed, wait=True)
+            
+            # Baixar, dividir, gerar embeddings e gravar em estágios paralelos
+            result = await self.pipeline.ingest_url(
+                url,
+                source=f"url:{nome or url}",
+                metadata={
+                    "url": url,
+                    "added_by": str(interaction.user.id),
+                    "added_via": "discord_url"
+                },
+                on_progress=self._progress_reporter(status_message, embed)
+            )
+            added_count = result.stored
             
             # Resposta de sucesso
             success_embed = discord.Embed(
@@ -109,7 +134,7 @@ class RAGCommands(commands.Cog):
             
             success_embed.add_field(
                 name="📊 Estatísticas",
-                value=f"🔗 **URL:** {url}\n📝 **Tipo:** {result['type']}\n📄 **Chunks:** {added_count}\n📊 **Caracteres:** {result['metadata']['char_count']}\n📝 **Palavras:** {result['metadata']['word_count']}",
+                value=f"🔗 **URL:** {url}\n📝 **Tipo:** {result.type}\n📄 **Chunks:** {added_count}{self._reuse_note(result)}\n📊 **Caracteres:** {result.char_count}\n📝 **Palavras:** {result.word_count}\n⏱️ **Tempo:** {result.seconds:.1f}s",
                 inline=False
             )
             
@@ -142,7 +167,7 @@ class RAGCommands(commands.Cog):
         await interaction.response.defer()
         
         try:
-            if not self.rag_system:
+            if not await self.ensure_rag_system():
                 embed = discord.Embed(
                     title="❌ Sistema RAG Indisponível",
                     description="O sistema RAG não está configurado.",
@@ -184,32 +209,22 @@ class RAGCommands(commands.Cog):
                 description=f"Processando: {arquivo.filename} ({arquivo.size / 1024:.1f} KB)",
                 color=0x0099ff
             )
-            await interaction.followup.send(embed=embed)
-            
-            # Processar arquivo
-            result = await self.document_processor.process_discord_attachment(
-                arquivo.url, arquivo.filename, nome
+            status_message = await interaction.followup.send(embed=embed, wait=True)
+            
+            # Baixar, dividir, gerar embeddings e gravar em estágios paralelos
+            result = await self.pipeline.ingest_attachment(
+                arquivo.url,
+                arquivo.filename,
+                source=f"file:{nome or arquivo.filename}",
+                metadata={
+                    "filename": arquivo.filename,
+                    "file_size": arquivo.size,
+                    "added_by": str(interaction.user.id),
+                    "added_via": "discord_file"
+                },
+                on_progress=self._progress_reporter(status_message, embed)
             )
-            
-            # Adicionar chunks ao RAG
-            added_count = 0
-            for chunk in result['chunks']:
-                doc_id = await self.rag_system.add_document(
-                    content=chunk,
-                    source=f"file:{result['source']}",
-                    metadata={
-                        "type": result['type'],
-                        "filename": arquivo.filename,
-                        "file_size": arquivo.size,
-                        "added_by": str(interaction.user.id),
-                        "added_via": "discord_file",
-                        "chunk_index": added_count,
-                        "total_chunks": result['total_chunks'],
-                        **result['metadata']
-                    }
-                )
-                if doc_id:
-                    added_count += 1
+            added_count = result.stored
             
             # Resposta de sucesso
             success_embed = discord.Embed(
@@ -220,7 +235,7 @@ class RAGCommands(commands.Cog):
             
             success_embed.add_field(
                 name="📊 Estatísticas",
-                value=f"📎 **Arquivo:** {arquivo.filename}\n📝 **Tipo:** {result['type']}\n📄 **Chunks:** {added_count}\n💾 **Tamanho:** {arquivo.size / 1024:.1f} KB\n📊 **Caracteres:** {result['metadata']['char_count']}\n📝 **Palavras:** {result['metadata']['word_count']}",
+                value=f"📎 **Arquivo:** {arquivo.filename}\n📝 **Tipo:** {result.type}\n📄 **Chunks:** {added_count}{self._reuse_note(result)}\n💾 **Tamanho:** {arquivo.size / 1024:.1f} KB\n📊 **Caracteres:** {result.char_count}\n📝 **Palavras:** {result.word_count}\n⏱️ **Tempo:** {result.seconds:.1f}s",
                 inline=False
             )
             
@@ -253,7 +268,7 @@ class RAGCommands(commands.Cog):
         await interaction.response.defer()
         
         try:
-            if not self.rag_system:
+            if not await self.ensure_rag_system():
                 embed = discord.Embed(
                     title="❌ Sistema RAG Indisponível",
                     description="O sistema RAG não está configurado.",
@@ -291,26 +306,16 @@ class RAGCommands(commands.Cog):
             )
             await interaction.followup.send(embed=embed)
             
-            # Processar texto
-            result = await self.document_processor._process_text_content(texto, nome)
-            
-            # Adicionar chunks ao RAG
-            added_count = 0
-            for chunk in result['chunks']:
-                doc_id = await self.rag_system.add_document(
-                    content=chunk,
-                    source=f"text:{result['source']}",
-                    metadata={
-                        "type": result['type'],
-                        "added_by": str(interaction.user.id),
-                        "added_via": "discord_text",
-                        "chunk_index": added_count,
-                        "total_chunks": result['total_chunks'],
-                        **result['metadata']
-                    }
-                )
-                if doc_id:
-                    added_count += 1
+            # Reenviar o mesmo nome atualiza o conhecimento (só os trechos alterados)
+            result = await self.pipeline.ingest_text(
+                texto,
+                source=f"text:{nome}",
+                metadata={
+                    "added_by": str(interaction.user.id),
+                    "added_via": "discord_text"
+                }
+            )
+            added_count = result.stored
             
             # Resposta de sucesso
             success_embed = discord.Embed(
@@ -321,7 +326,7 @@ class RAGCommands(commands.Cog):
             
             success_embed.add_field(
                 name="📊 Estatísticas",
-                value=f"📝 **Nome:** {nome}\n📄 **Chunks:** {added_count}\n📊 **Caracteres:** {result['metadata']['char_count']}\n📝 **Palavras:** {result['metadata']['word_count']}",
+                value=f"📝 **Nome:** {nome}\n📄 **Chunks:** {added_count}{self._reuse_note(result)}\n📊 **Caracteres:** {result.char_count}\n📝 **Palavras:** {result.word_count}",
                 inline=False
             )
             
@@ -354,7 +359,7 @@ class RAGCommands(commands.Cog):
         await interaction.response.defer()
         
         try:
-            if not self.rag_system:
+            if not await self.ensure_rag_system():
                 embed = discord.Embed(
                     title="❌ Sistema RAG Indisponível",
                     description="O sistema RAG não está configurado.",
@@ -418,7 +423,7 @@ class RAGCommands(commands.Cog):
         await interaction.response.defer()
         
         try:
-            if not self.rag_system:
+            if not await self.ensure_rag_system():
                 embed = discord.Embed(
                     title="❌ Sistema RAG Indisponível",
                     description="O sistema RAG não está configurado.",
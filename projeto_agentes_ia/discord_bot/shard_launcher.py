@@ -0,0 +1,95 @@
+# discord_bot/shard_launcher.py
+"""
+Modo um-processo-por-shard: o processo principal só supervisiona.
+
+Cada processo filho roda o bot com DISCORD_SHARD_COUNT e DISCORD_SHARD_IDS
+próprios (AutoShardedBot atende só esses shards), usando outro núcleo. O que
+precisa ser único ou compartilhado fica fora dos processos:
+- preferências de usuário e trava de líder em discord_bot/shared_state.py;
+- memória das conversas nos arquivos travados por flock (ou no PostgreSQL);
+- monitoramento de logs só no processo que vencer a trava de líder.
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CHILD_COMMAND = "from discord_bot.bot import run_bot; run_bot()"
+
+
+def assign_shards(shard_count: int, processes: int) -> List[List[int]]:
+    """Distribui os shards entre os processos (0,2,4... / 1,3,5...)."""
+    processes = max(1, min(processes, shard_count))
+    return [list(range(index, shard_count, processes)) for index in range(processes)]
+
+
+def _spawn(shard_ids: List[int], shard_count: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DISCORD_SHARD_COUNT": str(shard_count),
+        "DISCORD_SHARD_IDS": ",".join(str(shard_id) for shard_id in shard_ids),
+        "DISCORD_SHARD_PROCESSES": "1"
+    }
+    print(f"🧩 Iniciando processo dos shards {env['DISCORD_SHARD_IDS']} de {shard_count}")
+    return subprocess.Popen([sys.executable, "-c", CHILD_COMMAND], cwd=PROJECT_ROOT, env=env)
+
+
+def run_shard_processes(processes: int, shard_count: int = None):
+    """
+    Inicia um processo por grupo de shards e os mantém vivos: um filho que
+    termina com erro é reiniciado após DISCORD_SHARD_RESTART_DELAY segundos.
+    SIGINT/SIGTERM encerram todos os filhos.
+
+    Os processos sobem espaçados por DISCORD_SHARD_START_DELAY segundos por
+    shard, respeitando o limite de IDENTIFY do gateway do Discord.
+    """
+    shard_count = shard_count or int(os.getenv("DISCORD_SHARD_COUNT", str(processes)))
+    start_delay = float(os.getenv("DISCORD_SHARD_START_DELAY", "5"))
+    restart_delay = float(os.getenv("DISCORD_SHARD_RESTART_DELAY", "5"))
+    groups = assign_shards(shard_count, processes)
+    children: Dict[int, subprocess.Popen] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for child in children.values():
+            if child.poll() is None:
+                child.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"🚀 {shard_count} shards em {len(groups)} processos")
+    for index, shard_ids in enumerate(groups):
+        if stopping:
+            break
+        children[index] = _spawn(shard_ids, shard_count)
+        if index < len(groups) - 1:
+            time.sleep(start_delay * len(shard_ids))
+
+    while not stopping:
+        time.sleep(1)
+        for index, child in list(children.items()):
+            code = child.poll()
+            if code is None or stopping:
+                continue
+            if code == 0:
+                print(f"🛑 Processo dos shards {groups[index]} encerrado")
+                del children[index]
+                continue
+            print(f"⚠️ Processo dos shards {groups[index]} terminou com código {code}; reiniciando...")
+            time.sleep(restart_delay)
+            children[index] = _spawn(groups[index], shard_count)
+        if not children:
+            break
+
+    for child in children.values():
+        try:
+            child.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            child.kill()
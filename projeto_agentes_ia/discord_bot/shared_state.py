@@ -0,0 +1,284 @@
+# discord_bot/shared_state.py
+"""
+Estado compartilhado entre os processos do bot (um processo por shard).
+
+- Preferências de agente por usuário: gravadas fora do processo, para que
+  qualquer shard que receba o próximo comando do usuário as veja.
+- Trava de líder: garante que tarefas únicas (monitoramento de logs) rodem em
+  exatamente um processo; se o líder cair, outro processo assume.
+
+Backends (BOT_STATE_BACKEND):
+- "sqlite" (padrão): arquivo SQLite + flock, para vários processos no mesmo host.
+- "postgres": tabela agenteia.bot_user_preferences + pg_try_advisory_lock,
+  para processos em hosts diferentes.
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+# Estrutura de docker/init-scripts/03-bot-shared-state.sql, aplicada também em
+# bancos criados antes do script
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS {schema}.bot_user_preferences (
+    user_id VARCHAR(255) PRIMARY KEY,
+    agent_type VARCHAR(50) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class LeaderLock(ABC):
+    """Trava de líder não bloqueante: acquire() tenta uma vez e retorna se conseguiu."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.held = False
+
+    @abstractmethod
+    async def acquire(self) -> bool:
+        pass
+
+    async def check(self) -> bool:
+        """Confirma que a trava continua com este processo."""
+        return self.held
+
+    @abstractmethod
+    async def release(self):
+        pass
+
+
+class FileLeaderLock(LeaderLock):
+    """
+    flock exclusivo em um arquivo: o sistema operacional libera a trava quando
+    o processo termina, inclusive por falha. Sem fcntl, o processo é sempre líder.
+    """
+
+    def __init__(self, name: str, lock_dir: Path):
+        super().__init__(name)
+        self.path = Path(lock_dir) / f"leader_{name}.lock"
+        self._file = None
+
+    async def acquire(self) -> bool:
+        if self.held:
+            return True
+        if not FCNTL_AVAILABLE:
+            self.held = True
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Identifica o líder para quem inspecionar o arquivo
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        self.held = True
+        return True
+
+    async def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self.held = False
+
+
+class PostgresLeaderLock(LeaderLock):
+    """
+    pg_try_advisory_lock em uma conexão dedicada: a trava vive enquanto a
+    conexão viver, então um líder que perde o banco perde a liderança.
+    """
+
+    def __init__(self, name: str, connect):
+        super().__init__(name)
+        self._connect = connect
+        self._conn = None
+        # Chave bigint estável derivada do nome
+        self.key = int.from_bytes(hashlib.md5(name.encode()).digest()[:8], "big", signed=True)
+
+    async def acquire(self) -> bool:
+        if self.held:
+            return True
+        if self._conn is None or self._conn.is_closed():
+            self._conn = await self._connect()
+        self.held = await self._conn.fetchval("SELECT pg_try_advisory_lock($1)", self.key)
+        return self.held
+
+    async def check(self) -> bool:
+        if not self.held:
+            return False
+        try:
+            await self._conn.fetchval("SELECT 1")
+        except Exception:
+            self.held = False
+        return self.held
+
+    async def release(self):
+        if self._conn is not None and not self._conn.is_closed():
+            try:
+                if self.held:
+                    await self._conn.execute("SELECT pg_advisory_unlock($1)", self.key)
+            finally:
+                await self._conn.close()
+        self._conn = None
+        self.held = False
+
+
+class BotStateStore(ABC):
+    """Preferências de agente por usuário e travas de líder compartilhadas."""
+
+    @abstractmethod
+    async def get_preference(self, user_id: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def set_preference(self, user_id: str, agent_type: str):
+        pass
+
+    @abstractmethod
+    async def clear_preference(self, user_id: str):
+        pass
+
+    @abstractmethod
+    def leader_lock(self, name: str) -> LeaderLock:
+        pass
+
+    async def close(self):
+        pass
+
+
+class SQLiteStateStore(BotStateStore):
+    """Estado em um arquivo SQLite (WAL) compartilhado pelos processos do host."""
+
+    def __init__(self, path: str = "memory_storage/bot_state.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS user_preferences (
+                    user_id TEXT PRIMARY KEY,
+                    agent_type TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _execute(self, sql: str, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchone()
+
+    async def get_preference(self, user_id: str) -> Optional[str]:
+        row = await asyncio.to_thread(
+            self._execute, "SELECT agent_type FROM user_preferences WHERE user_id = ?", (user_id,))
+        return row[0] if row else None
+
+    async def set_preference(self, user_id: str, agent_type: str):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO user_preferences (user_id, agent_type, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET agent_type = excluded.agent_type, updated_at = excluded.updated_at",
+            (user_id, agent_type, time.time()))
+
+    async def clear_preference(self, user_id: str):
+        await asyncio.to_thread(self._execute, "DELETE FROM user_preferences WHERE user_id = ?", (user_id,))
+
+    def leader_lock(self, name: str) -> LeaderLock:
+        return FileLeaderLock(name, self.path.parent / ".locks")
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PostgresStateStore(BotStateStore):
+    """Estado no PostgreSQL do projeto (docker/init-scripts/03-bot-shared-state.sql)."""
+
+    def __init__(self, config=None):
+        from memory.postgres_memory_service import PostgresConfig
+
+        self.config = config or PostgresConfig(
+            host=os.getenv("POSTGRES_HOST", "localhost"),
+            port=int(os.getenv("POSTGRES_PORT", "5432")),
+            database=os.getenv("POSTGRES_DB", "agenteia_db"),
+            user=os.getenv("POSTGRES_USER", "agenteia_user"),
+            password=os.getenv("POSTGRES_PASSWORD", "agenteia_password_2025"),
+            schema=os.getenv("POSTGRES_SCHEMA", "agenteia")
+        )
+        self.pool = None
+        self._pool_lock = asyncio.Lock()
+
+    def _connect_kwargs(self):
+        return dict(host=self.config.host, port=self.config.port, database=self.config.database,
+                    user=self.config.user, password=self.config.password)
+
+    async def _get_pool(self):
+        async with self._pool_lock:
+            if self.pool is None:
+                import asyncpg
+                pool = await asyncpg.create_pool(min_size=1, max_size=2, command_timeout=10,
+                                                 **self._connect_kwargs())
+                # O script 03 só roda em bancos novos: criar a tabela nos já existentes
+                try:
+                    await pool.execute(SCHEMA_SQL.format(schema=self.config.schema))
+                except Exception:
+                    await pool.close()
+                    raise
+                self.pool = pool
+        return self.pool
+
+    async def get_preference(self, user_id: str) -> Optional[str]:
+        pool = await self._get_pool()
+        return await pool.fetchval(
+            f"SELECT agent_type FROM {self.config.schema}.bot_user_preferences WHERE user_id = $1", user_id)
+
+    async def set_preference(self, user_id: str, agent_type: str):
+        pool = await self._get_pool()
+        await pool.execute(
+            f"INSERT INTO {self.config.schema}.bot_user_preferences (user_id, agent_type) VALUES ($1, $2) "
+            "ON CONFLICT (user_id) DO UPDATE SET agent_type = EXCLUDED.agent_type, updated_at = CURRENT_TIMESTAMP",
+            user_id, agent_type)
+
+    async def clear_preference(self, user_id: str):
+        pool = await self._get_pool()
+        await pool.execute(f"DELETE FROM {self.config.schema}.bot_user_preferences WHERE user_id = $1", user_id)
+
+    def leader_lock(self, name: str) -> LeaderLock:
+        async def connect():
+            import asyncpg
+            return await asyncpg.connect(**self._connect_kwargs())
+        return PostgresLeaderLock(name, connect)
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+
+def create_state_store() -> BotStateStore:
+    """BOT_STATE_BACKEND=sqlite (padrão, BOT_STATE_PATH) ou postgres (variáveis POSTGRES_*)."""
+    backend = os.getenv("BOT_STATE_BACKEND", "sqlite").lower()
+    if backend == "postgres":
+        return PostgresStateStore()
+    return SQLiteStateStore(os.getenv("BOT_STATE_PATH", "memory_storage/bot_state.db"))
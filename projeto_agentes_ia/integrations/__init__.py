@@ -0,0 +1,13 @@
+"""
+Integrações com serviços externos e infraestrutura HTTP compartilhada.
+"""
+
+from .http_pool import HttpClientRegistry, http_pool, get_session, close_http_sessions, run_sync
+
+__all__ = [
+    'HttpClientRegistry',
+    'http_pool',
+    'get_session',
+    'close_http_sessions',
+    'run_sync'
+]
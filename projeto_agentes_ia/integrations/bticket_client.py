@@ -4,6 +4,8 @@ import json
 import os
 from typing import Dict, List, Optional, Any
 
+from .http_pool import get_session
+
 class BTicketClient:
     """
     Cliente assíncrono para interagir com a API B-Ticket, alinhado com a documentação oficial.
@@ -16,32 +18,28 @@ class BTicketClient:
             "x-api-key": self.api_key,
             "Content-Type": "application/json"
         }
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.timeout = aiohttp.ClientTimeout(total=30)
     
     async def __aenter__(self):
-        """Abrir sessão HTTP."""
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        """A sessão HTTP é compartilhada (pool de conexões de longa duração)."""
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Fechar sessão HTTP."""
-        if self.session:
-            await self.session.close()
+        """Nada a fechar: o pool é encerrado no desligamento da aplicação."""
+        pass
     
     async def _make_request(self, method: str, endpoint: str, data: Dict = None, params: Dict = None) -> Dict:
         """Faz requisição HTTP para a API."""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
-        
         try:
-            async with self.session.request(
+            async with get_session("bticket").request(
                 method=method,
                 url=url,
                 json=data if data else None,
                 params=params if params else None,
-                timeout=30
+                headers=self.headers,
+                timeout=self.timeout
             ) as response:
                 response_text = await response.text()
                 try:
@@ -0,0 +1,144 @@
+# integrations/http_pool.py
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Awaitable, Dict, Optional, Tuple, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+
+@dataclass
+class PoolConfig:
+    """Limites e timeouts de uma sessão compartilhada."""
+    limit: int = 100                # Conexões simultâneas no total
+    limit_per_host: int = 10        # Conexões simultâneas por host
+    ttl_dns_cache: int = 300        # Cache de DNS (segundos)
+    keepalive_timeout: float = 30   # Tempo que conexões ociosas ficam abertas
+    timeout: float = 30             # Timeout total padrão por requisição
+    connect_timeout: float = 10
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        return cls(
+            limit=int(os.getenv("HTTP_POOL_LIMIT", "100")),
+            limit_per_host=int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10")),
+            ttl_dns_cache=int(os.getenv("HTTP_DNS_CACHE_TTL", "300")),
+            keepalive_timeout=float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30")),
+            timeout=float(os.getenv("HTTP_TIMEOUT", "30")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+        )
+
+
+class HttpClientRegistry:
+    """
+    Registro de sessões aiohttp de longa duração, identificadas por nome.
+
+    Cada sessão tem seu próprio pool de conexões (keep-alive, limite por host
+    e cache de DNS), criado na primeira utilização dentro do loop em
+    execução. Uma sessão só serve ao loop que a criou, então o registro
+    guarda uma sessão por (loop, nome): loops temporários (asyncio.run em
+    threads, ver run_sync) não substituem a sessão do loop principal.
+    close_all() fecha as sessões do loop atual e deve ser chamado no
+    encerramento da aplicação.
+    """
+
+    def __init__(self, default_config: PoolConfig = None):
+        self.default_config = default_config or PoolConfig.from_env()
+        self._configs: Dict[str, PoolConfig] = {}
+        self._sessions: Dict[Tuple[asyncio.AbstractEventLoop, str], aiohttp.ClientSession] = {}
+
+    def configure(self, name: str, **overrides) -> PoolConfig:
+        """Define limites próprios para uma sessão (antes do primeiro uso)."""
+        base = self._configs.get(name, self.default_config)
+        values = {**base.__dict__, **overrides}
+        values['headers'] = dict(values.get('headers') or {})
+        self._configs[name] = PoolConfig(**values)
+        return self._configs[name]
+
+    def get(self, name: str = "default") -> aiohttp.ClientSession:
+        """Retorna a sessão compartilhada, criando-a se necessário."""
+        loop = asyncio.get_running_loop()
+        self._forget_closed_loops()
+        session = self._sessions.get((loop, name))
+        if session is not None and not session.closed:
+            return session
+
+        session = self._create(self._configs.get(name, self.default_config))
+        self._sessions[(loop, name)] = session
+        return session
+
+    def _forget_closed_loops(self):
+        """Remove as entradas de loops já encerrados (as sessões não podem mais ser usadas)."""
+        for key in [key for key in self._sessions if key[0].is_closed()]:
+            del self._sessions[key]
+
+    @staticmethod
+    def _create(config: PoolConfig) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=config.limit,
+            limit_per_host=config.limit_per_host,
+            ttl_dns_cache=config.ttl_dns_cache,
+            keepalive_timeout=config.keepalive_timeout
+        )
+        timeout = aiohttp.ClientTimeout(total=config.timeout, connect=config.connect_timeout)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=config.headers or None)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Conexões em uso e ociosas por sessão (do loop atual, se houver um em execução)."""
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        result = {}
+        for (loop, name), session in self._sessions.items():
+            connector = session.connector
+            if session.closed or connector is None or (current is not None and loop is not current):
+                continue
+            result[name] = {
+                'acquired': len(getattr(connector, '_acquired', ())),
+                'idle': sum(len(conns) for conns in getattr(connector, '_conns', {}).values()),
+                'limit': connector.limit,
+                'limit_per_host': connector.limit_per_host
+            }
+        return result
+
+    async def close_all(self):
+        """Fecha todas as sessões do loop atual; as de outros loops continuam registradas."""
+        loop = asyncio.get_running_loop()
+        for key, session in list(self._sessions.items()):
+            if key[0] is not loop:
+                continue
+            del self._sessions[key]
+            if not session.closed:
+                await session.close()
+        self._forget_closed_loops()
+        # Dar tempo para o fechamento das conexões SSL
+        await asyncio.sleep(0)
+
+
+# Registro global usado por agentes, bot e aplicação web
+http_pool = HttpClientRegistry()
+
+
+def get_session(name: str = "default") -> aiohttp.ClientSession:
+    return http_pool.get(name)
+
+
+async def close_http_sessions():
+    await http_pool.close_all()
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    asyncio.run que fecha, ao final, as sessões HTTP criadas no loop
+    temporário (métodos run() síncronos dos agentes).
+    """
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await http_pool.close_all()
+    return asyncio.run(runner())
@@ -1,12 +1,23 @@
 """
 Sistema de memória conversacional e RAG para agentes de IA.
 Implementação seguindo as melhores práticas de desenvolvimento assistido por IA.
+
+Os nomes abaixo são carregados no primeiro acesso: importar um submódulo
+(memory.memory_manager, memory.chunker...) não carrega o RAG, o LangChain
+nem o cliente PostgreSQL.
 """
+import importlib
 
-from .memory_manager import MemoryManager, ConversationEntry, PostgresMemoryManager
-from .rag_system import RAGManager, SimpleRAGSystem
-from .postgres_memory_service import PostgresMemoryService, PostgresConfig
-from .postgres_rag_system import PostgresRAGSystem
+_EXPORTS = {
+    'MemoryManager': '.memory_manager',
+    'ConversationEntry': '.memory_manager',
+    'PostgresMemoryManager': '.memory_manager',
+    'RAGManager': '.rag_system',
+    'SimpleRAGSystem': '.rag_system',
+    'PostgresMemoryService': '.postgres_memory_service',
+    'PostgresConfig': '.postgres_memory_service',
+    'PostgresRAGSystem': '.postgres_rag_system'
+}
 
 __all__ = [
     'MemoryManager',
@@ -17,4 +28,17 @@ __all__ = [
     'PostgresRAGSystem',
     'PostgresMemoryManager',
     'PostgresConfig'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
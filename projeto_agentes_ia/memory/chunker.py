@@ -0,0 +1,265 @@
+# memory/chunker.py
+import hashlib
+import math
+import re
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+TokenCounter = Callable[[str], int]
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_MARKDOWN_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+\S")
+_NUMBERED_HEADING = re.compile(r"^\s*\d+(\.\d+)*\.?\s+[A-ZÀ-Ý]")
+_SENTENCE_END = re.compile(r"(?<=[.!?…:;])\s+(?=[\"“(\[\-•]?[A-ZÀ-Ý0-9])")
+_BLANK_LINE = re.compile(r"\n\s*\n")
+
+# Acima disso sem linha em branco, o texto pendente é processado na última quebra
+# de linha; sem quebra de linha, no último espaço (ou inteiro, se não houver)
+MAX_PENDING_CHARS = 64 * 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa de tokens de subpalavra (WordPiece/BPE) sem carregar o
+    tokenizador: palavras e pontuação, com fator para palavras divididas.
+    """
+    return math.ceil(len(_WORD_RE.findall(text)) * 1.3)
+
+
+def tokenizer_counter(tokenizer) -> TokenCounter:
+    """Contador de tokens a partir de um tokenizador Hugging Face (ex.: SentenceTransformer.tokenizer)."""
+    def count(text: str) -> int:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    return count
+
+
+def chunk_id(text: str) -> str:
+    """Identificador derivado apenas do conteúdo (espaços normalizados)."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class Chunk:
+    """Trecho pronto para embedding."""
+    id: str
+    text: str
+    index: int
+    tokens: int
+    section: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class _Block:
+    kind: str  # 'heading', 'paragraph' ou 'table'
+    text: str
+    tokens: int
+
+
+class Chunker:
+    """
+    Divisão de texto por estrutura (títulos, parágrafos, tabelas e frases)
+    com tamanho medido em tokens do modelo de embedding.
+
+    Blocos são agrupados até max_tokens; blocos maiores são divididos por
+    frases (tabelas, por linhas). Um título sempre inicia um novo chunk e é
+    repetido no início dos chunks da sua seção. Os limites entre chunks são
+    definidos pelo conteúdo — um novo chunk começa também quando o hash de um
+    parágrafo cai na fronteira e o chunk já tem min_tokens — então editar um
+    trecho muda apenas os chunks próximos a ele, e os demais mantêm o mesmo
+    id (hash do conteúdo) e não precisam de novo embedding.
+    """
+
+    def __init__(self, max_tokens: int = 240, min_tokens: int = 80, token_counter: TokenCounter = None,
+                 boundary_modulus: int = 4):
+        self.max_tokens = max_tokens
+        self.min_tokens = min(min_tokens, max_tokens)
+        self.count_tokens = token_counter or estimate_tokens
+        self.boundary_modulus = boundary_modulus
+
+    def split(self, text: str) -> List[Chunk]:
+        """Divide o texto completo."""
+        stream = self.stream()
+        return stream.feed(text) + stream.finish()
+
+    def stream(self) -> "ChunkStream":
+        """Divisão incremental: feed() com trechos do texto, finish() ao final."""
+        return ChunkStream(self)
+
+    # Análise de blocos
+
+    def _blocks(self, text: str) -> Iterable[_Block]:
+        for raw in _BLANK_LINE.split(text):
+            lines = [line.rstrip() for line in raw.strip("\n").splitlines() if line.strip()]
+            if not lines:
+                continue
+
+            paragraph: List[str] = []
+            table: List[str] = []
+            for line in lines:
+                if self._is_table_row(line):
+                    if paragraph:
+                        yield self._block('paragraph', "\n".join(paragraph))
+                        paragraph = []
+                    table.append(line)
+                    continue
+                if table:
+                    yield self._block('table', "\n".join(table))
+                    table = []
+                if self._is_heading(line):
+                    if paragraph:
+                        yield self._block('paragraph', "\n".join(paragraph))
+                        paragraph = []
+                    yield self._block('heading', line.strip())
+                else:
+                    paragraph.append(line)
+            if table:
+                yield self._block('table', "\n".join(table))
+            if paragraph:
+                yield self._block('paragraph', "\n".join(paragraph))
+
+    def _block(self, kind: str, text: str) -> _Block:
+        return _Block(kind, text, self.count_tokens(text))
+
+    @staticmethod
+    def _is_heading(line: str) -> bool:
+        stripped = line.strip()
+        if _MARKDOWN_HEADING.match(stripped):
+            return True
+        if len(stripped) > 80 or stripped.endswith(('.', ',', ';')):
+            return False
+        if _NUMBERED_HEADING.match(stripped) and len(stripped.split()) <= 12:
+            return True
+        letters = [c for c in stripped if c.isalpha()]
+        return len(letters) >= 4 and all(c.isupper() for c in letters)
+
+    @staticmethod
+    def _is_table_row(line: str) -> bool:
+        stripped = line.strip()
+        return (stripped.startswith("|") and stripped.count("|") >= 2) or line.count("\t") >= 2
+
+    def _pieces(self, block: _Block, budget: int) -> List[str]:
+        """Divide um bloco maior que o limite: tabelas por linha, texto por frase e, no limite, por palavras."""
+        if block.kind == 'table':
+            rows = block.text.split("\n")
+            header, units = rows[0], rows[1:]
+            # Cabeçalho repetido em cada parte da tabela
+            return self._pack(units, budget - self.count_tokens(header), prefix=header + "\n")
+
+        units: List[str] = []
+        for sentence in _SENTENCE_END.split(block.text):
+            if self.count_tokens(sentence) <= budget:
+                units.append(sentence)
+            else:
+                units.extend(self._pack(sentence.split(), budget, separator=" "))
+        return self._pack(units, budget, separator=" ")
+
+    def _pack(self, units: List[str], budget: int, separator: str = "\n", prefix: str = "") -> List[str]:
+        pieces, current, size = [], [], 0
+        for unit in units:
+            tokens = self.count_tokens(unit)
+            if current and size + tokens > budget:
+                pieces.append(prefix + separator.join(current))
+                current, size = [], 0
+            current.append(unit)
+            size += tokens
+        if current:
+            pieces.append(prefix + separator.join(current))
+        return pieces
+
+    def _is_boundary(self, text: str) -> bool:
+        digest = hashlib.md5(text.encode("utf-8")).digest()
+        return digest[0] % self.boundary_modulus == 0
+
+
+class ChunkStream:
+    """Estado da divisão incremental; só o parágrafo ainda incompleto fica pendente."""
+
+    def __init__(self, chunker: Chunker):
+        self.chunker = chunker
+        self.pending = ""
+        self.section: Optional[str] = None
+        self.section_used = True
+        self.parts: List[str] = []
+        self.size = 0
+        self.index = 0
+
+    def feed(self, text: str) -> List[Chunk]:
+        self.pending += text
+        cut = self._last_boundary()
+        if cut <= 0:
+            return []
+        ready, self.pending = self.pending[:cut], self.pending[cut:]
+        return self._consume(ready)
+
+    def finish(self) -> List[Chunk]:
+        ready, self.pending = self.pending, ""
+        chunks = self._consume(ready)
+        chunks.extend(self._flush())
+        if not self.section_used:
+            # Título sem conteúdo no fim do documento
+            chunks.append(self._make_chunk(self.section))
+            self.section_used = True
+        return chunks
+
+    def _last_boundary(self) -> int:
+        match = None
+        for match in _BLANK_LINE.finditer(self.pending):
+            pass
+        if match is not None:
+            return match.end()
+        if len(self.pending) > MAX_PENDING_CHARS:
+            cut = self.pending.rfind("\n") + 1
+            if cut == 0:
+                # Texto sem quebras de linha (ex.: PDF extraído em uma linha só)
+                cut = self.pending.rfind(" ") + 1 or len(self.pending)
+            return cut
+        return 0
+
+    def _consume(self, text: str) -> List[Chunk]:
+        chunker = self.chunker
+        chunks: List[Chunk] = []
+        for block in chunker._blocks(text):
+            if block.kind == 'heading':
+                chunks.extend(self._flush())
+                # Títulos seguidos (ex.: capítulo e seção) formam um único cabeçalho
+                self.section = block.text if self.section_used else f"{self.section}\n{block.text}"
+                self.section_used = False
+                continue
+
+            header_tokens = chunker.count_tokens(self.section) if self.section else 0
+            budget = max(chunker.max_tokens - header_tokens, chunker.min_tokens)
+
+            if block.tokens > budget:
+                chunks.extend(self._flush())
+                for piece in chunker._pieces(block, budget):
+                    self._append(piece, chunker.count_tokens(piece))
+                    chunks.extend(self._flush())
+                continue
+
+            if self.parts and self.size + block.tokens > budget:
+                chunks.extend(self._flush())
+            self._append(block.text, block.tokens)
+            if self.size >= chunker.min_tokens and chunker._is_boundary(block.text):
+                chunks.extend(self._flush())
+        return chunks
+
+    def _append(self, text: str, tokens: int):
+        self.parts.append(text)
+        self.size += tokens
+
+    def _flush(self) -> List[Chunk]:
+        if not self.parts:
+            return []
+        body = "\n\n".join(self.parts)
+        self.parts, self.size = [], 0
+        self.section_used = True
+        return [self._make_chunk(f"{self.section}\n\n{body}" if self.section else body)]
+
+    def _make_chunk(self, text: str) -> Chunk:
+        chunk = Chunk(id=chunk_id(text), text=text, index=self.index,
+                      tokens=self.chunker.count_tokens(text), section=self.section)
+        self.index += 1
+        return chunk
@@ -0,0 +1,302 @@
+# memory/conversation_migration.py
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import asyncpg
+
+# Ordem das colunas no COPY e na tabela temporária
+COLUMNS = ('user_id', 'session_id', 'agent_type', 'user_message', 'agent_response', 'timestamp', 'metadata')
+
+Row = Tuple[str, str, str, str, str, datetime, str]
+
+# Fim do fluxo de leitura
+_DONE = object()
+
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+def iter_json_array(fp, block_size: int = _READ_BLOCK_SIZE) -> Iterator:
+    """
+    Lê os elementos de um array JSON um a um, em blocos de block_size
+    caracteres, sem carregar o arquivo inteiro na memória.
+    """
+    decoder = json.JSONDecoder()
+    buffer = fp.read(block_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("Arquivo não contém um array JSON")
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            block = fp.read(block_size)
+            eof = not block
+            buffer += block
+            continue
+        yield item
+        buffer = buffer[end:]
+        if not buffer and not eof:
+            block = fp.read(block_size)
+            eof = not block
+            buffer = block
+        if not buffer and eof:
+            raise ValueError("Array JSON incompleto")
+
+
+def entry_to_row(data: Dict) -> Row:
+    """Converte uma entrada de conversa (formato ConversationEntry) em linha do COPY."""
+    return (
+        data['user_id'],
+        data['session_id'],
+        data['agent_type'],
+        data['user_message'],
+        data['agent_response'],
+        datetime.fromisoformat(data['timestamp']),
+        json.dumps(data.get('metadata') or {}, ensure_ascii=False)
+    )
+
+
+def find_conversation_files(roots: Iterable[Path]) -> List[Path]:
+    """
+    Arquivos de conversa do armazenamento em arquivos, nos três formatos já
+    usados: conversation_*.json e user_*.json na raiz e user_*/conversation_*.json.
+    """
+    files: Dict[Path, None] = {}
+    for root in roots:
+        root = Path(root)
+        if not root.is_dir():
+            continue
+        for pattern in ("conversation_*.json", "user_*.json", "user_*/conversation_*.json"):
+            for path in sorted(root.glob(pattern)):
+                if path.is_file():
+                    files[path.resolve()] = None
+    return list(files)
+
+
+@dataclass
+class MigrationReport:
+    """Andamento e resultado da migração."""
+    files_total: int = 0
+    files_done: int = 0
+    files_skipped: int = 0
+    rows_read: int = 0
+    rows_inserted: int = 0
+    invalid_entries: int = 0
+    failed_files: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.rows_read - self.rows_inserted
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['duplicates'] = self.duplicates
+        data['rows_per_second'] = round(self.rows_per_second, 1)
+        return data
+
+
+class MigrationCheckpoint:
+    """
+    Arquivos já migrados por completo (caminho → tamanho e mtime), gravado
+    de forma atômica a cada lote. Um arquivo alterado depois de migrado é
+    processado de novo; as linhas repetidas são ignoradas pelo banco.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.files = json.load(f).get('files', {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Checkpoint ilegível, migrando tudo de novo: {e}")
+
+    @staticmethod
+    def _signature(path: Path) -> Dict:
+        stat = path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_done(self, path: Path) -> bool:
+        done = self.files.get(str(path))
+        return done is not None and {k: done.get(k) for k in ("size", "mtime_ns")} == self._signature(path)
+
+    def mark_done(self, path: Path, rows: int):
+        self.files[str(path)] = {**self._signature(path), "rows": rows}
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"updated_at": datetime.now().isoformat(), "files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class ConversationMigrator:
+    """
+    Migração do histórico em arquivos JSON para agenteia.conversations.
+
+    Um grupo limitado de leitores percorre os arquivos em paralelo (o parse
+    roda em threads, em trechos de batch_size entradas) e entrega as linhas
+    por uma fila limitada a um único gravador. Cada lote vai ao banco com
+    COPY para uma tabela temporária seguido de INSERT ... ON CONFLICT DO
+    NOTHING na chave (user_id, session_id, timestamp), então rodar de novo
+    nunca duplica conversas. O checkpoint marca os arquivos cujas linhas já
+    foram todas confirmadas, para retomar uma migração interrompida.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, checkpoint_path: Path = Path("migration_checkpoint.json"),
+                 batch_size: int = 5000, workers: int = 4, report_every: float = 5.0):
+        self.pool = pool
+        self.checkpoint = MigrationCheckpoint(checkpoint_path)
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.report_every = report_every
+
+    async def run(self, roots: Iterable[Path]) -> MigrationReport:
+        report = MigrationReport()
+        started = time.perf_counter()
+
+        files = find_conversation_files(roots)
+        report.files_total = len(files)
+        pending_files = []
+        for path in files:
+            if self.checkpoint.is_done(path):
+                report.files_skipped += 1
+            else:
+                pending_files.append(path)
+
+        paths: asyncio.Queue = asyncio.Queue()
+        for path in pending_files:
+            paths.put_nowait(path)
+        rows_queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+
+        readers = [asyncio.ensure_future(self._reader(paths, rows_queue, report)) for _ in range(self.workers)]
+        writer = asyncio.ensure_future(self._writer(rows_queue, report, started))
+        try:
+            await asyncio.gather(*readers)
+            await rows_queue.put(_DONE)
+            await writer
+        except BaseException:
+            for task in readers + [writer]:
+                task.cancel()
+            await asyncio.gather(*readers, writer, return_exceptions=True)
+            raise
+
+        report.seconds = time.perf_counter() - started
+        print(f"✅ Migração: {report.rows_inserted} conversas inseridas de {report.rows_read} lidas "
+              f"({report.duplicates} já existentes) em {report.seconds:.1f}s "
+              f"({report.rows_per_second:.0f} linhas/s); {report.files_skipped} arquivos já migrados")
+        return report
+
+    async def _reader(self, paths: asyncio.Queue, out: asyncio.Queue, report: MigrationReport):
+        while True:
+            try:
+                path = paths.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                with open(path, 'r', encoding='utf-8') as fp:
+                    entries = iter_json_array(fp)
+                    while True:
+                        rows, invalid, finished = await asyncio.to_thread(self._take_rows, entries)
+                        report.invalid_entries += invalid
+                        await out.put((path, rows, finished))
+                        if finished:
+                            break
+            except Exception as e:
+                # Linhas já entregues deste arquivo continuam válidas; ele só não entra no checkpoint
+                print(f"❌ Erro ao ler {path}: {e}")
+                report.failed_files.append(str(path))
+                await out.put((path, [], None))
+
+    def _take_rows(self, entries: Iterator) -> Tuple[List[Row], int, bool]:
+        rows: List[Row] = []
+        invalid = 0
+        for data in entries:
+            try:
+                rows.append(entry_to_row(data))
+            except (KeyError, TypeError, ValueError):
+                invalid += 1
+            if len(rows) >= self.batch_size:
+                return rows, invalid, False
+        return rows, invalid, True
+
+    async def _writer(self, inbox: asyncio.Queue, report: MigrationReport, started: float):
+        batch: List[Row] = []
+        # Arquivos cuja última parte está no lote atual → linhas do arquivo
+        completed: Dict[Path, int] = {}
+        file_rows: Dict[Path, int] = {}
+        last_report = time.perf_counter()
+
+        while True:
+            item = await inbox.get()
+            if item is not _DONE:
+                path, rows, finished = item
+                batch.extend(rows)
+                file_rows[path] = file_rows.get(path, 0) + len(rows)
+                report.rows_read += len(rows)
+                if finished:
+                    completed[path] = file_rows.pop(path)
+                elif finished is None:
+                    file_rows.pop(path, None)
+
+            if batch and (item is _DONE or len(batch) >= self.batch_size):
+                report.rows_inserted += await self._copy_batch(batch)
+                batch = []
+            if completed and not batch:
+                for path, count in completed.items():
+                    self.checkpoint.mark_done(path, count)
+                report.files_done += len(completed)
+                completed = {}
+                self.checkpoint.save()
+
+            now = time.perf_counter()
+            if now - last_report >= self.report_every:
+                last_report = now
+                report.seconds = now - started
+                print(f"📦 {report.files_done}/{report.files_total - report.files_skipped} arquivos, "
+                      f"{report.rows_read} linhas ({report.rows_per_second:.0f} linhas/s)")
+            if item is _DONE:
+                break
+
+    async def _copy_batch(self, rows: List[Row]) -> int:
+        """Grava um lote; retorna quantas linhas eram novas."""
+        columns = ", ".join(COLUMNS)
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE conversations_import (
+                        user_id VARCHAR(255), session_id VARCHAR(255), agent_type VARCHAR(50),
+                        user_message TEXT, agent_response TEXT,
+                        timestamp TIMESTAMP WITH TIME ZONE, metadata JSONB
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table('conversations_import', records=rows, columns=COLUMNS)
+                result = await conn.execute(
+                    f"""
+                    INSERT INTO agenteia.conversations ({columns})
+                    SELECT {columns} FROM conversations_import
+                    ON CONFLICT (user_id, session_id, timestamp) DO NOTHING
+                    """
+                )
+        return int(result.split()[-1])
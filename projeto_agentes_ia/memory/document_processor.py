@@ -1,35 +1,44 @@
 # memory/document_processor.py
 import asyncio
 import aiohttp
+import codecs
+import importlib.util
 import os
 import tempfile
 import hashlib
-from typing import List, Dict, Optional, Union
+from typing import AsyncIterator, BinaryIO, List, Dict, Optional, Tuple, Union
 from pathlib import Path
 import mimetypes
 from datetime import datetime
 from dotenv import load_dotenv
 
-# Processamento de diferentes tipos de arquivo
-try:
-    import PyPDF2
-    import pdfplumber
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from integrations.http_pool import get_session
+from memory.pdf_extractor import get_pdf_extractor
+from memory.chunker import Chunker, ChunkStream
 
-try:
-    from bs4 import BeautifulSoup
-    import requests
-    WEB_SCRAPING_AVAILABLE = True
-except ImportError:
-    WEB_SCRAPING_AVAILABLE = False
+# Bytes iniciais usados para detectar o tipo do conteúdo
+SNIFF_SIZE = 2048
+# Tamanho dos trechos lidos/gerados na extração incremental
+TEXT_BLOCK_SIZE = 256 * 1024
 
-try:
-    import docx
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# Tipo de documento pela extensão do arquivo
+EXTENSION_TYPES = {
+    '.pdf': 'pdf',
+    '.txt': 'text',
+    '.md': 'text',
+    '.docx': 'docx',
+    '.html': 'html',
+    '.htm': 'html'
+}
+
+# Processamento de diferentes tipos de arquivo: as bibliotecas só são
+# verificadas aqui e importadas quando um documento do tipo chega
+def _installed(*modules: str) -> bool:
+    return all(importlib.util.find_spec(module) is not None for module in modules)
+
+PDF_AVAILABLE = _installed("PyPDF2", "pdfplumber")
+WEB_SCRAPING_AVAILABLE = _installed("bs4")
+DOCX_AVAILABLE = _installed("docx")
 
 class DocumentProcessor:
     """
@@ -37,7 +46,7 @@ class DocumentProcessor:
     Suporta URLs, PDFs, TXT, DOCX e outros formatos.
     """
     
-    def __init__(self):
+    def __init__(self, chunker: Chunker = None):
         load_dotenv()
         self.supported_formats = {
             '.txt': self._process_text,
@@ -49,44 +58,156 @@ class DocumentProcessor:
         }
         
         self.max_file_size = 50 * 1024 * 1024  # 50MB
-        self.chunk_size = 1000  # Tamanho dos chunks
-        self.chunk_overlap = 200  # Sobreposição entre chunks
+        self.spool_threshold = 5 * 1024 * 1024  # Downloads maiores vão para disco
+        self.download_block_size = 64 * 1024
+        self.download_timeout = 120
+        # Chunks por estrutura (títulos, parágrafos, frases), medidos em tokens.
+        # Quem grava os chunks (ex.: PostgresRAGSystem) passa o seu chunker, com
+        # o tokenizador e o limite do modelo de embedding.
+        self.chunker = chunker or Chunker()
     
     async def process_url(self, url: str, source_name: str = None) -> Dict:
-        """Processa uma URL e extrai o conteúdo."""
-        if not WEB_SCRAPING_AVAILABLE:
-            raise ImportError("beautifulsoup4 e requests são necessários para processar URLs")
-        
+        """
+        Processa uma URL e extrai o conteúdo.
+
+        O corpo é baixado uma única vez, em streaming, para um arquivo
+        temporário (em memória até spool_threshold) com o limite de tamanho
+        verificado durante o download. O tipo é detectado pelo cabeçalho
+        Content-Type e pelos bytes iniciais do conteúdo.
+        """
         try:
             print(f"🌐 Processando URL: {url}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=30) as response:
-                    if response.status != 200:
-                        raise Exception(f"Erro HTTP {response.status}")
-                    
-                    content_type = response.headers.get('content-type', '').lower()
-                    content = await response.text()
-            
-            # Detectar tipo de conteúdo
-            if 'pdf' in content_type:
-                # Para PDFs via URL, baixar primeiro
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as response:
-                        pdf_content = await response.read()
-                        return await self._process_pdf_bytes(pdf_content, source_name or url)
-            
-            elif 'html' in content_type or url.startswith('http'):
-                return await self._process_html_content(content, source_name or url)
-            
-            else:
-                # Tratar como texto
-                return await self._process_text_content(content, source_name or url)
+            buffer, content_type, charset = await self.download(url)
+            with buffer:
+                kind = self.detect_type(buffer, content_type, url)
+                return await self._process_buffer(buffer, kind, source_name or url, charset)
             
         except Exception as e:
             print(f"❌ Erro ao processar URL {url}: {e}")
             raise
     
+    async def download(self, url: str) -> Tuple[BinaryIO, str, Optional[str]]:
+        """Baixa a URL em streaming para um arquivo temporário, respeitando max_file_size."""
+        session = get_session("documents")
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.download_timeout)) as response:
+            if response.status != 200:
+                raise Exception(f"Erro HTTP {response.status}")
+            
+            if response.content_length and response.content_length > self.max_file_size:
+                raise ValueError(f"Arquivo muito grande: {response.content_length} bytes")
+            
+            buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_threshold)
+            try:
+                size = 0
+                async for block in response.content.iter_chunked(self.download_block_size):
+                    size += len(block)
+                    if size > self.max_file_size:
+                        raise ValueError(f"Arquivo muito grande: mais de {self.max_file_size} bytes")
+                    buffer.write(block)
+            except BaseException:
+                buffer.close()
+                raise
+            
+            buffer.seek(0)
+            return buffer, response.headers.get('content-type', '').lower(), response.charset
+    
+    @staticmethod
+    def detect_type(buffer: BinaryIO, content_type: str = "", name: str = "") -> str:
+        """
+        Detecta o tipo do documento ('pdf', 'docx', 'html' ou 'text').
+        Os bytes iniciais têm prioridade, pois servidores costumam enviar
+        application/octet-stream para arquivos binários.
+        """
+        head = buffer.read(SNIFF_SIZE)
+        buffer.seek(0)
+        
+        # A especificação permite bytes antes do cabeçalho %PDF- (até 1 KB)
+        if b'%PDF-' in head[:1024]:
+            return 'pdf'
+        if head.startswith(b'PK\x03\x04') and (
+            'officedocument' in content_type or name.lower().split('?')[0].endswith('.docx')
+        ):
+            return 'docx'
+        if 'pdf' in content_type:
+            return 'pdf'
+        
+        start = head.lstrip()[:256].lower()
+        if 'html' in content_type or start.startswith(b'<!doctype html') or b'<html' in start:
+            return 'html'
+        return 'text'
+    
+    async def _process_buffer(self, buffer: BinaryIO, kind: str, source_name: str,
+                              charset: Optional[str] = None) -> Dict:
+        """Encaminha o conteúdo baixado ao extrator do tipo detectado."""
+        if kind == 'pdf':
+            return await self._process_pdf_bytes(buffer, source_name)
+        
+        if kind == 'docx':
+            return await self._process_docx(buffer, source_name)
+        
+        text = self._decode(buffer.read(), charset)
+        if kind == 'html':
+            return await self._process_html_content(text, source_name)
+        
+        return await self._process_text_content(text, source_name)
+    
+    async def iter_text(self, buffer: BinaryIO, kind: str, charset: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Gera o texto do documento em trechos, sem materializá-lo por inteiro
+        quando o formato permite (PDF por página, texto por bloco, DOCX por
+        grupo de parágrafos). HTML precisa do documento completo para o parser.
+        """
+        if kind == 'pdf':
+            async for page in get_pdf_extractor().iter_pages(buffer):
+                if page.text:
+                    yield page.text + "\n"
+        
+        elif kind == 'docx':
+            if not DOCX_AVAILABLE:
+                raise ImportError("python-docx é necessário para processar arquivos DOCX")
+            import docx
+            document = await asyncio.to_thread(docx.Document, buffer)
+            parts, size = [], 0
+            for paragraph in document.paragraphs:
+                parts.append(paragraph.text + "\n")
+                size += len(parts[-1])
+                if size >= TEXT_BLOCK_SIZE:
+                    yield "".join(parts)
+                    parts, size = [], 0
+            if parts:
+                yield "".join(parts)
+        
+        elif kind == 'html':
+            if not WEB_SCRAPING_AVAILABLE:
+                raise ImportError("beautifulsoup4 é necessário para processar HTML")
+            html = self._decode(await asyncio.to_thread(buffer.read), charset)
+            text, _ = await asyncio.to_thread(self._html_to_text, html)
+            yield text
+        
+        else:
+            try:
+                decoder = codecs.getincrementaldecoder(charset or 'utf-8')(errors='ignore')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+            while True:
+                block = await asyncio.to_thread(buffer.read, TEXT_BLOCK_SIZE)
+                if not block:
+                    break
+                text = decoder.decode(block)
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+    
+    @staticmethod
+    def _decode(data: bytes, charset: Optional[str]) -> str:
+        try:
+            return data.decode(charset or 'utf-8', errors='ignore')
+        except LookupError:
+            return data.decode('utf-8', errors='ignore')
+    
     async def process_file(self, file_path: str, source_name: str = None) -> Dict:
         """Processa um arquivo local."""
         file_path = Path(file_path)
@@ -113,29 +234,22 @@ class DocumentProcessor:
             print(f"📎 Processando anexo Discord: {filename}")
             
             # Baixar o arquivo
-            async with aiohttp.ClientSession() as session:
-                async with session.get(attachment_url) as response:
-                    if response.status != 200:
-                        raise Exception(f"Erro ao baixar anexo: HTTP {response.status}")
-                    
-                    content = await response.read()
+            buffer, content_type, charset = await self.download(attachment_url)
             
             # Detectar tipo de arquivo
             extension = Path(filename).suffix.lower()
             
-            if extension == '.pdf' and PDF_AVAILABLE:
-                return await self._process_pdf_bytes(content, source_name or filename)
-            
-            elif extension in ['.txt', '.md']:
-                text_content = content.decode('utf-8', errors='ignore')
-                return await self._process_text_content(text_content, source_name or filename)
-            
-            elif extension in ['.html', '.htm']:
-                html_content = content.decode('utf-8', errors='ignore')
-                return await self._process_html_content(html_content, source_name or filename)
+            with buffer:
+                if extension == '.pdf' and PDF_AVAILABLE:
+                    return await self._process_pdf_bytes(buffer, source_name or filename)
+                
+                elif extension in ['.txt', '.md']:
+                    return await self._process_buffer(buffer, 'text', source_name or filename, charset)
+                
+                elif extension in ['.html', '.htm']:
+                    return await self._process_buffer(buffer, 'html', source_name or filename, charset)
             
-            else:
-                raise ValueError(f"Formato de anexo não suportado: {extension}")
+            raise ValueError(f"Formato de anexo não suportado: {extension}")
             
         except Exception as e:
             print(f"❌ Erro ao processar anexo {filename}: {e}")
@@ -169,38 +283,35 @@ class DocumentProcessor:
         if not PDF_AVAILABLE:
             raise ImportError("PyPDF2 ou pdfplumber são necessários para processar PDFs")
         
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        return await self._process_pdf_bytes(content, source_name)
+        # Os processos de extração leem direto do arquivo
+        return await self._process_pdf_bytes(file_path, source_name)
     
-    async def _process_pdf_bytes(self, pdf_bytes: bytes, source_name: str) -> Dict:
-        """Processa bytes de PDF."""
+    async def _process_pdf_bytes(self, pdf_bytes: Union[bytes, BinaryIO, Path], source_name: str) -> Dict:
+        """
+        Processa um PDF (bytes, arquivo binário aberto ou caminho).
+
+        As páginas são extraídas em paralelo no pool de processos do
+        PdfExtractor e divididas em chunks à medida que chegam.
+        """
         try:
-            # Tentar com pdfplumber primeiro (melhor para texto)
-            import io
-            text_content = ""
+            extractor = get_pdf_extractor()
+            splitter = self._stream_splitter()
+            chunks: List[str] = []
             
-            if 'pdfplumber' in globals():
-                import pdfplumber
-                with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_content += page_text + "\n"
+            char_count = word_count = 0
+            async for page in extractor.iter_pages(pdf_bytes):
+                if not page.text:
+                    continue
+                text = page.text + "\n"
+                char_count += len(text)
+                word_count += len(text.split())
+                chunks.extend(chunk.text for chunk in splitter.feed(text))
             
-            # Fallback para PyPDF2
-            if not text_content and PDF_AVAILABLE:
-                import PyPDF2
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text() + "\n"
-            
-            if not text_content:
+            if not char_count:
                 raise Exception("Não foi possível extrair texto do PDF")
+            chunks.extend(chunk.text for chunk in splitter.finish())
             
-            chunks = self._split_text(text_content)
-            
+            stats = extractor.last_stats
             return {
                 'source': source_name,
                 'type': 'pdf',
@@ -208,9 +319,10 @@ class DocumentProcessor:
                 'chunks': chunks,
                 'metadata': {
                     'processed_at': datetime.now().isoformat(),
-                    'char_count': len(text_content),
-                    'word_count': len(text_content.split()),
-                    'pages': len(pdf_reader.pages) if 'pdf_reader' in locals() else 'unknown'
+                    'char_count': char_count,
+                    'word_count': word_count,
+                    'pages': stats.pages,
+                    'extraction': stats.to_dict()
                 }
             }
             
@@ -230,18 +342,7 @@ class DocumentProcessor:
         if not WEB_SCRAPING_AVAILABLE:
             raise ImportError("beautifulsoup4 é necessário para processar HTML")
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remover scripts e estilos
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Extrair texto
-        text_content = soup.get_text()
-        
-        # Limpar texto
-        lines = (line.strip() for line in text_content.splitlines())
-        chunks_text = '\n'.join(chunk for chunk in lines if chunk)
+        chunks_text, title = self._html_to_text(html_content)
         
         chunks = self._split_text(chunks_text)
         
@@ -254,12 +355,29 @@ class DocumentProcessor:
                 'processed_at': datetime.now().isoformat(),
                 'char_count': len(chunks_text),
                 'word_count': len(chunks_text.split()),
-                'title': soup.title.string if soup.title else None
+                'title': title
             }
         }
     
-    async def _process_docx(self, file_path: Path, source_name: str) -> Dict:
-        """Processa arquivos DOCX."""
+    @staticmethod
+    def _html_to_text(html_content: str) -> Tuple[str, Optional[str]]:
+        """Texto limpo (sem scripts, estilos e linhas vazias) e título de um HTML."""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # Remover scripts e estilos
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # Extrair texto
+        text_content = soup.get_text()
+        
+        # Limpar texto
+        lines = (line.strip() for line in text_content.splitlines())
+        return '\n'.join(chunk for chunk in lines if chunk), (soup.title.string if soup.title else None)
+    
+    async def _process_docx(self, file_path: Union[Path, BinaryIO], source_name: str) -> Dict:
+        """Processa arquivos DOCX (caminho ou arquivo binário já aberto)."""
         if not DOCX_AVAILABLE:
             raise ImportError("python-docx é necessário para processar arquivos DOCX")
         
@@ -285,20 +403,9 @@ class DocumentProcessor:
             }
         }
     
+    def _stream_splitter(self) -> ChunkStream:
+        return self.chunker.stream()
+    
     def _split_text(self, text: str) -> List[str]:
-        """Divide o texto em chunks com sobreposição."""
-        if len(text) < self.chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start = end - self.chunk_overlap if end < len(text) else end
-            
-            if start >= len(text):
-                break
-        
-        return chunks
\ No newline at end of file
+        """Divide o texto em chunks pela estrutura do documento (ver Chunker)."""
+        return [chunk.text for chunk in self.chunker.split(text)]
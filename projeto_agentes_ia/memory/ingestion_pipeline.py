@@ -0,0 +1,267 @@
+# memory/ingestion_pipeline.py
+import asyncio
+import contextlib
+import inspect
+import re
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from memory.document_processor import DocumentProcessor, EXTENSION_TYPES
+from memory.chunker import Chunk, Chunker
+
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_SPACES = re.compile(r'[ \t\u00a0]+')
+_TRAILING_SPACES = re.compile(r' +\n')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+# Marca de fim de fluxo entre os estágios
+_DONE = object()
+
+
+def normalize_text(text: str) -> str:
+    """Remove caracteres de controle e colapsa espaços e linhas em branco repetidas."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = _CONTROL_CHARS.sub('', text)
+    text = _SPACES.sub(' ', text)
+    text = _TRAILING_SPACES.sub('\n', text)
+    return _BLANK_LINES.sub('\n\n', text)
+
+
+@dataclass
+class IngestionProgress:
+    """Andamento de uma ingestão; também é o relatório final."""
+    source: str
+    type: str
+    char_count: int = 0
+    word_count: int = 0
+    chunks: int = 0
+    reused: int = 0
+    embedded: int = 0
+    stored: int = 0
+    removed: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+    done: bool = False
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.stored / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data.pop('started_at')
+        data['chunks_per_second'] = round(self.chunks_per_second, 2)
+        return data
+
+
+ProgressCallback = Callable[[IngestionProgress], Union[None, Awaitable[None]]]
+
+
+class IngestionPipeline:
+    """
+    Ingestão de documentos em estágios encadeados por geradores assíncronos:
+    extração → normalização → chunking → embedding em lote → inserção em lote.
+    Ao reprocessar uma fonte, chunks cujo id já está gravado não passam de
+    novo pelo embedding, e os que deixaram de existir são removidos.
+
+    Os cinco estágios rodam em paralelo e se comunicam por filas limitadas
+    (queue_size), então um estágio lento segura os anteriores em vez de
+    acumular dados: a memória de pico depende do tamanho dos lotes, não do
+    tamanho do documento. A pressão chega à extração: o PdfExtractor só
+    agenda novas faixas de páginas quando as anteriores são consumidas.
+    """
+
+    def __init__(self, rag_system, processor: DocumentProcessor = None, queue_size: int = 4,
+                 embed_batch_size: int = 32, insert_batch_size: int = 64):
+        self.rag_system = rag_system
+        # Um só chunker (e contagem de tokens) para o pipeline e o processador:
+        # o do sistema RAG, quando ele define um
+        rag_chunker = getattr(rag_system, 'chunker', None)
+        self.processor = processor or DocumentProcessor(chunker=rag_chunker)
+        if rag_chunker is not None:
+            self.processor.chunker = rag_chunker
+        self.chunker: Chunker = self.processor.chunker
+        self.queue_size = queue_size
+        self.embed_batch_size = embed_batch_size
+        self.insert_batch_size = insert_batch_size
+
+    async def ingest_url(self, url: str, source: str, metadata: Dict = None,
+                         on_progress: ProgressCallback = None) -> IngestionProgress:
+        """Baixa a URL uma vez e ingere o conteúdo no RAG."""
+        buffer, content_type, charset = await self.processor.download(url)
+        with buffer:
+            kind = self.processor.detect_type(buffer, content_type, url)
+            return await self.run(self.processor.iter_text(buffer, kind, charset), source, kind,
+                                  metadata, on_progress)
+
+    async def ingest_attachment(self, url: str, filename: str, source: str, metadata: Dict = None,
+                                on_progress: ProgressCallback = None) -> IngestionProgress:
+        """Baixa um anexo (tipo pela extensão) e ingere o conteúdo no RAG."""
+        kind = EXTENSION_TYPES.get(Path(filename).suffix.lower())
+        if kind is None:
+            raise ValueError(f"Formato de anexo não suportado: {Path(filename).suffix.lower()}")
+
+        buffer, _, charset = await self.processor.download(url)
+        with buffer:
+            return await self.run(self.processor.iter_text(buffer, kind, charset), source, kind,
+                                  metadata, on_progress)
+
+    async def ingest_text(self, text: str, source: str, metadata: Dict = None,
+                          on_progress: ProgressCallback = None) -> IngestionProgress:
+        async def single():
+            yield text
+        return await self.run(single(), source, 'text', metadata, on_progress)
+
+    async def run(self, pieces: AsyncIterator[str], source: str, kind: str, metadata: Dict = None,
+                  on_progress: ProgressCallback = None) -> IngestionProgress:
+        """Executa os estágios sobre os trechos de texto extraídos."""
+        # Uma ingestão por fonte de cada vez, do diff no registro até o commit
+        source_lock = getattr(self.rag_system, 'source_lock', None)
+        async with (source_lock(source) if source_lock else contextlib.nullcontext()):
+            return await self._run(pieces, source, kind, metadata, on_progress)
+
+    async def _run(self, pieces: AsyncIterator[str], source: str, kind: str, metadata: Dict,
+                   on_progress: ProgressCallback) -> IngestionProgress:
+        progress = IngestionProgress(source=source, type=kind)
+        known = await self.rag_system.existing_chunk_ids(source)
+        seen: Dict[str, None] = {}
+        base_metadata = {
+            "type": kind,
+            "processed_at": datetime.now().isoformat(),
+            **(metadata or {})
+        }
+
+        raw_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        text_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size * self.embed_batch_size)
+        embedded_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        stages = [
+            asyncio.ensure_future(self._extract_stage(pieces, raw_queue)),
+            asyncio.ensure_future(self._normalize_stage(raw_queue, text_queue, progress)),
+            asyncio.ensure_future(self._chunk_stage(text_queue, chunk_queue, progress, known, seen)),
+            asyncio.ensure_future(self._embed_stage(chunk_queue, embedded_queue, progress)),
+            asyncio.ensure_future(self._store_stage(embedded_queue, base_metadata, progress, on_progress))
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            # Uma falha em qualquer estágio interrompe os demais
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+
+        # Registro da fonte atualizado só depois que todos os chunks novos foram gravados
+        progress.removed = await self.rag_system.commit_source(
+            source, list(seen), known - seen.keys(), {"type": kind, "chunks": progress.chunks}
+        )
+
+        progress.done = True
+        progress.seconds = time.perf_counter() - progress.started_at
+        await self._notify(on_progress, progress)
+        print(f"📚 Ingestão de {source}: {progress.stored} chunks novos, {progress.reused} reaproveitados, "
+              f"{progress.removed} removidos em {progress.seconds:.2f}s ({progress.chunks_per_second:.1f} chunks/s)")
+        return progress
+
+    @staticmethod
+    async def _extract_stage(pieces: AsyncIterator[str], out: asyncio.Queue):
+        """Consome o extrator (páginas, blocos de texto) só quando há espaço na fila."""
+        async for piece in pieces:
+            await out.put(piece)
+        await out.put(_DONE)
+
+    @staticmethod
+    async def _normalize_stage(inbox: asyncio.Queue, out: asyncio.Queue, progress: IngestionProgress):
+        while True:
+            piece = await inbox.get()
+            if piece is _DONE:
+                break
+            text = normalize_text(piece)
+            progress.char_count += len(text)
+            progress.word_count += len(text.split())
+            await out.put(text)
+
+        if not progress.char_count:
+            raise ValueError("Nenhum texto extraído do documento")
+        await out.put(_DONE)
+
+    async def _chunk_stage(self, inbox: asyncio.Queue, out: asyncio.Queue, progress: IngestionProgress,
+                           known: Set[str], seen: Dict[str, None]):
+        stream = self.chunker.stream()
+        while True:
+            text = await inbox.get()
+            if text is _DONE:
+                break
+            for chunk in stream.feed(text):
+                await self._emit(chunk, out, progress, known, seen)
+
+        for chunk in stream.finish():
+            await self._emit(chunk, out, progress, known, seen)
+        await out.put(_DONE)
+
+    @staticmethod
+    async def _emit(chunk: Chunk, out: asyncio.Queue, progress: IngestionProgress, known: Set[str],
+                    seen: Dict[str, None]):
+        progress.chunks += 1
+        if chunk.id in known or chunk.id in seen:
+            # Conteúdo inalterado: o embedding gravado continua válido
+            progress.reused += 1
+        else:
+            await out.put(chunk)
+        seen[chunk.id] = None
+
+    async def _embed_stage(self, inbox: asyncio.Queue, out: asyncio.Queue, progress: IngestionProgress):
+        finished = False
+        while not finished:
+            batch: List[Chunk] = []
+            while len(batch) < self.embed_batch_size:
+                item = await inbox.get()
+                if item is _DONE:
+                    finished = True
+                    break
+                batch.append(item)
+
+            if batch:
+                # O modelo de embedding é síncrono (CPU): roda fora do loop de eventos
+                embeddings = await asyncio.to_thread(self.rag_system.generate_embeddings,
+                                                     [chunk.text for chunk in batch])
+                progress.embedded += len(batch)
+                await out.put(list(zip(batch, embeddings)))
+        await out.put(_DONE)
+
+    async def _store_stage(self, inbox: asyncio.Queue, base_metadata: Dict, progress: IngestionProgress,
+                           on_progress: ProgressCallback):
+        pending: List[Tuple[Chunk, Optional[List[float]]]] = []
+        while True:
+            item = await inbox.get()
+            if item is not _DONE:
+                pending.extend(item)
+            if pending and (item is _DONE or len(pending) >= self.insert_batch_size):
+                rows = [
+                    (chunk.text, progress.source,
+                     {**base_metadata, "chunk_id": chunk.id, "chunk_index": chunk.index,
+                      "section": chunk.section, "tokens": chunk.tokens},
+                     embedding)
+                    for chunk, embedding in pending
+                ]
+                progress.stored += await self.rag_system.add_documents(rows)
+                pending = []
+                progress.seconds = time.perf_counter() - progress.started_at
+                await self._notify(on_progress, progress)
+            if item is _DONE:
+                break
+
+    @staticmethod
+    async def _notify(on_progress: ProgressCallback, progress: IngestionProgress):
+        if on_progress is None:
+            return
+        try:
+            result = on_progress(progress)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"⚠️ Erro ao reportar progresso da ingestão: {e}")
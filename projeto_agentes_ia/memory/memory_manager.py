@@ -3,11 +3,24 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import json
 import os
+import time
 from pathlib import Path
 import hashlib
+import logging
+import queue
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: sem trava entre processos
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
 @dataclass
 class ConversationEntry:
     """Representa uma entrada de conversa."""
@@ -51,6 +64,10 @@ class IsolatedFileMemoryService(BaseMemoryService):
     Cada combinação user_id + session_id tem seu próprio arquivo.
     """
 
+    # Travas entre processos distribuídas em faixas fixas: um único diretório
+    # com no máximo LOCK_STRIPES arquivos, em vez de um .lock por conversa
+    LOCK_STRIPES = 64
+
     def __init__(self, storage_path: str = "memory_storage"):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
@@ -69,33 +86,55 @@ class IsolatedFileMemoryService(BaseMemoryService):
         user_dir.mkdir(exist_ok=True)
         return user_dir
 
+    @contextmanager
+    def _conversation_lock(self, conversation_file: Path):
+        """
+        Trava exclusiva do arquivo da conversa entre processos (vários workers
+        web gravando a mesma conversa). Sem fcntl, não trava.
+        """
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        lock_dir = self.storage_path / ".locks"
+        lock_dir.mkdir(exist_ok=True)
+        stripe = int(hashlib.md5(conversation_file.name.encode()).hexdigest(), 16) % self.LOCK_STRIPES
+        with open(lock_dir / f"stripe_{stripe:02d}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
     def save_conversation(self, entry: ConversationEntry) -> None:
         """Salva uma entrada de conversa no arquivo específico da conversa."""
         conversation_file = self._get_conversation_file(entry.user_id, entry.session_id)
 
-        # Carregar histórico existente desta conversa específica
-        conversations = []
-        if conversation_file.exists():
-            try:
-                with open(conversation_file, 'r', encoding='utf-8') as f:
-                    conversations = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                conversations = []
-
-        # Adicionar nova conversa
-        conversations.append(entry.to_dict())
-
-        # Manter apenas as últimas 100 interações por conversa
-        if len(conversations) > 100:
-            conversations = conversations[-100:]
-
-        # Salvar de volta no arquivo específico
         try:
-            with open(conversation_file, 'w', encoding='utf-8') as f:
-                json.dump(conversations, f, ensure_ascii=False, indent=2)
-            print(f"💾 Conversa salva: {conversation_file.name}")
+            with self._conversation_lock(conversation_file):
+                # Carregar histórico existente desta conversa específica
+                conversations = []
+                if conversation_file.exists():
+                    try:
+                        with open(conversation_file, 'r', encoding='utf-8') as f:
+                            conversations = json.load(f)
+                    except (json.JSONDecodeError, FileNotFoundError):
+                        conversations = []
+
+                # Adicionar nova conversa
+                conversations.append(entry.to_dict())
+
+                # Manter apenas as últimas 100 interações por conversa
+                if len(conversations) > 100:
+                    conversations = conversations[-100:]
+
+                # Gravar em arquivo temporário e trocar: leitores nunca veem JSON pela metade
+                tmp_path = conversation_file.with_name(f"{conversation_file.name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(conversations, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, conversation_file)
+            logger.debug("Conversa salva: %s", conversation_file.name)
         except Exception as e:
-            print(f"❌ Erro ao salvar conversa: {e}")
+            logger.error("Erro ao salvar conversa: %s", e)
 
     def get_conversation_history(self, user_id: str, session_id: str = None, limit: int = 10) -> List[ConversationEntry]:
         """Recupera o histórico de uma conversa específica."""
@@ -187,11 +226,97 @@ class IsolatedFileMemoryService(BaseMemoryService):
 
         return sorted(conversations_info, key=lambda x: x['last_time'], reverse=True)
 
+class MemoryWriteBehind:
+    """
+    Fila de gravações de memória executadas por uma thread de fundo, fora do
+    loop de eventos. flush() espera a fila esvaziar (encerramento gracioso).
+    A thread é recriada sob demanda após um fork (workers do servidor web).
+    """
+
+    def __init__(self):
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        # Itens ainda não gravados, por chave (leituras os mesclam: read-your-writes)
+        self._pending_items: Dict[Any, List[Any]] = {}
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._pending_items = {}
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._worker, name="memory-write-behind", daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        pending = self._queue
+        while True:
+            func, args, key, item = pending.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error("Erro na gravação de memória em segundo plano: %s", e)
+            finally:
+                if key is not None:
+                    self._discard_item(key, item)
+                pending.task_done()
+
+    def _discard_item(self, key, item):
+        with self._lock:
+            items = self._pending_items.get(key, [])
+            for index, pending_item in enumerate(items):
+                if pending_item is item:
+                    del items[index]
+                    break
+            if not items:
+                self._pending_items.pop(key, None)
+
+    def submit(self, func, *args, key=None, item=None):
+        """Enfileira func(*args); com key, item fica visível em pending_items até ser gravado."""
+        self._ensure_started()
+        if key is not None:
+            with self._lock:
+                self._pending_items.setdefault(key, []).append(item)
+        self._queue.put((func, args, key, item))
+
+    def pending_items(self, key) -> List[Any]:
+        """Itens enfileirados com esta chave e ainda não gravados neste processo."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return []
+            return list(self._pending_items.get(key, ()))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks if self._queue is not None and self._pid == os.getpid() else 0
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Espera as gravações pendentes; False se o prazo acabar antes."""
+        if self._queue is None or self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                logger.warning("%d gravações de memória pendentes após %.0fs", self._queue.unfinished_tasks, timeout)
+                return False
+            time.sleep(0.01)
+        return True
+
+
+# Uma fila por processo, compartilhada por todos os MemoryManager
+memory_writer = MemoryWriteBehind()
+
+
 class MemoryManager:
     """Gerenciador principal de memória com suporte a conversas isoladas."""
 
-    def __init__(self, memory_service: BaseMemoryService = None):
+    def __init__(self, memory_service: BaseMemoryService = None, write_behind: bool = None):
         self.memory_service = memory_service or IsolatedFileMemoryService()
+        # Gravação em segundo plano: ativada pelo servidor multi-worker (MEMORY_WRITE_BEHIND=1)
+        self.write_behind = os.getenv("MEMORY_WRITE_BEHIND") == "1" if write_behind is None else write_behind
 
     def save_interaction(self, user_id: str, session_id: str, user_message: str,
                            agent_response: str, agent_type: str, metadata: Dict = None) -> None:
@@ -206,11 +331,34 @@ class MemoryManager:
             metadata=metadata or {}
         )
 
-        self.memory_service.save_conversation(entry)
+        if self.write_behind:
+            memory_writer.submit(self.memory_service.save_conversation, entry,
+                                 key=self._pending_key(user_id, session_id), item=entry)
+        else:
+            self.memory_service.save_conversation(entry)
+
+    def _pending_key(self, user_id: str, session_id: str) -> tuple:
+        return (str(getattr(self.memory_service, 'storage_path', id(self.memory_service))), user_id, session_id)
+
+    def _get_history(self, user_id: str, session_id: str, limit: int) -> List[ConversationEntry]:
+        """Histórico gravado mais as interações ainda na fila de gravação."""
+        # Fila lida antes do arquivo: um item gravado entre as duas leituras aparece
+        # nas duas e é descartado abaixo, em vez de sumir das duas
+        pending = memory_writer.pending_items(self._pending_key(user_id, session_id)) if self.write_behind else []
+        history = self.memory_service.get_conversation_history(user_id, session_id, limit)
+        if not pending:
+            return history
+        saved = {(entry.timestamp, entry.user_message) for entry in history}
+        history = history + [entry for entry in pending if (entry.timestamp, entry.user_message) not in saved]
+        return history[-limit:]
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Conclui as gravações em segundo plano pendentes."""
+        return memory_writer.flush(timeout)
 
     def get_context_for_agent(self, user_id: str, session_id: str = None, limit: int = 5) -> str:
         """Gera contexto de conversa específica para o agente."""
-        history = self.memory_service.get_conversation_history(user_id, session_id, limit)
+        history = self._get_history(user_id, session_id, limit)
 
         if not history:
             return "Esta é uma nova conversa."
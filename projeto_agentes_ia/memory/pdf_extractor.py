@@ -0,0 +1,304 @@
+# memory/pdf_extractor.py
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
+
+# Bibliotecas de PDF importadas só nos processos que extraem páginas
+PYPDF2_AVAILABLE = importlib.util.find_spec("PyPDF2") is not None
+PDFPLUMBER_AVAILABLE = importlib.util.find_spec("pdfplumber") is not None
+
+PdfSource = Union[bytes, bytearray, BinaryIO, str, Path]
+
+
+class PageTimeout(Exception):
+    """Extração de uma página excedeu o tempo limite."""
+
+
+@dataclass
+class PageText:
+    """Texto extraído de uma página (número a partir de 1)."""
+    number: int
+    text: str
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class ExtractionStats:
+    """Resumo de uma extração: páginas, falhas e vazão."""
+    pages: int = 0
+    extracted: int = 0
+    timed_out: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['pages_per_second'] = round(self.pages_per_second, 2)
+        return data
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _extract_page_range(path: str, start: int, end: int, page_timeout: float) -> List[Tuple]:
+    """
+    Executado no processo de trabalho: extrai as páginas [start, end).
+
+    Cada página tem seu próprio alarme (SIGALRM), então uma página
+    problemática não derruba o restante do lote. Páginas sem texto no
+    pdfplumber são tentadas novamente com PyPDF2.
+    """
+    use_alarm = page_timeout > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_page_timeout)
+
+    if PDFPLUMBER_AVAILABLE:
+        import pdfplumber
+    if PYPDF2_AVAILABLE:
+        import PyPDF2
+
+    results = []
+    plumber_doc = pdfplumber.open(path) if PDFPLUMBER_AVAILABLE else None
+    reader = None
+    try:
+        for index in range(start, end):
+            text, timed_out, error = "", False, None
+            try:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+                if plumber_doc is not None:
+                    text = plumber_doc.pages[index].extract_text() or ""
+                    # Liberar objetos da página já processada
+                    plumber_doc.pages[index].flush_cache()
+                if not text and PYPDF2_AVAILABLE:
+                    if reader is None:
+                        reader = PyPDF2.PdfReader(path)
+                    text = reader.pages[index].extract_text() or ""
+            except PageTimeout:
+                timed_out = True
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            finally:
+                if use_alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+            results.append((index + 1, text, timed_out, error))
+    finally:
+        if plumber_doc is not None:
+            plumber_doc.close()
+    return results
+
+
+def _mp_context():
+    """
+    Processos de extração iniciados por forkserver (ou spawn): um fork do
+    processo do bot/servidor herdaria threads, locks e conexões abertas.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def count_pages(path: str) -> int:
+    if PYPDF2_AVAILABLE:
+        import PyPDF2
+        return len(PyPDF2.PdfReader(path).pages)
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+class PdfExtractor:
+    """
+    Extração de texto de PDFs em paralelo, por faixas de páginas, em um
+    ProcessPoolExecutor.
+
+    O documento é gravado uma vez em disco e cada processo abre apenas as
+    páginas da sua faixa. As páginas são entregues em ordem, assim que a
+    faixa correspondente termina, sem bloquear o loop de eventos. No máximo
+    max_in_flight faixas ficam agendadas à frente de quem consome as páginas.
+    Com max_workers=0 a extração roda em uma thread (sem processos).
+    """
+
+    def __init__(self, max_workers: int = None, pages_per_task: int = 8, page_timeout: float = 30):
+        if max_workers is None:
+            max_workers = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_workers = max_workers
+        self.pages_per_task = max(1, pages_per_task)
+        self.page_timeout = page_timeout
+        # Faixas agendadas à frente do consumidor: mantém os processos ocupados
+        # sem acumular o documento inteiro em memória quando o consumo é lento
+        self.max_in_flight = max(1, self.max_workers) * 2
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.last_stats: Optional[ExtractionStats] = None
+
+    @property
+    def available(self) -> bool:
+        return PDFPLUMBER_AVAILABLE or PYPDF2_AVAILABLE
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+        return self._executor
+
+    def _recycle_executor(self, executor: ProcessPoolExecutor):
+        """
+        Descarta um pool com processo preso (faixa que estourou o tempo): os
+        processos são encerrados e o próximo uso cria um pool novo. Faixas que
+        estavam no pool descartado são refeitas uma vez (_extract_range).
+        """
+        if self._executor is executor:
+            self._executor = None
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    async def iter_pages(self, source: PdfSource) -> AsyncIterator[PageText]:
+        """Gera o texto das páginas em ordem, conforme as faixas são concluídas."""
+        if not self.available:
+            raise ImportError("PyPDF2 ou pdfplumber são necessários para processar PDFs")
+
+        stats = ExtractionStats()
+        started = time.perf_counter()
+        path, temporary = await asyncio.to_thread(self._materialize, source)
+        try:
+            stats.pages = await asyncio.to_thread(count_pages, path)
+            ranges = [(start, min(start + self.pages_per_task, stats.pages))
+                      for start in range(0, stats.pages, self.pages_per_task)]
+
+            loop = asyncio.get_running_loop()
+            # Uma faixa por processo em execução: o tempo limite conta só a execução, não a fila
+            slots = asyncio.Semaphore(max(1, self.max_workers))
+            pending = deque(ranges)
+            tasks = deque()
+
+            def schedule():
+                while pending and len(tasks) < self.max_in_flight:
+                    start, end = pending.popleft()
+                    tasks.append(asyncio.ensure_future(self._run_range(loop, slots, path, start, end)))
+
+            try:
+                # Faixas concluem fora de ordem; as páginas saem na ordem do documento.
+                # Uma faixa nova só é agendada quando a mais antiga é consumida
+                schedule()
+                while tasks:
+                    rows = await tasks.popleft()
+                    schedule()
+                    for page in rows:
+                        if page.timed_out:
+                            stats.timed_out += 1
+                        elif page.error:
+                            stats.failed += 1
+                        else:
+                            stats.extracted += 1
+                        yield page
+            finally:
+                for task in tasks:
+                    task.cancel()
+        finally:
+            stats.seconds = time.perf_counter() - started
+            self.last_stats = stats
+            if temporary:
+                os.unlink(path)
+
+        print(f"📄 PDF: {stats.pages} páginas em {stats.seconds:.2f}s "
+              f"({stats.pages_per_second:.1f} páginas/s, {stats.timed_out} com timeout, {stats.failed} com erro)")
+
+    async def _run_range(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore,
+                         path: str, start: int, end: int) -> List[PageText]:
+        async with slots:
+            return await self._extract_range(loop, path, start, end)
+
+    async def _extract_range(self, loop: asyncio.AbstractEventLoop, path: str, start: int, end: int,
+                             retry_broken: bool = True) -> List[PageText]:
+        # Margem além do limite por página cobre a abertura do documento no processo
+        budget = self.page_timeout * (end - start) + 30 if self.page_timeout > 0 else None
+        executor = self._get_executor()
+        try:
+            if executor is None:
+                rows = await asyncio.wait_for(
+                    asyncio.to_thread(_extract_page_range, path, start, end, 0), budget
+                )
+            else:
+                rows = await asyncio.wait_for(
+                    loop.run_in_executor(executor, _extract_page_range, path, start, end, self.page_timeout),
+                    budget
+                )
+        except asyncio.TimeoutError:
+            # O processo continua preso na página: sem reciclar, ocuparia a vaga para sempre
+            if executor is not None:
+                self._recycle_executor(executor)
+            return [PageText(number, "", timed_out=True) for number in range(start + 1, end + 1)]
+        except BrokenProcessPool as e:
+            if self._executor is executor:
+                self._executor = None
+            if retry_broken:
+                return await self._extract_range(loop, path, start, end, retry_broken=False)
+            return [PageText(number, "", error=str(e) or "BrokenProcessPool") for number in range(start + 1, end + 1)]
+        except Exception as e:
+            return [PageText(number, "", error=str(e) or e.__class__.__name__) for number in range(start + 1, end + 1)]
+        return [PageText(*row) for row in rows]
+
+    @staticmethod
+    def _materialize(source: PdfSource) -> Tuple[str, bool]:
+        """Garante um caminho em disco legível pelos processos. Retorna (caminho, temporário)."""
+        if isinstance(source, (str, Path)):
+            return str(source), False
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            if isinstance(source, (bytes, bytearray)):
+                tmp.write(source)
+            else:
+                source.seek(0)
+                while True:
+                    block = source.read(1024 * 1024)
+                    if not block:
+                        break
+                    tmp.write(block)
+        return tmp.name, True
+
+    async def extract_text(self, source: PdfSource) -> str:
+        """Texto completo do documento (páginas separadas por quebra de linha)."""
+        return "".join([page.text + "\n" async for page in self.iter_pages(source) if page.text])
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_default_extractor: Optional[PdfExtractor] = None
+
+
+def get_pdf_extractor() -> PdfExtractor:
+    """Extrator compartilhado (um único pool de processos por aplicação)."""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = PdfExtractor()
+    return _default_extractor
+
+
+def close_pdf_extractor():
+    """Encerra o pool do extrator compartilhado (desligamento do bot e do servidor web)."""
+    global _default_extractor
+    if _default_extractor is not None:
+        _default_extractor.close()
+        _default_extractor = None
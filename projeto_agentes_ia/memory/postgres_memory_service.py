@@ -3,12 +3,16 @@ import asyncio
 import asyncpg
 import json
 import os
+import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from dotenv import load_dotenv
 
 from .memory_manager import ConversationEntry, BaseMemoryService
+from observability import span
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class PostgresConfig:
@@ -69,22 +73,23 @@ class PostgresMemoryService(BaseMemoryService):
         if not self._initialized:
             await self.initialize()
         try:
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO agenteia.conversations 
-                    (user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    """,
-                    entry.user_id,
-                    entry.session_id,
-                    entry.agent_type,
-                    entry.user_message,
-                    entry.agent_response,
-                    json.dumps(entry.metadata or {}),
-                    datetime.fromisoformat(entry.timestamp)
-                )
-            print(f"💾 Conversa salva no PostgreSQL: {entry.user_id}/{entry.session_id}")
+            with span("db.query", db_system="postgresql", db_operation="save_conversation"):
+                async with self.pool.acquire() as conn:
+                    await conn.execute(
+                        """
+                        INSERT INTO agenteia.conversations 
+                        (user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7)
+                        """,
+                        entry.user_id,
+                        entry.session_id,
+                        entry.agent_type,
+                        entry.user_message,
+                        entry.agent_response,
+                        json.dumps(entry.metadata or {}),
+                        datetime.fromisoformat(entry.timestamp)
+                    )
+            logger.debug("Conversa salva no PostgreSQL: %s/%s", entry.user_id, entry.session_id)
         except Exception as e:
             print(f"❌ Erro ao salvar conversa: {e}")
             raise
@@ -93,29 +98,30 @@ class PostgresMemoryService(BaseMemoryService):
         if not self._initialized:
             await self.initialize()
         try:
-            async with self.pool.acquire() as conn:
-                if session_id:
-                    rows = await conn.fetch(
-                        """
-                        SELECT user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp
-                        FROM agenteia.conversations
-                        WHERE user_id = $1 AND session_id = $2
-                        ORDER BY timestamp DESC
-                        LIMIT $3
-                        """,
-                        user_id, session_id, limit
-                    )
-                else:
-                    rows = await conn.fetch(
-                        """
-                        SELECT user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp
-                        FROM agenteia.conversations
-                        WHERE user_id = $1
-                        ORDER BY timestamp DESC
-                        LIMIT $2
-                        """,
-                        user_id, limit
-                    )
+            with span("db.query", db_system="postgresql", db_operation="get_conversation_history"):
+                async with self.pool.acquire() as conn:
+                    if session_id:
+                        rows = await conn.fetch(
+                            """
+                            SELECT user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp
+                            FROM agenteia.conversations
+                            WHERE user_id = $1 AND session_id = $2
+                            ORDER BY timestamp DESC
+                            LIMIT $3
+                            """,
+                            user_id, session_id, limit
+                        )
+                    else:
+                        rows = await conn.fetch(
+                            """
+                            SELECT user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp
+                            FROM agenteia.conversations
+                            WHERE user_id = $1
+                            ORDER BY timestamp DESC
+                            LIMIT $2
+                            """,
+                            user_id, limit
+                        )
             conversations = []
             for row in reversed(rows):
                 conversations.append(
@@ -138,20 +144,21 @@ class PostgresMemoryService(BaseMemoryService):
         if not self._initialized:
             await self.initialize()
         try:
-            async with self.pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp,
-                           ts_rank(to_tsvector('portuguese', user_message || ' ' || agent_response),
-                                   plainto_tsquery('portuguese', $2)) as rank
-                    FROM agenteia.conversations
-                    WHERE user_id = $1
-                      AND (to_tsvector('portuguese', user_message || ' ' || agent_response) @@ plainto_tsquery('portuguese', $2))
-                    ORDER BY rank DESC, timestamp DESC
-                    LIMIT $3
-                    """,
-                    user_id, query, limit
-                )
+            with span("db.query", db_system="postgresql", db_operation="search_conversations"):
+                async with self.pool.acquire() as conn:
+                    rows = await conn.fetch(
+                        """
+                        SELECT user_id, session_id, agent_type, user_message, agent_response, metadata, timestamp,
+                               ts_rank(to_tsvector('portuguese', user_message || ' ' || agent_response),
+                                       plainto_tsquery('portuguese', $2)) as rank
+                        FROM agenteia.conversations
+                        WHERE user_id = $1
+                          AND (to_tsvector('portuguese', user_message || ' ' || agent_response) @@ plainto_tsquery('portuguese', $2))
+                        ORDER BY rank DESC, timestamp DESC
+                        LIMIT $3
+                        """,
+                        user_id, query, limit
+                    )
             conversations = []
             for row in rows:
                 conversations.append(
@@ -174,19 +181,20 @@ class PostgresMemoryService(BaseMemoryService):
         if not self._initialized:
             await self.initialize()
         try:
-            async with self.pool.acquire() as conn:
-                if session_id:
-                    result = await conn.execute(
-                        "DELETE FROM agenteia.conversations WHERE user_id = $1 AND session_id = $2",
-                        user_id, session_id
-                    )
-                else:
-                    result = await conn.execute(
-                        "DELETE FROM agenteia.conversations WHERE user_id = $1",
-                        user_id
-                    )
+            with span("db.query", db_system="postgresql", db_operation="clear_conversation"):
+                async with self.pool.acquire() as conn:
+                    if session_id:
+                        result = await conn.execute(
+                            "DELETE FROM agenteia.conversations WHERE user_id = $1 AND session_id = $2",
+                            user_id, session_id
+                        )
+                    else:
+                        result = await conn.execute(
+                            "DELETE FROM agenteia.conversations WHERE user_id = $1",
+                            user_id
+                        )
             deleted_count = int(result.split()[-1])
-            print(f"🗑️ {deleted_count} conversas removidas")
+            logger.debug("%d conversas removidas", deleted_count)
             return deleted_count > 0
         except Exception as e:
             print(f"❌ Erro ao limpar conversas: {e}")
@@ -196,17 +204,18 @@ class PostgresMemoryService(BaseMemoryService):
         if not self._initialized:
             await self.initialize()
         try:
-            async with self.pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT session_id, agent_type, MIN(timestamp) as start_time, MAX(timestamp) as last_time, COUNT(*) as message_count
-                    FROM agenteia.conversations
-                    WHERE user_id = $1
-                    GROUP BY session_id, agent_type
-                    ORDER BY MAX(timestamp) DESC
-                    """,
-                    user_id
-                )
+            with span("db.query", db_system="postgresql", db_operation="get_user_sessions"):
+                async with self.pool.acquire() as conn:
+                    rows = await conn.fetch(
+                        """
+                        SELECT session_id, agent_type, MIN(timestamp) as start_time, MAX(timestamp) as last_time, COUNT(*) as message_count
+                        FROM agenteia.conversations
+                        WHERE user_id = $1
+                        GROUP BY session_id, agent_type
+                        ORDER BY MAX(timestamp) DESC
+                        """,
+                        user_id
+                    )
             sessions = []
             for row in rows:
                 sessions.append({
@@ -4,27 +4,32 @@ import asyncpg
 import json
 import os
 import hashlib
-from typing import List, Dict, Optional
+import importlib.util
+import logging
+from typing import List, Dict, Optional, Set, Tuple
+from contextlib import asynccontextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# sentence_transformers (e torch) e openai só são importados ao criar o
+# sistema com o modelo correspondente: a importação leva segundos e não
+# deve pesar no startup
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
 
 from .postgres_memory_service import PostgresConfig
+from .chunker import Chunker, tokenizer_counter, chunk_id
+from .source_registry import SourceRegistry
+from observability import span
+
+logger = logging.getLogger(__name__)
 
 class PostgresRAGSystem:
     """Sistema RAG usando PostgreSQL com pgvector."""
 
+    # Linhas por INSERT em add_documents (5 parâmetros cada, bem abaixo do limite de 32767)
+    INSERT_BATCH_ROWS = 500
+
     def __init__(self, config: PostgresConfig = None, embedding_model: str = "local"):
         load_dotenv()
         self.config = config or PostgresConfig(
@@ -35,72 +40,163 @@ class PostgresRAGSystem:
             password=os.getenv("POSTGRES_PASSWORD", "agenteia_password_2025")
         )
         self.pool: Optional[asyncpg.Pool] = None
+        self.registry: Optional[SourceRegistry] = None
         self._initialized = False
         self.embedding_model = embedding_model
         self.encoder = None
         if embedding_model == "local" and SENTENCE_TRANSFORMERS_AVAILABLE:
+            from sentence_transformers import SentenceTransformer
             self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
             self.embedding_dim = 384
         elif embedding_model == "openai" and OPENAI_AVAILABLE:
+            import openai
             openai.api_key = os.getenv("OPENAI_API_KEY")
+            self._openai = openai
             self.embedding_dim = 1536
         else:
             print("⚠️ Nenhum modelo de embedding disponível, usando busca textual")
             self.embedding_dim = None
+        # Chunks medidos com o tokenizador do próprio modelo, quando disponível
+        tokenizer = getattr(self.encoder, 'tokenizer', None)
+        self.chunker = Chunker(
+            max_tokens=min(240, getattr(self.encoder, 'max_seq_length', 256) - 16) if self.encoder else 240,
+            token_counter=tokenizer_counter(tokenizer) if tokenizer is not None else None
+        )
 
     async def initialize(self):
         if self._initialized:
             return
         try:
-            self.pool = await asyncpg.create_pool(
-                host=self.config.host,
-                port=self.config.port,
-                database=self.config.database,
-                user=self.config.user,
-                password=self.config.password,
-                min_size=2,
-                max_size=10
-            )
+            self.pool = await asyncpg.create_pool(min_size=2, max_size=10, **self._connect_kwargs())
+            self.registry = SourceRegistry(self.pool, connect=self._connect)
+            await self.registry.ensure_schema()
             self._initialized = True
             print(f"✅ PostgreSQL RAG inicializado: {self.embedding_model}")
         except Exception as e:
             print(f"❌ Erro ao conectar PostgreSQL RAG: {e}")
             raise
 
+    def _connect_kwargs(self) -> Dict:
+        return dict(host=self.config.host, port=self.config.port, database=self.config.database,
+                    user=self.config.user, password=self.config.password)
+
+    async def _connect(self) -> asyncpg.Connection:
+        """Conexão avulsa, fora do pool (travas de ingestão por fonte)."""
+        return await asyncpg.connect(**self._connect_kwargs())
+
     def generate_embedding(self, text: str) -> Optional[List[float]]:
         if not text.strip():
             return None
         try:
-            if self.embedding_model == "local" and self.encoder:
-                embedding = self.encoder.encode(text)
-                return embedding.tolist()
-            elif self.embedding_model == "openai" and OPENAI_AVAILABLE:
-                response = openai.Embedding.create(input=text, model="text-embedding-ada-002")
-                return response['data'][0]['embedding']
+            with span("embedding", model=self.embedding_model, texts=1):
+                if self.embedding_model == "local" and self.encoder:
+                    embedding = self.encoder.encode(text)
+                    return embedding.tolist()
+                elif self.embedding_model == "openai" and OPENAI_AVAILABLE:
+                    response = self._openai.Embedding.create(input=text, model="text-embedding-ada-002")
+                    return response['data'][0]['embedding']
             return None
         except Exception as e:
             print(f"❌ Erro ao gerar embedding: {e}")
             return None
 
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> List[Optional[List[float]]]:
+        """Embeddings de vários textos em lote (uma chamada ao modelo por lote)."""
+        if not texts:
+            return []
+        try:
+            with span("embedding", model=self.embedding_model, texts=len(texts)):
+                if self.embedding_model == "local" and self.encoder:
+                    vectors = self.encoder.encode(texts, batch_size=batch_size)
+                    return [vector.tolist() if text.strip() else None for text, vector in zip(texts, vectors)]
+                elif self.embedding_model == "openai" and OPENAI_AVAILABLE:
+                    response = self._openai.Embedding.create(input=texts, model="text-embedding-ada-002")
+                    return [item['embedding'] for item in response['data']]
+            return [None] * len(texts)
+        except Exception as e:
+            print(f"❌ Erro ao gerar embeddings em lote: {e}")
+            return [None] * len(texts)
+
+    async def add_documents(self, documents: List[Tuple[str, str, Dict, Optional[List[float]]]]) -> int:
+        """
+        Insere vários documentos (conteúdo, fonte, metadados, embedding) em
+        uma única transação. Conteúdo já gravado na mesma fonte é ignorado
+        pelo índice único (source, content_hash). Retorna quantos foram
+        realmente inseridos (RETURNING), sem contar os ignorados.
+        """
+        if not documents:
+            return 0
+        if not self._initialized:
+            await self.initialize()
+        rows = [(content, source, json.dumps(metadata or {}), embedding,
+                 (metadata or {}).get('chunk_id') or chunk_id(content))
+                for content, source, metadata, embedding in documents]
+        inserted = 0
+        with span("db.query", db_system="postgresql", db_operation="add_documents"):
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    # Um INSERT de várias linhas por lote: uma ida ao banco e a contagem exata
+                    for start in range(0, len(rows), self.INSERT_BATCH_ROWS):
+                        batch = rows[start:start + self.INSERT_BATCH_ROWS]
+                        values = ", ".join(
+                            f"(${i * 5 + 1}, ${i * 5 + 2}, ${i * 5 + 3}, ${i * 5 + 4}, ${i * 5 + 5})"
+                            for i in range(len(batch))
+                        )
+                        result = await conn.fetch(
+                            f"""
+                            INSERT INTO agenteia.documents (content, source, metadata, embedding, content_hash)
+                            VALUES {values}
+                            ON CONFLICT (source, content_hash) WHERE content_hash IS NOT NULL DO NOTHING
+                            RETURNING id
+                            """,
+                            *[value for row in batch for value in row]
+                        )
+                        inserted += len(result)
+        return inserted
+
+    async def existing_chunk_ids(self, source: str) -> Set[str]:
+        """Hashes dos chunks já gravados para a fonte, pelo registro de fontes."""
+        if not self._initialized:
+            await self.initialize()
+        record = await self.registry.get(source)
+        return set(record.chunk_hashes)
+
+    @asynccontextmanager
+    async def source_lock(self, source: str):
+        """Trava de ingestão da fonte (ver SourceRegistry.source_lock)."""
+        if not self._initialized:
+            await self.initialize()
+        async with self.registry.source_lock(source):
+            yield
+
+    async def commit_source(self, source: str, chunk_ids: List[str], removed: Set[str],
+                            metadata: Dict = None) -> int:
+        """Apaga os chunks que saíram do documento e atualiza o registro da fonte."""
+        if not self._initialized:
+            await self.initialize()
+        return await self.registry.commit(source, chunk_ids, removed, metadata)
+
     async def add_document(self, content: str, source: str = "manual", metadata: Dict = None) -> str:
         if not self._initialized:
             await self.initialize()
         try:
             embedding = self.generate_embedding(content)
-            doc_id = hashlib.md5(content.encode()).hexdigest()
-            async with self.pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO agenteia.documents (content, source, metadata, embedding)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT DO NOTHING
-                    """,
-                    content,
-                    source,
-                    json.dumps(metadata or {}),
-                    embedding
-                )
-            print(f"📚 Documento adicionado: {doc_id[:8]}...")
+            doc_id = chunk_id(content)
+            with span("db.query", db_system="postgresql", db_operation="add_document"):
+                async with self.pool.acquire() as conn:
+                    await conn.execute(
+                        """
+                        INSERT INTO agenteia.documents (content, source, metadata, embedding, content_hash)
+                        VALUES ($1, $2, $3, $4, $5)
+                        ON CONFLICT (source, content_hash) WHERE content_hash IS NOT NULL DO NOTHING
+                        """,
+                        content,
+                        source,
+                        json.dumps(metadata or {}),
+                        embedding,
+                        doc_id
+                    )
+            logger.debug("Documento adicionado: %s...", doc_id[:8])
             return doc_id
         except Exception as e:
             print(f"❌ Erro ao adicionar documento: {e}")
@@ -110,34 +206,35 @@ class PostgresRAGSystem:
         if not self._initialized:
             await self.initialize()
         try:
-            async with self.pool.acquire() as conn:
-                if self.embedding_dim:
-                    query_embedding = self.generate_embedding(query)
-                    if query_embedding:
+            # Embedding antes de pegar a conexão: o pool não fica preso durante o modelo
+            query_embedding = self.generate_embedding(query) if self.embedding_dim else None
+            rows = []
+            with span("db.query", db_system="postgresql", db_operation="search_documents"):
+                async with self.pool.acquire() as conn:
+                    if self.embedding_dim:
+                        if query_embedding:
+                            rows = await conn.fetch(
+                                """
+                                SELECT content, source, metadata, embedding <#> $1 as distance
+                                FROM agenteia.documents
+                                WHERE embedding IS NOT NULL
+                                ORDER BY embedding <#> $1
+                                LIMIT $2
+                                """,
+                                query_embedding, limit
+                            )
+                    else:
                         rows = await conn.fetch(
                             """
-                            SELECT content, source, metadata, embedding <#> $1 as distance
+                            SELECT content, source, metadata,
+                                   ts_rank(to_tsvector('portuguese', content), plainto_tsquery('portuguese', $1)) as rank
                             FROM agenteia.documents
-                            WHERE embedding IS NOT NULL
-                            ORDER BY embedding <#> $1
+                            WHERE to_tsvector('portuguese', content) @@ plainto_tsquery('portuguese', $1)
+                            ORDER BY rank DESC
                             LIMIT $2
                             """,
-                            query_embedding, limit
+                            query, limit
                         )
-                    else:
-                        rows = []
-                else:
-                    rows = await conn.fetch(
-                        """
-                        SELECT content, source, metadata,
-                               ts_rank(to_tsvector('portuguese', content), plainto_tsquery('portuguese', $1)) as rank
-                        FROM agenteia.documents
-                        WHERE to_tsvector('portuguese', content) @@ plainto_tsquery('portuguese', $1)
-                        ORDER BY rank DESC
-                        LIMIT $2
-                        """,
-                        query, limit
-                    )
             results = []
             for row in rows:
                 relevance = 1.0 - row.get('distance', 0.5) if 'distance' in row else row.get('rank', 0.5)
@@ -1,28 +1,47 @@
 from typing import List, Dict, Optional
+import functools
 import os
 from pathlib import Path
 import json
 from datetime import datetime
 import hashlib
+import logging
 
-try:
-    # Usar a nova importação para HuggingFaceEmbeddings
-    from langchain_huggingface import HuggingFaceEmbeddings
-    from langchain_community.vectorstores import FAISS
-    from langchain_core.documents import Document
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
+from memory.chunker import Chunker, tokenizer_counter
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def _langchain_modules() -> Optional[Dict]:
+    """
+    Classes do LangChain usadas pelo RAG avançado, importadas só quando ele é
+    pedido (a importação leva quase um segundo). None se não estiver instalado.
+    """
     try:
-        # Fallback para a versão antiga se a nova não estiver disponível
-        from langchain_community.embeddings import HuggingFaceEmbeddings
+        try:
+            # Usar a nova importação para HuggingFaceEmbeddings
+            from langchain_huggingface import HuggingFaceEmbeddings
+        except ImportError:
+            # Fallback para a versão antiga se a nova não estiver disponível
+            from langchain_community.embeddings import HuggingFaceEmbeddings
         from langchain_community.vectorstores import FAISS
         from langchain_core.documents import Document
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-        LANGCHAIN_AVAILABLE = True
     except ImportError:
-        LANGCHAIN_AVAILABLE = False
         print("⚠️  LangChain não disponível para RAG. Usando busca simples por texto.")
+        return None
+    return {"HuggingFaceEmbeddings": HuggingFaceEmbeddings, "FAISS": FAISS, "Document": Document}
+
+
+def langchain_available() -> bool:
+    """Verifica (e importa, na primeira chamada) o LangChain do RAG avançado."""
+    return _langchain_modules() is not None
+
+
+def __getattr__(name):
+    # Compatibilidade: LANGCHAIN_AVAILABLE passa a ser avaliado no primeiro acesso
+    if name == "LANGCHAIN_AVAILABLE":
+        return langchain_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class SimpleRAGSystem:
     """Sistema RAG simples baseado em busca de texto (fallback)."""
@@ -93,25 +112,33 @@ class AdvancedRAGSystem:
     """Sistema RAG avançado usando LangChain e embeddings."""
 
     def __init__(self, storage_path: str = "rag_storage"):
-        if not LANGCHAIN_AVAILABLE:
+        langchain = _langchain_modules()
+        if langchain is None:
             raise ImportError("LangChain não está disponível. Use SimpleRAGSystem.")
+        self._FAISS = langchain["FAISS"]
+        self._Document = langchain["Document"]
 
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
 
         # Usar embeddings locais (gratuitos)
-        self.embeddings = HuggingFaceEmbeddings(
+        self.embeddings = langchain["HuggingFaceEmbeddings"](
             model_name="sentence-transformers/all-MiniLM-L6-v2"
         )
 
         self.vectorstore_path = self.storage_path / "vectorstore"
         self.vectorstore = self._load_or_create_vectorstore()
 
+        # Mesmo chunker do pipeline de ingestão, medido com o tokenizador do modelo
+        client = getattr(self.embeddings, 'client', None)
+        tokenizer = getattr(client, 'tokenizer', None)
+        self.chunker = Chunker(token_counter=tokenizer_counter(tokenizer) if tokenizer is not None else None)
+
     def _load_or_create_vectorstore(self):
         """Carrega ou cria o vectorstore."""
         if self.vectorstore_path.exists():
             try:
-                return FAISS.load_local(
+                return self._FAISS.load_local(
                     str(self.vectorstore_path),
                     self.embeddings,
                     allow_dangerous_deserialization=True
@@ -121,36 +148,33 @@ class AdvancedRAGSystem:
                 print("Criando novo vectorstore...")
 
         # Criar novo vectorstore vazio
-        dummy_doc = Document(page_content="Documento inicial", metadata={"type": "dummy"})
-        vectorstore = FAISS.from_documents([dummy_doc], self.embeddings)
+        dummy_doc = self._Document(page_content="Documento inicial", metadata={"type": "dummy"})
+        vectorstore = self._FAISS.from_documents([dummy_doc], self.embeddings)
         return vectorstore
 
     def add_document(self, content: str, metadata: Dict = None) -> str:
         """Adiciona um documento ao sistema RAG."""
         doc_id = hashlib.md5(content.encode()).hexdigest()
 
-        # Dividir texto em chunks menores
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50
-        )
-
-        chunks = text_splitter.split_text(content)
-
-        # Criar documentos
-        documents = []
-        for i, chunk in enumerate(chunks):
+        # Chunks com id derivado do conteúdo: os já indexados não geram novo embedding
+        documents, ids = [], []
+        for chunk in self.chunker.split(content):
+            if chunk.id in ids or isinstance(self.vectorstore.docstore.search(chunk.id), self._Document):
+                continue
             doc_metadata = {
                 "doc_id": doc_id,
-                "chunk_id": f"{doc_id}_{i}",
+                "chunk_id": chunk.id,
+                "chunk_index": chunk.index,
+                "section": chunk.section,
                 "timestamp": datetime.now().isoformat(),
                 **(metadata or {})
             }
-            documents.append(Document(page_content=chunk, metadata=doc_metadata))
+            documents.append(self._Document(page_content=chunk.text, metadata=doc_metadata))
+            ids.append(chunk.id)
 
         # Adicionar ao vectorstore
         if documents:
-            self.vectorstore.add_documents(documents)
+            self.vectorstore.add_documents(documents, ids=ids)
             self._save_vectorstore()
 
         return doc_id
@@ -187,7 +211,7 @@ class RAGManager:
 
     def __init__(self, use_advanced: bool = True):
         try:
-            if use_advanced and LANGCHAIN_AVAILABLE:
+            if use_advanced and langchain_available():
                 self.rag_system = AdvancedRAGSystem()
                 self.system_type = "Advanced"
             else:
@@ -209,7 +233,7 @@ class RAGManager:
         }
 
         doc_id = self.rag_system.add_document(content, full_metadata)
-        print(f"📚 Conhecimento adicionado: {doc_id[:8]}...")
+        logger.info("Conhecimento adicionado: %s...", doc_id[:8])
         return doc_id
 
     def get_relevant_context(self, query: str, limit: int = 3) -> str:
@@ -0,0 +1,165 @@
+# memory/source_registry.py
+import json
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import asyncpg
+
+# Estrutura de docker/init-scripts/02-rag-source-registry.sql, aplicada também
+# em bancos criados antes do script (a limpeza de duplicatas antigas fica só no script)
+SCHEMA_SQL = """
+ALTER TABLE agenteia.documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_source_content_hash
+    ON agenteia.documents (source, content_hash)
+    WHERE content_hash IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS agenteia.rag_sources (
+    source VARCHAR(255) PRIMARY KEY,
+    chunk_hashes TEXT[] NOT NULL DEFAULT '{}',
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    ingested_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    metadata JSONB DEFAULT '{}'
+);
+"""
+
+
+@dataclass
+class SourceRecord:
+    """Estado gravado de uma fonte: hashes dos chunks na ordem do documento."""
+    source: str
+    chunk_hashes: List[str] = field(default_factory=list)
+    ingested_at: Optional[datetime] = None
+    metadata: Dict = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class SourceRegistry:
+    """
+    Registro fonte → hashes dos chunks gravados em agenteia.documents.
+
+    A reingestão compara os hashes do documento atual com o registro: só os
+    chunks novos são inseridos (o índice único (source, content_hash) garante
+    que não haja duplicatas) e os que sumiram são apagados, na mesma
+    transação que atualiza o registro. Reingestões da mesma fonte são
+    serializadas por source_lock (advisory lock do PostgreSQL).
+    """
+
+    def __init__(self, pool: asyncpg.Pool, connect: Callable[[], Awaitable[asyncpg.Connection]] = None):
+        self.pool = pool
+        # Conexões das travas de fonte ficam fora do pool (ver source_lock)
+        self._connect = connect
+
+    async def ensure_schema(self):
+        async with self.pool.acquire() as conn:
+            await conn.execute(SCHEMA_SQL)
+
+    async def get(self, source: str) -> SourceRecord:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT chunk_hashes, ingested_at, metadata FROM agenteia.rag_sources WHERE source = $1",
+                source
+            )
+        if row is None:
+            return SourceRecord(source=source)
+        return SourceRecord(
+            source=source,
+            chunk_hashes=list(row['chunk_hashes']),
+            ingested_at=row['ingested_at'],
+            metadata=json.loads(row['metadata']) if row['metadata'] else {}
+        )
+
+    @asynccontextmanager
+    async def source_lock(self, source: str):
+        """
+        Trava exclusiva da fonte durante toda a reingestão (leitura do registro,
+        inserções e commit), entre processos e servidores: duas ingestões
+        simultâneas da mesma fonte apagariam os chunks uma da outra.
+
+        A trava pertence à sessão, então a conexão fica reservada até o fim: ela
+        é aberta à parte (connect), não tirada do pool, senão max_size
+        ingestões simultâneas ocupariam o pool inteiro e as consultas de cada
+        uma (registro, inserções, commit) esperariam para sempre.
+        """
+        key = f"rag_source:{source}"
+        if self._connect is None:
+            async with self.pool.acquire() as conn:
+                async with self._advisory_lock(conn, key):
+                    yield
+            return
+
+        conn = await self._connect()
+        try:
+            async with self._advisory_lock(conn, key):
+                yield
+        finally:
+            await conn.close()
+
+    @staticmethod
+    @asynccontextmanager
+    async def _advisory_lock(conn: asyncpg.Connection, key: str):
+        await conn.execute("SELECT pg_advisory_lock(hashtextextended($1, 0))", key)
+        try:
+            yield
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtextextended($1, 0))", key)
+
+    async def commit(self, source: str, chunk_hashes: List[str], removed: Set[str],
+                     metadata: Dict = None) -> int:
+        """
+        Apaga os chunks que não fazem mais parte da fonte e grava o novo
+        estado. Retorna quantos foram apagados.
+
+        A exclusão é feita pela lista nova de hashes, não só por `removed`
+        (diff com o registro): linhas gravadas por uma ingestão que falhou
+        antes do commit nunca entraram no registro e também são apagadas. No
+        primeiro commit da fonte, os chunks gravados antes do registro (sem
+        content_hash) também saem: o documento acabou de ser reingerido com
+        hash, e eles duplicariam o conteúdo nas buscas.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                result = await conn.execute(
+                    """
+                    DELETE FROM agenteia.documents
+                    WHERE source = $1 AND content_hash IS NOT NULL AND content_hash <> ALL($2::text[])
+                    """,
+                    source, chunk_hashes
+                )
+                deleted = int(result.split()[-1])
+                registered = await conn.fetchval("SELECT 1 FROM agenteia.rag_sources WHERE source = $1", source)
+                if not registered:
+                    result = await conn.execute(
+                        "DELETE FROM agenteia.documents WHERE source = $1 AND content_hash IS NULL", source
+                    )
+                    deleted += int(result.split()[-1])
+                await conn.execute(
+                    """
+                    INSERT INTO agenteia.rag_sources (source, chunk_hashes, chunk_count, ingested_at, metadata)
+                    VALUES ($1, $2, $3, CURRENT_TIMESTAMP, $4)
+                    ON CONFLICT (source) DO UPDATE SET
+                        chunk_hashes = EXCLUDED.chunk_hashes,
+                        chunk_count = EXCLUDED.chunk_count,
+                        ingested_at = EXCLUDED.ingested_at,
+                        metadata = EXCLUDED.metadata
+                    """,
+                    source, chunk_hashes, len(chunk_hashes), json.dumps(metadata or {})
+                )
+        return deleted
+
+    async def list_sources(self, limit: int = 50) -> List[Dict]:
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT source, chunk_count, ingested_at
+                FROM agenteia.rag_sources
+                ORDER BY ingested_at DESC
+                LIMIT $1
+                """,
+                limit
+            )
+        return [dict(row) for row in rows]
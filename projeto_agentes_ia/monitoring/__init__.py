@@ -0,0 +1,44 @@
+"""
+Componentes de monitoramento de logs usados pelo LogMonitorAgent.
+Detecção de erros, deduplicação e demais etapas do pipeline de alertas.
+"""
+
+from .error_matcher import ErrorMatcher, ErrorMatch, DEFAULT_ERROR_PATTERNS
+from .dedup_store import ErrorDedupStore, ErrorFingerprinter, FingerprintStats
+from .clustering import DrainTemplateMiner, LogCluster, ClusterAnalysisCache
+from .sources import LogSource, LogChunk, HttpDateLogSource, FileLogSource, DirectoryLogSource, build_sources
+from .multi_source import MultiSourceMonitor
+from .file_follower import FileFollower, create_watcher
+from .event_store import ErrorEventStore, ErrorEvent
+from .log_index import LogIndex, LogIndexManager, SearchHit
+from .log_cache import LogCache
+from .alert_dispatcher import AlertDispatcher, Alert
+
+__all__ = [
+    'ErrorMatcher',
+    'ErrorMatch',
+    'DEFAULT_ERROR_PATTERNS',
+    'ErrorDedupStore',
+    'ErrorFingerprinter',
+    'FingerprintStats',
+    'DrainTemplateMiner',
+    'LogCluster',
+    'ClusterAnalysisCache',
+    'LogSource',
+    'LogChunk',
+    'HttpDateLogSource',
+    'FileLogSource',
+    'DirectoryLogSource',
+    'build_sources',
+    'MultiSourceMonitor',
+    'FileFollower',
+    'create_watcher',
+    'ErrorEventStore',
+    'ErrorEvent',
+    'LogIndex',
+    'LogIndexManager',
+    'SearchHit',
+    'LogCache',
+    'AlertDispatcher',
+    'Alert'
+]
@@ -0,0 +1,298 @@
+# monitoring/alert_dispatcher.py
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+
+# Limites de uma mensagem de webhook do Discord: embeds e caracteres somados de todos eles
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_CHARS = 6000
+MAX_FIELD_LENGTH = 1024
+# Um grupo cheio cabe em uma mensagem: o resumo ocupa um dos embeds
+MAX_ALERTS_PER_GROUP = MAX_EMBEDS_PER_MESSAGE - 1
+
+# Marca de fim na fila: o worker envia o que está pendente e termina
+_STOP = object()
+
+
+@dataclass
+class Alert:
+    """Alerta de erros de uma fonte aguardando envio."""
+    source_name: str
+    label: str
+    location: str
+    errors_count: int
+    message: str
+    created_at: float = field(default_factory=time.time)
+
+
+class AlertDispatcher:
+    """
+    Fila de envio de alertas para um webhook do Discord.
+
+    Alertas da mesma fonte que chegam dentro da janela (window_seconds) são
+    agrupados em uma mensagem de resumo; um resumo maior que os limites do
+    Discord (embeds e caracteres por mensagem) é dividido em várias. O envio
+    usa uma sessão HTTP persistente, respeita o Retry-After das respostas 429
+    (até max_rate_limit_wait segundos somados) e tenta novamente com backoff
+    exponencial em falhas. Latência de entrega e descartes ficam em stats.
+    """
+
+    def __init__(self, webhook_url: Optional[str], window_seconds: float = 30, max_queue: int = 500,
+                 max_retries: int = 5, backoff_base: float = 1.0, max_backoff: float = 60,
+                 max_rate_limit_wait: float = 120, username: str = "Log Monitor Bot",
+                 session_factory: Callable[[], aiohttp.ClientSession] = None):
+        self.webhook_url = webhook_url
+        self.window_seconds = window_seconds
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.username = username
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._pending: Dict[str, List[Alert]] = {}
+        # Sessão compartilhada fornecida pela aplicação; sem ela, uma sessão própria e persistente
+        self.session_factory = session_factory
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.stats = {'submitted': 0, 'sent_alerts': 0, 'sent_messages': 0, 'dropped': 0,
+                      'retries': 0, 'rate_limited': 0}
+        self.latencies: Deque[float] = deque(maxlen=500)
+
+    def submit(self, alert: Alert) -> bool:
+        """Enfileira o alerta sem bloquear. Retorna False se foi descartado."""
+        if not self.webhook_url:
+            print("⚠️ Discord webhook não configurado")
+            return False
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            print(f"⚠️ Fila de alertas cheia; alerta de {alert.source_name}/{alert.label} descartado")
+            return False
+
+        self.stats['submitted'] += 1
+        return True
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run(), name="alert-dispatcher")
+
+    async def _run(self):
+        while True:
+            timeout = self._next_deadline()
+            try:
+                alert = await asyncio.wait_for(self._queue.get(), timeout)
+                if alert is _STOP:
+                    for source_name in list(self._pending):
+                        await self._flush_group(source_name)
+                    return
+                group = self._pending.setdefault(alert.source_name, [])
+                group.append(alert)
+                if len(group) >= MAX_ALERTS_PER_GROUP:
+                    await self._flush_group(alert.source_name)
+            except asyncio.TimeoutError:
+                pass
+
+            now = time.time()
+            for source_name in [name for name, group in self._pending.items()
+                                if now - group[0].created_at >= self.window_seconds]:
+                await self._flush_group(source_name)
+
+    def _next_deadline(self) -> Optional[float]:
+        if not self._pending:
+            return None
+        oldest = min(group[0].created_at for group in self._pending.values())
+        return max(0.0, oldest + self.window_seconds - time.time())
+
+    async def _flush_group(self, source_name: str):
+        alerts = self._pending.pop(source_name, [])
+        if not alerts:
+            return
+
+        for sent_alerts, embeds in self.build_messages(alerts):
+            payload = {"embeds": embeds, "username": self.username}
+            if await self._post(payload):
+                now = time.time()
+                self.stats['sent_messages'] += 1
+                self.stats['sent_alerts'] += len(sent_alerts)
+                self.latencies.extend(now - alert.created_at for alert in sent_alerts)
+                print(f"✅ Alerta enviado para Discord ({len(sent_alerts)} alerta(s) de {source_name})")
+            else:
+                self.stats['dropped'] += len(sent_alerts)
+                print(f"❌ {len(sent_alerts)} alerta(s) de {source_name} descartado(s) após {self.max_retries} tentativas")
+
+    def build_messages(self, alerts: List[Alert]) -> List[Tuple[List[Alert], List[Dict]]]:
+        """
+        Divide os embeds de build_embeds em mensagens dentro dos limites do
+        Discord (MAX_EMBEDS_PER_MESSAGE e MAX_MESSAGE_CHARS). Retorna, por
+        mensagem, os alertas detalhados nela e os embeds.
+        """
+        embeds = self.build_embeds(alerts)
+        # O resumo (se houver) não corresponde a um alerta
+        owners: List[Optional[Alert]] = ([None] if len(embeds) > len(alerts) else []) + list(alerts)
+
+        messages, current, current_alerts, current_chars = [], [], [], 0
+        for owner, embed in zip(owners, embeds):
+            size = self._embed_length(embed)
+            if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or current_chars + size > MAX_MESSAGE_CHARS):
+                messages.append((current_alerts, current))
+                current, current_alerts, current_chars = [], [], 0
+            current.append(embed)
+            current_chars += size
+            if owner is not None:
+                current_alerts.append(owner)
+        if current:
+            messages.append((current_alerts, current))
+        return messages
+
+    @staticmethod
+    def _embed_length(embed: Dict) -> int:
+        """Caracteres que o Discord conta no limite por mensagem."""
+        total = len(embed.get("title", "")) + len(embed.get("description", ""))
+        total += len(embed.get("footer", {}).get("text", ""))
+        for embed_field in embed.get("fields", []):
+            total += len(embed_field["name"]) + len(embed_field["value"])
+        return total
+
+    def build_embeds(self, alerts: List[Alert]) -> List[Dict]:
+        """Um embed por alerta; vários alertas viram um resumo seguido dos detalhes."""
+        if len(alerts) == 1:
+            return [self._alert_embed(alerts[0])]
+
+        total = sum(alert.errors_count for alert in alerts)
+        summary = {
+            "title": f"🚨 Resumo de Alertas - {alerts[0].source_name}",
+            "description": f"{len(alerts)} alertas com {total} erros nos últimos {self.window_seconds:g}s",
+            "color": 0xff0000,
+            "timestamp": datetime.now().isoformat(),
+            "footer": {"text": "Sistema de Monitoramento de Logs"}
+        }
+        return [summary] + [self._alert_embed(alert) for alert in alerts]
+
+    @staticmethod
+    def _alert_embed(alert: Alert) -> Dict:
+        message = alert.message
+        if len(message) > 1000:
+            message = message[:1000] + "..."
+        return {
+            "title": "🚨 Alerta de Monitoramento de Logs",
+            "description": f"Erros detectados nos logs de {alert.label} ({alert.source_name})",
+            "color": 0xff0000,
+            "fields": [
+                {"name": "📅 Data", "value": alert.label, "inline": True},
+                {"name": "🔢 Erros Detectados", "value": str(alert.errors_count), "inline": True},
+                {"name": "🔗 URL dos Logs", "value": alert.location[:MAX_FIELD_LENGTH], "inline": False},
+                {"name": "🤖 Análise IA", "value": message or "-", "inline": False}
+            ],
+            "timestamp": datetime.fromtimestamp(alert.created_at).isoformat(),
+            "footer": {"text": "Sistema de Monitoramento de Logs"}
+        }
+
+    async def _post(self, payload: Dict) -> bool:
+        session = self._get_session()
+        attempt = 0
+        rate_limit_wait = 0.0
+        while attempt <= self.max_retries:
+            try:
+                async with session.post(self.webhook_url, json=payload) as response:
+                    if response.status in (200, 204):
+                        return True
+
+                    if response.status == 429:
+                        # Rate limit não conta como tentativa: aguardar o indicado pelo
+                        # Discord, até max_rate_limit_wait somados (mínimo de 0,1s por espera)
+                        self.stats['rate_limited'] += 1
+                        delay = max(await self._retry_after(response), 0.1)
+                        rate_limit_wait += delay
+                        if rate_limit_wait > self.max_rate_limit_wait:
+                            print(f"❌ Discord limitou o envio por mais de {self.max_rate_limit_wait:g}s; desistindo")
+                            return False
+                        print(f"⏳ Discord limitou o envio; nova tentativa em {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+
+                    if 400 <= response.status < 500:
+                        print(f"❌ Erro ao enviar para Discord: {response.status}")
+                        return False
+
+                    print(f"⚠️ Discord respondeu {response.status}; tentando novamente")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"⚠️ Falha ao enviar alerta Discord: {e or e.__class__.__name__}")
+
+            attempt += 1
+            if attempt > self.max_retries:
+                break
+            self.stats['retries'] += 1
+            await asyncio.sleep(min(self.backoff_base * 2 ** (attempt - 1), self.max_backoff))
+
+        return False
+
+    @staticmethod
+    async def _retry_after(response: aiohttp.ClientResponse) -> float:
+        try:
+            data = await response.json(content_type=None)
+            if isinstance(data, dict) and "retry_after" in data:
+                return float(data["retry_after"])
+        except (ValueError, aiohttp.ClientError):
+            pass
+        try:
+            return float(response.headers.get("Retry-After", 1))
+        except ValueError:
+            return 1.0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session_factory is not None:
+            return self.session_factory()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        return self._session
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Latência (s) entre a criação do alerta e a entrega: média, p50 e p95."""
+        if not self.latencies:
+            return {'avg': 0.0, 'p50': 0.0, 'p95': 0.0}
+        values = sorted(self.latencies)
+        return {
+            'avg': sum(values) / len(values),
+            'p50': values[len(values) // 2],
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))]
+        }
+
+    async def close(self, flush: bool = True):
+        """
+        Interrompe o envio; com flush=True envia antes o que estiver pendente.
+        O worker não é cancelado no meio de um envio: ele recebe a marca de fim
+        depois dos alertas já enfileirados, termina o grupo em andamento e envia
+        os demais.
+        """
+        worker, self._worker = self._worker, None
+        if flush and worker is not None and not worker.done():
+            await self._queue.put(_STOP)
+            await worker
+        else:
+            if worker is not None:
+                worker.cancel()
+                try:
+                    await worker
+                except asyncio.CancelledError:
+                    pass
+            if flush:
+                while not self._queue.empty():
+                    alert = self._queue.get_nowait()
+                    if alert is not _STOP:
+                        self._pending.setdefault(alert.source_name, []).append(alert)
+                for source_name in list(self._pending):
+                    await self._flush_group(source_name)
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
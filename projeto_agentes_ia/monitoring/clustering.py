@@ -0,0 +1,197 @@
+# monitoring/clustering.py
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .dedup_store import ErrorFingerprinter
+
+WILDCARD = "<*>"
+
+
+@dataclass
+class LogCluster:
+    """Grupo de linhas de log que compartilham o mesmo template."""
+    cluster_id: int
+    template_tokens: List[str]
+    size: int = 0
+    version: int = 1
+    samples: List[str] = field(default_factory=list)
+    last_seen: float = 0.0
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.template_tokens)
+
+    @property
+    def template_hash(self) -> str:
+        """Chave estável do template (muda quando o template é generalizado)."""
+        return hashlib.blake2b(self.template.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class DrainTemplateMiner:
+    """
+    Mineração de templates de log no estilo Drain.
+
+    As linhas são normalizadas pelo ErrorFingerprinter e tokenizadas; uma
+    árvore de profundidade fixa (número de tokens → primeiros tokens) limita
+    a comparação a poucos clusters candidatos. Uma linha entra no cluster
+    mais similar quando a fração de tokens iguais atinge o limiar; tokens
+    divergentes viram curingas no template.
+    """
+
+    def __init__(self, depth: int = 4, similarity_threshold: float = 0.5, max_children: int = 100,
+                 max_clusters: int = 2000, max_samples: int = 3, fingerprinter: ErrorFingerprinter = None):
+        if depth < 3:
+            raise ValueError("depth deve ser no mínimo 3")
+        self.depth = depth
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.max_samples = max_samples
+        self.fingerprinter = fingerprinter or ErrorFingerprinter()
+
+        self._root: Dict = {}
+        self._clusters: "OrderedDict[int, LogCluster]" = OrderedDict()
+        self._leaves: Dict[int, List[int]] = {}
+        self._next_id = 1
+
+    @property
+    def clusters(self) -> List[LogCluster]:
+        return list(self._clusters.values())
+
+    def add(self, line: str) -> Tuple[LogCluster, str]:
+        """
+        Adiciona uma linha e retorna (cluster, mudança).
+
+        mudança é "created" para um cluster novo, "changed" quando o template
+        foi generalizado e "none" quando a linha só aumentou o cluster.
+        """
+        tokens = self.fingerprinter.normalize(line).split()
+        leaf = self._leaf_for(tokens)
+
+        cluster = self._best_match(leaf, tokens)
+        if cluster is None:
+            cluster = LogCluster(cluster_id=self._next_id, template_tokens=list(tokens))
+            self._next_id += 1
+            self._clusters[cluster.cluster_id] = cluster
+            self._leaves[cluster.cluster_id] = leaf
+            leaf.append(cluster.cluster_id)
+            change = "created"
+            self._evict()
+        else:
+            merged = [a if a == b else WILDCARD for a, b in zip(cluster.template_tokens, tokens)]
+            if merged != cluster.template_tokens:
+                cluster.template_tokens = merged
+                cluster.version += 1
+                change = "changed"
+            else:
+                change = "none"
+            self._clusters.move_to_end(cluster.cluster_id)
+
+        cluster.size += 1
+        cluster.last_seen = time.time()
+        if len(cluster.samples) < self.max_samples:
+            cluster.samples.append(line.strip())
+
+        return cluster, change
+
+    def _leaf_for(self, tokens: List[str]) -> List[int]:
+        node = self._root.setdefault(len(tokens), {})
+        prefix = tokens[:self.depth - 2]
+
+        for i, token in enumerate(prefix):
+            key = WILDCARD if any(ch.isdigit() for ch in token) or token.startswith("<") else token
+            children = node.setdefault("children", {})
+            if key not in children and len(children) >= self.max_children:
+                key = WILDCARD
+            node = children.setdefault(key, {})
+
+        return node.setdefault("clusters", [])
+
+    def _best_match(self, leaf: List[int], tokens: List[str]) -> Optional[LogCluster]:
+        best, best_similarity, best_params = None, -1.0, -1
+        for cluster_id in leaf:
+            cluster = self._clusters[cluster_id]
+            similarity, params = self._similarity(cluster.template_tokens, tokens)
+            if similarity > best_similarity or (similarity == best_similarity and params > best_params):
+                best, best_similarity, best_params = cluster, similarity, params
+
+        if best is not None and best_similarity >= self.similarity_threshold:
+            return best
+        return None
+
+    @staticmethod
+    def _similarity(template: List[str], tokens: List[str]) -> Tuple[float, int]:
+        if not tokens:
+            return 1.0, 0
+        equal = params = 0
+        for a, b in zip(template, tokens):
+            if a == WILDCARD:
+                params += 1
+            elif a == b:
+                equal += 1
+        return equal / len(tokens), params
+
+    def _evict(self):
+        """Remove os clusters menos recentes quando o limite é excedido."""
+        while len(self._clusters) > self.max_clusters:
+            cluster_id, _ = self._clusters.popitem(last=False)
+            leaf = self._leaves.pop(cluster_id)
+            leaf.remove(cluster_id)
+
+
+class ClusterAnalysisCache:
+    """Cache persistente (SQLite) das análises de IA por template de cluster."""
+
+    def __init__(self, db_path: str = "log_storage/dedup.sqlite3", ttl_seconds: int = 7 * 24 * 3600):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        # Usado também de threads do pool: conexão compartilhada sob trava
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cluster_analyses (
+                    template_hash TEXT PRIMARY KEY,
+                    template TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, template_hash: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT analysis, updated_at FROM cluster_analyses WHERE template_hash = ?",
+                (template_hash,)
+            ).fetchone()
+        if not row or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return row[0]
+
+    def put_many(self, analyses: List[Tuple[str, str, str]]):
+        """Salva uma lista de (template_hash, template, análise)."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO cluster_analyses (template_hash, template, analysis, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(template_hash) DO UPDATE SET
+                    analysis = excluded.analysis,
+                    updated_at = excluded.updated_at
+                """,
+                [(h, t, a, now) for h, t, a in analyses]
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,313 @@
+# monitoring/dedup_store.py
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Máscaras aplicadas em ordem: das mais específicas para as mais genéricas
+FINGERPRINT_MASKS = [
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'), '<TS>'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}'), '<DATE>'),
+    (re.compile(r'\d{2}:\d{2}:\d{2}(?:[.,]\d+)?'), '<TIME>'),
+    (re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'), '<UUID>'),
+    (re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'), '<EMAIL>'),
+    (re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b'), '<IP>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b'), '<HEX>'),
+    (re.compile(r'\d+(?:\.\d+)*'), '<NUM>'),
+    (re.compile(r'\s+'), ' '),
+]
+
+MAX_TEMPLATE_LENGTH = 256
+# Bytes antes do checkpoint usados para reconhecer o mesmo conteúdo na próxima varredura
+CHECKPOINT_PROBE_BYTES = 4096
+
+
+class ErrorFingerprinter:
+    """Normaliza linhas de log em templates estáveis e gera fingerprints."""
+
+    def __init__(self, masks: List[Tuple[re.Pattern, str]] = None, max_length: int = MAX_TEMPLATE_LENGTH):
+        self.masks = masks or FINGERPRINT_MASKS
+        self.max_length = max_length
+
+    def normalize(self, line: str) -> str:
+        """Mascara timestamps, ids e números, mantendo o texto do erro."""
+        template = line
+        for regex, token in self.masks:
+            template = regex.sub(token, template)
+        return template.strip()[:self.max_length]
+
+    def fingerprint(self, line: str) -> Tuple[str, str]:
+        """Retorna (fingerprint, template) para a linha."""
+        template = self.normalize(line)
+        digest = hashlib.blake2b(template.encode('utf-8'), digest_size=8).hexdigest()
+        return digest, template
+
+
+@dataclass
+class FingerprintStats:
+    """Estatísticas de um fingerprint de erro."""
+    fingerprint: str
+    template: str
+    pattern: str
+    count: int
+    first_seen: float
+    last_seen: float
+    last_alerted: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class ErrorDedupStore:
+    """
+    Deduplicação de erros por fingerprint com memória limitada e persistência.
+
+    Mantém um LRU em memória (no máximo max_entries fingerprints, expirados
+    após window_seconds sem ocorrência) sobre uma tabela SQLite. Fingerprints
+    que saíram da memória são recarregados do disco quando reaparecem, então
+    reinícios do processo não geram novos alertas para erros antigos.
+    Alterações pendentes são gravadas em flush() ou ao passar de max_dirty.
+
+    Pode ser usado de threads do pool (asyncio.to_thread): a conexão aceita
+    outras threads e cada operação pública roda sob uma trava.
+    """
+
+    def __init__(self, db_path: str = "log_storage/dedup.sqlite3", max_entries: int = 5000,
+                 window_seconds: int = 24 * 3600, retention_seconds: int = 30 * 24 * 3600,
+                 fingerprinter: ErrorFingerprinter = None, max_dirty: int = 1000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_dirty = max_dirty
+        self.window_seconds = window_seconds
+        self.retention_seconds = retention_seconds
+        self.fingerprinter = fingerprinter or ErrorFingerprinter()
+
+        self._entries: "OrderedDict[str, FingerprintStats]" = OrderedDict()
+        self._dirty: Dict[str, FingerprintStats] = {}
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_schema()
+        self._warm_up()
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS error_fingerprints (
+                    fingerprint TEXT PRIMARY KEY,
+                    template TEXT NOT NULL,
+                    pattern TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    last_alerted REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_fingerprints_last_seen ON error_fingerprints(last_seen)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scan_checkpoints (
+                    source TEXT PRIMARY KEY,
+                    byte_offset INTEGER NOT NULL,
+                    line_count INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    probe_hash TEXT
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(scan_checkpoints)")}
+            if "probe_hash" not in columns:
+                self._conn.execute("ALTER TABLE scan_checkpoints ADD COLUMN probe_hash TEXT")
+
+    def _warm_up(self):
+        """Carrega os fingerprints mais recentes dentro da janela."""
+        cutoff = time.time() - self.window_seconds
+        rows = self._conn.execute(
+            """
+            SELECT fingerprint, template, pattern, count, first_seen, last_seen, last_alerted
+            FROM error_fingerprints
+            WHERE last_seen >= ?
+            ORDER BY last_seen ASC
+            """,
+            (cutoff,)
+        ).fetchall()
+        for row in rows[-self.max_entries:]:
+            self._entries[row[0]] = FingerprintStats(*row)
+
+    def observe(self, line: str, pattern: str, now: float = None) -> Tuple[FingerprintStats, bool]:
+        """
+        Registra uma ocorrência da linha.
+
+        Retorna (estatísticas, deve_alertar). O alerta é devido quando o
+        fingerprint é inédito ou quando o último alerta ficou fora da janela.
+        """
+        now = now or time.time()
+        fingerprint, template = self.fingerprinter.fingerprint(line)
+
+        with self._lock:
+            stats = self._get(fingerprint)
+            if stats is None:
+                stats = FingerprintStats(
+                    fingerprint=fingerprint,
+                    template=template,
+                    pattern=pattern,
+                    count=0,
+                    first_seen=now,
+                    last_seen=now
+                )
+
+            stats.count += 1
+            stats.last_seen = now
+
+            should_alert = now - stats.last_alerted >= self.window_seconds
+            if should_alert:
+                stats.last_alerted = now
+
+            self._put(stats, now)
+        return stats, should_alert
+
+    def get(self, fingerprint: str) -> Optional[FingerprintStats]:
+        """Retorna as estatísticas de um fingerprint (memória ou disco)."""
+        with self._lock:
+            return self._get(fingerprint)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return self.get(fingerprint) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, fingerprint: str) -> Optional[FingerprintStats]:
+        stats = self._entries.get(fingerprint)
+        if stats is not None:
+            self._entries.move_to_end(fingerprint)
+            return stats
+
+        # Pode ter saído da memória antes de ser persistido
+        stats = self._dirty.get(fingerprint)
+        if stats is not None:
+            return stats
+
+        row = self._conn.execute(
+            """
+            SELECT fingerprint, template, pattern, count, first_seen, last_seen, last_alerted
+            FROM error_fingerprints WHERE fingerprint = ?
+            """,
+            (fingerprint,)
+        ).fetchone()
+        return FingerprintStats(*row) if row else None
+
+    def _put(self, stats: FingerprintStats, now: float = None):
+        self._entries[stats.fingerprint] = stats
+        self._entries.move_to_end(stats.fingerprint)
+        self._dirty[stats.fingerprint] = stats
+        # Varredura longa sem flush: a memória das pendências também é limitada
+        if len(self._dirty) >= self.max_dirty:
+            self._write_dirty()
+        self._evict(now)
+
+    def _evict(self, now: float = None):
+        """Remove da memória entradas fora da janela ou além do limite."""
+        cutoff = (now or time.time()) - self.window_seconds
+        while self._entries:
+            fingerprint, oldest = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and oldest.last_seen >= cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def _write_dirty(self):
+        if self._dirty:
+            with self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT INTO error_fingerprints
+                        (fingerprint, template, pattern, count, first_seen, last_seen, last_alerted)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(fingerprint) DO UPDATE SET
+                        count = excluded.count,
+                        last_seen = excluded.last_seen,
+                        last_alerted = excluded.last_alerted
+                    """,
+                    [
+                        (s.fingerprint, s.template, s.pattern, s.count, s.first_seen, s.last_seen, s.last_alerted)
+                        for s in self._dirty.values()
+                    ]
+                )
+            self._dirty.clear()
+
+    def flush(self):
+        """Persiste as alterações pendentes e remove registros antigos do disco."""
+        with self._lock:
+            self._write_dirty()
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM error_fingerprints WHERE last_seen < ?",
+                    (time.time() - self.retention_seconds,)
+                )
+            self._evict()
+
+    @staticmethod
+    def _probe_hash(data, byte_offset: int) -> str:
+        """Hash dos bytes que antecedem o checkpoint (identifica o conteúdo já varrido)."""
+        probe = bytes(data[max(0, byte_offset - CHECKPOINT_PROBE_BYTES):byte_offset])
+        return hashlib.blake2b(probe, digest_size=16).hexdigest()
+
+    def get_checkpoint(self, source: str, data=None) -> Tuple[int, int]:
+        """
+        Retorna (offset em bytes, linhas já processadas) de uma fonte.
+
+        Com data (o conteúdo atual), o checkpoint só vale se os bytes antes do
+        offset forem os mesmos da última varredura: um arquivo substituído na
+        mesma URL (outro conteúdo, mesmo tamanho ou maior) recomeça do início.
+        O ETag não serve para isso, pois muda a cada linha acrescentada.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT byte_offset, line_count, probe_hash FROM scan_checkpoints WHERE source = ?",
+                (source,)
+            ).fetchone()
+        if not row:
+            return 0, 0
+        byte_offset, line_count, probe_hash = row
+        if data is not None:
+            if byte_offset > len(data) or (probe_hash and probe_hash != self._probe_hash(data, byte_offset)):
+                return 0, 0
+        return byte_offset, line_count
+
+    def set_checkpoint(self, source: str, byte_offset: int, line_count: int, data=None):
+        """Registra até onde uma fonte já foi processada (data: conteúdo varrido)."""
+        probe_hash = self._probe_hash(data, byte_offset) if data is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO scan_checkpoints (source, byte_offset, line_count, updated_at, probe_hash)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    byte_offset = excluded.byte_offset,
+                    line_count = excluded.line_count,
+                    updated_at = excluded.updated_at,
+                    probe_hash = excluded.probe_hash
+                """,
+                (source, byte_offset, line_count, time.time(), probe_hash)
+            )
+
+    def top(self, limit: int = 10) -> List[FingerprintStats]:
+        """Fingerprints mais frequentes em memória."""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=lambda s: s.count, reverse=True)[:limit]
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
@@ -0,0 +1,211 @@
+# monitoring/error_matcher.py
+import mmap
+import re
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+# Padrões de erro padrão usados pelo monitoramento de logs
+DEFAULT_ERROR_PATTERNS = [
+    r'ERROR',
+    r'CRITICAL',
+    r'FATAL',
+    r'Exception',
+    r'Traceback',
+    r'500\s+Internal\s+Server\s+Error',
+    r'404\s+Not\s+Found',
+    r'Connection\s+refused',
+    r'Timeout',
+    r'Failed\s+to\s+connect',
+    r'Database\s+error',
+    r'SQL\s+Error'
+]
+
+TIMESTAMP_PATTERN = r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}'
+
+NO_TIMESTAMP = "Timestamp não encontrado"
+
+# Tamanho do bloco lido por vez (ajustado para fim de linha)
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+
+Buffer = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+
+@dataclass
+class ErrorMatch:
+    """Representa uma linha de log que casou com um padrão de erro."""
+    line_number: int
+    offset: int
+    line: str
+    context: str
+    timestamp: str
+    pattern: str
+    pattern_index: int
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class ErrorMatcher:
+    """
+    Detector de erros em passagem única sobre o conteúdo dos logs.
+
+    Todos os padrões são compilados em uma única alternância sem grupos de
+    captura, o que permite ao motor de regex pular rapidamente as posições
+    cujo primeiro caractere não inicia nenhum padrão. Quando os padrões
+    permitem, o buffer é convertido para minúsculas bloco a bloco e a busca
+    é feita sem IGNORECASE (bem mais rápida). Apenas as linhas que casam
+    são decodificadas e recebem extração de timestamp e contexto.
+    """
+
+    def __init__(self, patterns: Sequence[str] = None, timestamp_pattern: str = TIMESTAMP_PATTERN,
+                 block_size: int = DEFAULT_BLOCK_SIZE):
+        self.patterns: List[str] = list(patterns or DEFAULT_ERROR_PATTERNS)
+        if not self.patterns:
+            raise ValueError("É necessário informar ao menos um padrão de erro")
+
+        self.block_size = block_size
+        self._lowercase = all(self._is_lowercase_safe(p) for p in self.patterns)
+
+        if self._lowercase:
+            alternation = "|".join(f"(?:{p.lower()})" for p in self.patterns)
+            self._prefilter = re.compile(alternation.encode())
+        else:
+            alternation = "|".join(f"(?:{p})" for p in self.patterns)
+            self._prefilter = re.compile(alternation.encode(), re.IGNORECASE)
+
+        # Padrões individuais só são usados para identificar o padrão nos acertos
+        self._individual = [re.compile(p.encode(), re.IGNORECASE) for p in self.patterns]
+        self._timestamp = re.compile(timestamp_pattern)
+
+    def match_line(self, line: str) -> Optional[str]:
+        """Retorna o primeiro padrão da lista que casa com a linha (ou None)."""
+        index = self._resolve_index(line.encode('utf-8'))
+        return self.patterns[index] if index is not None else None
+
+    def scan(self, data: Buffer, context_lines: int = 1, start: int = 0, end: int = None,
+             first_line: int = 1) -> Iterator[ErrorMatch]:
+        """
+        Percorre o buffer e gera um ErrorMatch por linha com erro.
+
+        Aceita str, bytes, bytearray, mmap ou memoryview (o corpo da resposta
+        HTTP pode ser repassado sem cópias). Offsets são sempre em bytes.
+        Em caso de vários padrões na mesma linha, reporta o primeiro da lista,
+        mantendo a semântica do laço original.
+
+        start/end delimitam a região varrida (start deve ser início de linha)
+        e first_line é o número da linha que começa em start, o que permite
+        varreduras incrementais de um log que cresce.
+        """
+        raw = self._as_searchable(data)
+        view = memoryview(raw)
+        size = len(raw) if end is None else min(end, len(raw))
+
+        block_start = start
+        line_number = first_line
+
+        while block_start < size:
+            block, block_end = self._read_block(view, block_start, size)
+            pos = 0
+            block_len = block_end - block_start
+
+            while pos < block_len:
+                match = self._prefilter.search(block, pos, block_len)
+                if not match:
+                    break
+
+                hit = match.start()
+                line_start = block.rfind(b'\n', pos, hit) + 1 or pos
+                line_number += block.count(b'\n', pos, line_start)
+
+                line_end = block.find(b'\n', hit, block_len)
+                if line_end == -1:
+                    line_end = block_len
+
+                abs_start = block_start + line_start
+                abs_end = block_start + line_end
+                line_bytes = view[abs_start:abs_end]
+
+                index = self._resolve_index(line_bytes)
+                if index is not None:
+                    line_text = str(line_bytes, 'utf-8', 'replace')
+                    timestamp_match = self._timestamp.search(line_text)
+
+                    yield ErrorMatch(
+                        line_number=line_number,
+                        offset=abs_start,
+                        line=line_text.strip(),
+                        context=self._context(raw, view, abs_start, abs_end, size, context_lines),
+                        timestamp=timestamp_match.group() if timestamp_match else NO_TIMESTAMP,
+                        pattern=self.patterns[index],
+                        pattern_index=index
+                    )
+
+                # Continuar a partir da próxima linha (um acerto por linha)
+                pos = line_end + 1
+                line_number += 1
+
+            if pos < block_len:
+                line_number += block.count(b'\n', pos, block_len)
+            block_start = block_end
+
+    def scan_all(self, data: Buffer, context_lines: int = 1, start: int = 0, end: int = None,
+                 first_line: int = 1) -> List[ErrorMatch]:
+        """Versão em lista de scan()."""
+        return list(self.scan(data, context_lines, start, end, first_line))
+
+    def _read_block(self, view: memoryview, start: int, size: int):
+        """Lê um bloco terminado em fim de linha, já normalizado para a busca."""
+        length = self.block_size
+        while True:
+            end = min(start + length, size)
+            block = view[start:end].tobytes()
+            if end < size:
+                last_newline = block.rfind(b'\n')
+                if last_newline == -1:
+                    # Linha maior que o bloco: ampliar a janela
+                    length *= 2
+                    continue
+                end = start + last_newline + 1
+            if self._lowercase:
+                block = block.lower()
+            return block, end
+
+    def _resolve_index(self, line) -> Optional[int]:
+        for index, pattern in enumerate(self._individual):
+            if pattern.search(line):
+                return index
+        return None
+
+    @staticmethod
+    def _context(raw, view: memoryview, start: int, end: int, size: int, context_lines: int) -> str:
+        context_start = start
+        for _ in range(context_lines):
+            if context_start == 0:
+                break
+            context_start = raw.rfind(b'\n', 0, context_start - 1) + 1
+
+        context_end = end
+        for _ in range(context_lines):
+            if context_end >= size:
+                break
+            next_end = raw.find(b'\n', context_end + 1)
+            context_end = size if next_end == -1 else next_end
+
+        return str(view[context_start:context_end], 'utf-8', 'replace')
+
+    @staticmethod
+    def _as_searchable(data: Buffer):
+        """Normaliza a entrada para um objeto com find/rfind sobre bytes."""
+        if isinstance(data, str):
+            return data.encode('utf-8')
+        if isinstance(data, memoryview):
+            obj = data.obj
+            if isinstance(obj, (bytes, bytearray, mmap.mmap)) and data.contiguous and data.nbytes == len(obj):
+                return obj
+            return data.tobytes()
+        return data
+
+    @staticmethod
+    def _is_lowercase_safe(pattern: str) -> bool:
+        """Indica se o padrão mantém o significado ao ser convertido para minúsculas."""
+        return re.search(r'\\[A-Z]|\(\?P|\\[pN]|\\x[0-9A-Fa-f]', pattern) is None
@@ -0,0 +1,293 @@
+# monitoring/event_store.py
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .error_matcher import NO_TIMESTAMP
+
+TIMESTAMP_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+
+
+@dataclass
+class ErrorEvent:
+    """Ocorrência de erro a ser registrada na série temporal."""
+    ts: int
+    fingerprint: str
+    template: str
+    pattern: str
+    source: str
+    line_offset: int
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def parse_log_timestamp(value: str, default: float = None) -> int:
+    """Converte o timestamp extraído da linha em epoch (segundos); usa default se ausente."""
+    if value and value != NO_TIMESTAMP:
+        normalized = " ".join(value.split())
+        for fmt in TIMESTAMP_FORMATS:
+            try:
+                return int(datetime.strptime(normalized, fmt).timestamp())
+            except ValueError:
+                continue
+    return int(default if default is not None else time.time())
+
+
+class ErrorEventStore:
+    """
+    Série temporal persistente (SQLite) dos erros detectados nos logs.
+
+    Cada evento ocupa uma linha de inteiros: fingerprints e fontes são
+    codificados em tabelas de dicionário, e os índices por (ts) e por
+    (fingerprint, ts) deixam contagens por intervalo, top-N e detecção de
+    picos como consultas indexadas, sem reprocessar os logs.
+
+    Eventos além da retenção são removidos a cada prune_interval segundos,
+    durante a gravação. A conexão é protegida por trava: consultas podem
+    rodar em threads (asyncio.to_thread) sem bloquear o loop de eventos.
+    """
+
+    def __init__(self, db_path: str = "log_storage/events.sqlite3", retention_seconds: int = 90 * 24 * 3600,
+                 prune_interval: float = 3600):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self.prune_interval = prune_interval
+        self._last_prune = time.time()
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        self._fingerprint_ids: Dict[str, int] = {}
+        self._source_ids: Dict[str, int] = {}
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS event_fingerprints (
+                    id INTEGER PRIMARY KEY,
+                    fingerprint TEXT NOT NULL UNIQUE,
+                    template TEXT NOT NULL,
+                    pattern TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS event_sources (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                );
+
+                CREATE TABLE IF NOT EXISTS error_events (
+                    source_id INTEGER NOT NULL,
+                    line_offset INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    fingerprint_id INTEGER NOT NULL,
+                    PRIMARY KEY (source_id, line_offset, ts)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_error_events_ts ON error_events(ts);
+                CREATE INDEX IF NOT EXISTS idx_error_events_fingerprint_ts ON error_events(fingerprint_id, ts);
+                """
+            )
+
+    def add_many(self, events: Sequence[ErrorEvent]) -> int:
+        """
+        Registra eventos em lote. Reprocessar o mesmo trecho não duplica
+        eventos (chave: fonte, offset da linha, timestamp). Retorna quantos
+        foram inseridos.
+        """
+        if not events:
+            return 0
+
+        with self._lock:
+            with self._conn:
+                rows = [
+                    (self._source_id(e.source), e.line_offset, e.ts,
+                     self._fingerprint_id(e.fingerprint, e.template, e.pattern))
+                    for e in events
+                ]
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO error_events (source_id, line_offset, ts, fingerprint_id) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                inserted = self._conn.total_changes - before
+
+            if time.time() - self._last_prune >= self.prune_interval:
+                self.prune()
+            return inserted
+
+    def _fingerprint_id(self, fingerprint: str, template: str, pattern: str) -> int:
+        cached = self._fingerprint_ids.get(fingerprint)
+        if cached is not None:
+            return cached
+        self._conn.execute(
+            "INSERT OR IGNORE INTO event_fingerprints (fingerprint, template, pattern) VALUES (?, ?, ?)",
+            (fingerprint, template, pattern)
+        )
+        row = self._conn.execute(
+            "SELECT id FROM event_fingerprints WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        self._fingerprint_ids[fingerprint] = row[0]
+        return row[0]
+
+    def _source_id(self, name: str) -> int:
+        cached = self._source_ids.get(name)
+        if cached is not None:
+            return cached
+        self._conn.execute("INSERT OR IGNORE INTO event_sources (name) VALUES (?)", (name,))
+        row = self._conn.execute("SELECT id FROM event_sources WHERE name = ?", (name,)).fetchone()
+        self._source_ids[name] = row[0]
+        return row[0]
+
+    def _filters(self, since: float = None, until: float = None, fingerprint: str = None,
+                 source: str = None) -> Tuple[str, List]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("e.ts >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("e.ts < ?")
+            params.append(int(until))
+        if fingerprint is not None:
+            clauses.append("e.fingerprint_id = (SELECT id FROM event_fingerprints WHERE fingerprint = ?)")
+            params.append(fingerprint)
+        if source is not None:
+            clauses.append("e.source_id = (SELECT id FROM event_sources WHERE name = ?)")
+            params.append(source)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, since: float = None, until: float = None, fingerprint: str = None, source: str = None) -> int:
+        where, params = self._filters(since, until, fingerprint, source)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM error_events e{where}", params).fetchone()[0]
+
+    def counts_by_bucket(self, bucket_seconds: int = 3600, since: float = None, until: float = None,
+                         fingerprint: str = None, source: str = None) -> List[Tuple[int, int]]:
+        """Contagem de eventos por intervalo: lista de (início do intervalo, total)."""
+        where, params = self._filters(since, until, fingerprint, source)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT (e.ts / ?) * ? AS bucket, COUNT(*)
+                FROM error_events e{where}
+                GROUP BY bucket
+                ORDER BY bucket
+                """,
+                [bucket_seconds, bucket_seconds] + params
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def top_fingerprints(self, limit: int = 10, since: float = None, until: float = None,
+                         source: str = None) -> List[Dict]:
+        """Fingerprints mais frequentes no período."""
+        where, params = self._filters(since, until, source=source)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT f.fingerprint, f.template, f.pattern, t.total, t.first_ts, t.last_ts
+                FROM (
+                    SELECT e.fingerprint_id, COUNT(*) AS total, MIN(e.ts) AS first_ts, MAX(e.ts) AS last_ts
+                    FROM error_events e{where}
+                    GROUP BY e.fingerprint_id
+                    ORDER BY total DESC
+                    LIMIT ?
+                ) t
+                JOIN event_fingerprints f ON f.id = t.fingerprint_id
+                ORDER BY t.total DESC
+                """,
+                params + [limit]
+            ).fetchall()
+        return [
+            {'fingerprint': r[0], 'template': r[1], 'pattern': r[2], 'count': r[3], 'first_ts': r[4], 'last_ts': r[5]}
+            for r in rows
+        ]
+
+    def detect_spikes(self, bucket_seconds: int = 3600, baseline_buckets: int = 24, threshold: float = 3.0,
+                      min_count: int = 5, now: float = None) -> List[Dict]:
+        """
+        Fingerprints cujo volume no intervalo atual está muito acima da média
+        dos intervalos anteriores (z-score acima de threshold).
+        """
+        now = int(now or time.time())
+        current_start = (now // bucket_seconds) * bucket_seconds
+        since = current_start - baseline_buckets * bucket_seconds
+
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT e.fingerprint_id, (e.ts / ?) * ? AS bucket, COUNT(*)
+                FROM error_events e
+                WHERE e.ts >= ? AND e.ts < ?
+                GROUP BY e.fingerprint_id, bucket
+                """,
+                (bucket_seconds, bucket_seconds, since, current_start + bucket_seconds)
+            ).fetchall()
+
+        series: Dict[int, Dict[int, int]] = {}
+        for fingerprint_id, bucket, total in rows:
+            series.setdefault(fingerprint_id, {})[bucket] = total
+
+        spikes = []
+        for fingerprint_id, buckets in series.items():
+            current = buckets.get(current_start, 0)
+            if current < min_count:
+                continue
+            history = [buckets.get(since + i * bucket_seconds, 0) for i in range(baseline_buckets)]
+            mean = sum(history) / len(history)
+            std = math.sqrt(sum((x - mean) ** 2 for x in history) / len(history))
+            # Desvio mínimo de 1 evento evita z-score infinito para séries constantes
+            zscore = (current - mean) / max(std, 1.0)
+            if zscore >= threshold:
+                spikes.append({'fingerprint_id': fingerprint_id, 'current': current,
+                               'baseline': round(mean, 2), 'zscore': round(zscore, 2)})
+
+        if not spikes:
+            return []
+
+        details = self._fingerprint_details([spike['fingerprint_id'] for spike in spikes])
+        for spike in spikes:
+            spike.update(details[spike.pop('fingerprint_id')])
+        return sorted(spikes, key=lambda s: s['zscore'], reverse=True)
+
+    def _fingerprint_details(self, ids: List[int]) -> Dict[int, Dict]:
+        placeholders = ",".join("?" for _ in ids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, fingerprint, template, pattern FROM event_fingerprints WHERE id IN ({placeholders})",
+                ids
+            ).fetchall()
+        return {r[0]: {'fingerprint': r[1], 'template': r[2], 'pattern': r[3]} for r in rows}
+
+    def sources(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM event_sources ORDER BY name")]
+
+    def last_event_ts(self, source: str = None) -> Optional[int]:
+        """Timestamp do evento mais recente (marca d'água da ingestão)."""
+        where, params = self._filters(source=source)
+        with self._lock:
+            return self._conn.execute(f"SELECT MAX(e.ts) FROM error_events e{where}", params).fetchone()[0]
+
+    def prune(self, now: float = None) -> int:
+        """Remove eventos mais antigos que a retenção."""
+        now = now or time.time()
+        cutoff = int(now - self.retention_seconds)
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM error_events WHERE ts < ?", (cutoff,))
+            self._last_prune = now
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,256 @@
+# monitoring/file_follower.py
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Tamanho de cada leitura e limite lido por chamada (o restante fica para a próxima)
+DEFAULT_READ_SIZE = 1024 * 1024
+DEFAULT_MAX_READ = 64 * 1024 * 1024
+
+# Eventos inotify relevantes (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class FileFollower:
+    """
+    Acompanha um arquivo de log como `tail -F`.
+
+    Mantém o descritor aberto e a posição de leitura; a cada read_new()
+    devolve apenas as linhas completas escritas desde a última chamada.
+    Detecta rotação (o caminho passa a apontar para outro inode: o restante
+    do arquivo antigo é lido antes de reabrir) e truncamento (tamanho menor
+    que a posição: volta ao início).
+    """
+
+    def __init__(self, path: str, start_at_end: bool = True, read_size: int = DEFAULT_READ_SIZE,
+                 max_read: int = DEFAULT_MAX_READ):
+        self.path = Path(path)
+        self.start_at_end = start_at_end
+        self.read_size = read_size
+        self.max_read = max_read
+
+        self.position = 0       # Offset em bytes do próximo byte a ser entregue
+        self.line_count = 0     # Linhas completas já entregues
+        self.rotations = 0
+        self.truncations = 0
+
+        self._fd: Optional[int] = None
+        self._inode: Optional[Tuple[int, int]] = None
+        self._pending = b''     # Linha parcial aguardando o fim de linha
+        self._first_open = True
+
+    def read_new(self) -> Tuple[bytes, int, int]:
+        """
+        Lê o que foi acrescentado ao arquivo.
+
+        Retorna (dados, offset, primeira_linha): dados contém apenas linhas
+        completas, offset é a posição deles no arquivo e primeira_linha o
+        número da primeira linha entregue.
+        """
+        if self._fd is not None and self._rotated():
+            # Entregar o restante do arquivo antigo (inclusive a linha parcial) antes de seguir o novo
+            remainder = self._pending + self._read_available()
+            offset, first_line = self.position, self.line_count + 1
+            self._pending = b''
+            self._close()
+            self.rotations += 1
+            print(f"🔄 Rotação detectada em {self.path}")
+            if remainder:
+                return remainder, offset, first_line
+
+        if self._fd is None and not self._open():
+            return b'', self.position, self.line_count + 1
+
+        size = os.fstat(self._fd).st_size
+        if size < self.position + len(self._pending):
+            self.truncations += 1
+            print(f"✂️ Truncamento detectado em {self.path}")
+            self._reset_position(0)
+
+        return self._split(self._read_available())
+
+    def _split(self, data: bytes) -> Tuple[bytes, int, int]:
+        data = self._pending + data
+        last_newline = data.rfind(b'\n') + 1
+        if last_newline == 0 and len(data) < self.max_read:
+            self._pending = data
+            return b'', self.position, self.line_count + 1
+
+        # Linha maior que max_read é entregue mesmo sem fim de linha
+        cut = last_newline or len(data)
+        complete, self._pending = data[:cut], data[cut:]
+
+        offset, first_line = self.position, self.line_count + 1
+        self.position += len(complete)
+        self.line_count += complete.count(b'\n')
+        return complete, offset, first_line
+
+    def _read_available(self) -> bytes:
+        parts = []
+        total = 0
+        while total < self.max_read:
+            block = os.read(self._fd, min(self.read_size, self.max_read - total))
+            if not block:
+                break
+            parts.append(block)
+            total += len(block)
+        return b''.join(parts)
+
+    def _open(self) -> bool:
+        try:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            # Arquivo criado depois do início será lido desde o começo
+            self._first_open = False
+            return False
+
+        stat = os.fstat(self._fd)
+        self._inode = (stat.st_dev, stat.st_ino)
+
+        if self._first_open and self.start_at_end:
+            # Como tail -F: ignorar o conteúdo existente, mas manter a numeração das linhas
+            self._reset_position(stat.st_size)
+            self.line_count = self._count_lines(stat.st_size)
+        else:
+            self._reset_position(0)
+        self._first_open = False
+        return True
+
+    def _count_lines(self, size: int) -> int:
+        count = 0
+        offset = 0
+        while offset < size:
+            block = os.pread(self._fd, min(self.max_read, size - offset), offset)
+            if not block:
+                break
+            count += block.count(b'\n')
+            offset += len(block)
+        return count
+
+    def _reset_position(self, position: int):
+        self.position = position
+        self.line_count = 0
+        self._pending = b''
+        os.lseek(self._fd, position, os.SEEK_SET)
+
+    def _rotated(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Arquivo movido e ainda não recriado: continuar no descritor atual
+            return False
+        return (stat.st_dev, stat.st_ino) != self._inode
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self._inode = None
+
+    def close(self):
+        self._close()
+
+
+class ChangeWatcher:
+    """Aguarda mudanças em um diretório; a implementação base apenas consulta periodicamente."""
+
+    def __init__(self, directory: str, poll_interval: float = 0.5):
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+
+    async def wait(self, timeout: float) -> bool:
+        """Aguarda até timeout segundos; True indica que vale a pena verificar os arquivos."""
+        await asyncio.sleep(min(self.poll_interval, timeout))
+        return True
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(ChangeWatcher):
+    """Notificações do kernel via inotify (Linux), integradas ao loop asyncio."""
+
+    def __init__(self, directory: str, poll_interval: float = 0.5):
+        super().__init__(directory, poll_interval)
+        libc = _load_libc()
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        watch = libc.inotify_add_watch(self._fd, os.fsencode(self.directory), WATCH_MASK)
+        if watch < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch falhou para {self.directory}")
+
+        self._event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def wait(self, timeout: float) -> bool:
+        self._ensure_reader()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+    def _ensure_reader(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._remove_reader()
+            self._loop = loop
+            self._event = asyncio.Event()
+            # Eventos ocorridos antes do registro continuam enfileirados no descritor
+            loop.add_reader(self._fd, self._on_readable)
+
+    def _on_readable(self):
+        # O conteúdo dos eventos não importa: qualquer mudança leva a uma verificação
+        try:
+            while os.read(self._fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        self._event.set()
+
+    def _remove_reader(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._fd)
+        self._loop = None
+
+    def close(self):
+        self._remove_reader()
+        os.close(self._fd)
+
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _libc
+
+
+def create_watcher(directory: str, use_inotify: bool = True, poll_interval: float = 0.5) -> ChangeWatcher:
+    """Usa inotify quando disponível; caso contrário, consulta a cada poll_interval."""
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory, poll_interval)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify indisponível para {directory} ({e}); usando polling")
+    return ChangeWatcher(directory, poll_interval)
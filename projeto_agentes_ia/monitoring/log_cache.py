@@ -0,0 +1,211 @@
+# monitoring/log_cache.py
+import asyncio
+import json
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+import aiohttp
+
+from .log_index import LogIndexManager, TAIL_CHECK_SIZE
+
+# Bytes finais da cópia local reenviados no pedido parcial para confirmar a continuidade
+RANGE_OVERLAP = TAIL_CHECK_SIZE
+
+
+@dataclass
+class CacheEntryMeta:
+    """Metadados de validação da cópia local."""
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class LogCache:
+    """
+    Cache local dos logs por dia, compartilhado por comandos e monitoramento.
+
+    Cada nome (data) tem uma cópia em disco no diretório do LogIndexManager,
+    então o índice de busca é atualizado a partir do mesmo arquivo. Dentro do
+    TTL a cópia é servida direto do disco; depois dele é revalidada com GET
+    condicional (ETag/Last-Modified) e, quando o servidor aceita Range, apenas
+    os bytes novos são baixados. Pedidos simultâneos do mesmo nome
+    compartilham um único download (single-flight). Em caso de erro do
+    servidor a última cópia é servida.
+    """
+
+    def __init__(self, index_manager: LogIndexManager, ttl_seconds: float = 60, timeout: float = 30):
+        self.index_manager = index_manager
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._meta: Dict[str, CacheEntryMeta] = {}
+        self.stats = {'hits': 0, 'coalesced': 0, 'not_modified': 0, 'partial': 0, 'full': 0, 'stale': 0}
+
+    def path(self, name: str) -> Path:
+        return self.index_manager.log_path(name)
+
+    async def get(self, session: aiohttp.ClientSession, url: str, name: str,
+                  max_age: float = None) -> Optional[bytes]:
+        """Retorna o conteúdo do log, baixando apenas se a cópia local estiver vencida."""
+        max_age = self.ttl_seconds if max_age is None else max_age
+        meta = self._load_meta(name, url)
+
+        if meta.fetched_at and time.time() - meta.fetched_at <= max_age and self.path(name).exists():
+            self.stats['hits'] += 1
+            return await asyncio.to_thread(self.path(name).read_bytes)
+
+        inflight = self._inflight.get(name)
+        if inflight is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(inflight)
+
+        # O download é uma task do cache: cancelar quem o iniciou (ex.: timeout
+        # do agendador) não interrompe a espera dos demais interessados
+        task = asyncio.create_task(self._refresh(session, url, name, meta), name=f"log-cache-{name}")
+        self._inflight[name] = task
+        task.add_done_callback(lambda done: self._refresh_done(name, done))
+        return await asyncio.shield(task)
+
+    def _refresh_done(self, name: str, task: asyncio.Task):
+        if self._inflight.get(name) is task:
+            del self._inflight[name]
+        if not task.cancelled():
+            # Evitar aviso de exceção não consumida quando não há outros interessados
+            task.exception()
+
+    async def _refresh(self, session: aiohttp.ClientSession, url: str, name: str,
+                       meta: CacheEntryMeta) -> Optional[bytes]:
+        path = self.path(name)
+        size = path.stat().st_size if path.exists() else 0
+        meta.url = url
+
+        headers = {}
+        if size:
+            if meta.etag:
+                headers["If-None-Match"] = meta.etag
+            if meta.last_modified:
+                headers["If-Modified-Since"] = meta.last_modified
+            overlap = min(RANGE_OVERLAP, size)
+            headers["Range"] = f"bytes={size - overlap}-"
+
+        try:
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status == 304:
+                    self.stats['not_modified'] += 1
+                    changed = False
+                elif response.status == 206:
+                    body = await response.read()
+                    changed = await asyncio.to_thread(self._apply_partial, path, size, response, body)
+                    if changed is None:
+                        # Conteúdo não continua a cópia local: baixar tudo
+                        return await self._refresh_full(session, url, name, meta)
+                    self.stats['partial'] += 1
+                elif response.status == 200:
+                    body = await response.read()
+                    changed = await asyncio.to_thread(self._store_full, name, body)
+                    self.stats['full'] += 1
+                elif response.status == 416:
+                    # Arquivo remoto ficou menor que a cópia: baixar tudo
+                    return await self._refresh_full(session, url, name, meta)
+                else:
+                    print(f"⚠️ Erro HTTP {response.status} ao acessar logs de {name}")
+                    return await self._stale(name)
+
+                self._remember(name, meta, response)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️ Falha ao atualizar logs de {name}: {e or e.__class__.__name__}")
+            return await self._stale(name)
+
+        return await self._after_refresh(name, changed)
+
+    async def _refresh_full(self, session: aiohttp.ClientSession, url: str, name: str,
+                            meta: CacheEntryMeta) -> Optional[bytes]:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            if response.status != 200:
+                print(f"⚠️ Erro HTTP {response.status} ao acessar logs de {name}")
+                return await self._stale(name)
+            body = await response.read()
+            changed = await asyncio.to_thread(self._store_full, name, body)
+            self.stats['full'] += 1
+            self._remember(name, meta, response)
+        return await self._after_refresh(name, changed)
+
+    def _store_full(self, name: str, body: bytes) -> bool:
+        """Grava o conteúdo completo; um arquivo substituído descarta o índice antigo."""
+        return self.index_manager.get(name).store(body) is not False
+
+    async def _after_refresh(self, name: str, changed: bool) -> Optional[bytes]:
+        path = self.path(name)
+        if changed:
+            await asyncio.to_thread(self.index_manager.get(name).update)
+        return await asyncio.to_thread(path.read_bytes) if path.exists() else None
+
+    async def _stale(self, name: str) -> Optional[bytes]:
+        path = self.path(name)
+        if not path.exists():
+            return None
+        self.stats['stale'] += 1
+        return await asyncio.to_thread(path.read_bytes)
+
+    @staticmethod
+    def _apply_partial(path: Path, size: int, response: aiohttp.ClientResponse, body: bytes) -> Optional[bool]:
+        """Acrescenta o trecho novo; None se o trecho não continua a cópia local."""
+        content_range = response.headers.get("Content-Range", "")
+        try:
+            start = int(content_range.split()[1].split("-")[0])
+        except (IndexError, ValueError):
+            return None
+
+        overlap = size - start
+        if start < 0 or overlap < 0 or len(body) < overlap:
+            return None
+
+        with open(path, 'rb') as f:
+            f.seek(start)
+            if f.read(overlap) != body[:overlap]:
+                return None
+
+        if len(body) == overlap:
+            return False
+        with open(path, 'ab') as f:
+            f.write(body[overlap:])
+        return True
+
+    def _remember(self, name: str, meta: CacheEntryMeta, response: aiohttp.ClientResponse):
+        meta.etag = response.headers.get("ETag", meta.etag)
+        meta.last_modified = response.headers.get("Last-Modified", meta.last_modified)
+        meta.fetched_at = time.time()
+        self._meta[name] = meta
+        try:
+            with open(self._meta_path(name), 'w', encoding='utf-8') as f:
+                json.dump(meta.to_dict(), f)
+        except OSError as e:
+            print(f"⚠️ Erro ao salvar metadados do cache de {name}: {e}")
+
+    def _load_meta(self, name: str, url: str) -> CacheEntryMeta:
+        meta = self._meta.get(name)
+        if meta is not None:
+            return meta
+
+        meta = CacheEntryMeta(url=url)
+        meta_path = self._meta_path(name)
+        if meta_path.exists():
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = CacheEntryMeta(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                pass
+        # Após reinício, a cópia só é reaproveitada depois de revalidada
+        meta.fetched_at = 0.0
+        self._meta[name] = meta
+        return meta
+
+    def _meta_path(self, name: str) -> Path:
+        return self.path(name).with_suffix(".meta.json")
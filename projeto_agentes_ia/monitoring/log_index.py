@@ -0,0 +1,519 @@
+# monitoring/log_index.py
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+TOKEN_PATTERN = re.compile(rb'\w+')
+LINE_TIMESTAMP_PATTERN = re.compile(rb'(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})')
+
+# Bytes do início da linha onde o timestamp é procurado
+TIMESTAMP_WINDOW = 48
+
+# Bytes finais comparados para decidir se um conteúdo novo apenas continua a cópia local
+TAIL_CHECK_SIZE = 4096
+
+# Acima deste número de segmentos as listas de postings são compactadas
+MAX_SEGMENTS = 32
+
+# Bytes lidos do arquivo por vez em update()
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Sufixo para buscar tokens por prefixo no índice UNIQUE de index_tokens
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+# Posição de um fragmento do termo nos tokens da linha, da mais seletiva para a menos
+FRAGMENT_KINDS = ("exact", "prefix", "suffix", "infix")
+
+
+@dataclass
+class SearchHit:
+    """Linha encontrada na busca indexada."""
+    line_number: int
+    offset: int
+    line: str
+    context: str
+    timestamp: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class LogIndex:
+    """
+    Índice invertido de tokens de um arquivo de log, persistido em SQLite.
+
+    Para cada linha guarda offset, tamanho e timestamp; para cada token
+    (minúsculo) a lista de linhas em que aparece. O índice cresce por
+    segmentos a cada update(), indexando só os bytes novos do arquivo. As
+    buscas usam o índice para achar linhas candidatas e confirmam cada uma
+    lendo apenas a linha do disco pelo offset.
+    """
+
+    def __init__(self, log_path: str, index_path: str = None):
+        self.log_path = Path(log_path)
+        self.index_path = Path(index_path or f"{log_path}.idx.sqlite3")
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+        self._minute_cache: Dict[bytes, int] = {}
+        self._token_cache: Dict[bytes, int] = {}
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS index_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS index_lines (
+                    line_number INTEGER PRIMARY KEY,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    ts INTEGER
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_index_lines_ts ON index_lines(ts);
+
+                CREATE TABLE IF NOT EXISTS index_tokens (
+                    id INTEGER PRIMARY KEY,
+                    token TEXT NOT NULL UNIQUE
+                );
+
+                CREATE TABLE IF NOT EXISTS index_postings (
+                    token_id INTEGER NOT NULL,
+                    segment INTEGER NOT NULL,
+                    lines BLOB NOT NULL,
+                    PRIMARY KEY (token_id, segment)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    def _meta(self, key: str, default: int = 0) -> int:
+        row = self._conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, **values: int):
+        self._conn.executemany(
+            "INSERT INTO index_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            list(values.items())
+        )
+
+    @property
+    def indexed_bytes(self) -> int:
+        return self._meta("indexed_bytes")
+
+    @property
+    def line_count(self) -> int:
+        return self._meta("line_count")
+
+    def update(self) -> int:
+        """Indexa as linhas completas acrescentadas ao arquivo. Retorna o número de linhas novas."""
+        with self._lock:
+            return self._update()
+
+    def _update(self) -> int:
+        if not self.log_path.exists():
+            return 0
+
+        size = self.log_path.stat().st_size
+        start = self._meta("indexed_bytes")
+        if size < start:
+            # Arquivo substituído por um menor: reconstruir
+            self._reset()
+            start = 0
+
+        # Ler em blocos limitados; a linha incompleta do fim de um bloco segue para o próximo
+        added = 0
+        pending = b''
+        with open(self.log_path, 'rb') as f:
+            f.seek(start)
+            position = start
+            while position < size:
+                data = f.read(min(READ_BLOCK_SIZE, size - position))
+                if not data:
+                    break
+                position += len(data)
+                pending += data
+                end = pending.rfind(b'\n') + 1
+                if end == 0:
+                    continue
+                added += self._index_block(pending[:end], start)
+                start += end
+                pending = pending[end:]
+        return added
+
+    def store(self, data: bytes) -> Optional[bool]:
+        """
+        Grava o conteúdo completo na cópia local (ver write_log_copy) sob a
+        trava do índice, para que nenhuma busca leia o arquivo no meio da
+        troca. Um arquivo substituído descarta o índice.
+        """
+        with self._lock:
+            result = write_log_copy(self.log_path, data)
+            if result is None:
+                self._reset()
+            return result
+
+    def _index_block(self, block: bytes, base_offset: int) -> int:
+        first_line = self._meta("line_count") + 1
+        last_ts = self._meta("last_ts") or None
+        segment = self._meta("segments")
+
+        line_rows = []
+        postings: Dict[bytes, array] = {}
+        offset = base_offset
+        line_number = first_line
+
+        for line in block.split(b'\n')[:-1]:
+            ts = self._line_timestamp(line[:TIMESTAMP_WINDOW])
+            if ts is None:
+                ts = last_ts  # Continuação (ex.: stack trace) herda o timestamp anterior
+            else:
+                last_ts = ts
+            line_rows.append((line_number, offset, len(line), ts))
+
+            for token in set(TOKEN_PATTERN.findall(line.lower())):
+                lines = postings.get(token)
+                if lines is None:
+                    lines = postings[token] = array('I')
+                lines.append(line_number)
+
+            offset += len(line) + 1
+            line_number += 1
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO index_lines (line_number, offset, length, ts) VALUES (?, ?, ?, ?)",
+                line_rows
+            )
+            token_ids = self._token_ids(postings.keys())
+            self._conn.executemany(
+                "INSERT INTO index_postings (token_id, segment, lines) VALUES (?, ?, ?)",
+                [(token_ids[token], segment, lines.tobytes()) for token, lines in postings.items()]
+            )
+            self._set_meta(indexed_bytes=base_offset + len(block), line_count=line_number - 1,
+                           last_ts=last_ts or 0, segments=segment + 1)
+
+        if segment + 1 > MAX_SEGMENTS:
+            self._compact()
+        return len(line_rows)
+
+    def _token_ids(self, tokens: Iterable[bytes]) -> Dict[bytes, int]:
+        ids = {}
+        for token in tokens:
+            token_id = self._token_cache.get(token)
+            if token_id is None:
+                text = token.decode('utf-8', 'replace')
+                self._conn.execute("INSERT OR IGNORE INTO index_tokens (token) VALUES (?)", (text,))
+                token_id = self._conn.execute("SELECT id FROM index_tokens WHERE token = ?", (text,)).fetchone()[0]
+                self._token_cache[token] = token_id
+            ids[token] = token_id
+        return ids
+
+    def _line_timestamp(self, head: bytes) -> Optional[int]:
+        match = LINE_TIMESTAMP_PATTERN.search(head)
+        if not match:
+            return None
+        minute_key = match.group()[:16]
+        base = self._minute_cache.get(minute_key)
+        if base is None:
+            year, month, day, hour, minute = (int(g) for g in match.groups()[:5])
+            try:
+                base = int(datetime(year, month, day, hour, minute).timestamp())
+            except ValueError:
+                return None
+            self._minute_cache[minute_key] = base
+        return base + int(match.group(6))
+
+    def _compact(self):
+        """Junta os segmentos de cada token em um só."""
+        with self._conn:
+            rows = self._conn.execute(
+                "SELECT token_id, lines FROM index_postings ORDER BY token_id, segment"
+            ).fetchall()
+            merged: Dict[int, array] = {}
+            for token_id, blob in rows:
+                lines = merged.get(token_id)
+                if lines is None:
+                    lines = merged[token_id] = array('I')
+                lines.frombytes(blob)
+            self._conn.execute("DELETE FROM index_postings")
+            self._conn.executemany(
+                "INSERT INTO index_postings (token_id, segment, lines) VALUES (?, 0, ?)",
+                [(token_id, lines.tobytes()) for token_id, lines in merged.items()]
+            )
+            self._set_meta(segments=1)
+
+    def reset(self):
+        """Descarta o índice (o arquivo foi substituído)."""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._token_cache.clear()
+        with self._conn:
+            for table in ("index_meta", "index_lines", "index_tokens", "index_postings"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def search(self, term: str = None, regex: str = None, since: float = None, until: float = None,
+               limit: int = 5, context_lines: int = 1) -> List[SearchHit]:
+        """
+        Busca linhas pelo texto (case-insensitive), por expressão regular e/ou
+        intervalo de tempo (epoch). Os resultados seguem a ordem do arquivo.
+        """
+        with self._lock:
+            candidates = self._candidates(term, regex, since, until)
+            compiled = re.compile(regex.encode('utf-8'), re.IGNORECASE) if regex else None
+            needle = term.lower() if term else None
+
+            hits = []
+            with open(self.log_path, 'rb') as f:
+                for line_number, offset, length, ts in self._line_rows(candidates, since, until):
+                    f.seek(offset)
+                    line = f.read(length)
+                    line_text = str(line, 'utf-8', 'replace')
+                    if needle is not None and needle not in line_text.lower():
+                        continue
+                    if compiled is not None and not compiled.search(line):
+                        continue
+                    hits.append(SearchHit(
+                        line_number=line_number,
+                        offset=offset,
+                        line=line_text.strip(),
+                        context=self._context(f, line_number, context_lines),
+                        timestamp=ts
+                    ))
+                    if len(hits) >= limit:
+                        break
+            return hits
+
+    def _candidates(self, term: Optional[str], regex: Optional[str], since: Optional[float],
+                    until: Optional[float]) -> Optional[List[int]]:
+        """Linhas candidatas em ordem; None significa que nenhum filtro de texto se aplica."""
+        texts = [term] if term else []
+        if regex:
+            texts.extend(required_literals(regex))
+
+        fragments: Dict[str, str] = {}
+        for text in texts:
+            for fragment, kind in _fragments(text):
+                # Um mesmo fragmento em posições diferentes: vale a forma mais seletiva
+                current = fragments.get(fragment)
+                if current is None or FRAGMENT_KINDS.index(kind) < FRAGMENT_KINDS.index(current):
+                    fragments[fragment] = kind
+
+        if not fragments:
+            return None
+
+        # Fragmentos que começam uma palavra são buscados pelo índice de tokens
+        # (igualdade ou faixa de prefixo). Os demais podem estar no meio de um
+        # token e exigiriam percorrer todo o vocabulário; se houver algum
+        # fragmento indexável eles ficam para a conferência da linha em search().
+        indexed = [(f, k) for f, k in fragments.items() if k in ("exact", "prefix")]
+        if not indexed:
+            indexed = [(max(fragments, key=len), "infix")]
+
+        result: Optional[Set[int]] = None
+        # Buscas exatas e tokens mais longos são mais seletivos: começar por eles
+        for fragment, kind in sorted(indexed, key=lambda item: (item[1] != "exact", -len(item[0]))):
+            lines = self._lines_for_fragment(fragment, kind)
+            result = lines if result is None else result & lines
+            if not result:
+                return []
+        return sorted(result)
+
+    def _lines_for_fragment(self, fragment: str, kind: str = "infix") -> Set[int]:
+        """
+        Linhas com algum token que casa com o fragmento: igual ("exact"),
+        começando por ele ("prefix") ou contendo-o em qualquer posição
+        ("infix", percorre o vocabulário inteiro).
+        """
+        if kind == "exact":
+            where, params = "t.token = ?", (fragment,)
+        elif kind == "prefix":
+            where, params = "t.token >= ? AND t.token < ?", (fragment, fragment + PREFIX_UPPER_BOUND)
+        else:
+            where, params = "instr(t.token, ?) > 0", (fragment,)
+
+        rows = self._conn.execute(
+            f"""
+            SELECT p.lines FROM index_tokens t
+            JOIN index_postings p ON p.token_id = t.id
+            WHERE {where}
+            """,
+            params
+        ).fetchall()
+        lines: Set[int] = set()
+        for (blob,) in rows:
+            postings = array('I')
+            postings.frombytes(blob)
+            lines.update(postings)
+        return lines
+
+    def _line_rows(self, candidates: Optional[List[int]], since: Optional[float], until: Optional[float]):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(int(until))
+        where = (" AND " + " AND ".join(clauses)) if clauses else ""
+
+        if candidates is None:
+            yield from self._conn.execute(
+                f"SELECT line_number, offset, length, ts FROM index_lines WHERE 1 = 1{where} ORDER BY line_number",
+                params
+            )
+            return
+
+        # Consultar em lotes para respeitar o limite de parâmetros do SQLite
+        for i in range(0, len(candidates), 500):
+            batch = candidates[i:i + 500]
+            placeholders = ",".join("?" for _ in batch)
+            yield from self._conn.execute(
+                f"""
+                SELECT line_number, offset, length, ts FROM index_lines
+                WHERE line_number IN ({placeholders}){where}
+                ORDER BY line_number
+                """,
+                batch + params
+            ).fetchall()
+
+    def _context(self, f, line_number: int, context_lines: int) -> str:
+        row = self._conn.execute(
+            """
+            SELECT MIN(offset), MAX(offset + length) FROM index_lines
+            WHERE line_number BETWEEN ? AND ?
+            """,
+            (line_number - context_lines, line_number + context_lines)
+        ).fetchone()
+        f.seek(row[0])
+        return str(f.read(row[1] - row[0]), 'utf-8', 'replace')
+
+    def close(self):
+        self._conn.close()
+
+
+def _fragments(text: str) -> List[tuple]:
+    """
+    Tokens de um trecho que precisa aparecer inteiro na linha, com a posição
+    que ocupam nos tokens da linha: um token precedido por separador no
+    trecho começa um token da linha ("prefix"); seguido por separador,
+    termina um ("suffix"); com os dois, é o token inteiro ("exact"); sem
+    nenhum, pode estar em qualquer posição ("infix").
+    """
+    data = text.lower().encode('utf-8')
+    fragments = []
+    for match in TOKEN_PATTERN.finditer(data):
+        starts = match.start() > 0
+        ends = match.end() < len(data)
+        if starts and ends:
+            kind = "exact"
+        elif starts:
+            kind = "prefix"
+        elif ends:
+            kind = "suffix"
+        else:
+            kind = "infix"
+        fragments.append((match.group().decode('utf-8', 'replace'), kind))
+    return fragments
+
+
+def required_literals(regex: str) -> List[str]:
+    """
+    Trechos literais que toda linha que casa com a regex precisa conter
+    (sequências de literais no nível superior do padrão). Usado como
+    pré-filtro no índice; a regex é sempre verificada na linha.
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+    except re.error:
+        return []
+
+    literals, current = [], []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if current:
+            literals.append("".join(current))
+            current = []
+    if current:
+        literals.append("".join(current))
+    return literals
+
+
+class LogIndexManager:
+    """Arquivos de log por dia em disco e seus índices (<dir>/<data>.log)."""
+
+    def __init__(self, directory: str = "log_storage/logs"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._indexes: Dict[str, LogIndex] = {}
+        self._lock = threading.Lock()
+
+    def log_path(self, name: str) -> Path:
+        safe_name = re.sub(r'[^\w.-]', '_', name)
+        return self.directory / f"{safe_name}.log"
+
+    def get(self, name: str) -> LogIndex:
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None:
+                index = self._indexes[name] = LogIndex(str(self.log_path(name)))
+            return index
+
+    def ingest(self, name: str, data: bytes) -> LogIndex:
+        """Atualiza a cópia local com o conteúdo completo mais recente e indexa o que é novo."""
+        index = self.get(name)
+        index.store(data)
+        index.update()
+        return index
+
+    def close(self):
+        for index in self._indexes.values():
+            index.close()
+        self._indexes.clear()
+
+
+def write_log_copy(path: Path, data: bytes) -> Optional[bool]:
+    """
+    Grava o conteúdo completo de um log na cópia local. Se o conteúdo apenas
+    continua a cópia existente, só a diferença é escrita. Retorna True se
+    acrescentou, False se nada mudou e None se o arquivo foi substituído.
+    """
+    size = path.stat().st_size if path.exists() else 0
+    if size and len(data) >= size:
+        tail = min(size, TAIL_CHECK_SIZE)
+        with open(path, 'rb') as f:
+            f.seek(size - tail)
+            same_prefix = f.read(tail) == data[size - tail:size]
+        if same_prefix:
+            if len(data) == size:
+                return False
+            with open(path, 'ab') as f:
+                f.write(data[size:])
+            return True
+
+    tmp_path = path.with_suffix(".log.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return None
@@ -0,0 +1,180 @@
+# monitoring/multi_source.py
+import asyncio
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+from .sources import LogChunk, LogSource
+
+ChunkHandler = Callable[[LogSource, LogChunk], Awaitable[None]]
+
+
+@dataclass
+class SourceState:
+    """Estado de agendamento de uma fonte."""
+    name: str
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    consecutive_failures: int = 0
+    next_run: Optional[float] = None
+    polls: int = 0
+    pending_chunks: int = 0
+    handler_errors: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class MultiSourceMonitor:
+    """
+    Executa várias fontes de log em paralelo, cada uma com sua agenda.
+
+    Todas as fontes HTTP compartilham uma única aiohttp.ClientSession com
+    limites de conexão globais e por host. Cada fonte roda em sua própria
+    task com timeout próprio, então uma fonte lenta ou fora do ar entra em
+    backoff sem atrasar as demais.
+
+    No modo contínuo (run()) o conteúdo obtido vai para uma fila por fonte,
+    consumida por uma task própria que chama o handler: a análise (ex.: IA)
+    não segura a agenda da fonte. Os trechos de uma fonte são tratados em
+    ordem; com max_pending_chunks na fila, a fonte espera antes de buscar mais.
+    """
+
+    def __init__(self, sources: List[LogSource], handler: ChunkHandler, connection_limit: int = 20,
+                 per_host_limit: int = 4, session_factory: Callable[[], aiohttp.ClientSession] = None,
+                 max_pending_chunks: int = 8):
+        self.sources = sources
+        self.handler = handler
+        self.max_pending_chunks = max_pending_chunks
+        self.connection_limit = connection_limit
+        self.per_host_limit = per_host_limit
+        # Sessão compartilhada fornecida pela aplicação (não é fechada aqui)
+        self.session_factory = session_factory
+        self.states: Dict[str, SourceState] = {source.name: SourceState(name=source.name) for source in sources}
+        self.is_running = False
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def run(self):
+        """Inicia o loop de todas as fontes e aguarda até stop()."""
+        self.is_running = True
+        owned = self.session_factory is None
+        session = self._create_session() if owned else self.session_factory()
+        try:
+            self._session = session
+            self._tasks = [
+                asyncio.create_task(self._source_loop(source), name=f"log-source-{source.name}")
+                for source in self.sources
+            ]
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            if owned:
+                await session.close()
+            for source in self.sources:
+                source.close()
+            self._session = None
+            self._tasks = []
+            self.is_running = False
+
+    def stop(self):
+        """Interrompe todas as fontes."""
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+
+    async def poll_once(self, sources: List[LogSource] = None) -> Dict[str, bool]:
+        """Verifica as fontes uma vez, em paralelo. Retorna sucesso por fonte."""
+        targets = sources or self.sources
+        session = self._session or (self.session_factory() if self.session_factory else None)
+        if session and not session.closed:
+            results = await asyncio.gather(*(self._poll(source, session) for source in targets))
+        else:
+            async with self._create_session() as session:
+                results = await asyncio.gather(*(self._poll(source, session) for source in targets))
+        return {source.name: ok for source, ok in zip(targets, results)}
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.connection_limit, limit_per_host=self.per_host_limit)
+        return aiohttp.ClientSession(connector=connector)
+
+    async def _source_loop(self, source: LogSource):
+        state = self.states[source.name]
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_chunks)
+
+        async def enqueue(source: LogSource, chunk: LogChunk):
+            await queue.put(chunk)
+            state.pending_chunks = queue.qsize()
+
+        consumer = asyncio.create_task(self._handle_chunks(source, queue), name=f"log-handler-{source.name}")
+        try:
+            # Espalhar o início das fontes para não disparar tudo ao mesmo tempo
+            await asyncio.sleep(random.uniform(0, source.interval * source.jitter))
+
+            while self.is_running:
+                ok = await self._poll(source, self._session, deliver=enqueue)
+                if ok and source.streaming:
+                    # A própria fonte aguarda novas linhas dentro de poll()
+                    continue
+                delay = self.next_delay(source, state.consecutive_failures)
+                state.next_run = time.time() + delay
+                await asyncio.sleep(delay)
+        finally:
+            consumer.cancel()
+
+    async def _handle_chunks(self, source: LogSource, queue: asyncio.Queue):
+        """Entrega ao handler, em ordem, o conteúdo enfileirado por uma fonte."""
+        state = self.states[source.name]
+        while True:
+            chunk = await queue.get()
+            try:
+                await self.handler(source, chunk)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                state.handler_errors += 1
+                print(f"❌ Erro ao processar conteúdo da fonte {source.name}: {e or e.__class__.__name__}")
+            finally:
+                state.pending_chunks = queue.qsize()
+                queue.task_done()
+
+    async def _poll(self, source: LogSource, session: aiohttp.ClientSession,
+                    deliver: ChunkHandler = None) -> bool:
+        """Busca a fonte e entrega o conteúdo (padrão: direto ao handler)."""
+        state = self.states.setdefault(source.name, SourceState(name=source.name))
+        state.polls += 1
+        deliver = deliver or self.handler
+        try:
+            chunks = await asyncio.wait_for(source.poll(session), timeout=source.timeout)
+            for chunk in chunks:
+                await deliver(source, chunk)
+            state.last_success = time.time()
+            state.last_error = None
+            state.consecutive_failures = 0
+            return True
+
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            state.last_error = f"timeout após {source.timeout:g}s"
+        except Exception as e:
+            state.last_error = str(e) or e.__class__.__name__
+
+        state.consecutive_failures += 1
+        print(f"⚠️ Fonte {source.name} falhou ({state.consecutive_failures}x): {state.last_error}")
+        return False
+
+    @staticmethod
+    def next_delay(source: LogSource, failures: int = 0) -> float:
+        """Intervalo até a próxima verificação, com jitter e backoff exponencial."""
+        if failures:
+            base = min(source.interval * source.backoff_factor ** failures, source.max_backoff)
+        else:
+            base = source.interval
+        spread = base * source.jitter
+        return max(0.1, base + random.uniform(-spread, spread))
+
+    def status(self) -> List[Dict]:
+        return [self.states[source.name].to_dict() for source in self.sources]
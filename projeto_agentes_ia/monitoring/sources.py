@@ -0,0 +1,270 @@
+# monitoring/sources.py
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from .file_follower import FileFollower, create_watcher
+
+
+@dataclass
+class LogChunk:
+    """Conteúdo obtido de uma fonte, pronto para o pipeline de detecção."""
+    source_name: str
+    key: str          # Chave estável usada nos checkpoints de varredura
+    label: str        # Identificação amigável (data, nome do arquivo...)
+    location: str     # URL ou caminho exibido nos alertas
+    data: bytes
+    incremental: bool = False  # data contém só o trecho novo (fontes que acompanham arquivos)
+    offset: int = 0            # Offset de data no arquivo, quando incremental
+    first_line: int = 1        # Número da primeira linha de data, quando incremental
+
+
+class LogSource(ABC):
+    """
+    Fonte de logs monitorada com agenda própria.
+
+    Cada fonte define seu intervalo de verificação, a variação aleatória
+    (jitter, fração do intervalo) e o limite do backoff exponencial aplicado
+    após falhas consecutivas.
+    """
+
+    kind = "base"
+    # Fontes de streaming aguardam mudanças dentro de poll(); o agendador não dorme entre chamadas
+    streaming = False
+
+    def __init__(self, name: str, interval: float = 300, jitter: float = 0.1, timeout: float = 30,
+                 backoff_factor: float = 2.0, max_backoff: float = 3600):
+        self.name = name
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    @abstractmethod
+    async def poll(self, session: aiohttp.ClientSession) -> List[LogChunk]:
+        """Busca o conteúdo atual da fonte."""
+        pass
+
+    @property
+    def location(self) -> str:
+        return self.name
+
+    def close(self):
+        """Libera recursos da fonte (descritores, observadores)."""
+        pass
+
+    def describe(self) -> str:
+        return f"{self.kind}:{self.name} ({self.location}, a cada {self.interval:g}s)"
+
+
+class HttpDateLogSource(LogSource):
+    """
+    Logs diários servidos por HTTP em <base_url>/<YYYY-MM-DD>.
+
+    Com um LogCache, os downloads passam pela cópia local compartilhada
+    (nome: cache_prefix + data).
+    """
+
+    kind = "http"
+
+    def __init__(self, name: str, base_url: str, days: int = 2, cache=None, cache_prefix: str = "", **kwargs):
+        super().__init__(name, **kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.days = days
+        self.cache = cache
+        self.cache_prefix = cache_prefix
+
+    @property
+    def location(self) -> str:
+        return self.base_url
+
+    def dates(self) -> List[str]:
+        """Datas monitoradas: hoje e os dias anteriores configurados."""
+        now = datetime.now()
+        return [(now - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(self.days)]
+
+    async def poll(self, session: aiohttp.ClientSession) -> List[LogChunk]:
+        results = await asyncio.gather(
+            *(self._fetch(session, date) for date in self.dates()),
+            return_exceptions=True
+        )
+
+        chunks = [result for result in results if isinstance(result, LogChunk)]
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures and len(failures) == len(results):
+            raise failures[0]
+        return chunks
+
+    async def _fetch(self, session: aiohttp.ClientSession, date: str) -> Optional[LogChunk]:
+        url = f"{self.base_url}/{date}"
+        if self.cache is not None:
+            data = await self.cache.get(session, url, f"{self.cache_prefix}{date}", max_age=0)
+            if data is None:
+                return None
+            return LogChunk(source_name=self.name, key=url, label=date, location=url, data=data)
+
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+            if response.status != 200:
+                print(f"⚠️ [{self.name}] HTTP {response.status} ao acessar logs de {date}")
+                return None
+            data = await response.read()
+            return LogChunk(source_name=self.name, key=url, label=date, location=url, data=data)
+
+
+class FileLogSource(LogSource):
+    """
+    Arquivo de log local acompanhado como `tail -F`.
+
+    Cada chamada de poll() aguarda uma notificação de mudança (inotify, com
+    fallback para polling a cada poll_interval) por até `interval` segundos e
+    entrega apenas as linhas novas, tratando rotação e truncamento.
+    """
+
+    kind = "file"
+    streaming = True
+    max_chunks_per_poll = 4
+
+    def __init__(self, name: str, path: str, interval: float = 1.0, start_at_end: bool = True,
+                 use_inotify: bool = True, poll_interval: float = 0.5, **kwargs):
+        super().__init__(name, interval=interval, **kwargs)
+        self.path = Path(path)
+        self.follower = FileFollower(str(self.path), start_at_end=start_at_end)
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self._watcher = None
+
+    @property
+    def location(self) -> str:
+        return str(self.path)
+
+    async def poll(self, session: aiohttp.ClientSession) -> List[LogChunk]:
+        if self._watcher is None:
+            # Primeira chamada: abrir o arquivo (no fim, se start_at_end) antes de observar
+            self._watcher = create_watcher(str(self.path.parent), self.use_inotify, self.poll_interval)
+            return await asyncio.to_thread(self._read_chunks)
+
+        await self._watcher.wait(min(self.interval, self.timeout / 2))
+        return await asyncio.to_thread(self._read_chunks)
+
+    def _read_chunks(self) -> List[LogChunk]:
+        chunks = []
+        # Após rotação o restante do arquivo antigo vem antes do conteúdo do novo
+        for _ in range(self.max_chunks_per_poll):
+            data, offset, first_line = self.follower.read_new()
+            if not data:
+                break
+            chunks.append(LogChunk(source_name=self.name, key=f"file:{self.path}", label=self.path.name,
+                                   location=str(self.path), data=data, incremental=True,
+                                   offset=offset, first_line=first_line))
+        return chunks
+
+    def close(self):
+        self.follower.close()
+        if self._watcher:
+            self._watcher.close()
+
+
+class DirectoryLogSource(LogSource):
+    """Diretório de logs locais; cada arquivo é acompanhado por um FileFollower."""
+
+    kind = "directory"
+    streaming = True
+
+    def __init__(self, name: str, path: str, pattern: str = "*.log", interval: float = 1.0,
+                 use_inotify: bool = True, poll_interval: float = 0.5, **kwargs):
+        super().__init__(name, interval=interval, **kwargs)
+        self.path = Path(path)
+        self.pattern = pattern
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self._followers: Dict[Path, FileFollower] = {}
+        self._watcher = None
+
+    @property
+    def location(self) -> str:
+        return str(self.path / self.pattern)
+
+    async def poll(self, session: aiohttp.ClientSession) -> List[LogChunk]:
+        if self._watcher is None:
+            # Arquivos existentes no início são acompanhados a partir do fim
+            self._watcher = create_watcher(str(self.path), self.use_inotify, self.poll_interval)
+            return await asyncio.to_thread(self._read_changed, True)
+
+        await self._watcher.wait(min(self.interval, self.timeout / 2))
+        return await asyncio.to_thread(self._read_changed)
+
+    def _read_changed(self, initial: bool = False) -> List[LogChunk]:
+        chunks = []
+        current = {file_path for file_path in self.path.glob(self.pattern) if file_path.is_file()}
+
+        for file_path in sorted(current):
+            follower = self._followers.get(file_path)
+            if follower is None:
+                follower = self._followers[file_path] = FileFollower(str(file_path), start_at_end=initial)
+            data, offset, first_line = follower.read_new()
+            if data:
+                chunks.append(LogChunk(source_name=self.name, key=f"file:{file_path}", label=file_path.name,
+                                       location=str(file_path), data=data, incremental=True,
+                                       offset=offset, first_line=first_line))
+
+        # Arquivos removidos deixam de ser acompanhados
+        for file_path in set(self._followers) - current:
+            self._followers.pop(file_path).close()
+
+        return chunks
+
+    def close(self):
+        for follower in self._followers.values():
+            follower.close()
+        self._followers.clear()
+        if self._watcher:
+            self._watcher.close()
+
+
+SOURCE_TYPES = {
+    "http": HttpDateLogSource,
+    "file": FileLogSource,
+    "directory": DirectoryLogSource
+}
+
+
+def build_sources(config: List[Dict]) -> List[LogSource]:
+    """
+    Cria as fontes a partir de uma lista de dicionários, por exemplo:
+
+        [{"type": "http", "name": "backend", "base_url": "https://.../logs", "interval": 300},
+         {"type": "file", "name": "nginx", "path": "/var/log/nginx/error.log", "interval": 5},
+         {"type": "directory", "name": "workers", "path": "/var/log/workers", "pattern": "*.log"}]
+    """
+    sources = []
+    for item in config:
+        options = dict(item)
+        source_type = options.pop("type", "http")
+        if source_type not in SOURCE_TYPES:
+            raise ValueError(f"Tipo de fonte desconhecido: {source_type}")
+        options.setdefault("name", options.get("base_url") or options.get("path") or source_type)
+        sources.append(SOURCE_TYPES[source_type](**options))
+    return sources
+
+
+def load_sources_from_env(variable: str = "LOG_MONITOR_SOURCES") -> List[LogSource]:
+    """Lê a configuração de fontes de um JSON inline ou de um arquivo .json."""
+    value = os.getenv(variable)
+    if not value:
+        return []
+
+    if value.strip().endswith(".json") and Path(value.strip()).exists():
+        with open(value.strip(), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    else:
+        config = json.loads(value)
+
+    return build_sources(config)
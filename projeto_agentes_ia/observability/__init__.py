@@ -0,0 +1,51 @@
+"""
+Observabilidade: rastreamento das requisições por etapa, métricas de
+latência expostas no formato do Prometheus, detecção de bloqueios do
+loop de eventos e tempos de inicialização.
+"""
+
+from .metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    registry,
+    render_prometheus,
+    STAGE_LATENCY,
+    STAGE_ERRORS,
+    REQUEST_LATENCY
+)
+from .tracing import (
+    OTEL_AVAILABLE,
+    setup_tracing,
+    span,
+    traced,
+    record_span,
+    mark_error,
+    current_trace_id,
+    recent_spans
+)
+from .loop_watchdog import LoopWatchdog, BlockingEvent
+from .startup import StartupReport, startup_report
+
+__all__ = [
+    'Counter',
+    'Histogram',
+    'MetricsRegistry',
+    'registry',
+    'render_prometheus',
+    'STAGE_LATENCY',
+    'STAGE_ERRORS',
+    'REQUEST_LATENCY',
+    'OTEL_AVAILABLE',
+    'setup_tracing',
+    'span',
+    'traced',
+    'record_span',
+    'mark_error',
+    'current_trace_id',
+    'recent_spans',
+    'LoopWatchdog',
+    'BlockingEvent',
+    'StartupReport',
+    'startup_report'
+]
@@ -0,0 +1,200 @@
+# observability/loop_watchdog.py
+"""
+Detector de bloqueios do loop de eventos.
+
+Uma tarefa no próprio loop mede o atraso (lag) de um sleep periódico. Uma
+thread vigia o último batimento dessa tarefa: se o loop fica parado mais
+que o limite, ela amostra a pilha da thread do loop (sys._current_frames)
+a cada sample_interval até o loop voltar. Cada bloqueio vira um
+BlockingEvent com a duração e a pilha mais frequente, apontando a chamada
+síncrona responsável (encode do SentenceTransformer, pdfplumber, JSON em
+disco, BeautifulSoup...).
+
+Configuração por ambiente: LOOP_WATCHDOG_INTERVAL_MS, LOOP_WATCHDOG_THRESHOLD_MS
+e LOOP_WATCHDOG_DISABLED=1.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as FrameCounter, deque
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+LOOP_LAG = registry.histogram(
+    "agenteia_event_loop_lag_seconds",
+    "Atraso do loop de eventos medido pelo watchdog",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+LOOP_BLOCKS = registry.counter(
+    "agenteia_event_loop_blocks",
+    "Bloqueios do loop de eventos acima do limite do watchdog"
+)
+
+
+@dataclass
+class BlockingEvent:
+    """Um período em que o loop ficou parado além do limite."""
+    started_at: str
+    duration_ms: float
+    samples: int
+    culprit: str
+    stack: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class LoopWatchdog:
+    """Mede o lag do loop e captura pilhas quando um callback bloqueia."""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, sample_interval: float = 0.02,
+                 max_events: int = 50, max_depth: int = 25, name: str = "loop"):
+        self.interval = interval
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.max_depth = max_depth
+        self.name = name
+        self.events = deque(maxlen=max_events)
+        self.recent_lags = deque(maxlen=max(1, int(60 / interval)))  # ~1 minuto
+        self.max_lag = 0.0
+        self.blocks = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._started_at: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, name: str = "loop") -> "LoopWatchdog":
+        return cls(
+            interval=float(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "100")) / 1000,
+            threshold=float(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS", "250")) / 1000,
+            name=name
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Inicia a medição no loop em execução (chamar de dentro de uma corrotina)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._started_at = time.time()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name=f"loop-watchdog-{self.name}", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 1.0)
+            self._thread = None
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_beat = time.monotonic()
+            self.recent_lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag, process=self.name)
+
+    def _capture_stack(self) -> Optional[List[str]]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        entries = traceback.extract_stack(frame)[-self.max_depth:]
+        return [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in entries]
+
+    @staticmethod
+    def _culprit(stack: List[str]) -> str:
+        """Frame mais interno do próprio projeto (ou o mais interno, se nenhum for)."""
+        for line in reversed(stack):
+            if line.startswith(PROJECT_ROOT) and "/observability/loop_watchdog.py" not in line:
+                return line[len(PROJECT_ROOT) + 1:]
+        return stack[-1] if stack else "desconhecido"
+
+    def _watch(self):
+        """Thread de vigilância: amostra a pilha enquanto o loop não bate."""
+        while not self._stop.wait(self.sample_interval):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold:
+                continue
+
+            samples = FrameCounter()
+            started = time.time() - stalled
+            while self._last_beat == beat and not self._stop.is_set():
+                stack = self._capture_stack()
+                if stack:
+                    samples[tuple(stack)] += 1
+                self._stop.wait(self.sample_interval)
+            duration = time.monotonic() - beat - self.interval
+            self._record(started, duration, samples)
+
+    def _record(self, started: float, duration: float, samples: FrameCounter):
+        stack = list(samples.most_common(1)[0][0]) if samples else []
+        event = BlockingEvent(
+            started_at=datetime.fromtimestamp(started).isoformat(timespec="milliseconds"),
+            duration_ms=round(duration * 1000, 1),
+            samples=sum(samples.values()),
+            culprit=self._culprit(stack),
+            stack=stack
+        )
+        self.events.append(event)
+        self.blocks += 1
+        LOOP_BLOCKS.inc(process=self.name)
+        logger.warning("Loop de eventos bloqueado por %.0fms em %s", event.duration_ms, event.culprit)
+
+    def recent_events(self, limit: int = 10, with_stack: bool = True) -> List[Dict]:
+        events = [event.to_dict() for event in list(self.events)[-limit:]]
+        if not with_stack:
+            for event in events:
+                event.pop("stack")
+        return list(reversed(events))
+
+    def stats(self) -> Dict:
+        lags = list(self.recent_lags)
+        return {
+            "running": self.running,
+            "interval_ms": round(self.interval * 1000, 1),
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "lag_p50_ms": round(_percentile(lags, 50) * 1000, 2),
+            "lag_p99_ms": round(_percentile(lags, 99) * 1000, 2),
+            "lag_max_ms": round(self.max_lag * 1000, 2),
+            "blocks": self.blocks,
+            "uptime_s": round(time.time() - self._started_at, 1) if self._started_at else 0.0,
+            "last_blocks": self.recent_events(limit=3, with_stack=False)
+        }
@@ -0,0 +1,191 @@
+# observability/metrics.py
+"""
+Métricas em memória no formato de exposição do Prometheus.
+
+Histogramas de latência e contadores com rótulos, seguros entre threads
+(os agentes rodam partes do pipeline em to_thread). render_prometheus()
+gera o texto servido em /metrics sem depender do prometheus_client.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Limites em segundos: do acesso a memória local (ms) até chamadas de LLM (dezenas de s)
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico com rótulos."""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def collect(self) -> List[str]:
+        name = f"{self.name}_total"
+        lines = [f"# HELP {name} {self.documentation}", f"# TYPE {name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Histograma cumulativo com limites fixos, como o do Prometheus."""
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # Por rótulo: [contagem por faixa (+Inf no fim), soma, total]
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels) -> Optional[Dict]:
+        """Contagem, soma e faixas cumulativas de uma série (None se não houver observações)."""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if series is None:
+                return None
+            counts, total, count = list(series[0]), series[1], series[2]
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative[bound] = running
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimativa do quantil pelo limite superior da faixa (como histogram_quantile)."""
+        snapshot = self.snapshot(**labels)
+        if not snapshot or not snapshot["count"]:
+            return None
+        target = q * snapshot["count"]
+        for bound, running in snapshot["buckets"].items():
+            if running >= target:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            keys = sorted(self._series)
+        for key in keys:
+            snapshot = self.snapshot(**dict(key))
+            for bound, running in snapshot["buckets"].items():
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(float(bound)))])} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(snapshot['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {snapshot['count']}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expostas juntas em /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Métrica '{metric.name}' já registrada com outro tipo")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def histogram(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+# Registro global usado pela aplicação
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    "agenteia_stage_duration_seconds",
+    "Latência por etapa do atendimento (contexto, embedding, banco, LLM, ferramentas, resposta)"
+)
+STAGE_ERRORS = registry.counter(
+    "agenteia_stage_errors",
+    "Etapas encerradas com erro"
+)
+REQUEST_LATENCY = registry.histogram(
+    "agenteia_request_duration_seconds",
+    "Latência total de requisições HTTP e comandos do Discord"
+)
+
+
+def render_prometheus() -> str:
+    """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)."""
+    return registry.render()
@@ -0,0 +1,83 @@
+# observability/startup.py
+"""
+Relatório de tempos da inicialização do processo (bot, servidor web).
+
+Cada etapa é medida com startup_report.phase("nome"). Etapas adiadas —
+agentes e modelos criados no primeiro uso ou no aquecimento em segundo
+plano — entram com deferred=True e não contam no tempo até ficar pronto.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Tempos das etapas de inicialização de um processo."""
+
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self.ready_at = None
+        self._phases: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, deferred: bool = False, error: bool = False):
+        with self._lock:
+            self._phases.append({
+                "name": name,
+                "seconds": round(seconds, 3),
+                "deferred": deferred,
+                "error": error
+            })
+
+    @contextmanager
+    def phase(self, name: str, deferred: bool = False):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, deferred=deferred, error=error)
+
+    def mark_ready(self) -> float:
+        """Marca o processo como pronto; retorna os segundos desde a criação do relatório."""
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter()
+        return self.ready_at - self.created_at
+
+    def as_dict(self) -> Dict:
+        with self._lock:
+            phases = list(self._phases)
+        return {
+            "ready_seconds": round(self.ready_at - self.created_at, 3) if self.ready_at else None,
+            "phases": phases
+        }
+
+    def format(self) -> str:
+        report = self.as_dict()
+        lines = [f"⏱️ Inicialização: pronto em {report['ready_seconds']}s" if report["ready_seconds"] is not None
+                 else "⏱️ Inicialização em andamento"]
+        for phase in report["phases"]:
+            flags = " (adiada)" if phase["deferred"] else ""
+            flags += " ❌" if phase["error"] else ""
+            lines.append(f"   {phase['name']:<28} {phase['seconds']:>7.3f}s{flags}")
+        return "\n".join(lines)
+
+    def log(self):
+        print(self.format())
+
+    def reset(self):
+        with self._lock:
+            self._phases.clear()
+        self.created_at = time.perf_counter()
+        self.ready_at = None
+
+
+# Relatório do processo atual (criado na primeira importação de observability)
+startup_report = StartupReport()
@@ -0,0 +1,310 @@
+# observability/tracing.py
+"""
+Rastreamento ponta a ponta das requisições, compatível com OpenTelemetry.
+
+Cada etapa do atendimento (contexto de memória, RAG, embedding, consultas
+ao banco, chamada ao LLM, ferramentas e resposta no Discord/web) abre um
+span com span(). Todo span encerrado — inclusive os que o próprio Google
+ADK emite (call_llm, execute_tool) — alimenta o histograma de latência por
+etapa exposto em /metrics.
+
+Exportadores:
+- memória: últimos spans, consultáveis em /api/traces (sempre ativo);
+- arquivo JSONL: TRACE_EXPORT_FILE=/caminho/spans.jsonl;
+- OTLP: OTEL_EXPORTER_OTLP_ENDPOINT (requer opentelemetry-exporter-otlp).
+
+Sem o SDK do OpenTelemetry instalado, span() apenas mede a duração e
+registra as métricas, mantendo a mesma interface.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .metrics import STAGE_ERRORS, STAGE_LATENCY
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor, SimpleSpanProcessor, SpanExporter, SpanExportResult
+    )
+    from opentelemetry.trace import Status, StatusCode
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+    SpanProcessor = SpanExporter = object
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "projeto_agentes_ia"
+RECENT_SPANS_LIMIT = 2000
+
+
+class RecentSpans:
+    """Buffer circular com os últimos spans encerrados (exportador local)."""
+
+    def __init__(self, maxlen: int = RECENT_SPANS_LIMIT):
+        self._spans = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict):
+        with self._lock:
+            self._spans.append(record)
+
+    def list(self, limit: int = 100, trace_id: str = None, name: str = None) -> List[Dict]:
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [record for record in spans if record["trace_id"] == trace_id]
+        if name:
+            spans = [record for record in spans if record["name"] == name]
+        return spans[-limit:] if limit else spans
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+recent_spans = RecentSpans()
+
+
+def _record_stage(name: str, duration: float, error: bool):
+    STAGE_LATENCY.observe(duration, stage=name)
+    if error:
+        STAGE_ERRORS.inc(stage=name)
+
+
+if OTEL_AVAILABLE:
+    def _span_to_dict(span: "ReadableSpan") -> Dict:
+        context = span.get_span_context()
+        return {
+            "name": span.name,
+            "trace_id": format(context.trace_id, "032x"),
+            "span_id": format(context.span_id, "016x"),
+            "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+            "start_time_unix_nano": span.start_time,
+            "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+            "status": span.status.status_code.name,
+            "attributes": {key: value for key, value in (span.attributes or {}).items()
+                           if isinstance(value, (str, int, float, bool))}
+        }
+
+    class MetricsSpanProcessor(SpanProcessor):
+        """Converte cada span encerrado em observação do histograma por etapa."""
+
+        def on_start(self, span, parent_context=None):
+            pass
+
+        def on_end(self, span: "ReadableSpan"):
+            if span.end_time is None or span.start_time is None:
+                return
+            _record_stage(span.name, (span.end_time - span.start_time) / 1e9,
+                          span.status.status_code == StatusCode.ERROR)
+
+        def shutdown(self):
+            pass
+
+        def force_flush(self, timeout_millis: int = 30000) -> bool:
+            return True
+
+    class RecentSpansExporter(SpanExporter):
+        """Exportador local: guarda os spans no buffer em memória."""
+
+        def __init__(self, buffer: RecentSpans = None):
+            self.buffer = buffer or recent_spans
+
+        def export(self, spans) -> "SpanExportResult":
+            for span in spans:
+                self.buffer.add(_span_to_dict(span))
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+    class JsonlSpanExporter(SpanExporter):
+        """Exportador em arquivo: uma linha JSON por span."""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans) -> "SpanExportResult":
+            lines = "".join(json.dumps(_span_to_dict(span), ensure_ascii=False) + "\n" for span in spans)
+            try:
+                with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write(lines)
+            except OSError as e:
+                logger.warning("Falha ao exportar spans para %s: %s", self.path, e)
+                return SpanExportResult.FAILURE
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+
+_setup_lock = threading.Lock()
+_configured = False
+
+
+def setup_tracing(service_name: str = SERVICE_NAME) -> bool:
+    """
+    Configura o TracerProvider global com os exportadores locais.
+    Idempotente; retorna False quando o OpenTelemetry não está instalado.
+    """
+    global _configured
+    if not OTEL_AVAILABLE:
+        return False
+    with _setup_lock:
+        if _configured:
+            return True
+
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+            trace.set_tracer_provider(provider)
+
+        provider.add_span_processor(MetricsSpanProcessor())
+        provider.add_span_processor(SimpleSpanProcessor(RecentSpansExporter()))
+
+        export_file = os.getenv("TRACE_EXPORT_FILE")
+        if export_file:
+            provider.add_span_processor(BatchSpanProcessor(JsonlSpanExporter(export_file)))
+
+        if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            except ImportError:
+                logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT definido, mas opentelemetry-exporter-otlp não está instalado")
+
+        _configured = True
+        return True
+
+
+class _TimedSpan:
+    """Span mínimo usado quando o OpenTelemetry não está disponível."""
+
+    def __init__(self, name: str, attributes: Dict):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.error = False
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict):
+        self.attributes.update(attributes)
+
+    def record_exception(self, exception: BaseException, **kwargs):
+        self.error = True
+
+    def set_status(self, status, description: str = None):
+        self.error = getattr(status, "name", str(status)) == "ERROR"
+
+
+def _clean_attributes(attributes: Dict) -> Dict:
+    return {key: value for key, value in attributes.items()
+            if value is not None and isinstance(value, (str, int, float, bool))}
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Abre um span filho do span atual. Exceções são registradas no span
+    (status ERROR) e propagadas normalmente.
+
+        with span("context.rag", limit=2) as current:
+            ...
+            current.set_attribute("rag.documents", len(documents))
+    """
+    attributes = _clean_attributes(attributes)
+    if setup_tracing():
+        with trace.get_tracer(__name__).start_as_current_span(name, attributes=attributes) as current:
+            yield current
+        return
+
+    current = _TimedSpan(name, attributes)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _record_stage(name, duration, current.error)
+        recent_spans.add({
+            "name": name, "trace_id": uuid.uuid4().hex, "span_id": uuid.uuid4().hex[:16], "parent_id": None,
+            "start_time_unix_nano": time.time_ns() - int(duration * 1e9),
+            "duration_ms": round(duration * 1000, 3), "status": "ERROR" if current.error else "OK",
+            "attributes": _clean_attributes(current.attributes)
+        })
+
+
+def record_span(name: str, started_ns: int, ended_ns: int = None, error: bool = False, **attributes):
+    """
+    Registra um span já medido (início/fim em time.time_ns()), para etapas
+    observadas por callbacks em vez de um bloco with (ex.: ferramentas do LangChain).
+    """
+    ended_ns = ended_ns or time.time_ns()
+    attributes = _clean_attributes(attributes)
+    if setup_tracing():
+        current = trace.get_tracer(__name__).start_span(name, attributes=attributes, start_time=started_ns)
+        if error:
+            current.set_status(Status(StatusCode.ERROR))
+        current.end(end_time=ended_ns)
+        return
+
+    duration = (ended_ns - started_ns) / 1e9
+    _record_stage(name, duration, error)
+    recent_spans.add({
+        "name": name, "trace_id": uuid.uuid4().hex, "span_id": uuid.uuid4().hex[:16], "parent_id": None,
+        "start_time_unix_nano": started_ns, "duration_ms": round(duration * 1000, 3),
+        "status": "ERROR" if error else "OK", "attributes": attributes
+    })
+
+
+def mark_error(current, description: str):
+    """Marca o span como erro quando a falha é tratada sem exceção (ex.: fallback)."""
+    if OTEL_AVAILABLE and not isinstance(current, _TimedSpan):
+        current.set_status(Status(StatusCode.ERROR, description))
+    else:
+        current.error = True
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id do span ativo (para correlacionar logs e respostas)."""
+    if not OTEL_AVAILABLE:
+        return None
+    context = trace.get_current_span().get_span_context()
+    return format(context.trace_id, "032x") if context.is_valid else None
+
+
+def traced(name: str = None, **attributes) -> Callable:
+    """Decorador que envolve a função (síncrona ou assíncrona) em um span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -1,12 +1,28 @@
 # run_web.py
+import argparse
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 def main():
-    """Inicia o servidor web da aplicação."""
+    """
+    Inicia o servidor web da aplicação.
+
+    Sem --workers: modo de desenvolvimento (um processo, reload automático).
+    Com --workers N (ou WEB_WORKERS): modo de produção com N processos que
+    compartilham os modelos pré-carregados (web/server.py); 0 = um por núcleo.
+    """
     load_dotenv()
-    
+
+    parser = argparse.ArgumentParser(description="Servidor web do Projeto Agentes IA")
+    parser.add_argument("--host", default=os.getenv("WEB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEB_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ["WEB_WORKERS"]) if os.getenv("WEB_WORKERS") else None,
+                        help="Processos de produção (0 = um por núcleo)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Segundos para concluir requisições em andamento ao encerrar")
+    args = parser.parse_args()
+
     # Verificar se a API key está configurada
     if not os.getenv("GOOGLE_API_KEY"):
         print("⚠️  AVISO: GOOGLE_API_KEY não encontrada no arquivo .env")
@@ -14,21 +30,29 @@ def main():
         print("Exemplo no arquivo .env:")
         print("GOOGLE_API_KEY=sua_chave_aqui")
         print()
-    
+
     print("🚀 Iniciando servidor web...")
-    print("📱 Interface disponível em: http://127.0.0.1:8000")
-    print("📊 Documentação da API: http://127.0.0.1:8000/docs")
+    print(f"📱 Interface disponível em: http://{args.host}:{args.port}")
+    print(f"📊 Documentação da API: http://{args.host}:{args.port}/docs")
     print("🔧 Para parar o servidor: Ctrl+C")
     print()
-    
+
+    if args.workers is not None:
+        # Gravações de memória em segundo plano, concluídas no encerramento de cada worker
+        os.environ.setdefault("MEMORY_WRITE_BEHIND", "1")
+        from web.server import serve
+        serve(host=args.host, port=args.port, workers=args.workers or os.cpu_count(),
+              graceful_timeout=args.graceful_timeout)
+        return
+
     # Iniciar o servidor
     uvicorn.run(
         "web.app:app",
-        host="127.0.0.1",
-        port=8000,
+        host=args.host,
+        port=args.port,
         reload=True,
         log_level="info"
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
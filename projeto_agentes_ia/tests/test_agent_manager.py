@@ -0,0 +1,64 @@
+# tests/test_agent_manager.py
+import asyncio
+import sys
+import threading
+import time
+import types
+
+from agents import agent_manager as agent_manager_module
+from agents.agent_manager import AgentManager
+from agents.base_agent import BaseAgent
+from observability import startup_report
+
+
+def install_fake_agent(monkeypatch, build_seconds=0.0):
+    created = []
+
+    class FakeAgent(BaseAgent):
+        def __init__(self, instruction=None):
+            time.sleep(build_seconds)
+            created.append(self)
+            super().__init__(name="FakeAgent")
+
+        def set_user_context(self, user_id, session_id=None):
+            pass
+
+        async def _run_async(self, query, user_id=None, session_id=None):
+            return f"{user_id}:{session_id}:{query}"
+
+    module = types.ModuleType("fake_agent_module")
+    module.FakeAgent = FakeAgent
+    monkeypatch.setitem(sys.modules, "fake_agent_module", module)
+    monkeypatch.setattr(agent_manager_module, "AGENT_TYPES", {"adk": ("fake_agent_module", "FakeAgent", "Agente falso")})
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    return created
+
+
+def test_agents_are_created_on_first_use(monkeypatch):
+    created = install_fake_agent(monkeypatch)
+    startup_report.reset()
+
+    manager = AgentManager()
+    assert created == [] and manager.available == ["adk"] and manager.current_agent == "adk"
+    assert manager.get_agent_info()["agents_status"]["adk"]["initialized"] is False
+
+    assert asyncio.run(manager.run_agent("oi", "u1", "s1")) == "u1:s1:oi"
+    assert asyncio.run(manager.run_agent("de novo", "u2")) == "u2:None:de novo"
+    assert len(created) == 1
+    assert manager.get_agent_info()["agents_status"]["adk"]["initialized"] is True
+    assert [phase["name"] for phase in startup_report.as_dict()["phases"] if phase["deferred"]] == ["agent.adk"]
+
+
+def test_concurrent_first_use_builds_agent_once(monkeypatch):
+    created = install_fake_agent(monkeypatch, build_seconds=0.1)
+    manager = AgentManager()
+
+    threads = [threading.Thread(target=manager.get_agent, args=("adk",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+
+    manager.start_warm_up().join()
+    assert len(created) == 1 and manager.resolve_agent_type("langchain") is None
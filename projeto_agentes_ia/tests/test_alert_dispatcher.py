@@ -0,0 +1,138 @@
+# tests/test_alert_dispatcher.py
+import asyncio
+
+from aiohttp import web
+
+from monitoring.alert_dispatcher import (
+    MAX_ALERTS_PER_GROUP, MAX_EMBEDS_PER_MESSAGE, MAX_MESSAGE_CHARS, Alert, AlertDispatcher
+)
+
+
+def test_alerts_are_grouped_and_429_is_respected():
+    received = []
+    state = {'rate_limited': False}
+
+    async def webhook(request):
+        if not state['rate_limited']:
+            state['rate_limited'] = True
+            return web.json_response({"retry_after": 0.05}, status=429)
+        received.append(await request.json())
+        return web.Response(status=204)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/hook", webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        dispatcher = AlertDispatcher(f"http://127.0.0.1:{port}/hook", window_seconds=0.1, backoff_base=0.01)
+        try:
+            for i in range(3):
+                assert dispatcher.submit(Alert("backend", f"2025-06-2{i}", "http://logs", i + 1, "análise"))
+            dispatcher.submit(Alert("nginx", "error.log", "/var/log/nginx/error.log", 1, "análise"))
+            await asyncio.sleep(0.5)
+        finally:
+            await dispatcher.close()
+            await runner.cleanup()
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+
+    assert len(received) == 2
+    backend = next(p for p in received if len(p["embeds"]) > 1)
+    assert len(backend["embeds"]) == 4  # Resumo + 3 alertas
+    assert "6 erros" in backend["embeds"][0]["description"]
+    assert dispatcher.stats['rate_limited'] == 1
+    assert dispatcher.stats['sent_alerts'] == 4 and dispatcher.stats['dropped'] == 0
+    assert dispatcher.latency_summary()['p95'] > 0
+
+
+def test_queue_overflow_is_counted_as_drop():
+    async def scenario():
+        dispatcher = AlertDispatcher("http://127.0.0.1:9/hook", max_queue=1, window_seconds=60)
+        dispatcher.submit(Alert("a", "d", "l", 1, "m"))
+        accepted = dispatcher.submit(Alert("a", "d", "l", 1, "m"))
+        await dispatcher.close(flush=False)
+        return dispatcher, accepted
+
+    dispatcher, accepted = asyncio.run(scenario())
+    assert accepted is False
+    assert dispatcher.stats['dropped'] == 1
+
+
+def test_large_groups_are_split_within_discord_limits():
+    dispatcher = AlertDispatcher("http://127.0.0.1:9/hook")
+    alerts = [Alert("backend", f"dia {i}", "http://logs/" + "x" * 900, 1, "erro " * 300) for i in range(12)]
+
+    messages = dispatcher.build_messages(alerts)
+
+    assert len(messages) > 1
+    assert [alert for sent, _ in messages for alert in sent] == alerts
+    for _, embeds in messages:
+        assert len(embeds) <= MAX_EMBEDS_PER_MESSAGE
+        assert sum(AlertDispatcher._embed_length(embed) for embed in embeds) <= MAX_MESSAGE_CHARS
+    # Um grupo cheio de alertas curtos cabe em uma mensagem: resumo + MAX_ALERTS_PER_GROUP
+    short = [Alert("backend", "d", "l", 1, "m")] * MAX_ALERTS_PER_GROUP
+    assert [len(embeds) for _, embeds in dispatcher.build_messages(short)] == [MAX_EMBEDS_PER_MESSAGE]
+
+
+def test_rate_limit_wait_is_capped():
+    async def webhook(request):
+        return web.json_response({"retry_after": 0.05}, status=429)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/hook", webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        dispatcher = AlertDispatcher(f"http://127.0.0.1:{port}/hook", window_seconds=0, max_rate_limit_wait=0.3)
+        try:
+            dispatcher.submit(Alert("backend", "d", "l", 1, "m"))
+            await asyncio.sleep(1)
+        finally:
+            await dispatcher.close()
+            await runner.cleanup()
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    assert dispatcher.stats['dropped'] == 1 and dispatcher.stats['rate_limited'] <= 4
+
+
+def test_close_waits_for_the_group_being_sent():
+    received = []
+
+    async def webhook(request):
+        await asyncio.sleep(0.2)
+        received.append(await request.json())
+        return web.Response(status=204)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/hook", webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        dispatcher = AlertDispatcher(f"http://127.0.0.1:{port}/hook", window_seconds=0.05)
+        try:
+            dispatcher.submit(Alert("backend", "2025-06-21", "http://logs", 1, "análise"))
+            # O grupo já saiu de _pending e está no POST quando o encerramento começa
+            await asyncio.sleep(0.1)
+            dispatcher.submit(Alert("nginx", "error.log", "/var/log/nginx/error.log", 2, "análise"))
+            await dispatcher.close()
+        finally:
+            await runner.cleanup()
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    assert len(received) == 2
+    assert dispatcher.stats['sent_alerts'] == 2 and dispatcher.stats['dropped'] == 0
@@ -0,0 +1,32 @@
+# tests/test_benchmarks.py
+import random
+
+from benchmarks.common import LatencyStats, compare_reports, percentile, synthetic_document
+from benchmarks.log_matcher import generate_log
+from benchmarks.memory_backends import generate_entries
+
+
+def test_percentiles_interpolate_between_samples():
+    samples = [i / 1000 for i in range(1, 101)]
+    stats = LatencyStats.from_samples(samples)
+    assert percentile(samples, 0) == samples[0] and percentile(samples, 100) == samples[-1]
+    assert stats.p50_ms == 50.5 and stats.p99_ms == 99.01 and stats.max_ms == 100.0
+    assert stats.count == 100 and stats.ops_per_second == round(100 / sum(samples), 2)
+    assert LatencyStats.from_samples([]).p95_ms == 0.0
+
+
+def test_generators_are_deterministic_per_seed():
+    assert synthetic_document(random.Random(7)) == synthetic_document(random.Random(7))
+    assert synthetic_document(random.Random(7)) != synthetic_document(random.Random(8))
+    assert generate_entries(3, 2, 2, 3) == generate_entries(3, 2, 2, 3)
+    assert generate_log(200_000, seed=1) == generate_log(200_000, seed=1)
+
+
+def test_compare_reports_flags_only_regressions_beyond_tolerance():
+    baseline = {"results": {"file": {"save": {"p95_ms": 10.0, "ops_per_second": 100.0}},
+                            "extract": {"mb_per_s": 50.0, "hits": 10}}}
+    current = {"results": {"file": {"save": {"p95_ms": 10.5, "ops_per_second": 70.0}},
+                           "extract": {"mb_per_s": 80.0, "hits": 1}}}
+    regressions = compare_reports(baseline, current, tolerance=0.10)
+    assert [item["metric"] for item in regressions] == ["file.save.ops_per_second"]
+    assert regressions[0]["worse_by"] == 0.3
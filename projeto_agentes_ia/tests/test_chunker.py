@@ -0,0 +1,68 @@
+# tests/test_chunker.py
+from memory.chunker import MAX_PENDING_CHARS, Chunker, estimate_tokens
+
+
+def test_headings_and_token_limit():
+    text = (
+        "# Instalação\n\n"
+        + "\n\n".join(f"Passo {i}. Execute o comando de instalação número {i} no servidor." for i in range(20))
+        + "\n\n# Configuração\n\nDefina as variáveis de ambiente antes de iniciar.\n"
+    )
+    chunks = Chunker(max_tokens=60, min_tokens=20).split(text)
+
+    assert all(chunk.tokens <= 60 for chunk in chunks)
+    assert all(chunk.text.startswith(chunk.section) for chunk in chunks)
+    assert chunks[-1].section == "# Configuração"
+    assert "Defina as variáveis" in chunks[-1].text
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    # Nenhum chunk mistura as duas seções
+    assert not any("Instalação" in chunk.text and "Configuração" in chunk.text for chunk in chunks)
+
+
+def test_long_paragraphs_split_on_sentences_and_tables_keep_header():
+    sentences = " ".join(f"Esta é a frase número {i} do parágrafo." for i in range(40))
+    table = "| nome | valor |\n" + "\n".join(f"| item {i} | {i * 10} |" for i in range(60))
+    chunks = Chunker(max_tokens=50, min_tokens=10).split(sentences + "\n\n" + table)
+
+    text_chunks = [c.text for c in chunks if "frase" in c.text]
+    assert all(c.rstrip().endswith("parágrafo.") for c in text_chunks)
+    table_chunks = [c.text for c in chunks if "item" in c.text]
+    assert len(table_chunks) > 1
+    assert all(c.startswith("| nome | valor |") for c in table_chunks)
+
+
+def test_ids_are_stable_when_a_paragraph_changes():
+    chunker = Chunker(max_tokens=120, min_tokens=40)
+    paragraphs = [f"Seção {i}: " + "conteúdo relevante sobre o tema " * (3 + i % 5) for i in range(60)]
+    before = {c.id for c in chunker.split("\n\n".join(paragraphs))}
+
+    paragraphs[30] += " Uma frase nova."
+    after = {c.id for c in chunker.split("\n\n".join(paragraphs))}
+
+    assert len(before - after) <= 2
+    assert len(after & before) >= len(before) - 2
+
+
+def test_streaming_matches_full_split():
+    chunker = Chunker(max_tokens=80, min_tokens=30)
+    text = "\n\n".join(f"## Tópico {i}\n\n" + "Linha de texto comum. " * (i % 7 + 2) for i in range(25))
+    stream = chunker.stream()
+    chunks = []
+    for start in range(0, len(text), 97):
+        chunks.extend(stream.feed(text[start:start + 97]))
+    chunks.extend(stream.finish())
+
+    assert [c.id for c in chunks] == [c.id for c in chunker.split(text)]
+    assert estimate_tokens("uma frase, curta") == 6
+
+
+def test_stream_without_newlines_keeps_pending_bounded():
+    stream = Chunker(max_tokens=80, min_tokens=30).stream()
+    chunks = []
+    for _ in range(40):
+        chunks.extend(stream.feed("palavra " * 1000))
+        assert len(stream.pending) <= MAX_PENDING_CHARS
+    chunks.extend(stream.finish())
+
+    assert chunks and all(c.tokens <= 80 for c in chunks)
+    assert sum(c.text.count("palavra") for c in chunks) == 40 * 1000
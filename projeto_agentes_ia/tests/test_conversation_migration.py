@@ -0,0 +1,127 @@
+# tests/test_conversation_migration.py
+import asyncio
+import io
+import json
+
+from memory.conversation_migration import (
+    ConversationMigrator, MigrationCheckpoint, find_conversation_files, iter_json_array
+)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.staged = []
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, *args):
+        if "INSERT INTO" not in query:
+            return "CREATE TABLE"
+        inserted = 0
+        for row in self.staged:
+            key = row[0], row[1], row[5]
+            if key not in self.db.rows:
+                self.db.rows[key] = row
+                inserted += 1
+        return f"INSERT 0 {inserted}"
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.db.copies += 1
+        self.staged = list(records)
+
+
+class FakePool:
+    def __init__(self):
+        self.rows = {}
+        self.copies = 0
+
+    def acquire(self):
+        return FakeConnection(self)
+
+
+def entry(user, session, i):
+    return {
+        "timestamp": f"2025-06-21T15:{i // 60:02d}:{i % 60:02d}",
+        "user_id": user, "session_id": session,
+        "user_message": f"mensagem {i}", "agent_response": f"resposta {i}",
+        "agent_type": "ADK", "metadata": {"i": i}
+    }
+
+
+def write_storage(root):
+    (root / "user_abc").mkdir(parents=True)
+    files = {
+        root / "user_1.json": [entry("u1", "s1", i) for i in range(30)],
+        root / "conversation_2.json": [entry("u2", "s2", i) for i in range(7)],
+        root / "user_abc" / "conversation_3.json": [entry("u3", "s3", i) for i in range(12)],
+    }
+    for path, entries in files.items():
+        path.write_text(json.dumps(entries, indent=2, ensure_ascii=False), encoding="utf-8")
+    return files
+
+
+def test_iter_json_array_streams_items_across_blocks():
+    items = [{"texto": "á" * n, "n": n} for n in range(50)]
+    fp = io.StringIO(json.dumps(items, indent=2, ensure_ascii=False))
+    assert list(iter_json_array(fp, block_size=16)) == items
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+
+def test_finds_all_storage_layouts(tmp_path):
+    files = write_storage(tmp_path)
+    (tmp_path / "outro.json").write_text("{}", encoding="utf-8")
+    assert set(find_conversation_files([tmp_path, tmp_path])) == {p.resolve() for p in files}
+
+
+def test_migration_batches_and_is_idempotent(tmp_path):
+    write_storage(tmp_path / "storage")
+    pool = FakePool()
+    checkpoint = tmp_path / "checkpoint.json"
+
+    report = asyncio.run(ConversationMigrator(pool, checkpoint, batch_size=10, workers=2)
+                         .run([tmp_path / "storage"]))
+    assert report.rows_read == report.rows_inserted == len(pool.rows) == 49
+    assert report.files_done == 3 and not report.failed_files
+    assert pool.copies <= 6
+
+    # Sem checkpoint, rodar de novo não duplica nada
+    checkpoint.unlink()
+    again = asyncio.run(ConversationMigrator(pool, checkpoint, batch_size=10).run([tmp_path / "storage"]))
+    assert again.rows_read == 49 and again.rows_inserted == 0 and len(pool.rows) == 49
+
+
+def test_checkpoint_resumes_only_pending_or_changed_files(tmp_path):
+    files = write_storage(tmp_path / "storage")
+    pool = FakePool()
+    checkpoint = tmp_path / "checkpoint.json"
+    asyncio.run(ConversationMigrator(pool, checkpoint).run([tmp_path / "storage"]))
+
+    changed = tmp_path / "storage" / "conversation_2.json"
+    changed.write_text(json.dumps(files[changed] + [entry("u2", "s2", 99)]), encoding="utf-8")
+
+    report = asyncio.run(ConversationMigrator(pool, checkpoint).run([tmp_path / "storage"]))
+    assert report.files_skipped == 2
+    assert report.rows_read == 8 and report.rows_inserted == 1
+    assert MigrationCheckpoint(checkpoint).is_done(changed.resolve())
+
+
+def test_invalid_entries_and_broken_files_are_reported(tmp_path):
+    storage = tmp_path / "storage"
+    storage.mkdir()
+    (storage / "user_ok.json").write_text(json.dumps([entry("u", "s", 1), {"user_id": "sem campos"}]),
+                                          encoding="utf-8")
+    (storage / "user_quebrado.json").write_text('[{"user_id": ', encoding="utf-8")
+
+    checkpoint = tmp_path / "checkpoint.json"
+    report = asyncio.run(ConversationMigrator(FakePool(), checkpoint).run([storage]))
+    assert report.rows_inserted == 1 and report.invalid_entries == 1
+    assert report.failed_files == [str((storage / "user_quebrado.json").resolve())]
+    assert not MigrationCheckpoint(checkpoint).is_done((storage / "user_quebrado.json").resolve())
@@ -0,0 +1,93 @@
+# tests/test_dedup_store.py
+import asyncio
+
+from monitoring.clustering import ClusterAnalysisCache
+from monitoring.dedup_store import ErrorDedupStore, ErrorFingerprinter
+
+
+def test_fingerprint_masks_variable_parts():
+    """Timestamps, ids e números não alteram o fingerprint."""
+    fingerprinter = ErrorFingerprinter()
+    first, template = fingerprinter.fingerprint(
+        "2025-06-21 10:00:01 ERROR pedido 123 falhou em 10.0.0.1:5432 (req 3f2a9c1d-1b2c-4d5e-8f90-0a1b2c3d4e5f)"
+    )
+    second, _ = fingerprinter.fingerprint(
+        "2025-06-22 23:59:59 ERROR pedido 98765 falhou em 10.0.0.7:5432 (req 00000000-1111-2222-3333-444444444444)"
+    )
+    assert first == second
+    assert template == "<TS> ERROR pedido <NUM> falhou em <IP> (req <UUID>)"
+
+
+def test_observe_alerts_once_per_window(tmp_path):
+    """Um fingerprint só volta a alertar depois que a janela expira."""
+    store = ErrorDedupStore(db_path=str(tmp_path / "dedup.sqlite3"), window_seconds=60)
+    _, alert = store.observe("ERROR pedido 1", "ERROR", now=1000)
+    assert alert
+    stats, alert = store.observe("ERROR pedido 2", "ERROR", now=1030)
+    assert not alert
+    assert stats.count == 2
+    _, alert = store.observe("ERROR pedido 3", "ERROR", now=1061)
+    assert alert
+
+
+def test_state_survives_restart_and_memory_limit(tmp_path):
+    """Entradas evictadas ou de um processo anterior são recuperadas do SQLite."""
+    db_path = str(tmp_path / "dedup.sqlite3")
+    store = ErrorDedupStore(db_path=db_path, max_entries=2)
+    for i in range(5):
+        store.observe(f"ERROR tipo {'abcde'[i]} falhou", "ERROR")
+    assert len(store) == 2
+    store.set_checkpoint("fonte", 120, 7)
+    store.close()
+
+    restarted = ErrorDedupStore(db_path=db_path, max_entries=2)
+    stats, alert = restarted.observe("ERROR tipo a falhou", "ERROR")
+    assert not alert
+    assert stats.count == 2
+    assert restarted.get_checkpoint("fonte") == (120, 7)
+
+
+def test_pending_writes_are_flushed_past_the_cap(tmp_path):
+    db_path = str(tmp_path / "dedup.sqlite3")
+    store = ErrorDedupStore(db_path=db_path, max_dirty=10)
+    for i in range(25):
+        store.observe(f"ERROR falha {'abcdefghijklmnopqrstuvwxy'[i]}", "ERROR")
+    assert len(store._dirty) < 10
+
+    # Sem flush: o que passou do limite já está no disco
+    other = ErrorDedupStore(db_path=db_path)
+    assert other._conn.execute("SELECT COUNT(*) FROM error_fingerprints").fetchone()[0] >= 20
+
+
+def test_checkpoint_resets_when_content_is_replaced(tmp_path):
+    store = ErrorDedupStore(db_path=str(tmp_path / "dedup.sqlite3"))
+    data = b"linha 1\nlinha 2\n"
+    store.set_checkpoint("url", len(data), 2, data)
+
+    # Conteúdo acrescentado: continua do checkpoint
+    assert store.get_checkpoint("url", data + b"linha 3\n") == (len(data), 2)
+    # Arquivo substituído por outro maior na mesma URL: recomeça
+    assert store.get_checkpoint("url", b"outro log 1\noutro log 2\n") == (0, 0)
+    # Sem o conteúdo, o checkpoint é retornado como gravado
+    assert store.get_checkpoint("url") == (len(data), 2)
+
+
+def test_stores_created_on_the_loop_work_from_worker_threads(tmp_path):
+    db_path = str(tmp_path / "dedup.sqlite3")
+
+    async def scenario():
+        # Criados na thread do loop, usados por asyncio.to_thread como em process_chunk
+        store = ErrorDedupStore(db_path=db_path)
+        cache = ClusterAnalysisCache(db_path=db_path)
+        await asyncio.gather(*(
+            asyncio.to_thread(store.observe, f"ERROR falha {name}", "ERROR") for name in "abcdef"
+        ))
+        await asyncio.to_thread(store.set_checkpoint, "url", 10, 2)
+        await asyncio.to_thread(cache.put_many, [("h", "template", "análise")])
+        result = (len(store), await asyncio.to_thread(store.get_checkpoint, "url"),
+                  await asyncio.to_thread(cache.get, "h"))
+        await asyncio.to_thread(store.close)
+        cache.close()
+        return result
+
+    assert asyncio.run(scenario()) == (6, (10, 2), "análise")
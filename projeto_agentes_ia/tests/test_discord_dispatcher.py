@@ -0,0 +1,93 @@
+# tests/test_discord_dispatcher.py
+import asyncio
+
+import pytest
+
+from discord_bot.dispatcher import DispatcherSaturated, RequestDispatcher
+
+
+def test_sessions_are_serialized_and_run_in_parallel_up_to_the_limit():
+    async def scenario():
+        dispatcher = RequestDispatcher(max_concurrency=2)
+        events, running, peak, positions = [], 0, 0, {}
+
+        async def job(name):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            events.append(f"start {name}")
+            await asyncio.sleep(0.05)
+            events.append(f"end {name}")
+            running -= 1
+            return name
+
+        async def queued(name, position):
+            positions[name] = position
+
+        requests = [("a", "a1"), ("a", "a2"), ("b", "b1"), ("c", "c1")]
+        results = await asyncio.gather(*(
+            dispatcher.run(session, lambda name=name: job(name), on_queued=lambda pos, name=name: queued(name, pos))
+            for session, name in requests
+        ))
+        return dispatcher, events, peak, positions, results
+
+    dispatcher, events, peak, positions, results = asyncio.run(scenario())
+    assert results == ["a1", "a2", "b1", "c1"] and peak == 2
+    # Mesma sessão em ordem, sem sobreposição; b1 roda junto com a1
+    assert events.index("end a1") < events.index("start a2")
+    assert events[:2] == ["start a1", "start b1"]
+    # a2 espera a sessão; c1 espera vaga e vê a posição atrás de a2
+    assert positions == {"a2": 1, "c1": 2}
+    assert dispatcher.stats() == {"running": 0, "waiting": 0, "max_concurrency": 2, "max_queue": 100,
+                                  "busy_sessions": 0, "completed": 4, "rejected": 0}
+
+
+def test_full_queue_rejects_and_cancelled_waiters_leave_the_queue():
+    async def scenario():
+        dispatcher = RequestDispatcher(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+        first = asyncio.create_task(dispatcher.run("a", release.wait))
+        waiting = asyncio.create_task(dispatcher.run("b", release.wait))
+        await asyncio.sleep(0)
+
+        with pytest.raises(DispatcherSaturated):
+            await dispatcher.run("c", release.wait)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert dispatcher.stats()["waiting"] == 0
+
+        release.set()
+        await first
+        assert await dispatcher.run("c", lambda: asyncio.sleep(0, "ok")) == "ok"
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["running"] == 0 and stats["rejected"] == 1 and stats["completed"] == 2
+
+
+def test_waiter_cancelled_while_the_running_request_finishes():
+    async def scenario():
+        dispatcher = RequestDispatcher(max_concurrency=1)
+        release = asyncio.Event()
+
+        async def answer():
+            await release.wait()
+            return "resposta"
+
+        first = asyncio.create_task(dispatcher.run("a", answer))
+        waiting = asyncio.create_task(dispatcher.run("b", release.wait))
+        await asyncio.sleep(0)
+
+        # No mesmo ciclo: o primeiro termina e o da fila é cancelado
+        release.set()
+        waiting.cancel()
+        results = await asyncio.gather(first, waiting, return_exceptions=True)
+        assert results[0] == "resposta"
+        assert isinstance(results[1], asyncio.CancelledError)
+
+        assert await dispatcher.run("c", lambda: asyncio.sleep(0, "ok")) == "ok"
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["running"] == 0 and stats["busy_sessions"] == 0 and stats["waiting"] == 0
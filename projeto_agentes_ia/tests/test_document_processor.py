@@ -0,0 +1,61 @@
+# tests/test_document_processor.py
+import asyncio
+import io
+
+import pytest
+from aiohttp import web
+
+from integrations.http_pool import close_http_sessions
+from memory.document_processor import DocumentProcessor
+
+
+def test_detect_type_prefers_magic_bytes():
+    detect = DocumentProcessor.detect_type
+    assert detect(io.BytesIO(b"%PDF-1.7\n..."), "application/octet-stream") == 'pdf'
+    assert detect(io.BytesIO(b"  <!DOCTYPE html><html></html>"), "") == 'html'
+    assert detect(io.BytesIO(b"PK\x03\x04..."), "application/octet-stream", "https://x/a.docx?dl=1") == 'docx'
+    assert detect(io.BytesIO(b"linha simples"), "text/plain") == 'text'
+
+
+def test_process_url_downloads_once_and_enforces_size_cap():
+    hits = {'/doc': 0, '/big': 0}
+
+    async def doc(request):
+        hits['/doc'] += 1
+        return web.Response(body="<html><title>T</title><body>olá mundo</body></html>".encode("latin-1"),
+                            headers={"Content-Type": "text/html; charset=latin-1"})
+
+    async def big(request):
+        hits['/big'] += 1
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(8):
+            await response.write(b"x" * 1024)
+        await response.write_eof()
+        return response
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/doc", doc)
+        app.router.add_get("/big", big)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        processor = DocumentProcessor()
+        processor.max_file_size = 4096
+        try:
+            result = await processor.process_url(f"http://127.0.0.1:{port}/doc")
+            assert result['type'] == 'html'
+            assert "olá mundo" in result['chunks'][0]
+            assert hits['/doc'] == 1
+
+            with pytest.raises(ValueError):
+                await processor.process_url(f"http://127.0.0.1:{port}/big")
+        finally:
+            await close_http_sessions()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
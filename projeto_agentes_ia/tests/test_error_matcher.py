@@ -0,0 +1,64 @@
+# tests/test_error_matcher.py
+import re
+from monitoring.error_matcher import ErrorMatcher, DEFAULT_ERROR_PATTERNS, NO_TIMESTAMP
+
+LOG = (
+    "2025-06-21 10:00:00 INFO iniciando aplicação\n"
+    "2025-06-21 10:00:01 Traceback (most recent call last): ERROR grave\n"
+    "  File \"app.py\", line 10\n"
+    "linha sem timestamp com connection   REFUSED\n"
+    "2025-06-21 10:00:03 INFO tudo certo"
+)
+
+
+def legacy_errors(content):
+    """Laço original de extract_errors, usado como referência."""
+    lines = content.split('\n')
+    found = []
+    for i, line in enumerate(lines):
+        for pattern in DEFAULT_ERROR_PATTERNS:
+            if re.search(pattern, line, re.IGNORECASE):
+                found.append((i + 1, pattern, '\n'.join(lines[max(0, i - 1):min(len(lines), i + 2)])))
+                break
+    return found
+
+
+def test_scan_matches_legacy_loop():
+    """O detector compilado encontra as mesmas linhas, padrões e contextos."""
+    matcher = ErrorMatcher()
+    result = [(m.line_number, m.pattern, m.context) for m in matcher.scan(LOG)]
+    assert result == legacy_errors(LOG)
+
+
+def test_first_pattern_in_list_wins():
+    """Com vários padrões na mesma linha, reporta o primeiro da lista."""
+    matcher = ErrorMatcher()
+    matches = matcher.scan_all(LOG)
+    assert matches[0].pattern == 'ERROR'
+    assert matches[0].timestamp == "2025-06-21 10:00:01"
+    assert matches[1].timestamp == NO_TIMESTAMP
+
+
+def test_scan_accepts_memoryview_and_reports_byte_offsets():
+    """Bytes via memoryview produzem o mesmo resultado, com offsets em bytes."""
+    data = LOG.encode('utf-8')
+    matcher = ErrorMatcher()
+    matches = matcher.scan_all(memoryview(data))
+    assert [m.line_number for m in matches] == [2, 4]
+    for match in matches:
+        assert data[match.offset:].decode('utf-8').startswith(match.line)
+
+
+def test_small_blocks_keep_line_numbers():
+    """A leitura em blocos não altera numeração nem contexto das linhas."""
+    content = "\n".join(f"linha {i} ERROR" if i % 7 == 0 else f"linha {i} ok" for i in range(200))
+    matcher = ErrorMatcher(block_size=64)
+    assert [m.line_number for m in matcher.scan(content)] == [i + 1 for i in range(200) if i % 7 == 0]
+    assert [m.context for m in matcher.scan(content)] == [c for _, _, c in legacy_errors(content)]
+
+
+def test_case_sensitive_escape_falls_back_to_ignorecase():
+    """Padrões com escapes maiúsculos continuam corretos (sem conversão para minúsculas)."""
+    matcher = ErrorMatcher([r'fail\S+'])
+    assert matcher.match_line("FAILED: disk") == r'fail\S+'
+    assert matcher.match_line("fail ") is None
@@ -0,0 +1,67 @@
+# tests/test_event_store.py
+import time
+
+from monitoring.event_store import ErrorEventStore, ErrorEvent, parse_log_timestamp
+
+HOUR = 3600
+
+
+def _event(ts, fingerprint="a", offset=0, source="backend"):
+    return ErrorEvent(ts=ts, fingerprint=fingerprint, template=f"ERROR {fingerprint}", pattern="ERROR",
+                      source=source, line_offset=offset)
+
+
+def test_ingestion_is_idempotent_and_counts_by_bucket(tmp_path):
+    store = ErrorEventStore(db_path=str(tmp_path / "events.sqlite3"))
+    events = [_event(10 * HOUR + i, offset=i) for i in range(3)] + [_event(11 * HOUR, offset=99)]
+
+    assert store.add_many(events) == 4
+    assert store.add_many(events) == 0  # Reprocessar o mesmo trecho não duplica
+
+    assert store.counts_by_bucket(HOUR) == [(10 * HOUR, 3), (11 * HOUR, 1)]
+    assert store.count(since=11 * HOUR) == 1
+    assert store.last_event_ts() == 11 * HOUR
+
+
+def test_top_fingerprints_and_spikes(tmp_path):
+    store = ErrorEventStore(db_path=str(tmp_path / "events.sqlite3"))
+    now = 100 * HOUR + 10
+    offset = 0
+    events = []
+    # Base: 1 ocorrência por hora de "a" nas últimas 24h
+    for hour in range(76, 100):
+        events.append(_event(hour * HOUR, "a", offset))
+        offset += 1
+    # Pico: 20 ocorrências de "b" na hora atual
+    for i in range(20):
+        events.append(_event(100 * HOUR + i, "b", offset))
+        offset += 1
+    store.add_many(events)
+
+    top = store.top_fingerprints(limit=1)
+    assert top[0]['fingerprint'] == "a" and top[0]['count'] == 24
+
+    spikes = store.detect_spikes(HOUR, baseline_buckets=24, now=now)
+    assert [s['fingerprint'] for s in spikes] == ["b"]
+    assert spikes[0]['current'] == 20
+
+
+def test_parse_log_timestamp_fallback():
+    assert parse_log_timestamp("Timestamp não encontrado", default=123) == 123
+    assert parse_log_timestamp("2025-06-21  10:00:00") == parse_log_timestamp("2025-06-21 10:00:00")
+
+
+def test_source_filter_matches_exact_name(tmp_path):
+    store = ErrorEventStore(db_path=str(tmp_path / "events.sqlite3"))
+    store.add_many([_event(HOUR, source="api"), _event(HOUR, offset=1, source="api-gateway")])
+
+    assert store.count(source="api") == 1
+    assert store.count(source="gateway") == 0
+
+
+def test_old_events_are_pruned_while_ingesting(tmp_path):
+    store = ErrorEventStore(db_path=str(tmp_path / "events.sqlite3"), retention_seconds=HOUR, prune_interval=0)
+    store.add_many([_event(1, offset=0)])
+    store.add_many([_event(int(time.time()), offset=1)])
+
+    assert store.count() == 1
@@ -0,0 +1,78 @@
+# tests/test_file_follower.py
+import asyncio
+import os
+import time
+
+from monitoring.file_follower import FileFollower, create_watcher
+from monitoring.sources import FileLogSource
+
+
+def test_follower_reads_only_new_complete_lines(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_bytes(b"linha antiga\n")
+
+    follower = FileFollower(str(log_file), start_at_end=True)
+    assert follower.read_new()[0] == b''
+
+    with open(log_file, "ab") as f:
+        f.write(b"ERROR um\nERROR par")
+    data, offset, first_line = follower.read_new()
+    assert (data, offset, first_line) == (b"ERROR um\n", 13, 2)
+
+    with open(log_file, "ab") as f:
+        f.write(b"cial\n")
+    assert follower.read_new() == (b"ERROR parcial\n", 22, 3)
+
+
+def test_follower_handles_rotation_and_truncation(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_bytes(b"")
+    follower = FileFollower(str(log_file))
+    follower.read_new()
+
+    with open(log_file, "ab") as f:
+        f.write(b"antes da rotacao\n")
+    os.rename(log_file, tmp_path / "app.log.1")
+    with open(tmp_path / "app.log.1", "ab") as f:
+        f.write(b"final do antigo\n")
+    log_file.write_bytes(b"novo arquivo\n")
+
+    assert follower.read_new()[0] == b"antes da rotacao\nfinal do antigo\n"
+    assert follower.read_new() == (b"novo arquivo\n", 0, 1)
+    assert follower.rotations == 1
+
+    log_file.write_bytes(b"")
+    with open(log_file, "ab") as f:
+        f.write(b"curto\n")
+    assert follower.read_new() == (b"curto\n", 0, 1)
+    assert follower.truncations == 1
+
+
+def test_file_source_detects_new_lines_within_a_second(tmp_path):
+    log_file = tmp_path / "app.log"
+    log_file.write_bytes(b"")
+
+    async def scenario():
+        source = FileLogSource("local", str(log_file))
+        assert await source.poll(None) == []
+
+        async def writer():
+            await asyncio.sleep(0.1)
+            with open(log_file, "ab") as f:
+                f.write(b"2025-06-21 10:00:00 ERROR falha\n")
+
+        started = time.monotonic()
+        _, chunks = await asyncio.gather(writer(), source.poll(None))
+        elapsed = time.monotonic() - started
+        source.close()
+        return chunks, elapsed
+
+    chunks, elapsed = asyncio.run(scenario())
+    assert [c.data for c in chunks] == [b"2025-06-21 10:00:00 ERROR falha\n"]
+    assert chunks[0].incremental and chunks[0].first_line == 1
+    assert elapsed < 1.0
+
+
+def test_polling_fallback_watcher(tmp_path):
+    watcher = create_watcher(str(tmp_path), use_inotify=False, poll_interval=0.05)
+    assert asyncio.run(watcher.wait(1.0)) is True
@@ -0,0 +1,63 @@
+# tests/test_http_pool.py
+import asyncio
+
+from aiohttp import web
+
+from integrations.http_pool import HttpClientRegistry, PoolConfig, http_pool, run_sync
+
+
+def test_session_is_reused_and_keeps_connections_alive():
+    async def hello(request):
+        return web.Response(text="ok")
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/", hello)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        registry = HttpClientRegistry(PoolConfig(limit=8, limit_per_host=2))
+        registry.configure("logs", limit_per_host=1)
+        try:
+            session = registry.get("logs")
+            assert registry.get("logs") is session
+            assert registry.get() is not session
+
+            for _ in range(3):
+                async with session.get(f"http://127.0.0.1:{port}/") as response:
+                    assert await response.text() == "ok"
+
+            stats = registry.stats()["logs"]
+            assert stats['limit'] == 8
+            assert stats['limit_per_host'] == 1
+            # Conexão devolvida ao pool (keep-alive) em vez de fechada
+            assert stats['idle'] == 1
+
+            await registry.close_all()
+            assert session.closed
+            assert registry.get("logs") is not session
+        finally:
+            await registry.close_all()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_sessions_of_other_loops_are_kept_and_temporary_loops_are_closed():
+    async def use_pool():
+        return http_pool.get("teste")
+
+    async def scenario():
+        main_session = http_pool.get("teste")
+        # Agente síncrono rodando em outra thread, com loop próprio (run_sync)
+        temporary = await asyncio.to_thread(run_sync, use_pool())
+        assert temporary is not main_session and temporary.closed
+        assert http_pool.get("teste") is main_session and not main_session.closed
+        await http_pool.close_all()
+        return main_session
+
+    assert asyncio.run(scenario()).closed
+    assert not http_pool._sessions
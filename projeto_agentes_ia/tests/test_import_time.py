@@ -0,0 +1,47 @@
+# tests/test_import_time.py
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Pontos de entrada do bot, do servidor web e das ferramentas de linha de comando
+ENTRY_MODULES = ["web.app", "discord_bot.bot", "agents.agent_manager", "memory.memory_manager", "monitoring"]
+# Bibliotecas que só podem ser carregadas no primeiro uso
+HEAVY_MODULES = ["langchain_core", "google.adk", "sentence_transformers", "torch", "pdfplumber", "PyPDF2", "bs4"]
+# Orçamento de importação a frio (medido ~0,8s; antes da carga preguiçosa, ~5s)
+IMPORT_BUDGET_SECONDS = 2.5
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}}))
+"""
+
+
+def import_in_fresh_interpreter(modules):
+    result = subprocess.run([sys.executable, "-c", PROBE.format(modules=modules)], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=120,
+                            env={**os.environ, "LOOP_WATCHDOG_DISABLED": "1"})
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_entry_points_import_within_budget_without_heavy_dependencies():
+    # Melhor de três execuções: o cache de disco da primeira não conta contra o orçamento
+    probes = [import_in_fresh_interpreter(ENTRY_MODULES) for _ in range(3)]
+    loaded = set(probes[0]["modules"])
+
+    assert not [name for name in HEAVY_MODULES if name in loaded]
+    assert min(probe["seconds"] for probe in probes) < IMPORT_BUDGET_SECONDS
+
+
+def test_memory_modules_load_once_under_the_package_name():
+    loaded = set(import_in_fresh_interpreter(["agents.log_monitor_agent"])["modules"])
+
+    assert {"memory.memory_manager", "memory.rag_system"} <= loaded
+    assert not {"memory_manager", "rag_system", "chunker"} & loaded
@@ -0,0 +1,161 @@
+# tests/test_ingestion_pipeline.py
+import asyncio
+import contextlib
+
+import pytest
+
+from memory.chunker import Chunker
+from memory.document_processor import DocumentProcessor
+from memory.ingestion_pipeline import IngestionPipeline, normalize_text
+from memory.source_registry import SourceRegistry
+
+
+class FakeRAG:
+    def __init__(self):
+        self.rows = []
+        self.embed_calls = 0
+        self.registry = {}
+
+    async def existing_chunk_ids(self, source):
+        return set(self.registry.get(source, []))
+
+    async def commit_source(self, source, chunk_ids, removed, metadata=None):
+        before = len(self.rows)
+        self.rows = [row for row in self.rows if not (row[1] == source and row[2]["chunk_id"] in removed)]
+        self.registry[source] = chunk_ids
+        return before - len(self.rows)
+
+    def generate_embeddings(self, texts):
+        self.embed_calls += 1
+        return [[float(len(text))] for text in texts]
+
+    async def add_documents(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+
+def test_pipeline_streams_chunks_in_order_with_backpressure():
+    rag = FakeRAG()
+    processor = DocumentProcessor()
+    pipeline = IngestionPipeline(rag, processor, queue_size=1, embed_batch_size=4, insert_batch_size=8)
+    pages = [f"página {i} " + "conteúdo " * 120 + "\n\n" for i in range(120)]
+    produced = {'chars': 0, 'snapshots': []}
+
+    async def pieces():
+        for page in pages:
+            produced['chars'] += len(page)
+            produced['snapshots'].append((produced['chars'], len(rag.rows)))
+            yield page
+            await asyncio.sleep(0)
+
+    updates = []
+    report = asyncio.run(pipeline.run(pieces(), "doc:teste", "text", {"added_by": "1"},
+                                      on_progress=lambda p: updates.append(p.stored)))
+
+    expected = processor._split_text(normalize_text("".join(pages)))
+    assert [row[0] for row in rag.rows] == expected
+    assert [row[2]["chunk_index"] for row in rag.rows] == list(range(len(expected)))
+    assert rag.rows[0][2]["added_by"] == "1" and rag.rows[0][1] == "doc:teste"
+    assert rag.embed_calls == -(-len(expected) // 4)
+    assert report.stored == len(expected) and report.done
+    assert len(updates) > 2 and updates == sorted(updates)
+    # Filas limitadas: a extração nunca fica muito à frente da gravação
+    chars_per_chunk = produced['chars'] / len(expected)
+    max_ahead = max(chars / chars_per_chunk - stored for chars, stored in produced['snapshots'])
+    assert max_ahead <= 40 < len(expected)
+
+
+def test_pipeline_propagates_stage_errors():
+    class BrokenRAG(FakeRAG):
+        async def add_documents(self, rows):
+            raise RuntimeError("banco indisponível")
+
+    pipeline = IngestionPipeline(BrokenRAG(), DocumentProcessor())
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.ingest_text("texto " * 2000, "doc:erro"))
+
+
+def test_reingesting_edited_document_only_embeds_changed_chunks():
+    rag = FakeRAG()
+    pipeline = IngestionPipeline(rag, DocumentProcessor())
+    paragraphs = [f"Parágrafo {i}. " + f"Texto do assunto {i} com detalhes. " * 12 for i in range(30)]
+
+    asyncio.run(pipeline.ingest_text("\n\n".join(paragraphs), "doc:manual"))
+    first_ids = {row[2]["chunk_id"] for row in rag.rows}
+    embedded_texts = rag.embed_calls
+
+    paragraphs[15] = "Parágrafo 15 reescrito com outro conteúdo."
+    report = asyncio.run(pipeline.ingest_text("\n\n".join(paragraphs), "doc:manual"))
+
+    # Só os chunks vizinhos ao parágrafo editado mudam
+    assert report.reused >= report.chunks - 4
+    assert 1 <= report.stored <= 4 and report.removed >= 1
+    assert len({row[2]["chunk_id"] for row in rag.rows} & first_ids) == report.reused
+    assert rag.embed_calls == embedded_texts + 1
+    assert set(rag.registry["doc:manual"]) == {row[2]["chunk_id"] for row in rag.rows}
+
+
+def test_concurrent_ingestions_of_a_source_are_serialized():
+    class LockingRAG(FakeRAG):
+        def __init__(self):
+            super().__init__()
+            self.locks, self.events = {}, []
+
+        @contextlib.asynccontextmanager
+        async def source_lock(self, source):
+            async with self.locks.setdefault(source, asyncio.Lock()):
+                self.events.append(("start", source))
+                yield
+                self.events.append(("end", source))
+
+    rag = LockingRAG()
+    pipeline = IngestionPipeline(rag, DocumentProcessor())
+
+    async def scenario():
+        await asyncio.gather(pipeline.ingest_text("versão um " * 500, "doc:a"),
+                             pipeline.ingest_text("versão dois " * 500, "doc:a"))
+
+    asyncio.run(scenario())
+    assert rag.events == [("start", "doc:a"), ("end", "doc:a")] * 2
+    # A segunda ingestão viu o registro da primeira e removeu os chunks dela
+    assert {row[0].split()[1] for row in rag.rows} == {"dois"}
+
+
+def test_source_lock_uses_its_own_connection_outside_the_pool():
+    class ExhaustedPool:
+        def acquire(self):
+            raise AssertionError("a trava não pode ocupar uma conexão do pool")
+
+    class FakeConnection:
+        def __init__(self):
+            self.queries, self.closed = [], False
+
+        async def execute(self, query, *args):
+            self.queries.append(query.split("(")[0])
+
+        async def close(self):
+            self.closed = True
+
+    connections = []
+
+    async def connect():
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    async def scenario():
+        registry = SourceRegistry(ExhaustedPool(), connect=connect)
+        async with registry.source_lock("doc:a"):
+            assert not connections[0].closed
+
+    asyncio.run(scenario())
+    assert connections[0].queries == ["SELECT pg_advisory_lock", "SELECT pg_advisory_unlock"]
+    assert connections[0].closed
+
+
+def test_processor_shares_the_rag_chunker():
+    rag = FakeRAG()
+    rag.chunker = Chunker(max_tokens=50, token_counter=len)
+    processor = DocumentProcessor()
+    pipeline = IngestionPipeline(rag, processor)
+    assert pipeline.chunker is rag.chunker and processor.chunker is rag.chunker
+    assert IngestionPipeline(rag).processor.chunker is rag.chunker
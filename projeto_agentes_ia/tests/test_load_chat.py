@@ -0,0 +1,63 @@
+# tests/test_load_chat.py
+import asyncio
+import time
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from benchmarks.fake_gemini import FakeGemini, FakeGeminiConfig
+from benchmarks.load_chat import LoopLagMonitor, find_saturation
+
+
+def request(text):
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+
+
+async def generate(fake, text, stream=False):
+    return [response async for response in fake.generate_content_async(request(text), stream=stream)]
+
+
+def test_fake_gemini_is_deterministic_and_respects_concurrency_limit():
+    config = FakeGeminiConfig(first_token_ms=20, tokens_per_second=2000, min_tokens=10, max_tokens=20,
+                              max_concurrency=2, seed=7)
+    fake = FakeGemini(config=config)
+
+    async def scenario():
+        return await asyncio.gather(*(generate(fake, f"pergunta {i % 2}") for i in range(6)))
+
+    started = time.perf_counter()
+    results = asyncio.run(scenario())
+    elapsed = time.perf_counter() - started
+
+    texts = [responses[-1].content.parts[0].text for responses in results]
+    assert texts[0] == texts[2] == texts[4] and texts[1] == texts[3] and texts[0] != texts[1]
+    assert texts[0] == asyncio.run(generate(FakeGemini(config=config), "pergunta 0"))[-1].content.parts[0].text
+
+    stats = fake.stats()
+    assert stats["calls"] == 6 and stats["peak_in_flight"] == 2
+    assert stats["queue_wait"]["max_ms"] > 0 and elapsed >= 3 * 0.02
+
+    streamed = asyncio.run(generate(fake, "pergunta 0", stream=True))
+    assert all(response.partial for response in streamed[:-1]) and streamed[-1].content.parts[0].text == texts[0]
+
+
+def test_loop_lag_monitor_detects_blocking_calls():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.005, stall_threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.12)  # chamada síncrona no loop
+        await asyncio.sleep(0.05)
+        return await monitor.stop()
+
+    stats = asyncio.run(scenario())
+    assert stats["stalls"] == 1 and stats["max_ms"] >= 100
+
+
+def test_saturation_is_first_level_where_throughput_stalls():
+    def level(users, rps, p95):
+        return {"users": users, "requests_per_second": rps, "latency": {"p95_ms": p95}}
+
+    levels = [level(1, 5, 200), level(5, 24, 210), level(10, 40, 260), level(25, 42, 600), level(50, 41, 1200)]
+    assert find_saturation(levels) == 25
+    assert find_saturation(levels[:3]) is None
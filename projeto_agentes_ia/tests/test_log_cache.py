@@ -0,0 +1,96 @@
+# tests/test_log_cache.py
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from monitoring.log_cache import LogCache
+from monitoring.log_index import LogIndexManager
+
+
+async def _serve(state):
+    async def handler(request):
+        state['requests'].append(dict(request.headers))
+        await asyncio.sleep(state.get('delay', 0.05))
+        body = state['body']
+        etag = f'"{len(body)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        range_header = request.headers.get("Range")
+        if range_header and state.get('ranges', True):
+            start = int(range_header.split("=")[1].rstrip("-"))
+            return web.Response(status=206, body=body[start:], headers={
+                "ETag": etag, "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"
+            })
+        return web.Response(body=body, headers={"ETag": etag})
+
+    app = web.Application()
+    app.router.add_get("/logs/{date}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/logs/2025-06-21"
+
+
+def test_single_flight_ttl_and_incremental_refresh(tmp_path):
+    state = {'body': b"linha 1 ERROR inicial\n", 'requests': []}
+
+    async def scenario():
+        runner, url = await _serve(state)
+        cache = LogCache(LogIndexManager(str(tmp_path)), ttl_seconds=60)
+        try:
+            async with aiohttp.ClientSession() as session:
+                # Pedidos simultâneos compartilham um único download
+                results = await asyncio.gather(*(cache.get(session, url, "2025-06-21") for _ in range(5)))
+                assert len(state['requests']) == 1
+                assert all(r == state['body'] for r in results)
+
+                # Dentro do TTL a cópia local é servida
+                await cache.get(session, url, "2025-06-21")
+                assert len(state['requests']) == 1
+
+                # Sem mudanças: 304
+                assert await cache.get(session, url, "2025-06-21", max_age=0) == state['body']
+                assert cache.stats['not_modified'] == 1
+
+                # Log cresceu: apenas o trecho novo é pedido (Range) e indexado
+                state['body'] += b"linha 2 Timeout novo\n"
+                assert await cache.get(session, url, "2025-06-21", max_age=0) == state['body']
+                assert "Range" in state['requests'][-1]
+                assert cache.stats['partial'] == 1
+                index = cache.index_manager.get("2025-06-21")
+                assert [h.line_number for h in index.search("timeout")] == [2]
+
+                # Servidor sem Range e conteúdo substituído: cópia e índice refeitos
+                state['ranges'] = False
+                state['body'] = b"outro conteudo\n"
+                assert await cache.get(session, url, "2025-06-21", max_age=0) == state['body']
+                assert index.line_count == 1
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_owner_does_not_cancel_coalesced_waiters(tmp_path):
+    state = {'body': b"linha 1 ERROR inicial\n", 'requests': [], 'delay': 0.3}
+
+    async def scenario():
+        runner, url = await _serve(state)
+        cache = LogCache(LogIndexManager(str(tmp_path)), ttl_seconds=60)
+        try:
+            async with aiohttp.ClientSession() as session:
+                # Quem inicia o download desiste (timeout do agendador)
+                owner = asyncio.create_task(asyncio.wait_for(cache.get(session, url, "2025-06-21"), 0.05))
+                await asyncio.sleep(0)
+                waiter = asyncio.create_task(cache.get(session, url, "2025-06-21"))
+                results = await asyncio.gather(owner, waiter, return_exceptions=True)
+                assert isinstance(results[0], asyncio.TimeoutError)
+                assert results[1] == state['body']
+                assert len(state['requests']) == 1 and cache.stats['coalesced'] == 1
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(scenario())
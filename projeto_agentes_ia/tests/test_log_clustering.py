@@ -0,0 +1,70 @@
+# tests/test_log_clustering.py
+import asyncio
+
+from monitoring.clustering import DrainTemplateMiner, ClusterAnalysisCache, WILDCARD
+
+
+def test_similar_lines_share_cluster_and_generalize_template():
+    """Linhas com o mesmo formato caem no mesmo cluster; divergências viram curinga."""
+    miner = DrainTemplateMiner()
+    first, change = miner.add("2025-06-21 10:00:01 ERROR falha ao salvar pedido 10 no banco")
+    assert change == "created"
+
+    same, change = miner.add("2025-06-21 10:00:02 ERROR falha ao salvar pedido 99 no banco")
+    assert same is first and change == "none"
+
+    hash_before = first.template_hash
+    changed, change = miner.add("2025-06-21 10:00:03 ERROR falha ao salvar cliente 7 no banco")
+    assert changed is first and change == "changed"
+    assert WILDCARD in first.template_tokens
+    assert first.template_hash != hash_before
+    assert first.size == 3
+
+
+def test_different_errors_get_different_clusters():
+    miner = DrainTemplateMiner()
+    a, _ = miner.add("ERROR Connection refused ao conectar no redis")
+    b, _ = miner.add("Traceback (most recent call last):")
+    assert a.cluster_id != b.cluster_id
+    assert len(miner.clusters) == 2
+
+
+def test_cluster_limit_evicts_oldest():
+    miner = DrainTemplateMiner(max_clusters=2)
+    for line in ["erro alfa", "falha beta gama", "timeout delta epsilon zeta"]:
+        miner.add(line)
+    assert [c.template for c in miner.clusters] == ["falha beta gama", "timeout delta epsilon zeta"]
+
+
+def test_analysis_cache_roundtrip(tmp_path):
+    cache = ClusterAnalysisCache(db_path=str(tmp_path / "cache.sqlite3"))
+    cache.put_many([("abc", "<TS> ERROR x", "🚨 ALTO - banco fora")])
+    assert cache.get("abc") == "🚨 ALTO - banco fora"
+    assert cache.get("outro") is None
+
+
+def test_clusters_beyond_prompt_limit_are_analyzed_in_further_batches(tmp_path):
+    from agents.log_monitor_agent import LogMonitorAgent
+
+    agent = object.__new__(LogMonitorAgent)
+    agent.template_miner = DrainTemplateMiner()
+    agent.analysis_cache = ClusterAnalysisCache(db_path=str(tmp_path / "cache.sqlite3"))
+    agent.analysis_stats = {'llm_calls': 0, 'cache_hits': 0}
+    agent.max_clusters_per_prompt = 20
+    prompts = []
+
+    async def fake_prompt(prompt, date):
+        prompts.append(prompt)
+        groups = prompt.count("Template:")
+        return "### RESUMO\nok\n" + "".join(f"### C{n}\nanálise\n" for n in range(1, groups + 1))
+
+    agent._run_analysis_prompt = fake_prompt
+    words = [chr(97 + i // 26) + chr(97 + i % 26) for i in range(50)]
+    errors = [{'line': f"{word} {word} {word} falhou", 'context': "", 'timestamp': "-", 'line_number': n}
+              for n, word in enumerate(words)]
+
+    report = asyncio.run(agent.analyze_errors_with_ai(errors, "2025-06-21"))
+
+    assert len(agent.template_miner.clusters) == 50
+    assert len(prompts) == 3
+    assert "Análise pendente" not in report
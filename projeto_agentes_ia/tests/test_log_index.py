@@ -0,0 +1,87 @@
+# tests/test_log_index.py
+from datetime import datetime
+
+from monitoring import log_index
+from monitoring.log_index import LogIndex, LogIndexManager, required_literals
+
+LOG = (
+    b"[2025-06-21 10:00:00] production.INFO: pedido 10 criado\n"
+    b"[2025-06-21 10:05:00] production.ERROR: Connection refused ao conectar no redis\n"
+    b"#0 /app/Redis.php(42): connect()\n"
+    b"[2025-06-21 11:00:00] production.ERROR: SQL Error no pedido 99\n"
+)
+
+
+def _ts(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()
+
+
+def test_phrase_search_with_context_and_partial_tokens(tmp_path):
+    manager = LogIndexManager(str(tmp_path))
+    index = manager.ingest("2025-06-21", LOG)
+    assert index.line_count == 4
+
+    hits = index.search("connection REFUSED")
+    assert [h.line_number for h in hits] == [2]
+    assert hits[0].context.splitlines()[0].endswith("pedido 10 criado")
+    assert hits[0].context.splitlines()[-1].startswith("#0 /app/Redis.php")
+
+    # Parte de uma palavra também é encontrada, como na busca antiga por substring
+    assert [h.line_number for h in index.search("redi")] == [2, 3]
+    assert index.search("inexistente") == []
+
+
+def test_incremental_ingest_regex_and_time_range(tmp_path):
+    manager = LogIndexManager(str(tmp_path))
+    manager.ingest("2025-06-21", LOG[:120])  # Última linha incompleta fica para depois
+    index = manager.ingest("2025-06-21", LOG)
+    assert index.line_count == 4
+    assert index.indexed_bytes == len(LOG)
+
+    assert [h.line_number for h in index.search(regex=r"pedido 9\d")] == [4]
+    assert [h.line_number for h in index.search("pedido", since=_ts("2025-06-21 10:30:00"))] == [4]
+    # Linha de stack trace herda o timestamp da linha anterior
+    assert [h.line_number for h in index.search(since=_ts("2025-06-21 10:05:00"),
+                                                until=_ts("2025-06-21 10:06:00"))] == [2, 3]
+
+
+def test_replaced_content_rebuilds_index(tmp_path):
+    manager = LogIndexManager(str(tmp_path))
+    manager.ingest("dia", LOG)
+    index = manager.ingest("dia", b"conteudo novo com timeout\n")
+    assert index.line_count == 1
+    assert [h.line for h in index.search("timeout")] == ["conteudo novo com timeout"]
+
+
+def test_required_literals():
+    assert required_literals(r"SQL\s+Error") == ["SQL", "Error"]
+    assert required_literals(r"(a|b)c") == ["c"]
+
+
+def test_fragments_use_token_index_before_substring_scan(tmp_path, monkeypatch):
+    manager = LogIndexManager(str(tmp_path))
+    index = manager.ingest("2025-06-21", LOG)
+    kinds = []
+    original = LogIndex._lines_for_fragment
+
+    def spy(self, fragment, kind="infix"):
+        kinds.append((fragment, kind))
+        return original(self, fragment, kind)
+
+    monkeypatch.setattr(LogIndex, "_lines_for_fragment", spy)
+    assert [h.line_number for h in index.search("production.error: sql")] == [4]
+    # Tokens entre separadores usam igualdade/prefixo; a ponta inicial é conferida na linha
+    assert kinds == [("error", "exact"), ("sql", "prefix")]
+
+    kinds.clear()
+    assert [h.line_number for h in index.search("onnect")] == [2, 3]
+    assert kinds == [("onnect", "infix")]
+
+
+def test_update_reads_in_bounded_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_index, "READ_BLOCK_SIZE", 16)
+    manager = LogIndexManager(str(tmp_path))
+    index = manager.ingest("2025-06-21", LOG)
+    assert index.line_count == 4
+    assert index.indexed_bytes == len(LOG)
+    assert [h.line_number for h in index.search("redis")] == [2, 3]
@@ -0,0 +1,41 @@
+# tests/test_loop_watchdog.py
+import asyncio
+import time
+
+from observability import LoopWatchdog
+
+
+def blocking_parse():
+    time.sleep(0.2)  # simula encode/parsing síncrono dentro de uma corrotina
+
+
+def test_watchdog_captures_stack_of_blocking_call():
+    async def scenario():
+        watchdog = LoopWatchdog(interval=0.01, threshold=0.05, sample_interval=0.01)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        blocking_parse()
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(scenario())
+    stats = watchdog.stats()
+    assert stats["blocks"] == 1 and stats["lag_max_ms"] >= 150
+    event = watchdog.recent_events(limit=1)[0]
+    assert event["duration_ms"] >= 150 and event["samples"] >= 2
+    assert event["culprit"].startswith("tests/test_loop_watchdog.py") and "blocking_parse" in event["culprit"]
+    assert "stack" not in stats["last_blocks"][0]
+
+
+def test_watchdog_ignores_short_callbacks():
+    async def scenario():
+        watchdog = LoopWatchdog(interval=0.01, threshold=0.1, sample_interval=0.01)
+        watchdog.start()
+        for _ in range(5):
+            time.sleep(0.01)
+            await asyncio.sleep(0.01)
+        await watchdog.stop()
+        return watchdog
+
+    assert asyncio.run(scenario()).stats()["blocks"] == 0
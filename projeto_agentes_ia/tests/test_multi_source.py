@@ -0,0 +1,89 @@
+# tests/test_multi_source.py
+import asyncio
+
+from monitoring.multi_source import MultiSourceMonitor
+from monitoring.sources import FileLogSource, LogChunk, LogSource, build_sources
+
+
+class SlowSource(LogSource):
+    kind = "slow"
+
+    async def poll(self, session):
+        await asyncio.sleep(10)
+        return []
+
+
+def test_slow_source_times_out_without_blocking_others(tmp_path):
+    """Uma fonte lenta entra em falha pelo timeout; as demais são processadas."""
+    log_file = tmp_path / "app.log"
+    log_file.write_text("2025-06-21 10:00:00 ERROR falha\n")
+
+    received = []
+
+    async def handler(source, chunk):
+        received.append((source.name, chunk.data))
+
+    sources = [FileLogSource("local", str(log_file), start_at_end=False), SlowSource("lenta", timeout=0.2)]
+    monitor = MultiSourceMonitor(sources, handler)
+    results = asyncio.run(monitor.poll_once())
+
+    assert results == {"local": True, "lenta": False}
+    assert received == [("local", log_file.read_bytes())]
+    assert monitor.states["lenta"].consecutive_failures == 1
+    assert "timeout" in monitor.states["lenta"].last_error
+
+
+class TickSource(LogSource):
+    kind = "tick"
+
+    def __init__(self, name, **kwargs):
+        super().__init__(name, **kwargs)
+        self.ticks = 0
+
+    async def poll(self, session):
+        self.ticks += 1
+        return [LogChunk(self.name, self.name, str(self.ticks), self.name, b"%d" % self.ticks)]
+
+
+def test_source_keeps_polling_while_handler_is_busy():
+    """O handler lento consome a fila em ordem; a agenda da fonte não espera por ele."""
+    source = TickSource("tick", interval=0.01, jitter=0)
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(source, chunk):
+        await release.wait()
+        handled.append(chunk.data)
+
+    async def scenario():
+        monitor = MultiSourceMonitor([source], handler, max_pending_chunks=3)
+        task = asyncio.create_task(monitor.run())
+        # Intervalo mínimo de 0.1s entre verificações: tempo para mais de 5
+        await asyncio.sleep(1.0)
+        # Um trecho no handler e a fila cheia: a fonte só espera por espaço na fila
+        polls_while_blocked = source.ticks
+        release.set()
+        await asyncio.sleep(0.1)
+        monitor.stop()
+        await task
+        return polls_while_blocked
+
+    assert asyncio.run(scenario()) == 5
+    assert handled[:5] == [b"1", b"2", b"3", b"4", b"5"]
+
+
+def test_next_delay_applies_backoff_and_cap():
+    source = SlowSource("s", interval=10, jitter=0, backoff_factor=2, max_backoff=60)
+    assert MultiSourceMonitor.next_delay(source, 0) == 10
+    assert MultiSourceMonitor.next_delay(source, 2) == 40
+    assert MultiSourceMonitor.next_delay(source, 10) == 60
+
+
+def test_build_sources_from_config():
+    sources = build_sources([
+        {"type": "http", "name": "backend", "base_url": "https://exemplo/logs/", "interval": 60},
+        {"type": "file", "path": "/var/log/app.log"}
+    ])
+    assert [s.kind for s in sources] == ["http", "file"]
+    assert sources[0].location == "https://exemplo/logs"
+    assert sources[1].name == "/var/log/app.log"
@@ -0,0 +1,108 @@
+# tests/test_pdf_extractor.py
+import asyncio
+import time
+
+from memory.document_processor import DocumentProcessor
+from memory.pdf_extractor import PageText, PdfExtractor
+
+
+def build_pdf(pages):
+    """PDF mínimo com uma linha de texto por página."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def test_pages_come_back_in_order_from_process_pool():
+    pdf = build_pdf([f"Pagina numero {i}" for i in range(1, 11)])
+    extractor = PdfExtractor(max_workers=2, pages_per_task=3)
+
+    async def scenario():
+        return [page async for page in extractor.iter_pages(pdf)]
+
+    try:
+        pages = asyncio.run(scenario())
+    finally:
+        extractor.close()
+
+    assert [page.number for page in pages] == list(range(1, 11))
+    assert all(f"Pagina numero {page.number}" in page.text for page in pages)
+    assert extractor.last_stats.pages == 10
+    assert extractor.last_stats.extracted == 10
+    assert extractor.last_stats.pages_per_second > 0
+
+
+def test_ranges_in_flight_are_bounded_by_the_consumer():
+    pdf = build_pdf([f"Pagina {i}" for i in range(1, 21)])
+    extractor = PdfExtractor(max_workers=2, pages_per_task=1)
+    started = []
+
+    async def fake_extract_range(loop, path, start, end):
+        started.append(start)
+        return [PageText(start + 1, f"Pagina {start + 1}")]
+
+    extractor._extract_range = fake_extract_range
+
+    async def scenario():
+        seen = []
+        async for page in extractor.iter_pages(pdf):
+            # Consumidor lento: além da faixa sendo entregue, no máximo a janela
+            await asyncio.sleep(0.01)
+            assert len(started) - len(seen) <= extractor.max_in_flight + 1
+            seen.append(page.number)
+        return seen
+
+    assert asyncio.run(scenario()) == list(range(1, 21))
+    assert extractor.max_in_flight == 4
+
+
+def test_timed_out_pool_is_recycled():
+    extractor = PdfExtractor(max_workers=1)
+    try:
+        executor = extractor._get_executor()
+        assert executor._mp_context.get_start_method() in ("forkserver", "spawn")
+        # Processo preso, como uma página que não respeita o alarme
+        executor.submit(time.sleep, 60)
+        processes = []
+        while not processes:
+            processes = list(executor._processes.values())
+            time.sleep(0.05)
+
+        extractor._recycle_executor(executor)
+        for process in processes:
+            process.join(5)
+        assert not any(process.is_alive() for process in processes)
+        assert extractor._get_executor() is not executor
+    finally:
+        extractor.close()
+
+
+def test_stream_splitter_matches_split_text():
+    processor = DocumentProcessor()
+    text = "".join(f"linha {i} com algum conteúdo\n" for i in range(300))
+
+    for step in (7, 150, 1000, 5000):
+        splitter = processor._stream_splitter()
+        chunks = []
+        for start in range(0, len(text), step):
+            chunks.extend(chunk.text for chunk in splitter.feed(text[start:start + step]))
+        chunks.extend(chunk.text for chunk in splitter.finish())
+        assert chunks == processor._split_text(text)
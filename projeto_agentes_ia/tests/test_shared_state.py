@@ -0,0 +1,43 @@
+# tests/test_shared_state.py
+import asyncio
+
+from discord_bot.shard_launcher import assign_shards
+from discord_bot.shared_state import SQLiteStateStore
+
+
+def test_preferences_are_visible_to_every_process(tmp_path):
+    async def scenario():
+        # Dois processos de shard = duas conexões ao mesmo arquivo
+        first = SQLiteStateStore(tmp_path / "bot_state.db")
+        second = SQLiteStateStore(tmp_path / "bot_state.db")
+        await first.set_preference("u1", "langchain")
+        seen = await second.get_preference("u1")
+        await second.clear_preference("u1")
+        cleared = await first.get_preference("u1")
+        await first.close()
+        await second.close()
+        return seen, cleared
+
+    assert asyncio.run(scenario()) == ("langchain", None)
+
+
+def test_only_one_holder_of_the_leader_lock(tmp_path):
+    async def scenario():
+        store = SQLiteStateStore(tmp_path / "bot_state.db")
+        leader = store.leader_lock("log_monitor")
+        follower = store.leader_lock("log_monitor")
+
+        results = [await leader.acquire(), await follower.acquire()]
+        # O líder cai: o seguinte assume na próxima tentativa
+        await leader.release()
+        results += [await follower.acquire(), await follower.check()]
+        await follower.release()
+        await store.close()
+        return results
+
+    assert asyncio.run(scenario()) == [True, False, True, True]
+
+
+def test_shards_are_spread_across_processes():
+    assert assign_shards(4, 2) == [[0, 2], [1, 3]]
+    assert assign_shards(2, 4) == [[0], [1]]
@@ -0,0 +1,73 @@
+# tests/test_tracing.py
+import asyncio
+import time
+
+import pytest
+
+from observability import STAGE_ERRORS, STAGE_LATENCY, recent_spans, record_span, span, traced
+from observability.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets_in_prometheus_format():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_latency_seconds", "Latência de teste", buckets=(0.1, 1.0))
+    counter = registry.counter("test_errors", "Erros de teste")
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage='llm "call"')
+    counter.inc(stage="db")
+
+    text = registry.render()
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{stage="llm \\"call\\"",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="llm \\"call\\"",le="1.0"} 3' in text
+    assert 'test_latency_seconds_bucket{stage="llm \\"call\\"",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{stage="llm \\"call\\""} 4' in text
+    assert 'test_errors_total{stage="db"} 1.0' in text
+    assert histogram.quantile(0.5, stage='llm "call"') == 1.0
+
+
+def test_spans_nest_and_feed_stage_histogram():
+    before = (STAGE_LATENCY.snapshot(stage="test.inner") or {"count": 0})["count"]
+
+    @traced("test.outer")
+    async def handler():
+        with span("test.inner", limit=2) as current:
+            await asyncio.sleep(0.01)
+            current.set_attribute("documents", 3)
+
+    asyncio.run(handler())
+    started = time.time_ns()
+    record_span("test.tool", started - 5_000_000, started, tool="busca")
+
+    inner, outer = recent_spans.list(name="test.inner")[-1], recent_spans.list(name="test.outer")[-1]
+    assert inner["trace_id"] == outer["trace_id"] and inner["parent_id"] == outer["span_id"]
+    assert inner["attributes"] == {"limit": 2, "documents": 3} and inner["duration_ms"] >= 10
+    assert STAGE_LATENCY.snapshot(stage="test.inner")["count"] == before + 1
+    assert recent_spans.list(name="test.tool")[-1]["attributes"] == {"tool": "busca"}
+
+
+def test_span_records_errors_and_reraises():
+    errors = STAGE_ERRORS.value(stage="test.fail")
+    with pytest.raises(ValueError):
+        with span("test.fail"):
+            raise ValueError("falhou")
+    assert STAGE_ERRORS.value(stage="test.fail") == errors + 1
+    assert recent_spans.list(name="test.fail")[-1]["status"] == "ERROR"
+
+
+def test_traces_endpoint_is_restricted_to_admins(monkeypatch):
+    from fastapi.testclient import TestClient
+    from web.app import app
+
+    # O TestClient não é localhost: sem token configurado, nada passa
+    client = TestClient(app)
+    monkeypatch.delenv("OBSERVABILITY_ADMIN_TOKEN", raising=False)
+    assert client.get("/api/traces").status_code == 403
+    assert client.get("/api/loop-blocks").status_code == 403
+
+    monkeypatch.setenv("OBSERVABILITY_ADMIN_TOKEN", "segredo")
+    assert client.get("/api/traces", headers={"X-Admin-Token": "errado"}).status_code == 403
+    response = client.get("/api/traces", headers={"X-Admin-Token": "segredo"})
+    assert response.status_code == 200 and "spans" in response.json()
+    response = client.get("/api/loop-blocks", headers={"X-Admin-Token": "segredo"})
+    assert response.status_code == 200 and "events" in response.json()
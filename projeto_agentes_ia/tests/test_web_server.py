@@ -0,0 +1,121 @@
+# tests/test_web_server.py
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from memory.memory_manager import ConversationEntry, IsolatedFileMemoryService, MemoryManager
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+APP_MODULE = """
+import asyncio, os
+from fastapi import FastAPI
+
+app = FastAPI()
+state = {}
+
+def preload():
+    state["loaded_by"] = os.getpid()
+
+@app.get("/info")
+async def info(delay: float = 0.0):
+    await asyncio.sleep(delay)
+    return {"pid": os.getpid(), "loaded_by": state.get("loaded_by")}
+
+@app.on_event("shutdown")
+async def shutdown():
+    with open(os.path.join(os.environ["SHUTDOWN_DIR"], f"worker_{os.getpid()}"), "w") as f:
+        f.write("flushed")
+"""
+
+SERVER_SCRIPT = """
+import sys
+sys.path[:0] = [{root!r}, {app_dir!r}]
+from web.server import PreforkServer
+PreforkServer(app="fake_app:app", preload="fake_app:preload", port={port}, workers=2,
+              graceful_timeout=5, log_level="warning").run()
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_prefork_workers_share_preloaded_app_and_shut_down_gracefully(tmp_path):
+    (tmp_path / "fake_app.py").write_text(textwrap.dedent(APP_MODULE))
+    port = free_port()
+    script = SERVER_SCRIPT.format(root=str(PROJECT_ROOT), app_dir=str(tmp_path), port=port)
+    server = subprocess.Popen([sys.executable, "-c", script], env={**os.environ, "SHUTDOWN_DIR": str(tmp_path)},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/info"
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                info = httpx.get(url, timeout=1).json()
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline and server.poll() is None
+                time.sleep(0.1)
+
+        # Modelo carregado uma vez no mestre e herdado pelo worker
+        assert info["loaded_by"] == server.pid and info["pid"] != server.pid
+
+        slow = {}
+        request = threading.Thread(target=lambda: slow.update(httpx.get(url, params={"delay": 1.0}, timeout=10).json()))
+        request.start()
+        time.sleep(0.3)
+        server.send_signal(signal.SIGTERM)
+        request.join()
+        assert server.wait(timeout=15) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
+
+    # Requisição em andamento concluída e shutdown executado nos dois workers
+    assert slow["loaded_by"] == server.pid
+    assert len(list(tmp_path.glob("worker_*"))) == 2
+
+
+def test_write_behind_flushes_pending_saves(tmp_path):
+    service = IsolatedFileMemoryService(storage_path=str(tmp_path))
+    manager = MemoryManager(service, write_behind=True)
+    for i in range(20):
+        manager.save_interaction("u1", "s1", f"pergunta {i}", f"resposta {i}", "ADK")
+    assert manager.flush(timeout=5)
+
+    saved = json.loads(service._get_conversation_file("u1", "s1").read_text(encoding="utf-8"))
+    assert [entry["user_message"] for entry in saved] == [f"pergunta {i}" for i in range(20)]
+    assert not list(tmp_path.glob("*.tmp"))
+    assert ConversationEntry.from_dict(saved[0]).agent_type == "ADK"
+
+
+def test_write_behind_reads_own_pending_writes(tmp_path):
+    service = IsolatedFileMemoryService(storage_path=str(tmp_path))
+    release = threading.Event()
+    save = service.save_conversation
+    service.save_conversation = lambda entry: (release.wait(5), save(entry))
+    manager = MemoryManager(service, write_behind=True)
+
+    manager.save_interaction("u1", "s1", "meu nome é Ana", "Olá, Ana!", "ADK")
+    manager.save_interaction("u1", "s1", "qual é o meu nome?", "Ana.", "ADK")
+    context = manager.get_context_for_agent("u1", "s1")
+    assert "meu nome é Ana" in context and "qual é o meu nome?" in context
+    assert "meu nome é Ana" not in manager.get_context_for_agent("u1", "s2")
+
+    release.set()
+    assert manager.flush(timeout=5)
+    assert manager.get_context_for_agent("u1", "s1").count("meu nome é Ana") == 1
+    # Travas em um único diretório, sem arquivo .lock ao lado de cada conversa
+    assert not list(tmp_path.glob("*.lock"))
@@ -1,10 +1,11 @@
 # web/app.py - Versão corrigida com logger configurado
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import asyncio
-import sys
+import hmac
+import time
 import os
 import logging
 import traceback
@@ -17,12 +18,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Adicionar o diretório pai ao path para importar os agentes
+# Pacotes do projeto (agents, memory...) importados a partir da raiz: use
+# run_web.py, "uvicorn web.app:app" ou "python -m web.app"
 current_dir = Path(__file__).parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
 
 from agents.agent_manager import AgentManager
+from integrations.http_pool import close_http_sessions
+from memory.pdf_extractor import close_pdf_extractor
+from observability import (
+    REQUEST_LATENCY, LoopWatchdog, current_trace_id, recent_spans, render_prometheus, setup_tracing, span,
+    startup_report
+)
 from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
@@ -42,12 +48,43 @@ templates_dir = current_dir / "templates"
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 templates = Jinja2Templates(directory=str(templates_dir))
 
+# Rastreamento das requisições (spans do ADK entram na mesma árvore)
+setup_tracing()
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Abre o span raiz da requisição e registra a latência por rota."""
+    started = time.perf_counter()
+    status_code = 500
+    with span("http.request", http_method=request.method, http_target=request.url.path) as request_span:
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            trace_id = current_trace_id()
+            if trace_id:
+                response.headers["X-Trace-Id"] = trace_id
+            return response
+        finally:
+            # Rota do template (/chat), não o caminho concreto, para não explodir a cardinalidade
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            request_span.set_attribute("http_route", route)
+            request_span.set_attribute("http_status_code", status_code)
+            REQUEST_LATENCY.observe(time.perf_counter() - started, route=route,
+                                    method=request.method, status=str(status_code))
+
 # Inicializar o gerenciador de agentes
 agent_manager = None
 
-@app.on_event("startup")
-async def startup_event():
-    """Inicializa o gerenciador de agentes quando a aplicação inicia."""
+# Detector de bloqueios do loop de eventos (observability/loop_watchdog.py)
+loop_watchdog = LoopWatchdog.from_env("web")
+
+def preload_agents(eager: bool = True):
+    """
+    Cria o gerenciador de agentes. Com eager (servidor multi-worker, no
+    processo mestre) os agentes e modelos são carregados já, antes do fork,
+    e os workers compartilham essa memória por copy-on-write. Sem eager, cada
+    agente é criado no primeiro uso (AGENT_WARMUP=1 aquece em segundo plano).
+    """
     global agent_manager
     
     # Verificar se as API keys estão configuradas
@@ -63,13 +100,47 @@ async def startup_event():
         print("Configure no arquivo .env para usar todos os agentes")
     
     try:
-        agent_manager = AgentManager()
+        with startup_report.phase("agent_manager"):
+            agent_manager = AgentManager()
+        if eager:
+            with startup_report.phase("agents.preload"):
+                agent_manager.warm_up()
+        if os.getenv("FAKE_GEMINI"):
+            # Testes de carga: modelo falso com latência configurável (benchmarks/fake_gemini.py)
+            from benchmarks.fake_gemini import FakeGeminiConfig, install_fake_gemini
+            install_fake_gemini(agent_manager, FakeGeminiConfig.from_env())
         logger.info("Gerenciador de agentes inicializado com sucesso")
         print("✅ Gerenciador de agentes inicializado com sucesso")
     except Exception as e:
         logger.error(f"Erro ao inicializar gerenciador de agentes: {e}")
         print(f"❌ Erro ao inicializar gerenciador de agentes: {e}")
 
+@app.on_event("startup")
+async def startup_event():
+    """Inicializa o gerenciador de agentes quando a aplicação inicia."""
+    if not os.getenv("LOOP_WATCHDOG_DISABLED"):
+        loop_watchdog.start()
+
+    # Já carregado pelo processo mestre no modo multi-worker (web/server.py)
+    if agent_manager is None:
+        preload_agents(eager=False)
+        if agent_manager and os.getenv("AGENT_WARMUP") == "1":
+            agent_manager.start_warm_up()
+    startup_report.mark_ready()
+    startup_report.log()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Conclui as gravações de memória e fecha as conexões HTTP e o pool de extração de PDF."""
+    if agent_manager:
+        # Requisições em andamento já terminaram (uvicorn espera antes do shutdown)
+        if not await asyncio.to_thread(agent_manager.flush_memory):
+            logger.warning("Encerrando com gravações de memória pendentes")
+    await loop_watchdog.stop()
+    await close_http_sessions()
+    close_pdf_extractor()
+    logger.info("Pool de conexões HTTP encerrado")
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Página principal da aplicação."""
@@ -79,12 +150,16 @@ async def home(request: Request):
 async def chat_endpoint(
     query: str = Form(...),
     user_id: str = Form(default="web_user"),
-    session_id: str = Form(default=None)
+    session_id: str = Form(default=None),
+    agent_type: str = Form(default=None)
 ):
-    """Endpoint para processar mensagens do chat com contexto de usuário."""
+    """
+    Endpoint para processar mensagens do chat com contexto de usuário.
+    agent_type escolhe o agente desta requisição (padrão: agente padrão do servidor).
+    """
     global agent_manager
     
-    logger.info(f"Recebida consulta: {query[:50]}... de usuário: {user_id}")
+    logger.debug(f"Recebida consulta: {query[:50]}... de usuário: {user_id}")
     
     if not agent_manager:
         logger.error("Agent manager não disponível")
@@ -96,33 +171,29 @@ async def chat_endpoint(
     if not query.strip():
         logger.error("Query vazia recebida")
         raise HTTPException(status_code=400, detail="Pergunta não pode estar vazia.")
+
+    requested_type = agent_type
+    agent_type = agent_manager.resolve_agent_type(agent_type)
+    if agent_type is None:
+        raise HTTPException(status_code=400, detail=f"Agente '{requested_type}' não disponível.")
     
     try:
-        # Definir contexto do usuário
+        # Contexto do usuário vai por requisição: nada é gravado no agente compartilhado
         if not session_id:
             session_id = f"web_session_{user_id}_{hash(user_id) % 10000}"
         
-        logger.info(f"Definindo contexto: user_id={user_id}, session_id={session_id}")
-        agent_manager.set_user_context(user_id, session_id)
-        
-        # Verificar se o método existe
-        if hasattr(agent_manager, 'run_current_agent_with_context'):
-            logger.info("Usando run_current_agent_with_context")
-            response = await agent_manager.run_current_agent_with_context(
-                query.strip(), user_id, session_id
-            )
-        else:
-            logger.info("Usando run_current_agent (fallback)")
-            response = await agent_manager.run_current_agent(query.strip())
+        logger.debug(f"Contexto: user_id={user_id}, session_id={session_id}, agente={agent_type}")
+        response = await agent_manager.run_agent(query.strip(), user_id, session_id, agent_type=agent_type)
+        agent = agent_manager.agents.get(agent_type)
         
-        logger.info(f"Resposta gerada com sucesso: {len(response)} caracteres")
+        logger.debug(f"Resposta gerada com sucesso: {len(response)} caracteres")
         
         return JSONResponse({
             "success": True,
             "query": query,
             "response": response,
-            "agent": agent_manager.current_agent,
-            "agent_name": agent_manager.get_current_agent().name if agent_manager.get_current_agent() else "Desconhecido",
+            "agent": agent_type,
+            "agent_name": agent.name if agent else agent_type,
             "user_id": user_id,
             "session_id": session_id
         })
@@ -138,21 +209,23 @@ async def chat_endpoint(
 
 @app.post("/switch-agent")
 async def switch_agent(agent_type: str = Form(...)):
-    """Endpoint para trocar o agente ativo."""
+    """
+    Valida a troca de agente. A escolha fica no cliente, que a envia em cada
+    /chat (agent_type): o agente padrão do servidor não muda, e a troca vale
+    igualmente em qualquer worker.
+    """
     global agent_manager
     
     if not agent_manager:
         raise HTTPException(status_code=503, detail="Gerenciador de agentes não disponível.")
     
-    success = agent_manager.set_agent(agent_type)
-    
-    if success:
-        logger.info(f"Agente alterado para: {agent_type}")
+    if agent_manager.resolve_agent_type(agent_type) is not None:
+        logger.debug(f"Agente selecionado pelo cliente: {agent_type}")
         return JSONResponse({
             "success": True,
             "message": f"Agente alterado para {agent_type}",
-            "current_agent": agent_manager.current_agent,
-            "agent_info": agent_manager.get_agent_info()
+            "current_agent": agent_type,
+            "agent_info": agent_manager.get_agent_info(selected=agent_type)
         })
     else:
         logger.error(f"Falha ao alterar para agente: {agent_type}")
@@ -165,21 +238,22 @@ async def switch_agent(agent_type: str = Form(...)):
 async def add_knowledge_endpoint(
     content: str = Form(...),
     source: str = Form(default="user"),
-    user_id: str = Form(default="web_user")
+    user_id: str = Form(default="web_user"),
+    agent_type: str = Form(default=None)
 ):
-    """Endpoint para adicionar conhecimento ao sistema RAG."""
+    """Endpoint para adicionar conhecimento ao sistema RAG do agente escolhido."""
     global agent_manager
     
     if not agent_manager:
         raise HTTPException(status_code=503, detail="Gerenciador de agentes não disponível.")
     
     try:
-        # Definir contexto do usuário
-        agent_manager.set_user_context(user_id)
+        key = agent_manager.resolve_agent_type(agent_type)
+        agent = await agent_manager.aget_agent(key) if key else None
         
         # Adicionar conhecimento
-        if hasattr(agent_manager, 'add_knowledge_to_current_agent'):
-            doc_id = agent_manager.add_knowledge_to_current_agent(
+        if agent is not None and hasattr(agent, 'add_knowledge'):
+            doc_id = agent.add_knowledge(
                 content=content.strip(),
                 source=source,
                 metadata={"added_via": "web_interface", "user_id": user_id}
@@ -219,9 +293,45 @@ async def health_check():
             "google_api_key": bool(os.getenv("GOOGLE_API_KEY")),
             "openai_api_key": bool(os.getenv("OPENAI_API_KEY")),
             "tavily_api_key": bool(os.getenv("TAVILY_API_KEY"))
-        }
+        },
+        "event_loop": loop_watchdog.stats(),
+        "startup": startup_report.as_dict()
     }
 
+@app.get("/api/loop-blocks")
+async def loop_blocks(request: Request, limit: int = 10):
+    """Bloqueios recentes do loop de eventos com a pilha amostrada (admin ou localhost)."""
+    require_admin(request)
+    return {"stats": loop_watchdog.stats(), "events": loop_watchdog.recent_events(limit=limit)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas no formato do Prometheus (latência por etapa e por rota)."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+def require_admin(request: Request):
+    """
+    Acesso a dados internos (spans com atributos brutos: user_id, consultas...;
+    pilhas amostradas com caminhos de arquivos).
+    Com OBSERVABILITY_ADMIN_TOKEN definido, exige o cabeçalho X-Admin-Token
+    (atrás de um proxy toda requisição parece local); sem ele, só localhost.
+    """
+    token = os.getenv("OBSERVABILITY_ADMIN_TOKEN")
+    if token:
+        if hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+            return
+    elif request.client and request.client.host in LOOPBACK_HOSTS:
+        return
+    raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+
+@app.get("/api/traces")
+async def traces(request: Request, limit: int = 100, trace_id: str = None, name: str = None):
+    """Últimos spans registrados pelo exportador local (admin ou localhost)."""
+    require_admin(request)
+    return {"spans": recent_spans.list(limit=limit, trace_id=trace_id, name=name)}
+
 @app.get("/api/agents-info")
 async def agents_info():
     """Retorna informações sobre todos os agentes disponíveis."""
@@ -237,4 +347,4 @@ async def agents_info():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("web.app:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
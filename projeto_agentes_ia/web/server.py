@@ -0,0 +1,170 @@
+# web/server.py
+"""
+Servidor de produção com vários workers (pre-fork).
+
+O processo mestre importa a aplicação e carrega os agentes e modelos uma
+única vez, congela esses objetos no coletor de lixo (gc.freeze, para que o
+GC não reescreva as páginas compartilhadas), abre o socket e faz fork dos
+workers uvicorn. Cada worker herda a memória do mestre por copy-on-write e
+aceita conexões no mesmo socket.
+
+SIGTERM/SIGINT no mestre é repassado aos workers: cada um para de aceitar
+conexões, termina as requisições em andamento, executa o shutdown da
+aplicação (que grava a memória pendente) e sai. Workers que morrem sem
+pedido de parada são recriados.
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, Optional
+
+import uvicorn
+from uvicorn.importer import import_from_string
+
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """Mestre que pré-carrega a aplicação e supervisiona N workers uvicorn."""
+
+    def __init__(self, app: str = "web.app:app", host: str = "127.0.0.1", port: int = 8000,
+                 workers: int = None, preload: Optional[str] = "web.app:preload_agents",
+                 graceful_timeout: float = 30.0, log_level: str = "info"):
+        self.app_path = app
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.preload_path = preload
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}  # pid -> início
+        self.sock: Optional[socket.socket] = None
+        self.app = None
+        self._stopping = False
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def load(self):
+        """Importa a aplicação e executa o pré-carregamento no mestre."""
+        self.app = import_from_string(self.app_path)
+        if self.preload_path:
+            preload: Callable = import_from_string(self.preload_path)
+            started = time.perf_counter()
+            preload()
+            print(f"📦 Aplicação pré-carregada em {time.perf_counter() - started:.1f}s (pid {os.getpid()})")
+        # Objetos já existentes saem das varreduras do GC: as páginas continuam compartilhadas
+        gc.collect()
+        gc.freeze()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException as e:
+                logger.error("Worker %d encerrado com erro: %s", os.getpid(), e)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _run_worker(self):
+        # Sinais voltam ao padrão; o uvicorn instala os próprios handlers de parada graciosa
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app,
+            log_level=self.log_level,
+            lifespan="on",
+            timeout_graceful_shutdown=self.graceful_timeout
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _reap(self):
+        """Recolhe workers encerrados e recria os que morreram inesperadamente."""
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            print(f"⚠️ Worker {pid} saiu (status {status}); recriando")
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)  # evita recriar em laço um worker que falha na inicialização
+            self._spawn()
+
+    def _shutdown(self):
+        print(f"🛑 Encerrando {len(self.children)} worker(s)...")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+
+        for pid in list(self.children):
+            logger.warning("Worker %d não encerrou a tempo; forçando", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
+
+    def run(self):
+        self.load()
+        self.sock = self._bind()
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for _ in range(self.workers):
+            self._spawn()
+        print(f"🚀 {self.workers} worker(s) em http://{self.host}:{self.port} (mestre {os.getpid()})")
+
+        try:
+            while not self._stopping:
+                self._reap()
+                time.sleep(0.2)
+        finally:
+            self._shutdown()
+            self.sock.close()
+            print("✅ Servidor encerrado")
+
+
+def serve(app: str = "web.app:app", host: str = "127.0.0.1", port: int = 8000, workers: int = None,
+          preload: Optional[str] = "web.app:preload_agents", log_level: str = "info",
+          graceful_timeout: float = 30.0):
+    """
+    Inicia o modo de produção. Sem fork (Windows), cai para os workers do
+    próprio uvicorn, que carregam a aplicação em cada processo.
+    """
+    if not hasattr(os, "fork"):
+        print("⚠️ fork indisponível: cada worker carregará os próprios modelos")
+        uvicorn.run(app, host=host, port=port, workers=workers or os.cpu_count() or 1,
+                    log_level=log_level, timeout_graceful_shutdown=graceful_timeout)
+        return
+    PreforkServer(app=app, host=host, port=port, workers=workers, preload=preload,
+                  graceful_timeout=graceful_timeout, log_level=log_level).run()
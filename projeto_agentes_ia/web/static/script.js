@@ -210,6 +210,8 @@ class ChatInterface {
         console.log(`sendMessage called with query: ${message.substring(0, 50)}...`); // Added logging
         const formData = new FormData();
         formData.append('query', message);
+        // Agente escolhido vai em cada requisição (o servidor não guarda a seleção)
+        formData.append('agent_type', this.agentSelect.value);
         
         const response = await fetch('/chat', {
             method: 'POST',
@@ -354,7 +356,8 @@ async function handleKnowledgeSubmit(e) {
         const formData = new FormData();
         formData.append('content', content);
         formData.append('source', source);
-        formData.append('user_id', this.getCurrentUserId());
+        formData.append('user_id', getCurrentUserId());
+        formData.append('agent_type', document.getElementById('agentSelect').value);
 
         const response = await fetch('/add-knowledge', {
             method: 'POST',